@@ -1,3 +1,5 @@
+import importlib
+
 __version__ = '3.2.3'
 __all__ = [
     'AxiePaymentsManager',
@@ -9,10 +11,26 @@ __all__ = [
     'ScatterRonManager'
 ]
 
-from axie.payments import AxiePaymentsManager
-from axie.claims import AxieClaimsManager
-from axie.transfers import AxieTransferManager
-from axie.scatter import ScatterRonManager
-from axie.morphing import AxieMorphingManager
-from axie.breeding import AxieBreedManager
-from axie.qr_code import QRCodeManager
+# Module of each manager, imported the first time the manager is used so that
+# importing a light module of the package does not load all of them
+MANAGERS = {
+    'AxiePaymentsManager': 'axie.payments',
+    'AxieClaimsManager': 'axie.claims',
+    'AxieTransferManager': 'axie.transfers',
+    'ScatterRonManager': 'axie.scatter',
+    'AxieMorphingManager': 'axie.morphing',
+    'AxieBreedManager': 'axie.breeding',
+    'QRCodeManager': 'axie.qr_code'
+}
+
+
+def __getattr__(name):
+    if name not in MANAGERS:
+        raise AttributeError(f"module 'axie' has no attribute '{name}'")
+    manager = getattr(importlib.import_module(MANAGERS[name]), name)
+    globals()[name] = manager
+    return manager
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,79 @@
+import logging
+
+import requests
+from requests.exceptions import RequestException
+from axie_utils.utils import RONIN_PROVIDER, TOKEN, USER_AGENT
+
+
+BALANCE_OF_SELECTOR = "0x70a08231"
+RPC_BATCH_SIZE = 100
+RPC_TIMEOUT = 30
+
+
+def build_balance_request(request_id, account, token='slp'):
+    address = account.lower().replace("ronin:", "0x")
+    if token == 'ron':
+        return {"jsonrpc": "2.0", "id": request_id, "method": "eth_getBalance", "params": [address, "latest"]}
+    data = BALANCE_OF_SELECTOR + address.replace("0x", "").zfill(64)
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "eth_call",
+        "params": [{"to": TOKEN[token], "data": data}, "latest"]
+    }
+
+
+def parse_balance(result, token='slp'):
+    balance = int(result, 16) if result not in ["0x", None] else 0
+    if token == 'ron':
+        return float(balance / 1000000000000000000)
+    return balance
+
+
+def post_rpc_batch(payload, provider=RONIN_PROVIDER):
+    """ Sends a JSON-RPC batch request and returns its responses indexed by request id """
+    response = requests.post(
+        provider,
+        json=payload,
+        headers={"content-type": "application/json", "user-agent": USER_AGENT},
+        timeout=RPC_TIMEOUT)
+    results = response.json()
+    if not isinstance(results, list):
+        raise ValueError(f"Unexpected response: {results}")
+    return {r["id"]: r for r in results if isinstance(r, dict) and isinstance(r.get("id"), int)}
+
+
+def fetch_balances(accounts, token='slp', provider=RONIN_PROVIDER, batch_size=RPC_BATCH_SIZE):
+    """ Fetches the balance of all accounts using JSON-RPC batch requests.
+    Accounts whose balance could not be retrieved are left out of the snapshot,
+    so callers can fall back to check_balance for them. """
+    token = token.lower()
+    accounts = list(dict.fromkeys(accounts))
+    balances = {}
+    for start in range(0, len(accounts), batch_size):
+        batch = accounts[start:start + batch_size]
+        payload = [build_balance_request(i, acc, token) for i, acc in enumerate(batch)]
+        try:
+            results = post_rpc_batch(payload, provider)
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not fetch {token} balances for {len(batch)} accounts. Error: {e}")
+            continue
+        for i, acc in enumerate(batch):
+            if i not in results or results[i].get("result") is None:
+                continue
+            try:
+                balances[acc] = parse_balance(results[i]["result"], token)
+            except ValueError:
+                logging.warning(f"Could not parse {token} balance for account {acc}")
+    logging.info(f"Fetched {token} balances for {len(balances)}/{len(accounts)} accounts")
+    return balances
+
+
+def top_up_amounts(accounts, balances, minimum):
+    """ Amount every account is missing to hold the minimum, computed for the whole roster at once.
+    Accounts that already hold it are left out. """
+    missing = {acc: minimum - balances[acc] for acc in dict.fromkeys(accounts)}
+    for acc in [acc for acc, amount in missing.items() if amount <= 0]:
+        logging.info(f'Account {acc} already has more than the min ron desired')
+        del missing[acc]
+    return missing
@@ -1,39 +1,80 @@
 import sys
 import logging
-from datetime import datetime
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from axie.schemas import breeding_validator, breeding_record_validator, schema_errors
+from axie.receipts import ReceiptTracker
+from axie.lanes import LaneExecutor, LANE_CONCURRENCY, account_lane
+from axie.preflight import BreedingPreflight, breeding_slp_costs, breeding_axs_costs, WEI_PER_AXS
+from axie.balances import fetch_balances
+from axie.transactions import AccountNonces, SignedTransaction
+from axie.utils import load_json, JsonRecords, FilteredRecords
+from axie.payments import CREATOR_FEE_ADDRESS
+from web3 import Web3
+from axie_utils import check_balance
+from axie_utils.abis import AXIE_ABI, SLP_ABI
+from axie_utils.utils import AXIE_CONTRACT, SLP_CONTRACT
 
-from axie.schemas import breeding_schema
-from axie.utils import load_json, ImportantLogsFilter
-from axie.payments import PaymentsSummary, CREATOR_FEE_ADDRESS
-from axie_utils import Breed, Payment, check_balance
 
+class AxieBreed(SignedTransaction):
+    """ Breeds two axies of an account, sent without waiting for its receipt """
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+    def __init__(self, sire_axie, matron_axie, address, private_key):
+        super().__init__(address, private_key)
+        self.sire_axie = sire_axie
+        self.matron_axie = matron_axie
+
+    def contract_function(self):
+        axie_contract = self.w3.eth.contract(address=Web3.toChecksumAddress(AXIE_CONTRACT), abi=AXIE_ABI)
+        return axie_contract.functions.breedAxies(self.sire_axie, self.matron_axie)
+
+    def __str__(self):
+        return (f"Breeding axie {self.sire_axie} with {self.matron_axie} "
+                f"in account {self.from_acc.replace('0x', 'ronin:')}")
+
+
+class FeePayment(SignedTransaction):
+    """ SLP transfer paying the fee of a breeding session, sent without waiting for its receipt """
+
+    gas = 246437
+
+    def __init__(self, from_acc, from_private, to_acc, amount):
+        super().__init__(from_acc, from_private)
+        self.to_acc = to_acc.replace("ronin:", "0x")
+        self.amount = amount
+
+    def contract_function(self):
+        slp_contract = self.w3.eth.contract(address=Web3.toChecksumAddress(SLP_CONTRACT), abi=SLP_ABI)
+        return slp_contract.functions.transfer(Web3.toChecksumAddress(self.to_acc), self.amount)
+
+    def __str__(self):
+        return (f"Breeding Fee of {self.amount} SLP from account ({self.from_acc.replace('0x', 'ronin:')}) "
+                f"to account ({self.to_acc.replace('0x', 'ronin:')})")
 
 
 class AxieBreedManager:
-    def __init__(self, breeding_file, secrets_file, payment_account):
+    def __init__(self, breeding_file, secrets_file, payment_account, journal=None, stream=False,
+                 concurrency=LANE_CONCURRENCY):
         self.secrets = load_json(secrets_file)
-        self.breeding_file = load_json(breeding_file)
+        if stream:
+            self.breeding_file = JsonRecords(breeding_file, breeding_record_validator)
+        else:
+            self.breeding_file = load_json(breeding_file)
         self.payment_account = payment_account
         self.breeding_costs = 0
+        self.breeding_costs_by_account = {}
+        self.breeding_axs_by_account = {}
+        self.breed_counts = None
+        self.rejected = set()
+        self.rejected_count = 0
+        self.receipts = ReceiptTracker()
+        self.nonces = AccountNonces()
+        self.journal = journal
+        self.executor = LaneExecutor(concurrency)
 
     def verify_inputs(self):
         validation_error = False
         logging.info("Validating file inputs...")
-        try:
-            validate(self.breeding_file, breeding_schema)
-        except ValidationError as ex:
+        for ex in schema_errors(breeding_validator, self.breeding_file):
             logging.critical(f'Validation of breeding file failed. Error given: {ex.message}\n'
                              f'For attribute in: {list(ex.path)}')
             validation_error = True
@@ -51,11 +92,20 @@ class AxieBreedManager:
         return self.calculate_fee_cost() + self.breeding_costs
 
     def calculate_breeding_cost(self):
-        # TODO: We need to calculate how much will all breeding cost, pending for the future!
-        return 0
+        """ SLP the breeding accounts will spend, priced from the breed count of every parent.
+        The AXS each of them spends is kept too """
+        if self.breed_counts is None:
+            self.breed_counts = BreedingPreflight(self.pending_breedings()).load().breed_counts()
+        self.breeding_costs_by_account = breeding_slp_costs(self.pending_breedings(), self.breed_counts)
+        self.breeding_axs_by_account = breeding_axs_costs(self.pending_breedings())
+        return sum(self.breeding_costs_by_account.values())
+
+    def number_of_breeds(self):
+        """ Breedings of the file the preflight did not reject """
+        return len(self.breeding_file) - self.rejected_count
 
     def calculate_fee_cost(self):
-        number_of_breeds = len(self.breeding_file)
+        number_of_breeds = self.number_of_breeds()
         if number_of_breeds <= 15:
             cost = number_of_breeds * 30
         elif 15 < number_of_breeds <= 30:
@@ -66,30 +116,106 @@ class AxieBreedManager:
             cost = (15 * 30) + (15 * 25) + (20 * 20) + ((number_of_breeds - 50) * 15)
         return cost
 
+    def is_completed(self, bf):
+        return self.journal is not None and self.journal.is_completed(self.journal_key(bf))
+
+    def pending_breedings(self):
+        """ Breedings neither completed nor rejected, read again from the breedings file on every pass """
+        return FilteredRecords(self.breeding_file,
+                               lambda bf: not self.is_completed(bf) and self.journal_key(bf) not in self.rejected)
+
+    def breedings_to_execute(self):
+        for bf in self.breeding_file:
+            if self.is_completed(bf):
+                logging.info(f"Breeding of {bf['Sire']} with {bf['Matron']} already done according to journal, "
+                             "skipping.")
+            elif self.journal_key(bf) not in self.rejected:
+                yield bf
+
+    def preflight(self):
+        """ Drops the breedings that would revert, before paying any gas or fee for them.
+        Only the keys of the rejected ones are kept, the breedings file is not loaded in memory """
+        index = BreedingPreflight(self.pending_breedings()).load()
+        rejected = index.rejected_breedings()
+        self.breed_counts = index.breed_counts()
+        self.rejected = {self.journal_key(bf) for bf in rejected}
+        self.rejected_count = len(rejected)
+
+    def check_funds(self):
+        """ Checks at once that every account holds the SLP and AXS it will spend, so the session never stops
+        halfway """
+        required = {"slp": dict(self.breeding_costs_by_account), "axs": dict(self.breeding_axs_by_account)}
+        payment_account = self.payment_account.lower().replace("0x", "ronin:")
+        if not (self.journal and self.journal.is_completed("breeding_fee")):
+            required["slp"][payment_account] = required["slp"].get(payment_account, 0) + self.calculate_fee_cost()
+        enough_funds = True
+        for token, amounts in required.items():
+            if not amounts:
+                continue
+            balances = fetch_balances(list(amounts), token)
+            for acc, amount in amounts.items():
+                balance = balances[acc] if acc in balances else check_balance(acc, token)
+                if token == "axs":
+                    balance = balance / WEI_PER_AXS
+                if balance < amount:
+                    logging.critical(f"Important: Account {acc} needs {amount} {token.upper()} for this session "
+                                     f"but holds {balance} {token.upper()}")
+                    enough_funds = False
+        return enough_funds
+
     def execute(self):
-        if check_balance(self.payment_account) < self.calculate_cost():
-            logging.critical("Important: Not enough SLP funds to pay for breeding and the fee")
+        self.preflight()
+        if not self.number_of_breeds():
+            logging.critical("Important: No valid breedings to execute")
+            return
+        self.breeding_costs = self.calculate_breeding_cost()
+        logging.info(f"Important: Breeding session will cost {self.calculate_cost()} SLP, "
+                     f"{self.breeding_costs} SLP to breed and {self.calculate_fee_cost()} SLP of fee")
+        if not self.check_funds():
+            logging.critical("Important: Not enough SLP or AXS funds to pay for breeding and the fee")
             sys.exit()
 
         logging.info("Important: About to start breeding axies")
-        for bf in self.breeding_file:
-            b = Breed(
-                sire_axie=bf['Sire'],
-                matron_axie=bf['Matron'],
-                address=bf['AccountAddress'],
-                private_key=self.secrets[bf['AccountAddress']]
-            )
-            b.execute()
+        sent = self.executor.run(self.breedings_to_execute(), lambda bf: account_lane(bf['AccountAddress']),
+                                 self.breed)
         logging.info("Important: Done breeding axies")
+        if self.journal and self.journal.is_completed("breeding_fee"):
+            logging.info("Breeding fee already paid according to journal, skipping.")
+        else:
+            sent.append(("breeding_fee", self.pay_fee()))
+        self.receipts.wait()
+        # Only the transactions the chain confirmed are done, the rest are sent again on a resumed run
+        if self.journal:
+            for key, tx_hash in [breeding for breeding in sent if breeding]:
+                if tx_hash and self.receipts.outcome(tx_hash) == "confirmed":
+                    self.journal.complete(key, tx_hash=tx_hash)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
+
+    @staticmethod
+    def journal_key(bf):
+        return f"breed:{bf['Sire']}:{bf['Matron']}"
+
+    def breed(self, bf):
+        """ Sends the breeding, returns its journal key with the hash it was sent with """
+        b = AxieBreed(
+            sire_axie=bf['Sire'],
+            matron_axie=bf['Matron'],
+            address=bf['AccountAddress'],
+            private_key=self.secrets[bf['AccountAddress']]
+        )
+        tx_hash = self.nonces.send(b)
+        self.receipts.track("Breed", f"{bf['Sire']} with {bf['Matron']}", tx_hash)
+        return self.journal_key(bf), tx_hash
+
+    def pay_fee(self):
         fee = self.calculate_fee_cost()
         logging.info(f"Time to pay the fee for breeding. For this session it is: {fee} SLP")
-        p = Payment(
-            "Breeding Fee",
-            "donation",
+        p = FeePayment(
             self.payment_account,
             self.secrets[self.payment_account],
             CREATOR_FEE_ADDRESS,
-            fee,
-            PaymentsSummary()
+            fee
         )
-        p.execute()
+        tx_hash = self.nonces.send(p)
+        self.receipts.track("Payment", "Breeding Fee", tx_hash)
+        return tx_hash
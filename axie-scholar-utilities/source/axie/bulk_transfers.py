@@ -0,0 +1,246 @@
+import logging
+
+from requests.exceptions import RequestException
+from web3 import Web3
+from axie_utils.utils import RONIN_PROVIDER, AXIE_CONTRACT, USER_AGENT, get_nonce
+
+from axie.lanes import account_lane
+
+
+# Gas a bulk transfer may use, it is split in as many transactions as needed to stay below it
+BULK_TRANSFER_GAS_LIMIT = 3000000
+# Upper bound of the gas of a bulk transfer, used to size the chunks and when the chain could not estimate it
+BULK_TRANSFER_BASE_GAS = 100000
+BULK_TRANSFER_AXIE_GAS = 80000
+# Estimates are raised by this factor, the chain state can change between estimating and mining
+BULK_TRANSFER_GAS_MARGIN = 1.25
+# setApprovalForAll only sets one flag of the account, it uses about half of this
+APPROVAL_GAS = 100000
+
+BATCH_TRANSFER_ABI = [{
+    "inputs": [
+        {"internalType": "address", "name": "_tokenContract", "type": "address"},
+        {"internalType": "uint256[]", "name": "_ids", "type": "uint256[]"},
+        {"internalType": "address[]", "name": "_recipients", "type": "address[]"}
+    ],
+    "name": "safeBatchTransfer",
+    "outputs": [],
+    "stateMutability": "nonpayable",
+    "type": "function"
+}]
+
+APPROVAL_FOR_ALL_ABI = [{
+    "inputs": [
+        {"internalType": "address", "name": "_owner", "type": "address"},
+        {"internalType": "address", "name": "_operator", "type": "address"}
+    ],
+    "name": "isApprovedForAll",
+    "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
+    "stateMutability": "view",
+    "type": "function"
+}, {
+    "inputs": [
+        {"internalType": "address", "name": "_operator", "type": "address"},
+        {"internalType": "bool", "name": "_approved", "type": "bool"}
+    ],
+    "name": "setApprovalForAll",
+    "outputs": [],
+    "stateMutability": "nonpayable",
+    "type": "function"
+}]
+
+
+def function_selectors(abi):
+    """ 4 byte selectors of the functions of an ABI """
+    selectors = []
+    for entry in abi:
+        if entry["type"] == "function":
+            signature = f"{entry['name']}({','.join(i['type'] for i in entry['inputs'])})"
+            selectors.append(bytes(Web3.keccak(text=signature)[:4]))
+    return selectors
+
+
+def implements_abi(code, abi):
+    """ Whether deployed bytecode dispatches every function of the ABI, their selectors are pushed with PUSH4 """
+    return bool(code) and all(b"\x63" + selector in bytes(code) for selector in function_selectors(abi))
+
+
+def check_batch_contract(contract):
+    """ Checks the batch transfer contract the user gave is deployed and implements safeBatchTransfer """
+    w3 = Web3(
+        Web3.HTTPProvider(
+            RONIN_PROVIDER,
+            request_kwargs={"headers": {"content-type": "application/json", "user-agent": USER_AGENT}}))
+    try:
+        code = w3.eth.get_code(Web3.toChecksumAddress(contract.replace("ronin:", "0x")))
+    except (RequestException, ValueError) as e:
+        logging.critical(f"Important: Could not read the batch transfer contract ({contract}). Error given: {e}")
+        return False
+    if not implements_abi(code, BATCH_TRANSFER_ABI):
+        logging.critical(f"Important: Contract ({contract}) is not a batch transfer contract, "
+                         "it does not implement safeBatchTransfer. Review the address given to --bulk.")
+        return False
+    return True
+
+
+def confirm_approval(contract):
+    """ Asks the user to confirm approving the batch transfer contract to move all the axies of the accounts """
+    accept = None
+    while accept not in ["y", "n", "Y", "N"]:
+        accept = input(f"--approve-bulk lets the contract ({contract}) move ALL the axies of the accounts that "
+                       "did not approve it yet, and the approval stays after this run. Do you want to approve it? "
+                       "(y/n): ")
+    return accept.lower() == "y"
+
+
+def bulk_transfer_gas(number_of_axies):
+    return BULK_TRANSFER_BASE_GAS + BULK_TRANSFER_AXIE_GAS * number_of_axies
+
+
+def max_axies_per_transfer(gas_limit=BULK_TRANSFER_GAS_LIMIT):
+    return max(1, (gas_limit - BULK_TRANSFER_BASE_GAS) // BULK_TRANSFER_AXIE_GAS)
+
+
+def chunk_transfers(transfers, gas_limit=BULK_TRANSFER_GAS_LIMIT):
+    """ Splits the transfers of an account in chunks that fit in a bulk transfer """
+    size = max_axies_per_transfer(gas_limit)
+    return [transfers[i:i + size] for i in range(0, len(transfers), size)]
+
+
+def group_by_account(transfers):
+    """ Groups single transfers by the account sending them, keeping their order """
+    groups = {}
+    for t in transfers:
+        groups.setdefault(account_lane(t.from_acc), []).append(t)
+    return groups
+
+
+def send_bulk_transfers(bulks, receipts, approve=False):
+    """ Sends the bulk transfers of one account with consecutive nonces. Accounts that did not approve the
+    batch transfer contract are skipped, unless approve is set, then it is approved first and the approval
+    stays after the run. Returns the bulk transfers sent with their hash. """
+    account = bulks[0].from_acc.replace('0x', 'ronin:')
+    contract = bulks[0].contract
+    approved = bulks[0].is_approved()
+    if not approved and not approve:
+        logging.critical(f"Important: Account ({account}) has not approved the batch transfer contract "
+                         f"({contract}), skipping its bulk transfers. Re-run with --approve-bulk "
+                         "to approve it.")
+        return []
+    nonce = get_nonce(bulks[0].from_acc)
+    if not approved:
+        logging.critical(f"Important: Approving the batch transfer contract ({contract}) to move "
+                         f"all the axies of account ({account}). The approval stays after this run.")
+        tx_hash = bulks[0].approve(nonce)
+        receipts.track("Approval", f"of batch transfers for account ({account})", tx_hash)
+        if not tx_hash:
+            return []
+        nonce += 1
+    sent = []
+    for bulk in bulks:
+        tx_hash = bulk.execute(nonce)
+        receipts.track("Bulk Transfer", str(bulk), tx_hash)
+        if tx_hash:
+            nonce += 1
+            sent.append((bulk, tx_hash))
+    return sent
+
+
+class BulkTransfer:
+    """ Transfers several axies from one account in a single transaction through the batch transfer contract
+    the user gave.
+
+    The nonce is given by the caller, so the chunks of an account are sent one after
+    the other without waiting for each other. Their receipts are tracked afterwards. """
+
+    def __init__(self, from_acc, from_private, transfers, contract):
+        self.w3 = Web3(
+            Web3.HTTPProvider(
+                RONIN_PROVIDER,
+                request_kwargs={"headers": {"content-type": "application/json", "user-agent": USER_AGENT}}))
+        self.from_acc = from_acc.replace("ronin:", "0x")
+        self.from_private = from_private
+        self.axie_ids = [axie_id for axie_id, _ in transfers]
+        self.to_accs = [to_acc.replace("ronin:", "0x") for _, to_acc in transfers]
+        self.contract = contract.replace("ronin:", "0x")
+        self.batch_contract = self.w3.eth.contract(
+            address=Web3.toChecksumAddress(self.contract),
+            abi=BATCH_TRANSFER_ABI
+        )
+        self.axie_contract = self.w3.eth.contract(
+            address=Web3.toChecksumAddress(AXIE_CONTRACT),
+            abi=APPROVAL_FOR_ALL_ABI
+        )
+
+    def is_approved(self):
+        try:
+            return self.axie_contract.functions.isApprovedForAll(
+                Web3.toChecksumAddress(self.from_acc),
+                Web3.toChecksumAddress(self.contract)).call()
+        except (RequestException, ValueError) as e:
+            # Approving again does no harm, not approving makes every transfer fail
+            logging.warning(f"Could not check batch transfer approval of account {self.from_acc}. Error: {e}")
+            return False
+
+    def transaction_params(self, gas, nonce):
+        return {
+            "chainId": 2020,
+            "gas": gas,
+            "from": Web3.toChecksumAddress(self.from_acc),
+            "gasPrice": self.w3.toWei("1", "gwei"),
+            "value": 0,
+            "nonce": nonce
+        }
+
+    def build_approval(self, nonce):
+        return self.axie_contract.functions.setApprovalForAll(
+            Web3.toChecksumAddress(self.contract),
+            True
+        ).buildTransaction(self.transaction_params(APPROVAL_GAS, nonce))
+
+    def transfer_function(self):
+        return self.batch_contract.functions.safeBatchTransfer(
+            Web3.toChecksumAddress(AXIE_CONTRACT),
+            self.axie_ids,
+            [Web3.toChecksumAddress(to_acc) for to_acc in self.to_accs]
+        )
+
+    def transaction_gas(self):
+        """ Estimated gas of the transfer, the upper bound when the chain could not estimate it,
+        as happens while the approval sent right before it is not mined yet """
+        try:
+            gas = self.transfer_function().estimateGas({"from": Web3.toChecksumAddress(self.from_acc)})
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not estimate gas of a bulk transfer of {len(self.axie_ids)} axies. Error: {e}")
+            return bulk_transfer_gas(len(self.axie_ids))
+        return min(BULK_TRANSFER_GAS_LIMIT, int(gas * BULK_TRANSFER_GAS_MARGIN))
+
+    def build_transfer(self, nonce):
+        return self.transfer_function().buildTransaction(self.transaction_params(self.transaction_gas(), nonce))
+
+    def sign(self, transaction):
+        return self.w3.eth.account.sign_transaction(transaction, private_key=self.from_private).rawTransaction
+
+    def send(self, transaction, description):
+        try:
+            raw_transaction = self.sign(transaction)
+            self.w3.eth.send_raw_transaction(raw_transaction)
+        except (RequestException, ValueError) as e:
+            logging.critical(f"Important: {description} could not be sent. Error given: {e}")
+            return None
+        _hash = self.w3.toHex(self.w3.keccak(raw_transaction))
+        logging.info(f"Important: {description} sent. Hash: {_hash} - "
+                     f"Explorer: https://explorer.roninchain.com/tx/{_hash}")
+        return _hash
+
+    def approve(self, nonce):
+        """ Allows the batch transfer contract to move the axies of the account """
+        return self.send(self.build_approval(nonce),
+                         f"Batch transfer approval for account ({self.from_acc.replace('0x', 'ronin:')})")
+
+    def execute(self, nonce):
+        return self.send(self.build_transfer(nonce), str(self))
+
+    def __str__(self):
+        return (f"Bulk Transfer of {len(self.axie_ids)} axies from account "
+                f"({self.from_acc.replace('0x', 'ronin:')})")
@@ -1,25 +1,90 @@
 import sys
-import asyncio
 import logging
-from datetime import datetime
 
-from axie.utils import ImportantLogsFilter
+from axie.scheduler import ClaimScheduler, CLAIM_CONCURRENCY, CLAIM_RATE
+from axie.eligibility import claimable_accounts
+from axie.receipts import ReceiptTracker
+from axie.tokens import CachedJWTMixin
+from axie.transactions import send_transaction
+from requests.exceptions import RequestException, RetryError
+from web3 import Web3
+
 from axie_utils import Claim
+from axie_utils.utils import get_nonce
+
+
+CLAIM_URL = "http://game-api-pre.skymavis.com/v1/players/me/items/1/claim"
+
+
+class CachedClaim(CachedJWTMixin, Claim):
+    """ Claim sent without waiting for its receipt, which is tracked afterwards with the rest of the claims.
+    It returns the hash of its transaction, None when it was skipped or could not be sent """
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+    def claim_signature(self):
+        """ Signature of the checkpoint given by the game API, None when there is nothing to claim """
+        unclaimed = self.has_unclaimed_slp()
+        if not unclaimed:
+            logging.info(f"Important: Account {self.acc_name} ({self.account.replace('0x', 'ronin:')}) "
+                         "has no claimable SLP")
+            return None
+        logging.info(f"Account {self.acc_name} ({self.account.replace('0x', 'ronin:')}) has "
+                     f"{unclaimed} unclaimed SLP")
+        jwt = self.get_jwt()
+        if not jwt:
+            logging.critical("Important: Skipping claiming, we could not get the JWT for account "
+                             f"{self.account.replace('0x', 'ronin:')}")
+            return None
+        headers = {
+            "User-Agent": self.user_agent,
+            "authorization": f"Bearer {jwt}"
+        }
+        try:
+            response = self.request.post(CLAIM_URL, headers=headers)
+        except RetryError as e:
+            logging.critical(f"Important: Error! Executing SLP claim API call for account {self.acc_name}"
+                             f"({self.account.replace('0x', 'ronin:')}). Error {e}")
+            return None
+        if not 200 <= response.status_code <= 299:
+            logging.info(f"Important: Claim for account {self.acc_name} ({self.account.replace('0x', 'ronin:')}) "
+                         "had to be skipped")
+            return None
+        signature = response.json()["blockchainRelated"].get("signature")
+        if not signature or not signature["signature"]:
+            logging.critical(f"Important: Account {self.acc_name} ({self.account.replace('0x', 'ronin:')}) "
+                             "had no signature in blockchainRelated")
+            return None
+        return signature
+
+    def build(self, signature, nonce):
+        return self.slp_contract.functions.checkpoint(
+            Web3.toChecksumAddress(self.account),
+            signature['amount'],
+            signature['timestamp'],
+            signature['signature']
+        ).buildTransaction({'gas': 492874, 'gasPrice': self.w3.toWei('1', 'gwei'), 'nonce': nonce})
+
+    async def async_execute(self):
+        signature = self.claim_signature()
+        if not signature:
+            return None
+        try:
+            transaction = self.build(signature, get_nonce(self.account))
+        except (RequestException, ValueError) as e:
+            logging.critical(f"Important: {self} could not be built. Error given: {e}")
+            return None
+        return send_transaction(self.w3, transaction, self.private_key, str(self))
 
 
 class AxieClaimsManager:
-    def __init__(self, payments_file, secrets_file, force=False):
+    def __init__(self, payments_file, secrets_file, force=False, journal=None, concurrency=CLAIM_CONCURRENCY,
+                 rate=CLAIM_RATE, token_cache=None):
         self.secrets_file, self.acc_names = self.load_secrets_and_acc_name(secrets_file, payments_file)
         self.force = force
+        self.journal = journal
+        self.scheduler = ClaimScheduler(concurrency, rate)
+        self.token_cache = token_cache
+        self.receipts = ReceiptTracker()
+        self.sent = {}
 
     def load_secrets_and_acc_name(self, secrets, payments):
         refined_secrets = {}
@@ -54,14 +119,43 @@ class AxieClaimsManager:
             sys.exit()
         logging.info("Secret file correctly validated")
 
+    @staticmethod
+    def journal_key(account):
+        return f"claim:{account}"
+
     def prepare_claims(self):
-        claims_list = [
-            Claim(
-                force=self.force,
-                account=acc,
-                private_key=self.secrets_file[acc],
-                acc_name=self.acc_names[acc]) for acc in self.secrets_file]
+        accounts = self.secrets_file
+        if self.journal:
+            accounts = self.journal.pending(list(accounts), self.journal_key)
+        accounts = claimable_accounts(accounts, self.acc_names, self.force)
         logging.info("Important: Claiming starting...")
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(asyncio.gather(*[claim.async_execute() for claim in claims_list]))
+        try:
+            self.scheduler.run(accounts, self.build_claim, self.complete_claim)
+        finally:
+            if self.token_cache:
+                self.token_cache.save()
+        self.receipts.wait()
+        # Only the claims the chain confirmed are done, the rest are claimed again on a resumed run
+        if self.journal:
+            confirmed = self.receipts.confirmed_hashes()
+            for account, tx_hash in self.sent.items():
+                if tx_hash in confirmed:
+                    self.journal.complete(self.journal_key(account), tx_hash=tx_hash)
         logging.info("Important: Claiming completed!")
+        logging.info(f"Important: Claims summary:\n{self.scheduler}")
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
+
+    def build_claim(self, account):
+        return CachedClaim(
+            force=self.force,
+            account=account,
+            private_key=self.secrets_file[account],
+            acc_name=self.acc_names[account],
+            token_cache=self.token_cache)
+
+    def complete_claim(self, account, tx_hash):
+        """ Tracks the receipt of a claim, returns whether it was sent """
+        self.receipts.track("Claim", f"SLP claim for account {account}", tx_hash)
+        if tx_hash:
+            self.sent[account] = tx_hash
+        return tx_hash is not None
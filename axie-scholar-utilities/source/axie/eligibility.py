@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from axie_utils.utils import USER_AGENT
+
+
+GAME_API_ITEMS_URL = "http://game-api-pre.skymavis.com/v1/players/{}/items/1"
+CLAIM_INTERVAL = timedelta(days=14)
+PREFETCH_BATCH_SIZE = 50
+PREFETCH_TIMEOUT = 30
+
+
+def build_session(pool_size=PREFETCH_BATCH_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_claim_status(data):
+    return {
+        "last_claimed": datetime.utcfromtimestamp(data["lastClaimedItemAt"]),
+        "unclaimed": int(data["rawTotal"]) - int(data["rawClaimableTotal"])
+    }
+
+
+def fetch_claim_status(accounts, batch_size=PREFETCH_BATCH_SIZE, session=None):
+    """ Fetches the last claim date and the unclaimed SLP of all accounts, a batch of them at a time
+    over a single keep-alive session. Accounts that could not be checked are left out. """
+    session = session or build_session(batch_size)
+
+    def fetch(account):
+        url = GAME_API_ITEMS_URL.format(account.lower().replace("ronin:", "0x"))
+        try:
+            response = session.get(url, headers={"User-Agent": USER_AGENT}, timeout=PREFETCH_TIMEOUT)
+            if 200 <= response.status_code <= 299:
+                return parse_claim_status(response.json())
+        except (RequestException, ValueError, KeyError, TypeError) as e:
+            logging.debug(f"Could not fetch claim status of account {account}. Error: {e}")
+        return None
+
+    accounts = list(dict.fromkeys(accounts))
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=batch_size) as executor:
+        for start in range(0, len(accounts), batch_size):
+            batch = accounts[start:start + batch_size]
+            for account, status in zip(batch, executor.map(fetch, batch)):
+                if status is not None:
+                    statuses[account] = status
+    logging.info(f"Fetched claim status for {len(statuses)}/{len(accounts)} accounts")
+    return statuses
+
+
+def next_claim_date(status):
+    return status["last_claimed"] + CLAIM_INTERVAL
+
+
+def humanize_date(date_utc):
+    return date_utc.replace(tzinfo=timezone.utc).astimezone(tz=None).strftime("%m/%d/%Y, %H:%M")
+
+
+def check_eligibility(status, force=False, now=None):
+    """ Returns None when the account can claim, or the reason why it cannot """
+    now = now or datetime.utcnow()
+    if not force and now < next_claim_date(status):
+        return f"will be claimable again on {humanize_date(next_claim_date(status))}"
+    if status["unclaimed"] <= 0:
+        return "has no claimable SLP"
+    return None
+
+
+def claimable_accounts(accounts, acc_names, force=False):
+    """ Keeps the accounts that can claim now, so the others do not go through auth and signing.
+    Accounts whose status could not be fetched are kept, their claim checks it again. """
+    accounts = list(accounts)
+    logging.info(f"Checking which of the {len(accounts)} accounts can claim...")
+    statuses = fetch_claim_status(accounts)
+    claimable = []
+    for acc in accounts:
+        reason = check_eligibility(statuses[acc], force) if acc in statuses else None
+        if reason:
+            logging.info(f"Important: Account {acc_names[acc]} ({acc}) {reason}")
+        else:
+            claimable.append(acc)
+    logging.info(f"Important: {len(claimable)} out of {len(accounts)} accounts can claim")
+    return claimable
@@ -0,0 +1,97 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import RequestException
+from axie_utils.utils import RONIN_PROVIDER, AXIE_CONTRACT
+
+from axie.balances import post_rpc_batch, BALANCE_OF_SELECTOR, RPC_BATCH_SIZE
+
+
+TOKEN_OF_OWNER_BY_INDEX_SELECTOR = "0x2f745c59"
+INVENTORY_WORKERS = 8
+
+
+def build_axie_call(request_id, data):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "eth_call",
+        "params": [{"to": AXIE_CONTRACT, "data": data}, "latest"]
+    }
+
+
+def encode_address(account):
+    return account.lower().replace("ronin:", "").replace("0x", "").zfill(64)
+
+
+def call_results(payload, provider):
+    """ Results of a batch of eth_calls in request order, raising if any of them is missing """
+    results = post_rpc_batch(payload, provider)
+    values = []
+    for request in payload:
+        result = results.get(request["id"], {}).get("result")
+        if result in [None, "0x"]:
+            raise ValueError(f"Missing result for request {request['id']}")
+        values.append(int(result, 16))
+    return values
+
+
+def fetch_axie_ids(account, provider=RONIN_PROVIDER, batch_size=RPC_BATCH_SIZE):
+    """ Fetches the ids of all axies owned by an account, paginating its token index
+    in JSON-RPC batches. Returns None when the inventory could not be fully read. """
+    owner = encode_address(account)
+    try:
+        count, = call_results([build_axie_call(0, BALANCE_OF_SELECTOR + owner)], provider)
+        axie_ids = set()
+        for start in range(0, count, batch_size):
+            payload = [
+                build_axie_call(i, TOKEN_OF_OWNER_BY_INDEX_SELECTOR + owner + hex(index)[2:].zfill(64))
+                for i, index in enumerate(range(start, min(start + batch_size, count)))]
+            axie_ids.update(call_results(payload, provider))
+    except (RequestException, ValueError) as e:
+        logging.warning(f"Could not fetch the axies of account {account}. Error: {e}")
+        return None
+    return axie_ids
+
+
+class AxieInventory:
+    """ Index of the axies owned by a set of accounts, loaded once per account.
+
+    Accounts are fetched concurrently. Ownership of accounts that could not be
+    loaded is unknown, so callers can fall back to asking the chain per axie. """
+
+    def __init__(self, accounts, provider=RONIN_PROVIDER, workers=INVENTORY_WORKERS):
+        self.accounts = list(dict.fromkeys(self.normalize(acc) for acc in accounts))
+        self.provider = provider
+        self.workers = workers
+        self.index = {}
+
+    @staticmethod
+    def normalize(account):
+        return account.lower().replace("0x", "ronin:")
+
+    def load(self):
+        if not self.accounts:
+            return self
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(self.accounts))) as executor:
+            inventories = executor.map(lambda acc: fetch_axie_ids(acc, self.provider), self.accounts)
+            for acc, axie_ids in zip(self.accounts, inventories):
+                if axie_ids is not None:
+                    self.index[acc] = axie_ids
+        logging.info(f"Loaded the axies of {len(self.index)}/{len(self.accounts)} accounts, "
+                     f"{sum(len(ids) for ids in self.index.values())} axies in total")
+        return self
+
+    def owns(self, account, axie_id):
+        """ Tells if the account owns the axie, or None when its inventory is unknown """
+        axie_ids = self.index.get(self.normalize(account))
+        if axie_ids is None:
+            return None
+        return int(axie_id) in axie_ids
+
+    def check_owner(self, axies, axie_id):
+        """ Ownership check for an Axies helper, asking the chain only when its inventory is unknown """
+        owned = self.owns(axies.acc, axie_id)
+        if owned is None:
+            return axies.check_axie_owner(axie_id)
+        return owned
@@ -0,0 +1,100 @@
+import os
+import json
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+
+JOURNAL_SYNC_EVERY = 25
+
+
+def new_journal_path(folder='logs'):
+    return os.path.join(folder, f"journal_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+
+
+class RunJournal:
+    """ Append-only journal of the actions planned and completed during a run.
+
+    Every entry is a JSON line, flushed as soon as it is written and fsynced in
+    batches. Loading an existing journal gives back the completed actions, so a
+    resumed run can skip them without asking the chain again, and the planned
+    ones that never completed, which the managers check against the chain. """
+
+    def __init__(self, path, sync_every=JOURNAL_SYNC_EVERY):
+        self.path = path
+        self.sync_every = sync_every
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0
+        self.completed = {}
+        self.planned = {}
+        if os.path.isfile(path):
+            self.load()
+
+    def load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    # A crash can leave the last line half written
+                    logging.warning(f"Ignoring corrupted line in journal {self.path}")
+                    continue
+                if entry.get("event") == "completed":
+                    self.completed[entry["key"]] = entry
+                elif entry.get("event") == "planned":
+                    self.planned[entry["key"]] = entry
+        logging.info(f"Loaded journal {self.path}, {len(self.completed)} actions already completed")
+
+    def record(self, event, key, **data):
+        entry = {"event": event, "key": key, "time": datetime.now().isoformat(), **data}
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8')
+                atexit.register(self.close)
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            self.unsynced += 1
+            if self.unsynced >= self.sync_every:
+                self.sync()
+            if event == "completed":
+                self.completed[key] = entry
+            elif event == "planned":
+                self.planned[key] = entry
+
+    def plan(self, key, **data):
+        self.record("planned", key, **data)
+
+    def complete(self, key, **data):
+        self.record("completed", key, **data)
+
+    def is_completed(self, key):
+        return key in self.completed
+
+    def unconfirmed(self, key):
+        """ Planned entry of an action that never completed, it may have reached the chain anyway """
+        if key in self.completed:
+            return None
+        return self.planned.get(key)
+
+    def pending(self, items, key):
+        """ Filters out the items whose action, given by the key function, is already completed """
+        pending = [item for item in items if key(item) not in self.completed]
+        if len(pending) < len(items):
+            logging.info(f"Important: Skipping {len(items) - len(pending)} actions already completed "
+                         f"according to journal {self.path}")
+        return pending
+
+    def sync(self):
+        if self.file is not None and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.sync()
+                self.file.close()
+                self.file = None
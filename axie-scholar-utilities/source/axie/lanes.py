@@ -0,0 +1,64 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+LANE_CONCURRENCY = 1
+
+
+def account_lane(account):
+    """ Lane of an account, the same however its address is written """
+    return account.lower().replace("ronin:", "0x")
+
+
+class LaneExecutor:
+    """ Runs work items partitioned in lanes, one lane per source account.
+
+    Items of the same lane run one after the other in their original order, as their
+    transactions share the nonce sequence of the account. Different lanes are
+    independent and run concurrently, at most `concurrency` of them at a time. Running
+    one lane at a time, items run in the order they were given. """
+
+    def __init__(self, concurrency=LANE_CONCURRENCY):
+        self.concurrency = concurrency
+
+    @staticmethod
+    def partition(items, lane_key):
+        lanes = {}
+        for position, item in enumerate(items):
+            lanes.setdefault(lane_key(item), []).append((position, item))
+        return lanes
+
+    @staticmethod
+    def run_lane(lane, items, execute, results):
+        for position, item in items:
+            try:
+                results[position] = execute(item)
+            except Exception as e:
+                # One failed item must not stop the rest of its lane
+                logging.critical(f"Important: Execution in lane {lane} failed with error: {e}")
+                results[position] = None
+
+    def run(self, items, lane_key, execute):
+        """ Executes every item and returns their results in the order of the items """
+        if self.concurrency <= 1:
+            # Items are consumed as they run, a stream of them is never held in memory
+            results = []
+            for position, item in enumerate(items):
+                results.append(None)
+                self.run_lane(lane_key(item), [(position, item)], execute, results)
+            return results
+        items = list(items)
+        lanes = self.partition(items, lane_key)
+        results = [None] * len(items)
+        if len(lanes) > 1:
+            logging.info(f"Executing {len(items)} actions in {len(lanes)} account lanes, "
+                         f"{self.concurrency} lanes at a time")
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(lanes))) as executor:
+                futures = [executor.submit(self.run_lane, lane, lane_items, execute, results)
+                           for lane, lane_items in lanes.items()]
+                for future in futures:
+                    future.result()
+        else:
+            for lane, lane_items in lanes.items():
+                self.run_lane(lane, lane_items, execute, results)
+        return results
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+from axie.utils import ImportantLogsFilter
+
+
+LOGS_FOLDER = 'logs'
+# Log files are written to disk once this many records are buffered, or on the first record
+# that comes this many seconds after the last write
+LOG_FLUSH_RECORDS = 50
+LOG_FLUSH_INTERVAL = 2
+
+# Listener writing the log files of the current run, there is only one per run
+listener = None
+
+
+class BufferedFileHandler(logging.StreamHandler):
+    """ Writes records to a file, flushing them in batches instead of after every record """
+
+    def __init__(self, path, flush_records=LOG_FLUSH_RECORDS, flush_interval=LOG_FLUSH_INTERVAL):
+        super().__init__(open(path, 'w', encoding='utf-8'))
+        self.path = path
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        self.buffered += 1
+        if self.buffered >= self.flush_records or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.stream and not self.stream.closed:
+                self.stream.flush()
+            self.buffered = 0
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            try:
+                if self.stream and not self.stream.closed:
+                    self.stream.flush()
+                    self.stream.close()
+            finally:
+                logging.Handler.close(self)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }, ensure_ascii=False)
+
+
+def setup_run_logging(folder=LOGS_FOLDER, level=logging.INFO):
+    """ Sets up the log files of the run, later calls return the same listener.
+
+    Loggers only put their records in a queue, so logging never waits on the disk. A
+    single listener thread writes them: the important ones to the results log, to be
+    shared with the scholars, and all of them as JSON lines to the run log. """
+    global listener
+    if listener is not None:
+        return listener
+    os.makedirs(folder, exist_ok=True)
+    now = int(datetime.now().timestamp())
+    results = BufferedFileHandler(os.path.join(folder, f'results_{now}.log'))
+    results.addFilter(ImportantLogsFilter())
+    records = BufferedFileHandler(os.path.join(folder, f'run_{now}.jsonl'))
+    records.setFormatter(JsonLinesFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, results, records)
+    listener.start()
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    atexit.register(stop_run_logging)
+    return listener
+
+
+def stop_run_logging():
+    """ Writes the records still queued and closes the log files """
+    global listener
+    if listener is None:
+        return
+    logger = logging.getLogger()
+    for handler in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        if handler.queue is listener.queue:
+            logger.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    listener = None
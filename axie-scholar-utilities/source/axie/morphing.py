@@ -1,27 +1,69 @@
 import sys
 import logging
-from datetime import datetime
 
-from axie.utils import load_json, ImportantLogsFilter
+from axie.lanes import LaneExecutor
+from axie.utils import load_json
+from eth_account.messages import encode_defunct
+from requests.exceptions import RetryError
+from web3 import Web3
 from axie_utils import Morph
 
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+MORPH_URL = 'https://graphql-gateway.axieinfinity.com/graphql'
+
+
+def morphed(response):
+    try:
+        return 200 <= response.status_code <= 299 and bool((response.json().get('data') or {}).get('morphAxie'))
+    except ValueError:
+        return False
+
+
+class CheckedMorph(Morph):
+    """ Morph telling whether the axie was morphed, from the morphAxie field of the response """
+
+    def payload(self):
+        msg = f"axie_id={self.axie}&owner={self.account}"
+        signed_msg = Web3().eth.account.sign_message(encode_defunct(text=msg), private_key=self.private_key)
+        return {
+            "operationName": "MorphAxie",
+            "variables": {
+                "axieId": f"{self.axie}",
+                "owner": f"{self.account}",
+                "signature": f"{signed_msg['signature'].hex()}"
+            },
+            "query": "mutation MorphAxie($axieId: ID!, $owner: String!, $signature: String!) "
+            "{morphAxie(axieId: $axieId, owner: $owner, signature: $signature)}"
+        }
+
+    def execute(self):
+        headers = {
+            "User-Agent": self.user_agent,
+            "authorization": f"Bearer {self.get_jwt()}"
+        }
+        try:
+            response = self.request.post(MORPH_URL, headers=headers, json=self.payload())
+        except RetryError:
+            logging.critical(f"Important: Axie {self.axie} in {self.account} is not ready to be morphed!")
+            return False
+        if morphed(response):
+            logging.info(f"Important: Axie {self.axie} in {self.account} correctly morphed!")
+            return True
+        if 200 <= response.status_code <= 299:
+            logging.info(f"Important: Something went wrong morphing axie {self.axie} in {self.account}")
+        else:
+            logging.critical(f"Important: Axie {self.axie} in {self.account} is not ready to be morphed!")
+        return False
 
 
 class AxieMorphingManager:
 
-    def __init__(self, axie_list, account, secrets_file):
+    def __init__(self, axie_list, account, secrets_file, journal=None):
         self.axie_list = axie_list
         self.account = account
         self.secrets = load_json(secrets_file)
+        self.journal = journal
+        self.executor = LaneExecutor()
 
     def verify_inputs(self):
         if self.account not in self.secrets:
@@ -30,7 +72,14 @@ class AxieMorphingManager:
 
     def execute(self):
         logging.info(f"Important: About to start morphing axies for account {self.account}")
-        for axie in self.axie_list:
-            m = Morph(axie=axie, account=self.account, private_key=self.secrets[self.account])
-            m.execute()
+        axie_list = self.axie_list
+        if self.journal:
+            axie_list = self.journal.pending(axie_list, lambda axie: f"morph:{axie}")
+        # Morphs of an account share its nonces, they all go in the same lane
+        self.executor.run(axie_list, lambda axie: self.account, self.morph)
         logging.info(f"Important: Done morphing axies for account {self.account}")
+
+    def morph(self, axie):
+        m = CheckedMorph(axie=axie, account=self.account, private_key=self.secrets[self.account])
+        if m.execute() and self.journal:
+            self.journal.complete(f"morph:{axie}")
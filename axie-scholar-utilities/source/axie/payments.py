@@ -1,30 +1,35 @@
+import csv
 import sys
+import json
 import logging
-from datetime import datetime
-from math import floor
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from axie.balances import fetch_balances
+from axie.receipts import ReceiptTracker
+from axie.scatter_chunks import chunk_scatter, send_scatter_chunks
+from axie.schemas import (
+    payments_schema,
+    legacy_payments_schema,
+    payments_validator,
+    legacy_payments_validator,
+    payout_plan_validator,
+    detect_payments_format,
+    schema_errors,
+    format_errors
+)
+from axie.splits import CREATOR_FEE_ADDRESS, SplitsCalculator
+from axie.utils import content_hash
+from axie_utils import check_balance
+from axie_utils.utils import get_nonce
 
-from axie.schemas import payments_schema, legacy_payments_schema
-from axie.utils import Singleton, ImportantLogsFilter
-from axie_utils import Scatter, check_balance
 
-
-CREATOR_FEE_ADDRESS = "ronin:9fa1bc784c665e683597d3f29375e45786617550"
-
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+PAYOUT_TYPES = ["manager", "scholar", "trainer", "other", "donation"]
 
 
 class AxiePaymentsManager:
-    def __init__(self, payments_file, secrets_file, auto=False):
+    def __init__(self, payments_file, secrets_file, auto=False, concurrency=1, journal=None, validation_cache=None):
         self.payments_file = payments_file
         self.secrets_file = secrets_file
         self.manager_acc = None
@@ -32,7 +37,13 @@ class AxiePaymentsManager:
         self.donations = None
         self.type = None
         self.auto = auto
+        self.concurrency = concurrency
+        self.balances = {}
+        self.results = {}
         self.summary = PaymentsSummary()
+        self.receipts = ReceiptTracker()
+        self.journal = journal
+        self.validation_cache = validation_cache
 
     def legacy_verify(self):
         validation_success = True
@@ -61,7 +72,7 @@ class AxiePaymentsManager:
                              "Find it here: https://ferranmarin.github.io/axie-scholar-utilities/ \n"
                              "Make sure you have configured all secrets too!")
             sys.exit()
-        return
+        return validation_success
     
     def verify(self):
         validation_success = True
@@ -95,71 +106,88 @@ class AxiePaymentsManager:
                              "Find it here: https://ferranmarin.github.io/axie-scholar-utilities/ \n"
                              "Make sure you have configured all secrets too!")
             sys.exit()
-        return
+        return validation_success
 
     def verify_inputs(self):
         logging.info("Validating file inputs...")
-        validation_success = True
-        # Validate payments file
-        legacy_msg = None
-        new_msg = None
+        cache_key = None
+        if self.validation_cache is not None:
+            cache_key = content_hash(payments_schema, legacy_payments_schema, self.payments_file, self.secrets_file)
+            self.type = self.validation_cache.get(cache_key)
+        if self.type:
+            logging.info("Files did not change since they were last validated, skipping validation")
+            self.donations = self.payments_file.get("Donations" if self.type == "legacy" else "donations")
+        elif self.validate_files() and cache_key:
+            self.validation_cache.set(cache_key, self.type)
 
-        try:
-            validate(self.payments_file, payments_schema)
-            self.type = "new"
-        except ValidationError as ex:
-            new_msg = ("If you were tyring to pay using the current format:\n"
-                       f"Error given: {ex.message}\n"
-                       f"For attribute in: {list(ex.path)}\n")
-            validation_success = False
+        if self.type == "legacy":
+            self.manager_acc = self.payments_file["Manager"]
+            self.scholar_accounts = self.payments_file["Scholars"]
+        elif self.type == "new":
+            self.scholar_accounts = self.payments_file["scholars"]
+        if self.journal:
+            field = 'AccountAddress' if self.type == "legacy" else 'ronin'
+            self.scholar_accounts = self.journal.pending(self.scholar_accounts,
+                                                         lambda acc: self.journal_key(acc[field]))
+        logging.info("Files correctly validated!")
 
+    def validate_files(self):
+        """ Validates payments and secrets files, reporting all the errors found """
+        payments_format = detect_payments_format(self.payments_file)
+        msg = "Payments file failed validation. Please review it.\n"
+        for candidate in [payments_format] if payments_format else ["new", "legacy"]:
+            if candidate == "new":
+                errors = schema_errors(payments_validator, self.payments_file)
+                format_name = "current"
+            else:
+                errors = schema_errors(legacy_payments_validator, self.payments_file)
+                format_name = "legacy"
+            if not errors:
+                self.type = candidate
+                break
+            msg += f"If you were tyring to pay using the {format_name} format:\n" + format_errors(errors)
         if not self.type:
-            try:
-                validate(self.payments_file, legacy_payments_schema)
-                self.type = "legacy"
-                validation_success = True
-            except ValidationError as ex:
-                legacy_msg = ("If you were tyring to pay using the legacy format:\n"
-                              f"Error given: {ex.message}\n"
-                              f"For attribute in: {list(ex.path)}\n")
-                validation_success = False
-        
-        if not validation_success:
-            msg = "Payments file failed validation. Please review it.\n"
-            if new_msg:
-                msg += new_msg
-            if legacy_msg:
-                msg += legacy_msg
             logging.critical(msg)
             sys.exit()
-        
+            return False
+
         if self.type == 'legacy':
-            self.legacy_verify()
-        elif self.type == 'new':
-            self.verify()
+            files_success = self.legacy_verify()
         else:
-            # This should not be reachable!
-            logging.critical(f"Unexpected error! Unrecognized payments mode")
+            files_success = self.verify()
 
+        validation_success = True
         for sf in self.secrets_file:
             if len(self.secrets_file[sf]) != 66 or self.secrets_file[sf][:2] != "0x":
                 logging.critical(f"Private key for account {sf} is not valid, please review it!")
                 validation_success = False
-        
+
         if not validation_success:
             logging.critical("There is a problem with your secrets.json, delete it and re-generate the file starting with an empty secrets file."
                              "Or open it and see what is wrong with the keys of the accounts reported above.")
             sys.exit()
-        
+        return files_success and validation_success
+
+    @staticmethod
+    def journal_key(account):
+        return f"payout:{account}"
+
+    def load_balances(self):
         if self.type == "legacy":
-            self.manager_acc = self.payments_file["Manager"]
-            self.scholar_accounts = self.payments_file["Scholars"]
-        elif self.type == "new":
-            self.scholar_accounts = self.payments_file["scholars"]
-        logging.info("Files correctly validated!")
+            accounts = [acc['AccountAddress'] for acc in self.scholar_accounts]
+        else:
+            accounts = [acc['ronin'] for acc in self.scholar_accounts]
+        logging.info("Fetching SLP balances for all accounts...")
+        self.balances = fetch_balances(accounts)
+
+    def get_balance(self, account):
+        # Read from the balance snapshot, only accounts missing from it hit the RPC
+        if account not in self.balances:
+            self.balances[account] = check_balance(account)
+        return self.balances[account]
 
     def check_acc_has_enough_balance(self, account, balance):
-        account_balance = check_balance(account)
+        account_balance = self.get_balance(account)
         if account_balance < balance:
             logging.critical(f"Balance in account {account} is "
                              "inssuficient to cover all planned payments!")
@@ -178,72 +206,51 @@ class AxiePaymentsManager:
             logging.critical(f"Unexpected error! Unrecognized payments mode {self.type}")
 
     def prepare_new_payout(self):
-        for acc in self.scholar_accounts:
-            acc_balance = check_balance(acc['ronin'])
-            total_payments = 0
-            acc_payments = {}
-            deductable_fees = 1
-            if self.donations:
-                for dono in self.donations:
-                    deductable_fees += dono['percentage']
-            # Split payments
-            for sacc in acc['splits']:
-                if sacc['persona'].lower() == 'manager':
-                    amount = floor(acc_balance * ((sacc['percentage'] - deductable_fees)/100))
-                else:
-                    amount = floor(acc_balance * (sacc['percentage']/100))
-                if amount < 1:
-                    logging.info(f'Important: Skipping payment to {sacc["persona"]} as it would be less than 1SLP')
-                    continue
-                total_payments += amount
-                # define type
-                if sacc['persona'].lower() == 'manager':
-                    t = 'manager'
-                elif sacc['persona'].lower() == 'scholar':
-                    t = 'scholar'
-                elif sacc['persona'].lower() in ['trainer', 'investor', 'trainer/investor', 'investor/trainer']:
-                    t = 'trainer'
-                else:
-                    t = 'other'
-                acc_payments[sacc['ronin']] = amount
-                self.summary.increase_payout(amount=amount, address=sacc['ronin'], payout_type=t)
-            # Donation Payments
-            if self.donations:
-                for dono in self.donations:
-                    dono_amount = floor(acc_balance * (dono["percentage"]/100))
-                    if dono_amount > 0:
-                        acc_payments[dono['ronin']] = dono_amount
-                        self.summary.increase_payout(amount=dono_amount, address=dono['ronin'], payout_type='donation')
-                        total_payments += dono_amount
-            # Fee Payments
-            fee_amount = floor(acc_balance * 0.01)
-            if fee_amount > 0:
-                acc_payments[CREATOR_FEE_ADDRESS] = fee_amount
-                self.summary.increase_payout(amount=fee_amount, address=CREATOR_FEE_ADDRESS, payout_type='donation')
-                total_payments += fee_amount
-            if self.check_acc_has_enough_balance(acc['ronin'], total_payments) and acc_balance > 0:
-                accept = "y" if self.auto else None
-                while accept not in ["y", "n", "Y", "N"]:
-                    accept = input(f"Do you want to proceed with payments for {acc['name']} ({acc_payments})? (y/n): ")
-                if accept.lower() == "y":
-                    s = Scatter('slp', acc['ronin'], self.secrets_file[acc['ronin']], acc_payments)
-                    s.execute()
-                    logging.info(f"SLP scatter completed for account: '{acc['name']}'")
-                else:
-                    logging.info(f"SLP scatter canceled for account: '{acc['name']}'")
-        logging.info(f"Important: Transactions Summary:\n {self.summary}")
+        self.execute_plan({"type": "new", "accounts": self.plan_new_payout()})
 
     def prepare_old_payout(self):
+        self.execute_plan({"type": "legacy", "accounts": self.plan_old_payout()})
+
+    def plan_payout(self):
+        if self.type == "new":
+            accounts = self.plan_new_payout()
+        elif self.type == "legacy":
+            accounts = self.plan_old_payout()
+        else:
+            logging.critical(f"Unexpected error! Unrecognized payments mode {self.type}")
+            return None
+        return {"type": self.type, "accounts": accounts}
+
+    def add_to_plan(self, plan, name, account, balance, total_payments, payments):
+        if self.check_acc_has_enough_balance(account, total_payments) and balance > 0:
+            plan.append({
+                "name": name,
+                "ronin": account,
+                "balance": balance,
+                "total": total_payments,
+                "payments": payments
+            })
+
+    def plan_new_payout(self):
+        plan = []
+        balances = [self.get_balance(acc['ronin']) for acc in self.scholar_accounts]
+        calculator = SplitsCalculator(self.scholar_accounts, self.donations)
+        for acc, acc_balance, (acc_payments, total_payments) in zip(
+                self.scholar_accounts, balances, calculator.calculate(balances)):
+            self.add_to_plan(plan, acc['name'], acc['ronin'], acc_balance, total_payments, acc_payments)
+        return plan
+
+    def plan_old_payout(self):
+        plan = []
         for acc in self.scholar_accounts:
-            acc_balance = check_balance(acc['AccountAddress'])
+            acc_balance = self.get_balance(acc['AccountAddress'])
             total_payments = 0
-            acc_payments = {}
+            acc_payments = []
             # Scholar Payment
             scholar_amount = acc_balance * (acc["ScholarPercent"]/100)
             scholar_amount += acc.get("ScholarPayout", 0)
             scholar_amount = round(scholar_amount)
-            acc_payments[acc["ScholarPayoutAddress"]] = scholar_amount
-            self.summary.increase_payout(amount=scholar_amount, address=acc["ScholarPayoutAddress"], payout_type='scholar')
+            acc_payments.append({"ronin": acc["ScholarPayoutAddress"], "amount": scholar_amount, "type": "scholar"})
             total_payments += scholar_amount
             if acc.get("TrainerPayoutAddress"):
                 # Trainer Payment
@@ -251,8 +258,8 @@ class AxiePaymentsManager:
                 trainer_amount += acc.get("TrainerPayout", 0)
                 trainer_amount = round(trainer_amount)
                 if trainer_amount > 0:
-                    acc_payments[acc["TrainerPayoutAddress"]] = trainer_amount
-                    self.summary.increase_payout(amount=trainer_amount, address=acc["TrainerPayoutAddress"], payout_type='trainer')
+                    acc_payments.append({"ronin": acc["TrainerPayoutAddress"], "amount": trainer_amount,
+                                         "type": "trainer"})
                     total_payments += trainer_amount
             manager_payout = acc_balance - total_payments
             if self.donations:
@@ -260,100 +267,248 @@ class AxiePaymentsManager:
                 for dono in self.donations:
                     dono_amount = round(acc_balance * (dono["Percent"]/100))
                     if dono_amount > 1:
-                        acc_payments[dono['AccountAddress']] = dono_amount
-                        self.summary.increase_payout(amount=dono_amount, address=dono['AccountAddress'], payout_type='donation')
+                        acc_payments.append({"ronin": dono['AccountAddress'], "amount": dono_amount,
+                                             "type": "donation"})
                         manager_payout -= dono_amount
                         total_payments += dono_amount
             # Fee Payments
             fee_amount = round(acc_balance * 0.01)
             if fee_amount > 0:
-                acc_payments[CREATOR_FEE_ADDRESS] = fee_amount
-                self.summary.increase_payout(amount=fee_amount, address=CREATOR_FEE_ADDRESS, payout_type='donation')
+                acc_payments.append({"ronin": CREATOR_FEE_ADDRESS, "amount": fee_amount, "type": "donation"})
                 manager_payout -= fee_amount
                 total_payments += fee_amount
             # Manager Payment
             if manager_payout > 0:
-                acc_payments[self.manager_acc] = manager_payout
-                self.summary.increase_payout(amount=manager_payout, address=self.manager_acc, payout_type='manager')
+                acc_payments.append({"ronin": self.manager_acc, "amount": manager_payout, "type": "manager"})
                 total_payments += manager_payout
             else:
                 logging.info("Important: Skipping manager payout as it resulted in 0 SLP.")
-            if self.check_acc_has_enough_balance(acc['AccountAddress'], total_payments) and acc_balance > 0:
-                accept = "y" if self.auto else None
-                while accept not in ["y", "n", "Y", "N"]:
-                    accept = input(f"Do you want to proceed with payments for {acc['Name']} ({acc_payments})? (y/n): ")
-                if accept.lower() == "y":
-                    s = Scatter('slp', acc['AccountAddress'], self.secrets_file[acc['AccountAddress']], acc_payments)
-                    s.execute()
-                    logging.info(f"SLP scatter completed for account: '{acc['Name']}'")
-                else:
-                    logging.info(f"SLP scatter canceled for account: '{acc['Name']}'")
+            self.add_to_plan(plan, acc['Name'], acc['AccountAddress'], acc_balance, total_payments, acc_payments)
+        return plan
+
+    def verify_plan(self, plan):
+        logging.info("Validating payout plan...")
+        validation_success = True
+        errors = schema_errors(payout_plan_validator, plan)
+        if errors:
+            logging.critical("Payout plan failed validation. Please review it or generate it again.\n" +
+                             format_errors(errors))
+            sys.exit()
+            return
+        for acc in plan["accounts"]:
+            if acc["ronin"] not in self.secrets_file:
+                logging.critical(f"Account '{acc['name']}' is not present in secret file, please add it.")
+                validation_success = False
+            elif len(self.secrets_file[acc["ronin"]]) != 66 or self.secrets_file[acc["ronin"]][:2] != "0x":
+                logging.critical(f"Private key for account {acc['ronin']} is not valid, please review it!")
+                validation_success = False
+        if not validation_success:
+            sys.exit()
+        logging.info("Payout plan correctly validated!")
+
+    def execute_plan(self, plan):
+        scatters = []
+        for acc in plan["accounts"]:
+            if self.journal and self.journal.is_completed(self.journal_key(acc['ronin'])):
+                logging.info(f"Important: Skipping payout for account '{acc['name']}', already completed")
+                continue
+            if self.sent_unconfirmed(acc['ronin']):
+                logging.critical(f"Important: Skipping payout for account '{acc['name']}', the interrupted run sent "
+                                 "it but did not confirm it. Check the account in the explorer before paying again.")
+                continue
+            acc_payments = {}
+            for payment in acc["payments"]:
+                acc_payments[payment["ronin"]] = payment["amount"]
+            accept = "y" if self.auto else None
+            while accept not in ["y", "n", "Y", "N"]:
+                accept = input(f"Do you want to proceed with payments for {acc['name']} ({acc_payments})? (y/n): ")
+            if accept.lower() == "y":
+                payout_types = {payment["ronin"]: payment["type"] for payment in acc["payments"]}
+                scatters.append((acc['name'], acc['ronin'], acc_payments, payout_types))
+            else:
+                logging.info(f"SLP scatter canceled for account: '{acc['name']}'")
+        self.execute_scatters(scatters)
+        self.receipts.wait()
+        self.summary.confirm(self.receipts)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
         logging.info(f"Important: Transactions Summary:\n {self.summary}")
 
+    def sent_unconfirmed(self, account):
+        """ Whether the resumed journal planned a payout of the account that never completed but may be
+        on chain, the account nonce moved past the one the payout was sent with """
+        entry = self.journal.unconfirmed(self.journal_key(account)) if self.journal else None
+        if not entry or entry.get("nonce") is None:
+            return False
+        return get_nonce(account) > entry["nonce"]
+
+    def journal_scatter(self, name, account, payments, nonce):
+        self.journal.plan(self.journal_key(account), name=name, payments=payments, nonce=nonce)
 
-class PaymentsSummary(Singleton):
+    def execute_scatter(self, name, account, payments, payout_types=None):
+        before_send = partial(self.journal_scatter, name, account, payments) if self.journal else None
+        try:
+            chunks = chunk_scatter('slp', account, self.secrets_file[account], payments)
+            sent = send_scatter_chunks(chunks, self.receipts, name, before_send)
+        except Exception as e:
+            logging.critical(f"Important: SLP scatter failed for account: '{name}'. Error given: {e}")
+            self.receipts.track("Scatter", name, None)
+            return None
+        if not sent:
+            return None
+        tx_hashes = [tx_hash for _, tx_hash in sent]
+        payout_types = payout_types or {}
+        for chunk, tx_hash in sent:
+            self.summary.expect(tx_hash, [(amount, ronin, payout_types.get(ronin, "other"), account)
+                                          for ronin, amount in chunk.amounts.items()])
+        if len(sent) < len(chunks):
+            paid = {acc for chunk, _ in sent for acc in chunk.amounts}
+            logging.critical(f"Important: SLP scatter for account '{name}' only partially sent, these payments are "
+                             f"missing: {[acc for acc in payments if acc not in paid]}")
+            return tx_hashes
+        logging.info(f"SLP scatter completed for account: '{name}'")
+        if self.journal:
+            self.journal.complete(self.journal_key(account), name=name, tx_hash=tx_hashes[-1], tx_hashes=tx_hashes)
+        return tx_hashes
+
+    def execute_scatters(self, scatters):
+        # Each scatter is sent from its own scholar account, so they do not share nonces
+        if self.concurrency > 1 and len(scatters) > 1:
+            logging.info(f"Executing {len(scatters)} SLP scatters, {self.concurrency} at a time")
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                tx_hashes = list(executor.map(lambda s: self.execute_scatter(*s), scatters))
+        else:
+            tx_hashes = [self.execute_scatter(*scatter) for scatter in scatters]
+        for (_, account, *_), tx_hash in zip(scatters, tx_hashes):
+            self.results[account] = tx_hash
+        if scatters:
+            completed = len([h for h in tx_hashes if h])
+            logging.info(f"Important: {completed}/{len(scatters)} SLP scatters returned a transaction hash")
+
+
+class PaymentsSummary:
+    """ Ledger of the payouts made during a run, owned by the manager running it.
+
+    Payouts are expected along with the hash of the transaction paying them, and
+    only enter the ledger once its receipt confirms it. Amounts are aggregated on
+    insertion per payout type, per receiver address and per source account, so
+    adding a payout is O(1) and exporting only walks the aggregates. """
 
     def __init__(self):
-        self.manager = {"accounts": [], "slp": 0}
-        self.trainer = {"accounts": [], "slp": 0}
-        self.scholar = {"accounts": [], "slp": 0}
-        self.other = {"accounts": [], "slp": 0}
-        self.donations = {"accounts": [], "slp": 0}
-
-    def increase_payout(self, amount, address, payout_type):
-        if payout_type == "manager":
-            self.increase_manager_payout(amount, address)
-        elif payout_type == "scholar":
-            self.increase_scholar_payout(amount, address)
-        elif payout_type == "donation":
-            self.increase_donations_payout(amount, address)
-        elif payout_type == "trainer":
-            self.increase_trainer_payout(amount, address)
-        elif payout_type == "other":
-            self.increase_other_payout(amount, address)
-
-    def increase_manager_payout(self, amount, address):
-        self.manager["slp"] += amount
-        if address not in self.manager["accounts"]:
-            self.manager["accounts"].append(address)
-
-    def increase_trainer_payout(self, amount, address):
-        self.trainer["slp"] += amount
-        if address not in self.trainer["accounts"]:
-            self.trainer["accounts"].append(address)
-
-    def increase_scholar_payout(self, amount, address):
-        self.scholar["slp"] += amount
-        if address not in self.scholar["accounts"]:
-            self.scholar["accounts"].append(address)
-
-    def increase_donations_payout(self, amount, address):
-        self.donations["slp"] += amount
-        if address not in self.donations["accounts"]:
-            self.donations["accounts"].append(address)
-    
-    def increase_other_payout(self, amount, address):
-        self.other["slp"] += amount
-        if address not in self.other["accounts"]:
-            self.other["accounts"].append(address)
+        self.lock = threading.Lock()
+        self.slp = dict.fromkeys(PAYOUT_TYPES, 0)
+        self.receivers = {payout_type: {} for payout_type in PAYOUT_TYPES}
+        self.sources = {}
+        self.entries = {}
+        self.expected = {}
+        self.transactions = {}
+
+    def expect(self, tx_hash, payouts):
+        """ Payouts paid by a sent transaction, as (amount, address, payout_type, source) tuples """
+        with self.lock:
+            self.expected.setdefault(tx_hash, []).extend(payouts)
+
+    def confirm(self, receipts):
+        """ Adds the expected payouts whose transaction the receipts confirmed """
+        confirmed = receipts.confirmed_hashes()
+        with self.lock:
+            expected, self.expected = self.expected, {}
+        for tx_hash, payouts in expected.items():
+            if tx_hash in confirmed:
+                for amount, address, payout_type, source in payouts:
+                    self.increase_payout(amount, address, payout_type, source)
+        self.transactions = receipts.summary().get("Scatter", {})
+
+    def increase_payout(self, amount, address, payout_type, source=None):
+        if payout_type not in self.slp:
+            return
+        with self.lock:
+            self.slp[payout_type] += amount
+            receivers = self.receivers[payout_type]
+            receivers[address] = receivers.get(address, 0) + amount
+            if source:
+                breakdown = self.sources.setdefault(source, dict.fromkeys(PAYOUT_TYPES, 0))
+                breakdown[payout_type] += amount
+            key = (payout_type, address, source)
+            self.entries[key] = self.entries.get(key, 0) + amount
+
+    def increase_manager_payout(self, amount, address, source=None):
+        self.increase_payout(amount, address, "manager", source)
+
+    def increase_trainer_payout(self, amount, address, source=None):
+        self.increase_payout(amount, address, "trainer", source)
+
+    def increase_scholar_payout(self, amount, address, source=None):
+        self.increase_payout(amount, address, "scholar", source)
+
+    def increase_donations_payout(self, amount, address, source=None):
+        self.increase_payout(amount, address, "donation", source)
+
+    def increase_other_payout(self, amount, address, source=None):
+        self.increase_payout(amount, address, "other", source)
+
+    def category(self, payout_type):
+        return {"accounts": list(self.receivers[payout_type]), "slp": self.slp[payout_type]}
+
+    @property
+    def manager(self):
+        return self.category("manager")
+
+    @property
+    def trainer(self):
+        return self.category("trainer")
+
+    @property
+    def scholar(self):
+        return self.category("scholar")
+
+    @property
+    def other(self):
+        return self.category("other")
+
+    @property
+    def donations(self):
+        return self.category("donation")
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "totals": dict(self.slp),
+                "receivers": {payout_type: dict(r) for payout_type, r in self.receivers.items()},
+                "sources": {source: dict(b) for source, b in self.sources.items()}
+            }
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def export_csv(self, path):
+        with self.lock:
+            rows = [[payout_type, address, source or "", amount]
+                    for (payout_type, address, source), amount in self.entries.items()]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["type", "address", "source", "slp"])
+            writer.writerows(rows)
 
     def __str__(self):
+        count = {payout_type: len(r) for payout_type, r in self.receivers.items()}
         msg = "No payments made!"
-        if self.manager["accounts"] and self.scholar["accounts"]:
-            msg = f'Paid {len(self.manager["accounts"])} managers, {self.manager["slp"]} SLP.\n'
-            msg += f'Paid {len(self.scholar["accounts"])} scholars, {self.scholar["slp"]} SLP.\n'
-        if self.manager["accounts"] and not self.scholar["accounts"]:
-            msg = f'Paid {len(self.manager["accounts"])} managers, {self.manager["slp"]} SLP.\n'
-        if self.scholar["accounts"] and not self.manager["accounts"]:
-            msg = f'Paid {len(self.scholar["accounts"])} scholars, {self.scholar["slp"]} SLP.\n'
-        if self.trainer["slp"] > 0:
-            msg += f'Paid {len(self.trainer["accounts"])} trainers, {self.trainer["slp"]} SLP.\n'
-        if self.other["slp"] > 0:
-            msg += f'Paid {len(self.other["accounts"])} other accounts, {self.other["slp"]} SLP.\n'
-        if self.donations["slp"] > 0:
-            msg += f'Donated to {len(self.donations["accounts"])} organisations, {self.donations["slp"]} SLP.\n'
-
-        # TODO: Find a fix for this!
-        msg += "---------------------- \n"
-        msg += "This summary assumes all trasactions went fine, please do NOT trust it!\n"
+        if count["manager"] and count["scholar"]:
+            msg = f'Paid {count["manager"]} managers, {self.slp["manager"]} SLP.\n'
+            msg += f'Paid {count["scholar"]} scholars, {self.slp["scholar"]} SLP.\n'
+        if count["manager"] and not count["scholar"]:
+            msg = f'Paid {count["manager"]} managers, {self.slp["manager"]} SLP.\n'
+        if count["scholar"] and not count["manager"]:
+            msg = f'Paid {count["scholar"]} scholars, {self.slp["scholar"]} SLP.\n'
+        if self.slp["trainer"] > 0:
+            msg += f'Paid {count["trainer"]} trainers, {self.slp["trainer"]} SLP.\n'
+        if self.slp["other"] > 0:
+            msg += f'Paid {count["other"]} other accounts, {self.slp["other"]} SLP.\n'
+        if self.slp["donation"] > 0:
+            msg += f'Donated to {count["donation"]} organisations, {self.slp["donation"]} SLP.\n'
+
+        if self.transactions.get("failed") or self.transactions.get("pending"):
+            msg += "---------------------- \n"
+            msg += (f'Only counts the {self.transactions["confirmed"]} confirmed scatters, '
+                    f'{self.transactions["failed"]} failed and {self.transactions["pending"]} are still pending.\n')
         return msg
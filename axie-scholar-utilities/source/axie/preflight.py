@@ -0,0 +1,187 @@
+import logging
+
+import requests
+from requests.exceptions import RequestException
+from axie_utils.utils import RONIN_PROVIDER, USER_AGENT
+
+from axie.balances import post_rpc_batch, RPC_BATCH_SIZE, RPC_TIMEOUT
+from axie.inventory import build_axie_call
+
+
+GRAPHQL_URL = "https://graphql-gateway.axieinfinity.com/graphql"
+OWNER_OF_SELECTOR = "0x6352211e"
+PREFLIGHT_QUERY_SIZE = 50
+MAX_BREED_COUNT = 7
+ADULT_STAGE = 4
+# Breeding prices of Axie Infinity since its February 2022 breeding update. Each parent costs the SLP of its breed
+# count and every breeding costs BREEDING_AXS_COST AXS. The game does not publish them on chain nor in an API,
+# update them here if it changes its prices.
+BREEDING_SLP_COSTS = [900, 1350, 2250, 3600, 5850, 9450, 15300]
+BREEDING_AXS_COST = 0.5
+WEI_PER_AXS = 10 ** 18
+
+
+def build_axies_query(axie_ids):
+    """ Single GraphQL query asking for the breeding details of all given axies, one alias per axie """
+    fields = " ".join(
+        f'a{axie_id}: axie(axieId: "{axie_id}") {{ id breedCount sireId matronId stage }}' for axie_id in axie_ids)
+    return {"operationName": "GetAxiesBreedingDetails", "variables": {},
+            "query": f"query GetAxiesBreedingDetails {{ {fields} }}"}
+
+
+def parse_axie_details(axie):
+    return {
+        "breed_count": int(axie["breedCount"]),
+        "parents": {int(parent) for parent in [axie.get("sireId"), axie.get("matronId")] if parent},
+        "stage": int(axie.get("stage") or ADULT_STAGE)
+    }
+
+
+def fetch_axie_details(axie_ids, batch_size=PREFLIGHT_QUERY_SIZE):
+    """ Fetches breed count, parents and stage of the axies, a batch of them per GraphQL query.
+    Axies whose details could not be fetched are left out. """
+    axie_ids = list(dict.fromkeys(axie_ids))
+    details = {}
+    for start in range(0, len(axie_ids), batch_size):
+        batch = axie_ids[start:start + batch_size]
+        try:
+            response = requests.post(GRAPHQL_URL, json=build_axies_query(batch),
+                                     headers={"User-Agent": USER_AGENT}, timeout=RPC_TIMEOUT)
+            data = response.json().get("data") or {}
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not fetch details of {len(batch)} axies. Error: {e}")
+            continue
+        for axie_id in batch:
+            axie = data.get(f"a{axie_id}")
+            try:
+                details[axie_id] = parse_axie_details(axie)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                logging.debug(f"No breeding details for axie {axie_id}")
+    return details
+
+
+def fetch_owners(axie_ids, provider=RONIN_PROVIDER, batch_size=RPC_BATCH_SIZE):
+    """ Fetches the owner of the axies from the chain using JSON-RPC batch requests.
+    Axies whose owner could not be read are left out. """
+    axie_ids = list(dict.fromkeys(axie_ids))
+    owners = {}
+    for start in range(0, len(axie_ids), batch_size):
+        batch = axie_ids[start:start + batch_size]
+        payload = [build_axie_call(i, OWNER_OF_SELECTOR + hex(int(axie_id))[2:].zfill(64))
+                   for i, axie_id in enumerate(batch)]
+        try:
+            results = post_rpc_batch(payload, provider)
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not fetch owners of {len(batch)} axies. Error: {e}")
+            continue
+        for i, axie_id in enumerate(batch):
+            result = results.get(i, {}).get("result")
+            if result and len(result) >= 42:
+                owners[axie_id] = "ronin:" + result[-40:].lower()
+    return owners
+
+
+def breeding_slp_costs(breedings, breed_counts):
+    """ SLP each account spends on its breedings. Parents breeding several times in the session
+    pay more each time, axies with an unknown breed count are priced as the most expensive. """
+    counts = dict(breed_counts)
+    costs = {}
+    for breeding in breedings:
+        cost = 0
+        for axie_id in [int(breeding["Sire"]), int(breeding["Matron"])]:
+            count = counts.get(axie_id)
+            if count is None:
+                logging.warning(f"Breed count of axie {axie_id} is unknown, counting it at the highest price")
+                count = MAX_BREED_COUNT - 1
+            cost += BREEDING_SLP_COSTS[min(count, MAX_BREED_COUNT - 1)]
+            counts[axie_id] = count + 1
+        account = breeding["AccountAddress"].lower().replace("0x", "ronin:")
+        costs[account] = costs.get(account, 0) + cost
+    return costs
+
+
+def breeding_axs_costs(breedings):
+    """ AXS each account spends on its breedings """
+    costs = {}
+    for breeding in breedings:
+        account = breeding["AccountAddress"].lower().replace("0x", "ronin:")
+        costs[account] = costs.get(account, 0) + BREEDING_AXS_COST
+    return costs
+
+
+class BreedingPreflight:
+    """ Checks all the pairs of a breedings file before sending any breeding.
+
+    Details of every Sire and Matron are fetched once in batches and kept in an
+    index. Pairs that would revert on chain are rejected with the reasons why.
+    Checks that need data that could not be fetched are skipped, the chain has
+    the last word on those. The breedings are iterated on every pass, a
+    re-iterable stream of them is never held in memory. """
+
+    def __init__(self, breedings):
+        self.breedings = breedings
+        self.details = {}
+        self.owners = {}
+
+    def axie_ids(self):
+        return [int(bf[key]) for bf in self.breedings for key in ["Sire", "Matron"]]
+
+    def load(self):
+        axie_ids = self.axie_ids()
+        logging.info(f"Checking {len(axie_ids) // 2} breedings before sending them...")
+        self.details = fetch_axie_details(axie_ids)
+        self.owners = fetch_owners(axie_ids)
+        return self
+
+    def breed_counts(self):
+        return {axie_id: details["breed_count"] for axie_id, details in self.details.items()}
+
+    def axie_problems(self, axie_id, account):
+        problems = []
+        owner = self.owners.get(axie_id)
+        if owner and owner != account.lower().replace("0x", "ronin:"):
+            problems.append(f"axie {axie_id} is not owned by {account}")
+        details = self.details.get(axie_id)
+        if details:
+            if details["stage"] < ADULT_STAGE:
+                problems.append(f"axie {axie_id} is not an adult")
+            if details["breed_count"] >= MAX_BREED_COUNT:
+                problems.append(f"axie {axie_id} reached the max breed count")
+        return problems
+
+    def check(self, breeding):
+        """ Returns the reasons why the breeding would fail, empty if none """
+        sire, matron = int(breeding["Sire"]), int(breeding["Matron"])
+        if sire == matron:
+            return [f"axie {sire} cannot breed with itself"]
+        problems = self.axie_problems(sire, breeding["AccountAddress"])
+        problems += self.axie_problems(matron, breeding["AccountAddress"])
+        sire_details, matron_details = self.details.get(sire), self.details.get(matron)
+        if sire_details and matron_details:
+            if sire in matron_details["parents"] or matron in sire_details["parents"]:
+                problems.append("one axie is a parent of the other")
+            elif sire_details["parents"] & matron_details["parents"]:
+                problems.append("axies are siblings")
+        return problems
+
+    def checked_breedings(self):
+        """ Yields every breeding with whether it passed the checks, the rejected ones are reported """
+        total = rejected = 0
+        for breeding in self.breedings:
+            total += 1
+            problems = self.check(breeding)
+            if problems:
+                rejected += 1
+                logging.critical(f"Important: Breeding of {breeding['Sire']} with {breeding['Matron']} "
+                                 f"rejected: {', '.join(problems)}")
+            yield breeding, not problems
+        if rejected:
+            logging.info(f"Important: {rejected} out of {total} breedings rejected before sending them")
+
+    def valid_breedings(self):
+        """ Breedings that passed the checks, the rejected ones are reported """
+        return [breeding for breeding, valid in self.checked_breedings() if valid]
+
+    def rejected_breedings(self):
+        """ Breedings that would revert, they are reported """
+        return [breeding for breeding, valid in self.checked_breedings() if not valid]
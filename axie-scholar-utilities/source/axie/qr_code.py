@@ -7,8 +7,10 @@ import qrcode
 
 from axie_utils import AxieGraphQL
 
+from axie.tokens import CachedJWTMixin
 
-class QRCode(AxieGraphQL):
+
+class QRCode(CachedJWTMixin, AxieGraphQL):
 
     def __init__(self, acc_name, path, **kwargs):
         self.acc_name = acc_name
@@ -25,9 +27,10 @@ class QRCode(AxieGraphQL):
 
 class QRCodeManager:
 
-    def __init__(self, payments_file, secrets_file, path):
+    def __init__(self, payments_file, secrets_file, path, token_cache=None):
         self.secrets_file, self.acc_names = self.load_secrets_and_acc_name(secrets_file, payments_file)
         self.path = path
+        self.token_cache = token_cache
 
     def load_secrets_and_acc_name(self, secrets, payments):
         refined_secrets = {}
@@ -68,8 +71,13 @@ class QRCodeManager:
                 account=acc,
                 private_key=self.secrets_file[acc],
                 acc_name=self.acc_names[acc],
-                path=self.path
+                path=self.path,
+                token_cache=self.token_cache
             ) for acc in self.secrets_file
         ]
-        for qr in qrcode_list:
-            qr.generate_qr()
+        try:
+            for qr in qrcode_list:
+                qr.generate_qr()
+        finally:
+            if self.token_cache:
+                self.token_cache.save()
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+
+from requests.exceptions import RequestException
+from axie_utils.utils import RONIN_PROVIDER
+
+from axie.balances import post_rpc_batch, RPC_BATCH_SIZE
+
+
+RECEIPT_POLL_INTERVAL = 5
+RECEIPT_TIMEOUT = 300
+STATUSES = ["confirmed", "failed", "pending"]
+
+
+def build_receipt_request(request_id, tx_hash):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "eth_getTransactionReceipt", "params": [tx_hash]}
+
+
+def fetch_receipts(tx_hashes, provider=RONIN_PROVIDER, batch_size=RPC_BATCH_SIZE):
+    """ Fetches the receipts of the given transactions using JSON-RPC batch requests.
+    Transactions not mined yet map to None, the ones that could not be queried are left out. """
+    receipts = {}
+    for start in range(0, len(tx_hashes), batch_size):
+        batch = tx_hashes[start:start + batch_size]
+        try:
+            results = post_rpc_batch([build_receipt_request(i, h) for i, h in enumerate(batch)], provider)
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not fetch receipts for {len(batch)} transactions. Error: {e}")
+            continue
+        for i, tx_hash in enumerate(batch):
+            if i in results and "error" not in results[i]:
+                receipts[tx_hash] = results[i].get("result")
+    return receipts
+
+
+class ReceiptTracker:
+    """ Gathers the transactions sent during a run and confirms them in the background.
+
+    Pending transactions are polled together in batched receipt requests from a
+    single worker thread, so sending transactions never waits on confirmations. """
+
+    def __init__(self, provider=RONIN_PROVIDER, poll_interval=RECEIPT_POLL_INTERVAL):
+        self.provider = provider
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.polled = threading.Condition(self.lock)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.transactions = []
+        self.status = {}
+
+    def track(self, kind, description, tx_hash):
+        """ Registers the outcome of an execution. Executions that did not return a
+        transaction hash are failed, the rest stay pending until their receipt shows up. """
+        with self.lock:
+            if not isinstance(tx_hash, str) or not tx_hash.startswith("0x"):
+                self.transactions.append((kind, description, None))
+                return
+            self.transactions.append((kind, description, tx_hash))
+            self.status.setdefault(tx_hash, "pending")
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def pending(self):
+        with self.lock:
+            return self.pending_hashes()
+
+    def pending_hashes(self):
+        return [h for h, status in self.status.items() if status == "pending"]
+
+    def poll(self):
+        """ Fetches the receipts of all pending transactions once """
+        pending = self.pending()
+        if not pending:
+            return
+        receipts = fetch_receipts(pending, self.provider)
+        with self.lock:
+            for tx_hash, receipt in receipts.items():
+                if receipt is None:
+                    continue
+                self.status[tx_hash] = "confirmed" if int(receipt.get("status", "0x0"), 16) == 1 else "failed"
+            self.polled.notify_all()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.poll()
+            self.stop_event.wait(self.poll_interval)
+
+    def wait(self, timeout=RECEIPT_TIMEOUT):
+        """ Waits until no transaction is pending or the timeout is reached and stops polling """
+        deadline = time.monotonic() + timeout
+        with self.polled:
+            while self.pending_hashes() and time.monotonic() < deadline:
+                self.polled.wait(deadline - time.monotonic())
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.stop_event.clear()
+        return self.summary()
+
+    def outcome(self, tx_hash):
+        if tx_hash is None:
+            return "failed"
+        return self.status[tx_hash]
+
+    def confirmed_hashes(self):
+        with self.lock:
+            return {h for h, status in self.status.items() if status == "confirmed"}
+
+    def summary(self):
+        with self.lock:
+            summary = {}
+            for kind, _, tx_hash in self.transactions:
+                counts = summary.setdefault(kind, dict.fromkeys(STATUSES, 0))
+                counts[self.outcome(tx_hash)] += 1
+            return summary
+
+    def __str__(self):
+        summary = self.summary()
+        if not summary:
+            return "No transactions sent!"
+        msg = ""
+        for kind, counts in summary.items():
+            msg += f"{kind}: {counts['confirmed']} confirmed, {counts['failed']} failed, {counts['pending']} pending.\n"
+        with self.lock:
+            for kind, description, tx_hash in self.transactions:
+                outcome = self.outcome(tx_hash)
+                if outcome != "confirmed":
+                    msg += f"{kind} {description} {outcome}" + (f" ({tx_hash})" if tx_hash else "") + ".\n"
+        return msg
@@ -1,34 +1,76 @@
+import sys
 import logging
 
-from axie_utils import check_balance, Scatter
+from axie.receipts import ReceiptTracker
+from axie.balances import fetch_balances, top_up_amounts
+from axie.scatter_chunks import chunk_scatter, send_scatter_chunks
+from axie_utils import check_balance
 
-class ScatterRonManager:
-    def __init__(self, from_acc, payments, secrets, min_ron):
+
+class ScatterPlanMixin:
+    """ Plans the RON each scholar account of a payments file needs to reach min_ron """
+
+    @property
+    def scatter_accounts_amounts(self):
+        # The scatter plan needs the balances of the whole roster, it is only built when first needed
+        if self._scatter_accounts_amounts is None:
+            self._scatter_accounts_amounts = self.load_scatter(self.payments)
+        return self._scatter_accounts_amounts
+
+    @scatter_accounts_amounts.setter
+    def scatter_accounts_amounts(self, value):
+        self._scatter_accounts_amounts = value
+
+    def scholar_accounts(self, payments):
+        if 'Manager' in payments:
+            return [scholar['AccountAddress'] for scholar in self.pending(payments['Scholars'], 'AccountAddress')]
+        return [scholar['ronin'] for scholar in self.pending(payments['scholars'], 'ronin')]
+
+    def load_scatter(self, payments):
+        accounts = self.scholar_accounts(payments)
+        logging.info(f"Fetching RON balances for {len(accounts)} accounts...")
+        balances = fetch_balances(accounts, 'ron')
+        for acc in accounts:
+            if acc not in balances:
+                balances[acc] = check_balance(acc, 'ron')
+        return top_up_amounts(accounts, balances, self.min_ron)
+
+    def pending(self, scholars, field):
+        """ Scholars whose account is still to be topped up """
+        return scholars
+
+
+class ScatterRonManager(ScatterPlanMixin):
+    def __init__(self, from_acc, payments, secrets, min_ron, journal=None):
         self.min_ron = float(min_ron)
         self.from_acc = from_acc
-        self.from_private = secrets[self.from_acc]
-        self.scatter_accounts_amounts = self.load_scatter(payments)
+        self.from_private = secrets.get(self.from_acc)
+        self.payments = payments
+        self.journal = journal
+        self._scatter_accounts_amounts = None
+        self.receipts = ReceiptTracker()
+
+    def verify_inputs(self):
+        if not self.from_private:
+            logging.critical(f"Account '{self.from_acc}' is not present in secret file, please add it.")
+            sys.exit()
+
+    def pending(self, scholars, field):
+        if not self.journal:
+            return scholars
+        return self.journal.pending(scholars, lambda scholar: f"scatter_ron:{scholar[field]}")
 
-    def load_scatter(self, payments):
-        scatter_dict = {}
-        if 'Manager' in payments:
-            for scholar in payments['Scholars']:
-                # check how much ron to scatter
-                missing_ron = self.min_ron - check_balance(scholar['AccountAddress'], 'ron')
-                if missing_ron > 0:
-                    scatter_dict[scholar['AccountAddress']] = missing_ron
-                else:
-                    logging.info(f'Account {scholar["AccountAddress"]} already has more than the min ron desired')
-        else:
-            for scholar in payments['scholars']:
-                # check how much ron to scatter
-                missing_ron = self.min_ron - check_balance(scholar['ronin'], 'ron')
-                if missing_ron > 0:
-                    scatter_dict[scholar['ronin']] = missing_ron
-                else:
-                    logging.info(f'Account {scholar["ronin"]} already has more than the min ron desired')
-        return scatter_dict
-    
     def execute(self):
-        s = Scatter('ron', self.from_acc, self.from_private, self.scatter_accounts_amounts)
-        s.execute()
+        chunks = chunk_scatter('ron', self.from_acc, self.from_private, self.scatter_accounts_amounts)
+        if len(chunks) > 1:
+            logging.info(f"Scattering RON to {len(self.scatter_accounts_amounts)} accounts "
+                         f"in {len(chunks)} transactions")
+        sent = send_scatter_chunks(chunks, self.receipts, self.from_acc)
+        self.receipts.wait()
+        # A chunk tops up all its accounts or none of them
+        if self.journal:
+            for chunk, tx_hash in sent:
+                if self.receipts.outcome(tx_hash) == "confirmed":
+                    for account in chunk.amounts:
+                        self.journal.complete(f"scatter_ron:{account}", tx_hash=tx_hash)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
@@ -0,0 +1,208 @@
+import logging
+
+from requests.exceptions import RequestException
+from web3 import Web3
+from axie_utils.abis import SCATTER_ABI, APPROVE_ABI
+from axie_utils.utils import RONIN_PROVIDER, SCATTER_CONTRACT, TOKEN, USER_AGENT, check_balance, get_nonce
+
+
+# Gas a scatter may use, it is split in as many transactions as needed to stay below it
+SCATTER_GAS_LIMIT = 1000000
+SCATTER_BASE_GAS = 50000
+# Gas each recipient adds, used when the chain could not estimate it
+SCATTER_RECIPIENT_GAS = {"ron": 35000}
+SCATTER_TOKEN_RECIPIENT_GAS = 60000
+# Estimates are raised by this factor, the chain state can change between estimating and mining
+SCATTER_GAS_MARGIN = 1.25
+# Recipients of the scatter whose estimate calibrates the chunk size
+SCATTER_PROBE_SIZE = 10
+APPROVAL_GAS = 100000
+MAX_ALLOWANCE = 2 ** 256 - 1
+
+# Gas estimates by token and number of recipients, shared by all the scatters of a run
+gas_estimates = {}
+
+
+def scatter_gas(token, number_of_recipients):
+    """ Gas of a scatter when the chain could not estimate it """
+    return SCATTER_BASE_GAS + SCATTER_RECIPIENT_GAS.get(token, SCATTER_TOKEN_RECIPIENT_GAS) * number_of_recipients
+
+
+def estimate_scatter_gas(chunk):
+    """ Gas the chunk uses, estimated once per token and number of recipients """
+    key = (chunk.token, len(chunk.to_list))
+    if key not in gas_estimates:
+        try:
+            gas_estimates[key] = chunk.estimate_gas()
+        except (RequestException, ValueError) as e:
+            logging.warning(f"Could not estimate gas of a {chunk.token} scatter to {len(chunk.to_list)} "
+                            f"recipients. Error: {e}")
+            return scatter_gas(*key)
+    return gas_estimates[key]
+
+
+def recipients_per_scatter(gas_per_recipient, gas_limit=SCATTER_GAS_LIMIT):
+    return max(1, int((gas_limit / SCATTER_GAS_MARGIN - SCATTER_BASE_GAS) // gas_per_recipient))
+
+
+def chunk_scatter(token, from_acc, from_private, to_ronin_amount_dict, gas_limit=SCATTER_GAS_LIMIT):
+    """ Splits a scatter in chunks that fit in the gas limit. The number of recipients
+    per chunk is calibrated from the estimate of a scatter to the first recipients. """
+    recipients = list(to_ronin_amount_dict.items())
+    if not recipients:
+        return []
+    probe = ScatterChunk(token, from_acc, from_private, dict(recipients[:SCATTER_PROBE_SIZE]), gas_limit)
+    gas = estimate_scatter_gas(probe)
+    size = recipients_per_scatter(max(gas - SCATTER_BASE_GAS, len(probe.to_list)) / len(probe.to_list), gas_limit)
+    return [ScatterChunk(token, from_acc, from_private, dict(recipients[i:i + size]), gas_limit)
+            for i in range(0, len(recipients), size)]
+
+
+def has_funds(chunks):
+    total = sum(amount for chunk in chunks for amount in chunk.amounts.values())
+    balance = check_balance(chunks[0].from_acc, chunks[0].token)
+    if balance < total:
+        logging.critical(f"Important: Account ({chunks[0].from_acc.replace('0x', 'ronin:')}) needs {total} "
+                         f"{chunks[0].token.upper()} to scatter but holds {balance}")
+        return False
+    return True
+
+
+def send_scatter_chunks(chunks, receipts, description, before_send=None):
+    """ Sends the chunks of a scatter with consecutive nonces from the funding account, approving
+    the scatter contract first when needed. Chunks do not wait for the receipt of the previous one.
+    before_send is called with the first nonce right before anything is sent.
+    Returns the chunks sent with their hash. """
+    if not chunks or not has_funds(chunks):
+        return []
+    nonce = get_nonce(chunks[0].from_acc)
+    if before_send:
+        before_send(nonce)
+    if chunks[0].token != "ron" and not chunks[0].is_approved(sum(chunk.total() for chunk in chunks)):
+        tx_hash = chunks[0].approve(nonce)
+        receipts.track("Approval", f"of {chunks[0].token.upper()} scatter for account "
+                       f"({chunks[0].from_acc.replace('0x', 'ronin:')})", tx_hash)
+        if not tx_hash:
+            return []
+        nonce += 1
+    sent = []
+    for i, chunk in enumerate(chunks, start=1):
+        tx_hash = chunk.execute(nonce)
+        receipts.track("Scatter", description if len(chunks) == 1 else f"{description} ({i}/{len(chunks)})", tx_hash)
+        if tx_hash:
+            nonce += 1
+            sent.append((chunk, tx_hash))
+    return sent
+
+
+class ScatterChunk:
+    """ Scatters RON or a token from one account to part of the recipients of a scatter.
+
+    The nonce is given by the caller, so the chunks of a scatter are sent one after
+    the other without waiting for each other. Their receipts are tracked afterwards. """
+
+    def __init__(self, token, from_acc, from_private, to_ronin_amount_dict, gas_limit=SCATTER_GAS_LIMIT):
+        self.w3 = Web3(
+            Web3.HTTPProvider(
+                RONIN_PROVIDER,
+                request_kwargs={"headers": {"content-type": "application/json", "user-agent": USER_AGENT}}))
+        self.token = token.lower()
+        self.from_acc = from_acc.replace("ronin:", "0x")
+        self.from_private = from_private
+        self.amounts = dict(to_ronin_amount_dict)
+        self.gas_limit = gas_limit
+        self.to_list = [Web3.toChecksumAddress(acc.replace("ronin:", "0x")) for acc in self.amounts]
+        if self.token == "ron":
+            self.amounts_list = [self.w3.toWei(amount, "ether") for amount in self.amounts.values()]
+        else:
+            self.amounts_list = list(self.amounts.values())
+            self.token_contract = self.w3.eth.contract(
+                address=Web3.toChecksumAddress(TOKEN[self.token]),
+                abi=APPROVE_ABI
+            )
+        self.contract = self.w3.eth.contract(
+            address=Web3.toChecksumAddress(SCATTER_CONTRACT),
+            abi=SCATTER_ABI
+        )
+
+    def total(self):
+        return sum(self.amounts_list)
+
+    def value(self):
+        return self.total() if self.token == "ron" else 0
+
+    def scatter_function(self):
+        if self.token == "ron":
+            return self.contract.functions.disperseEther(self.to_list, self.amounts_list)
+        return self.contract.functions.disperseTokenSimple(
+            Web3.toChecksumAddress(TOKEN[self.token]), self.to_list, self.amounts_list)
+
+    def estimate_gas(self):
+        return self.scatter_function().estimateGas(
+            {"from": Web3.toChecksumAddress(self.from_acc), "value": self.value()})
+
+    def is_approved(self, amount):
+        try:
+            allowance = self.token_contract.functions.allowance(
+                Web3.toChecksumAddress(self.from_acc),
+                Web3.toChecksumAddress(SCATTER_CONTRACT)).call()
+        except (RequestException, ValueError) as e:
+            # Approving again does no harm, not approving makes every chunk fail
+            logging.warning(f"Could not check scatter allowance of account {self.from_acc}. Error: {e}")
+            return False
+        return int(allowance) >= amount
+
+    def transaction_params(self, gas, nonce, value=0):
+        return {
+            "chainId": 2020,
+            "gas": gas,
+            "from": Web3.toChecksumAddress(self.from_acc),
+            "gasPrice": self.w3.toWei("1", "gwei"),
+            "value": value,
+            "nonce": nonce
+        }
+
+    def approval_function(self):
+        return self.token_contract.functions.approve(Web3.toChecksumAddress(SCATTER_CONTRACT), MAX_ALLOWANCE)
+
+    def transaction_gas(self):
+        return min(self.gas_limit, int(estimate_scatter_gas(self) * SCATTER_GAS_MARGIN))
+
+    def build_approval(self, nonce):
+        return self.approval_function().buildTransaction(self.transaction_params(APPROVAL_GAS, nonce))
+
+    def build_scatter(self, nonce):
+        return self.scatter_function().buildTransaction(
+            self.transaction_params(self.transaction_gas(), nonce, self.value()))
+
+    def sign(self, transaction):
+        return self.w3.eth.account.sign_transaction(transaction, private_key=self.from_private).rawTransaction
+
+    def send(self, transaction, description):
+        try:
+            raw_transaction = self.sign(transaction)
+            self.w3.eth.send_raw_transaction(raw_transaction)
+        except (RequestException, ValueError) as e:
+            logging.critical(f"Important: {description} could not be sent. Error given: {e}")
+            return None
+        _hash = self.w3.toHex(self.w3.keccak(raw_transaction))
+        logging.info(f"Important: {description} sent. Hash: {_hash} - "
+                     f"Explorer: https://explorer.roninchain.com/tx/{_hash}")
+        return _hash
+
+    def approve(self, nonce):
+        """ Allows the scatter contract to move the tokens of the account """
+        return self.send(self.build_approval(nonce),
+                         f"{self.token.upper()} scatter approval for account ({self.from_acc.replace('0x', 'ronin:')})")
+
+    def execute(self, nonce):
+        try:
+            transaction = self.build_scatter(nonce)
+        except (RequestException, ValueError) as e:
+            logging.critical(f"Important: {self} could not be built. Error given: {e}")
+            return None
+        return self.send(transaction, str(self))
+
+    def __str__(self):
+        return (f"{self.token.upper()} Scatter to {len(self.to_list)} accounts from account "
+                f"({self.from_acc.replace('0x', 'ronin:')})")
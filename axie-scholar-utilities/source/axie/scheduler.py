@@ -0,0 +1,91 @@
+import time
+import asyncio
+import logging
+from collections import namedtuple
+
+
+CLAIM_CONCURRENCY = 10
+CLAIM_RATE = 2
+
+ClaimResult = namedtuple("ClaimResult", ["account", "outcome", "latency"])
+
+
+class TokenBucket:
+    """ Limits how many requests start per second, allowing bursts of up to capacity requests """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        self.refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self.refill()
+        self.tokens -= 1
+
+
+class ClaimScheduler:
+    """ Runs claims with at most `concurrency` of them in flight, started at most `rate` times per second.
+
+    Workers pull accounts from a shared iterator and only then build their claim,
+    so no more than `concurrency` claims exist at any time. A claim is completed when
+    `on_complete` accepts its result, or without it when the claim returned one. """
+
+    def __init__(self, concurrency=CLAIM_CONCURRENCY, rate=CLAIM_RATE):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate) if rate else None
+        self.results = []
+
+    def run(self, accounts, build_claim, on_complete=None):
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(self.schedule(accounts, build_claim, on_complete))
+        return self.results
+
+    async def schedule(self, accounts, build_claim, on_complete):
+        accounts = iter(accounts)
+        await asyncio.gather(*[self.worker(accounts, build_claim, on_complete) for _ in range(self.concurrency)])
+
+    async def worker(self, accounts, build_claim, on_complete):
+        for account in accounts:
+            if self.bucket:
+                await self.bucket.acquire()
+            start = time.monotonic()
+            try:
+                claim = build_claim(account)
+                result = await claim.async_execute()
+                confirmed = on_complete(account, result) if on_complete else result
+                outcome = "completed" if confirmed else "failed"
+            except Exception as e:
+                logging.critical(f"Important: Claim for account {account} failed with error: {e}")
+                outcome = "failed"
+            latency = time.monotonic() - start
+            self.results.append(ClaimResult(account, outcome, latency))
+            logging.info(f"Claim for account {account} {outcome} in {latency:.2f}s")
+
+    def summary(self):
+        summary = {"completed": 0, "failed": 0}
+        for result in self.results:
+            summary[result.outcome] += 1
+        return summary
+
+    def __str__(self):
+        if not self.results:
+            return "No claims executed!"
+        summary = self.summary()
+        latencies = sorted(result.latency for result in self.results)
+        slowest = max(self.results, key=lambda r: r.latency)
+        msg = (f"Claims: {summary['completed']} completed, {summary['failed']} failed.\n"
+               f"Latency: {sum(latencies) / len(latencies):.2f}s average, "
+               f"{latencies[len(latencies) // 2]:.2f}s median, "
+               f"{slowest.latency:.2f}s slowest ({slowest.account}).\n")
+        for result in self.results:
+            if result.outcome != "completed":
+                msg += f"Claim for account {result.account} {result.outcome}.\n"
+        return msg
@@ -1,3 +1,8 @@
+from jsonschema.validators import validator_for
+
+from axie.utils import JsonRecords
+
+
 payments_schema = {
     "type": "object",
     "required": [
@@ -238,3 +243,118 @@ breeding_schema = {
         }
     }
 }
+
+
+payout_plan_schema = {
+    "type": "object",
+    "required": [
+        "type",
+        "accounts"
+    ],
+    "properties": {
+        "type": {
+            "type": "string",
+            "enum": ["new", "legacy"]
+        },
+        "accounts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": [
+                    "name",
+                    "ronin",
+                    "balance",
+                    "total",
+                    "payments"
+                ],
+                "properties": {
+                    "name": {
+                        "type": "string"
+                    },
+                    "ronin": {
+                        "type": "string",
+                        "pattern": "^ronin:"
+                    },
+                    "balance": {
+                        "type": "integer",
+                        "minimum": 1
+                    },
+                    "total": {
+                        "type": "integer",
+                        "minimum": 0
+                    },
+                    "payments": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": [
+                                "ronin",
+                                "amount",
+                                "type"
+                            ],
+                            "properties": {
+                                "ronin": {
+                                    "type": "string",
+                                    "pattern": "^ronin:"
+                                },
+                                "amount": {
+                                    "type": "integer",
+                                    "minimum": 0
+                                },
+                                "type": {
+                                    "type": "string",
+                                    "enum": ["manager", "scholar", "trainer", "other", "donation"]
+                                }
+                            },
+                            "additionalProperties": False
+                        }
+                    }
+                },
+                "additionalProperties": False
+            }
+        }
+    },
+    "additionalProperties": False
+}
+
+
+def compile_validator(schema):
+    """ Builds the validator of a schema once, so it is not rebuilt on every validation """
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+payments_validator = compile_validator(payments_schema)
+legacy_payments_validator = compile_validator(legacy_payments_schema)
+transfers_validator = compile_validator(transfers_schema)
+breeding_validator = compile_validator(breeding_schema)
+payout_plan_validator = compile_validator(payout_plan_schema)
+# Validators for single records of streamed files
+scholar_validator = compile_validator(payments_schema["properties"]["scholars"]["items"])
+legacy_scholar_validator = compile_validator(legacy_payments_schema["properties"]["Scholars"]["items"])
+transfer_validator = compile_validator(transfers_schema["items"])
+breeding_record_validator = compile_validator(breeding_schema["items"])
+
+
+def schema_errors(validator, instance):
+    """ Returns all the errors of an instance in a single traversal.
+    Streamed records are checked one by one against their own validator instead. """
+    if isinstance(instance, JsonRecords):
+        return list(instance.errors())
+    return list(validator.iter_errors(instance))
+
+
+def format_errors(errors):
+    return "".join(f"Error given: {e.message}\nFor attribute in: {list(e.path)}\n" for e in errors)
+
+
+def detect_payments_format(payments):
+    """ Tells the format of a payments file from its top level keys, 'new' or 'legacy'.
+    Returns None when it does not look like any of them. """
+    if isinstance(payments, dict):
+        if "scholars" in payments:
+            return "new"
+        if "Scholars" in payments or "Manager" in payments:
+            return "legacy"
+    return None
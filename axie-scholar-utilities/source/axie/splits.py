@@ -0,0 +1,93 @@
+import logging
+from fractions import Fraction
+
+
+CREATOR_FEE_ADDRESS = "ronin:9fa1bc784c665e683597d3f29375e45786617550"
+TRAINER_PERSONAS = ['trainer', 'investor', 'trainer/investor', 'investor/trainer']
+FEE_FACTOR = Fraction(1, 100)
+
+
+def persona_type(persona):
+    persona = persona.lower()
+    if persona == 'manager':
+        return 'manager'
+    elif persona == 'scholar':
+        return 'scholar'
+    elif persona in TRAINER_PERSONAS:
+        return 'trainer'
+    return 'other'
+
+
+def percent_factor(percentage):
+    """ Exact factor of a percentage from the payments file, 55.5 is 111/200 """
+    return Fraction(str(percentage)) / 100
+
+
+def floor_amounts(balances, factors):
+    """ floor(balance * factor) for each pair, in integers so no amount is rounded down by float error """
+    return [b * f.numerator // f.denominator for b, f in zip(balances, factors)]
+
+
+class SplitsCalculator:
+    """ Columnar payout calculator for payments files in the current format.
+
+    The splits of all scholars are flattened into columns once (owner, receiver,
+    type and percentage factor), so computing a payout for a set of balances is a
+    single pass over the columns instead of a per scholar loop. """
+
+    def __init__(self, scholars, donations=None):
+        self.scholars = scholars
+        self.donations = donations or []
+        deductable_fees = Fraction(1)
+        for dono in self.donations:
+            deductable_fees += Fraction(str(dono['percentage']))
+        types = {}
+        self.split_owner = []
+        self.split_ronin = []
+        self.split_persona = []
+        self.split_type = []
+        self.split_factor = []
+        for i, acc in enumerate(scholars):
+            for sacc in acc['splits']:
+                if sacc['persona'] not in types:
+                    types[sacc['persona']] = persona_type(sacc['persona'])
+                t = types[sacc['persona']]
+                self.split_owner.append(i)
+                self.split_ronin.append(sacc['ronin'])
+                self.split_persona.append(sacc['persona'])
+                self.split_type.append(t)
+                if t == 'manager':
+                    self.split_factor.append(percent_factor(sacc['percentage']) - deductable_fees / 100)
+                else:
+                    self.split_factor.append(percent_factor(sacc['percentage']))
+        self.dono_factor = [percent_factor(dono['percentage']) for dono in self.donations]
+
+    def calculate(self, balances):
+        """ Returns a (payments, total) tuple per scholar, given their balances in the same order.
+        Payments are dicts with the receiver ronin, the amount and the payout type. """
+        split_amounts = floor_amounts([balances[o] for o in self.split_owner], self.split_factor)
+        n_donos = len(self.dono_factor)
+        dono_amounts = floor_amounts(
+            [b for b in balances for _ in range(n_donos)],
+            self.dono_factor * len(balances))
+        fee_amounts = floor_amounts(balances, [FEE_FACTOR] * len(balances))
+
+        payments = [[] for _ in balances]
+        totals = [0] * len(balances)
+        for owner, ronin, persona, t, amount in zip(
+                self.split_owner, self.split_ronin, self.split_persona, self.split_type, split_amounts):
+            if amount < 1:
+                logging.info(f'Important: Skipping payment to {persona} as it would be less than 1SLP')
+                continue
+            payments[owner].append({"ronin": ronin, "amount": amount, "type": t})
+            totals[owner] += amount
+        for i in range(len(balances)):
+            for j, dono in enumerate(self.donations):
+                dono_amount = dono_amounts[i * n_donos + j]
+                if dono_amount > 0:
+                    payments[i].append({"ronin": dono['ronin'], "amount": dono_amount, "type": "donation"})
+                    totals[i] += dono_amount
+            if fee_amounts[i] > 0:
+                payments[i].append({"ronin": CREATOR_FEE_ADDRESS, "amount": fee_amounts[i], "type": "donation"})
+                totals[i] += fee_amounts[i]
+        return list(zip(payments, totals))
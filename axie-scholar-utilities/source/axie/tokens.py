@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+
+from Crypto.Cipher import AES
+
+
+# Kept in the home folder of the user, away from the logs that get shared when asking for help
+TOKEN_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.axie-scholar-utilities', 'token_cache.json')
+TOKEN_CACHE_KEY_ENV = 'AXIE_TOKEN_CACHE_KEY'
+# Tokens about to expire are not handed out, they could expire mid request
+TOKEN_EXPIRY_MARGIN = 300
+# Used when the token does not tell when it expires
+DEFAULT_TOKEN_TTL = 3600
+
+
+def jwt_expiry(token):
+    """ Expiration timestamp of a JWT, read from its payload without verifying it """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+def derive_key(passphrase, salt):
+    return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=2**14, r=8, p=1, dklen=32)
+
+
+class TokenCache:
+    """ Access tokens of previous runs, kept on disk by account until they expire.
+
+    When a passphrase is given the tokens are encrypted at rest with AES-GCM,
+    without it they are saved in plain text, readable only by the owner.
+    A cache that cannot be read or decrypted is discarded, its accounts just
+    go through the auth handshake again. """
+
+    def __init__(self, path=TOKEN_CACHE_FILE, passphrase=None):
+        self.path = path
+        self.passphrase = passphrase
+        self.tokens = None
+        self.dirty = False
+
+    def load(self):
+        if self.tokens is None:
+            self.tokens = {}
+            if os.path.isfile(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        self.tokens = self.decode(json.load(f))
+                except (OSError, ValueError, KeyError, TypeError):
+                    logging.warning(f"Could not read token cache {self.path}, starting a new one")
+            self.evict()
+        return self.tokens
+
+    def decode(self, content):
+        if "tokens" in content:
+            return content["tokens"]
+        if not self.passphrase:
+            logging.warning(f"Token cache {self.path} is encrypted, set {TOKEN_CACHE_KEY_ENV} to use it")
+            return {}
+        salt, nonce, tag, data = (bytes.fromhex(content[k]) for k in ["salt", "nonce", "tag", "data"])
+        cipher = AES.new(derive_key(self.passphrase, salt), AES.MODE_GCM, nonce=nonce)
+        return json.loads(cipher.decrypt_and_verify(data, tag))
+
+    def encode(self):
+        if not self.passphrase:
+            return {"tokens": self.tokens}
+        salt = os.urandom(16)
+        cipher = AES.new(derive_key(self.passphrase, salt), AES.MODE_GCM)
+        data, tag = cipher.encrypt_and_digest(json.dumps(self.tokens).encode('utf-8'))
+        return {"salt": salt.hex(), "nonce": cipher.nonce.hex(), "tag": tag.hex(), "data": data.hex()}
+
+    def evict(self):
+        limit = time.time() + TOKEN_EXPIRY_MARGIN
+        expired = [acc for acc, entry in self.tokens.items() if entry["expires"] <= limit]
+        for acc in expired:
+            del self.tokens[acc]
+        self.dirty = self.dirty or bool(expired)
+
+    def get(self, account):
+        entry = self.load().get(account)
+        if entry and entry["expires"] > time.time() + TOKEN_EXPIRY_MARGIN:
+            return entry["token"]
+        return None
+
+    def set(self, account, token):
+        expires = jwt_expiry(token) or int(time.time()) + DEFAULT_TOKEN_TTL
+        self.load()[account] = {"token": token, "expires": expires}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        if not self.passphrase:
+            logging.warning(f"Saving access tokens unencrypted in {self.path}, set {TOKEN_CACHE_KEY_ENV} "
+                            "to encrypt them")
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+        # Tokens give access to the accounts, keep them readable only by the owner
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.encode(), f)
+        self.dirty = False
+
+
+def open_token_cache():
+    return TokenCache(passphrase=os.environ.get(TOKEN_CACHE_KEY_ENV))
+
+
+class CachedJWTMixin:
+    """ Makes get_jwt reuse the valid tokens of a TokenCache and store the new ones """
+
+    def __init__(self, *args, token_cache=None, **kwargs):
+        self.token_cache = token_cache
+        super().__init__(*args, **kwargs)
+
+    def get_jwt(self):
+        if self.token_cache is None:
+            return super().get_jwt()
+        jwt = self.token_cache.get(self.account)
+        if jwt:
+            logging.info(f"Reusing access token for account {self.account.replace('0x', 'ronin:')}")
+            return jwt
+        jwt = super().get_jwt()
+        if jwt:
+            self.token_cache.set(self.account, jwt)
+        return jwt
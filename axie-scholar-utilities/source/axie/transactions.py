@@ -0,0 +1,90 @@
+import logging
+import threading
+
+from requests.exceptions import RequestException
+from web3 import Web3
+from axie_utils.utils import RONIN_PROVIDER, USER_AGENT, get_nonce
+
+from axie.lanes import account_lane
+
+
+def send_transaction(w3, transaction, private_key, description):
+    """ Signs and sends a transaction without waiting for its receipt.
+    Returns its hash, None when it could not be sent """
+    try:
+        raw_transaction = w3.eth.account.sign_transaction(transaction, private_key=private_key).rawTransaction
+        w3.eth.send_raw_transaction(raw_transaction)
+    except (RequestException, ValueError) as e:
+        logging.critical(f"Important: {description} could not be sent. Error given: {e}")
+        return None
+    _hash = w3.toHex(w3.keccak(raw_transaction))
+    logging.info(f"Important: {description} sent. Hash: {_hash} - "
+                 f"Explorer: https://explorer.roninchain.com/tx/{_hash}")
+    return _hash
+
+
+class AccountNonces:
+    """ Next nonce of each account. It is asked to the chain the first time an account sends
+    a transaction in the run and counted locally after that, as the transactions sent before
+    may not be mined yet. """
+
+    def __init__(self):
+        self.nonces = {}
+        self.lock = threading.Lock()
+
+    def next(self, account):
+        lane = account_lane(account)
+        with self.lock:
+            if lane not in self.nonces:
+                self.nonces[lane] = get_nonce(account)
+            return self.nonces[lane]
+
+    def send(self, transaction):
+        """ Sends the transaction with the next nonce of its account, the nonce is only used up when it was sent """
+        nonce = self.next(transaction.from_acc)
+        tx_hash = transaction.execute(nonce)
+        if tx_hash:
+            with self.lock:
+                self.nonces[account_lane(transaction.from_acc)] = nonce + 1
+        return tx_hash
+
+
+class SignedTransaction:
+    """ Contract call signed with the private key of its account.
+
+    The nonce is given by the caller and the transaction is sent without waiting
+    for its receipt, which is tracked afterwards with the rest of the run. """
+
+    gas = 492874
+
+    def __init__(self, from_acc, from_private):
+        self.w3 = Web3(
+            Web3.HTTPProvider(
+                RONIN_PROVIDER,
+                request_kwargs={"headers": {"content-type": "application/json", "user-agent": USER_AGENT}}))
+        self.from_acc = from_acc.replace("ronin:", "0x")
+        self.from_private = from_private
+
+    def contract_function(self):
+        raise NotImplementedError
+
+    def transaction_params(self, nonce):
+        return {
+            "chainId": 2020,
+            "gas": self.gas,
+            "from": Web3.toChecksumAddress(self.from_acc),
+            "gasPrice": self.w3.toWei("1", "gwei"),
+            "value": 0,
+            "nonce": nonce
+        }
+
+    def build(self, nonce):
+        return self.contract_function().buildTransaction(self.transaction_params(nonce))
+
+    def execute(self, nonce):
+        try:
+            transaction = self.build(nonce)
+        except (RequestException, ValueError) as e:
+            logging.critical(f"Important: {self} could not be built. Error given: {e}")
+            return None
+        return send_transaction(self.w3, transaction, self.from_private, str(self))
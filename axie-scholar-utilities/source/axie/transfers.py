@@ -1,37 +1,84 @@
 import sys
 import logging
-from datetime import datetime
+from collections import namedtuple
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from axie.schemas import transfers_validator, transfer_validator, schema_errors
+from axie.receipts import ReceiptTracker
+from axie.inventory import AxieInventory
+from axie.lanes import LaneExecutor, LANE_CONCURRENCY, account_lane
+from axie.bulk_transfers import (BulkTransfer, chunk_transfers, group_by_account, send_bulk_transfers,
+                                 check_batch_contract)
+from axie.transactions import AccountNonces, SignedTransaction
+from axie.utils import load_json, JsonRecords
+from web3 import Web3
+from axie_utils import Axies
+from axie_utils.abis import AXIE_ABI
+from axie_utils.utils import AXIE_CONTRACT
 
-from axie.schemas import transfers_schema
-from axie.utils import load_json, ImportantLogsFilter
-from axie_utils import Transfer, Axies
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+# Accounts are planned and sent in chunks of about this many axies, so the memory a run needs does not grow with
+# the size of the transfers file
+TRANSFER_CHUNK_SIZE = 500
+
+PlannedTransfer = namedtuple("PlannedTransfer", ["from_acc", "from_private", "to_acc", "axie_id"])
+
+
+def chunk_accounts(records, size=TRANSFER_CHUNK_SIZE):
+    """ Groups the records of a transfers file in chunks of whole accounts with at least `size` axies each """
+    chunk, axies = [], 0
+    for record in records:
+        chunk.append(record)
+        axies += len(record['Transfers'])
+        if axies >= size:
+            yield chunk
+            chunk, axies = [], 0
+    if chunk:
+        yield chunk
+
+
+class AxieTransfer(SignedTransaction):
+    """ Transfers one axie, sent without waiting for its receipt """
+
+    def __init__(self, from_acc, from_private, to_acc, axie_id):
+        super().__init__(from_acc, from_private)
+        self.to_acc = to_acc.replace("ronin:", "0x")
+        self.axie_id = axie_id
+
+    def contract_function(self):
+        axie_contract = self.w3.eth.contract(address=Web3.toChecksumAddress(AXIE_CONTRACT), abi=AXIE_ABI)
+        return axie_contract.functions.safeTransferFrom(
+            Web3.toChecksumAddress(self.from_acc),
+            Web3.toChecksumAddress(self.to_acc),
+            self.axie_id
+        )
+
+    def __str__(self):
+        return (f"Axie Transfer of axie ({self.axie_id}) from account ({self.from_acc.replace('0x', 'ronin:')}) "
+                f"to account ({self.to_acc.replace('0x', 'ronin:')})")
 
 
 class AxieTransferManager:
-    def __init__(self, transfers_file, secrets_file, secure=None):
-        self.transfers_file = load_json(transfers_file)
+    def __init__(self, transfers_file, secrets_file, secure=None, journal=None, stream=False, bulk_contract=None,
+                 concurrency=LANE_CONCURRENCY, approve=False):
+        if stream:
+            self.transfers_file = JsonRecords(transfers_file, transfer_validator)
+        else:
+            self.transfers_file = load_json(transfers_file)
         self.secrets_file = load_json(secrets_file)
         self.secure = secure
+        self.receipts = ReceiptTracker()
+        self.nonces = AccountNonces()
+        self.journal = journal
+        # Address of the batch transfer contract given by the user, transfers are sent one by one without it
+        self.bulk_contract = bulk_contract
+        self.approve = approve
+        self.executor = LaneExecutor(concurrency)
 
     def verify_inputs(self):
         logging.info("Validating file inputs...")
         validation_success = True
         # Validate transfers file
-        try:
-            validate(self.transfers_file, transfers_schema)
-        except ValidationError as ex:
+        for ex in schema_errors(transfers_validator, self.transfers_file):
             logging.critical("Transfers file failed validation. Please review it. "
                              f"Error given: {ex.message}. "
                              f"For attribute in: {list(ex.path)}")
@@ -54,30 +101,92 @@ class AxieTransferManager:
         logging.info("Files correctly validated!")
 
     def prepare_transfers(self):
-        transfers = []
         logging.info("Preparing transfers")
-        for acc in self.transfers_file:
+        if self.bulk_contract and not check_batch_contract(self.bulk_contract):
+            return
+        for records in chunk_accounts(self.transfers_file):
+            transfers = self.plan_transfers(records)
+            if self.bulk_contract:
+                self.execute_bulk_transfers(transfers)
+            else:
+                self.execute_transfers(transfers)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
+
+    def plan_transfers(self, records):
+        """ Plans the transfers of a chunk of accounts. The signers are only built when each transfer is sent """
+        transfers = []
+        inventory = AxieInventory(acc['AccountAddress'] for acc in records).load()
+        for acc in records:
             a = Axies(acc['AccountAddress'])
             for axie in acc['Transfers']:
+                if self.journal and self.journal.is_completed(self.journal_key(acc['AccountAddress'], axie['AxieId'])):
+                    logging.info(f"Axie ({axie['AxieId']}) already transferred according to journal, skipping.")
+                    continue
                 if not self.secure or (self.secure and axie['ReceiverAddress'] in self.secrets_file):
-                    # Check axie in account
-                    if a.check_axie_owner(axie['AxieId']):
-                        t = Transfer(
-                            to_acc=axie['ReceiverAddress'],
+                    # Check axie in account, transfers an interrupted run planned but never completed are
+                    # not sent again when their axie already left the account
+                    if inventory.check_owner(a, axie['AxieId']):
+                        t = PlannedTransfer(
+                            from_acc=acc['AccountAddress'].replace("ronin:", "0x"),
                             from_private=self.secrets_file[acc['AccountAddress']],
-                            from_acc=acc['AccountAddress'],
+                            to_acc=axie['ReceiverAddress'].replace("ronin:", "0x"),
                             axie_id=axie['AxieId']
                         )
                         transfers.append(t)
-                        logging.info(f"Added transaction to the list: {t}")
+                        if self.journal:
+                            self.journal.plan(self.journal_key(acc['AccountAddress'], axie['AxieId']),
+                                              receiver=axie['ReceiverAddress'])
+                        logging.info(f"Added transaction to the list: Axie Transfer of axie ({t.axie_id}) "
+                                     f"from account ({acc['AccountAddress']}) to account ({axie['ReceiverAddress']})")
                     else:
                         logging.info(f"Axie ({axie['AxieId']}) not in account ({acc['AccountAddress']}), skipping.")
                 else:
                     logging.info(f"Receiver address {axie['ReceiverAddress']} not in secrets.json, skipping transfer.")
-        self.execute_transfers(transfers)
+        return transfers
+
+    @staticmethod
+    def journal_key(account, axie_id):
+        return f"transfer:{account.lower().replace('0x', 'ronin:')}:{axie_id}"
+
+    def execute_transfer(self, planned):
+        t = AxieTransfer(
+            to_acc=planned.to_acc,
+            from_private=planned.from_private,
+            from_acc=planned.from_acc,
+            axie_id=planned.axie_id
+        )
+        tx_hash = self.nonces.send(t)
+        self.receipts.track("Transfer", str(t), tx_hash)
+        return tx_hash
 
     def execute_transfers(self, transfers):
         logging.info("Starting to transfer axies")
-        for t in transfers:
-            t.execute()
+        results = self.executor.run(transfers, lambda t: account_lane(t.from_acc), self.execute_transfer)
+        logging.info("Axie transfers finished")
+        self.receipts.wait()
+        # Only the transfers the chain confirmed are done, the rest are checked again on a resumed run
+        if self.journal:
+            for t, tx_hash in zip(transfers, results):
+                if tx_hash and self.receipts.outcome(tx_hash) == "confirmed":
+                    self.journal.complete(self.journal_key(t.from_acc, t.axie_id), tx_hash=tx_hash)
+
+    def execute_account_bulk_transfers(self, account_transfers):
+        from_acc, transfers = account_transfers
+        bulks = [BulkTransfer(from_acc, chunk[0].from_private, [(t.axie_id, t.to_acc) for t in chunk],
+                              self.bulk_contract)
+                 for chunk in chunk_transfers(transfers)]
+        return send_bulk_transfers(bulks, self.receipts, self.approve)
+
+    def execute_bulk_transfers(self, transfers):
+        logging.info("Starting to transfer axies in bulk")
+        accounts = list(group_by_account(transfers).items())
+        results = self.executor.run(accounts, lambda account_transfers: account_transfers[0],
+                                    self.execute_account_bulk_transfers)
         logging.info("Axie transfers finished")
+        self.receipts.wait()
+        # A bulk transfer moves all its axies or none of them
+        if self.journal:
+            for bulk, tx_hash in [sent for account_sent in results if account_sent for sent in account_sent]:
+                if self.receipts.outcome(tx_hash) == "confirmed":
+                    for axie_id in bulk.axie_ids:
+                        self.journal.complete(self.journal_key(bulk.from_acc, axie_id), tx_hash=tx_hash)
@@ -1,8 +1,16 @@
 import os
+import re
 import json
+import hashlib
 import logging
 
 
+VALIDATION_CACHE_FILE = os.path.join('logs', 'validation_cache.json')
+STREAM_CHUNK_SIZE = 1024 * 1024
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_DELIMITERS = ' \t\n\r,:]}'
+
+
 def load_json(json_file):
     # This is a safeguard, it should never raise as we check this in the CLI.
     if not os.path.isfile(json_file):
@@ -16,25 +24,185 @@ def load_json(json_file):
     return data
 
 
+class JsonArrayReader:
+    """ Reads the items of a JSON array from a file one at a time, keeping
+    only the chunk being parsed in memory """
+    def __init__(self, f, path, chunk_size=STREAM_CHUNK_SIZE):
+        self.f = f
+        self.path = path
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def invalid(self):
+        return Exception(f"File in path {self.path} is not a correctly encoded JSON.")
+
+    def read_chunk(self):
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+
+    def peek(self):
+        while True:
+            self.pos = JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self.read_chunk()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.invalid()
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.decoder.JSONDecodeError:
+                if self.eof:
+                    raise self.invalid()
+                self.read_chunk()
+                continue
+            # A number could continue in the next chunk
+            if not self.eof and (end == len(self.buffer) or self.buffer[end] not in JSON_DELIMITERS):
+                self.read_chunk()
+                continue
+            self.pos = end
+            return value
+
+    def seek_key(self, key):
+        """ Moves to the value of the given key in the top level object, skipping the others """
+        self.expect("{")
+        while self.peek() != "}":
+            name = self.value()
+            self.expect(":")
+            if name == key:
+                return True
+            self.value()
+            if self.peek() != "}":
+                self.expect(",")
+        return False
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            if char == "]":
+                return
+            self.expect(",")
+
+
+def iter_json_array(json_file, key=None, chunk_size=STREAM_CHUNK_SIZE):
+    """ Yields the items of the array in the file, or of the array under the
+    given key of its top level object, without loading the whole file """
+    if not os.path.isfile(json_file):
+        raise Exception(f"File path {json_file} does not exist. "
+                        f"Please provide a correct one")
+    with open(json_file, encoding='utf-8') as f:
+        reader = JsonArrayReader(f, json_file, chunk_size)
+        if key is not None and not reader.seek_key(key):
+            raise Exception(f"File in path {json_file} does not contain the '{key}' list.")
+        if reader.peek() != "[":
+            raise Exception(f"File in path {json_file} does not contain a list of records.")
+        yield from reader.items()
+
+
+class JsonRecords:
+    """ Records of a JSON file streamed from disk every time they are iterated.
+
+    Each record is validated on its own against the items sub-schema, so a huge
+    file can be checked and processed while holding a single record in memory. """
+    def __init__(self, path, validator, key=None, chunk_size=STREAM_CHUNK_SIZE):
+        if not os.path.isfile(path):
+            raise Exception(f"File path {path} does not exist. "
+                            f"Please provide a correct one")
+        self.path = path
+        self.validator = validator
+        self.key = key
+        self.chunk_size = chunk_size
+        self.count = None
+
+    def __iter__(self):
+        count = 0
+        for record in iter_json_array(self.path, self.key, self.chunk_size):
+            count += 1
+            yield record
+        self.count = count
+
+    def __len__(self):
+        if self.count is None:
+            self.count = sum(1 for _ in self)
+        return self.count
+
+    def errors(self):
+        """ Yields the validation errors of every record, with paths relative to the whole file """
+        for index, record in enumerate(self):
+            for ex in self.validator.iter_errors(record):
+                ex.path.appendleft(index)
+                if self.key is not None:
+                    ex.path.appendleft(self.key)
+                yield ex
+
+
+class FilteredRecords:
+    """ Records of a re-iterable source that pass `keep`, filtered again on every pass,
+    so a stream can be narrowed down without holding its records in memory """
+    def __init__(self, records, keep):
+        self.records = records
+        self.keep = keep
+
+    def __iter__(self):
+        return (record for record in self.records if self.keep(record))
+
+
+def content_hash(*contents):
+    """ Hash of the given JSON contents, independent of the order of their keys """
+    digest = hashlib.sha256()
+    for content in contents:
+        digest.update(json.dumps(content, sort_keys=True).encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """ Results of successful input validations, keyed by the hash of the validated files """
+    def __init__(self, path=VALIDATION_CACHE_FILE):
+        self.path = path
+        self.results = None
+
+    def load(self):
+        if self.results is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self.results = json.load(f)
+            except (OSError, ValueError):
+                self.results = {}
+        return self.results
+
+    def get(self, key):
+        return self.load().get(key)
+
+    def set(self, key, value):
+        self.load()[key] = value
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f)
+
+
 class ImportantLogsFilter(logging.Filter):
     """ Logging filter used to only keep important messages which will be
     written to the log file """
     def filter(self, record):
         return record.getMessage().startswith('Important:')
-
-
-class Singleton:
-    _instance = None
-
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(Singleton, cls).__new__(
-                                cls, *args, **kwargs)
-        return cls._instance
-
-    def clear(cls):
-        # We need this for testing purposes!
-        try:
-            del Singleton._instance
-        except AttributeError:
-            pass
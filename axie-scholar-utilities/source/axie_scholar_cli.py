@@ -1,26 +1,34 @@
 """ Axie Scholar Utilities CLI.
 This tool will help you perform various actions.
-They are: payout, claim, generate_secrets, mass_update_secrets, generate_payments, generate_QR,
-transfer_axies, axie_morphing, axie_breeding, generate_breedings, scatter_ron and a few managed ones which mean
-they have an integration with axie.management
+They are: payout, plan_payout, execute_plan, claim, generate_secrets, mass_update_secrets, generate_payments,
+generate_QR, transfer_axies, axie_morphing, axie_breeding, generate_breedings, scatter_ron and a few managed ones
+which mean they have an integration with axie.management
 
 Usage:
-    axie_scholar_cli.py payout <payments_file> <secrets_file> [-y]
-    axie_scholar_cli.py managed_payout <secrets_file> <token> [-y]
-    axie_scholar_cli.py scatter_ron <payments_file> <secrets_file> <min_amount>
-    axie_scholar_cli.py managed_scatter_ron <secrets_file> <token> <min_amount>
-    axie_scholar_cli.py claim <payments_file> <secrets_file> [--force]
-    axie_scholar_cli.py managed_claim <secrets_file> <token> [--force]
+    axie_scholar_cli.py payout <payments_file> <secrets_file> [-y] [--concurrency=<n>] [--resume=<journal>]
+                        [--summary=<file>]
+    axie_scholar_cli.py managed_payout <secrets_file> <token> [-y] [--concurrency=<n>] [--resume=<journal>]
+                        [--summary=<file>]
+    axie_scholar_cli.py plan_payout <payments_file> <secrets_file> <plan_file>
+    axie_scholar_cli.py execute_plan <plan_file> <secrets_file> [-y] [--concurrency=<n>] [--resume=<journal>]
+                        [--summary=<file>]
+    axie_scholar_cli.py scatter_ron <payments_file> <secrets_file> <min_amount> [--resume=<journal>]
+    axie_scholar_cli.py managed_scatter_ron <secrets_file> <token> <min_amount> [--resume=<journal>]
+    axie_scholar_cli.py claim <payments_file> <secrets_file> [--force] [--claim-concurrency=<n>] [--claim-rate=<r>]
+                        [--resume=<journal>]
+    axie_scholar_cli.py managed_claim <secrets_file> <token> [--force] [--claim-concurrency=<n>] [--claim-rate=<r>]
+                        [--resume=<journal>]
     axie_scholar_cli.py generate_secrets <payments_file> [<secrets_file>]
     axie_scholar_cli.py managed_generate_secrets <secrets_file> <token>
     axie_scholar_cli.py mass_update_secrets <csv_file> <secrets_file>
     axie_scholar_cli.py generate_payments <csv_file> [<payments_file>]
     axie_scholar_cli.py generate_QR <payments_file> <secrets_file>
     axie_scholar_cli.py managed_generate_QR <secrets_file> <token>
-    axie_scholar_cli.py axie_morphing <secrets_file> <list_of_accounts>
-    axie_scholar_cli.py axie_breeding <breedings_file> <secrets_file>
+    axie_scholar_cli.py axie_morphing <secrets_file> <list_of_accounts> [--concurrency=<n>] [--resume=<journal>]
+    axie_scholar_cli.py axie_breeding <breedings_file> <secrets_file> [--concurrency=<n>] [--resume=<journal>]
     axie_scholar_cli.py generate_breedings <csv_file> [<breedings_file>]
-    axie_scholar_cli.py transfer_axies <transfers_file> <secrets_file> [--safe-mode]
+    axie_scholar_cli.py transfer_axies <transfers_file> <secrets_file> [--safe-mode] [--bulk=<contract>]
+                        [--approve-bulk] [--concurrency=<n>] [--resume=<journal>]
     axie_scholar_cli.py generate_transfer_axies <csv_file> [<transfers_file>]
     axie_scholar_cli.py -h | --help
     axie_scholar_cli.py --version
@@ -29,6 +37,14 @@ Options:
     -h --help   Shows this extra help options
     -y --yes    Automatically say "yes" to all confirmation promts (they will not appear).
     --force     Forces claim even if last claim was less than 14 days ago. (Used to bypass possible issues)
+    --concurrency=<n>   Number of accounts paid, transferring, breeding or morphing at the same time [default: 1].
+    --claim-concurrency=<n>   Number of accounts claimed at the same time [default: 10].
+    --claim-rate=<r>    Maximum number of claims started per second [default: 2].
+    --bulk=<contract>  Sends the transfers of each account in as few transactions as possible through the batch
+                           transfer contract at this address.
+    --approve-bulk  Allows the batch transfer contract to move all the axies of the accounts, after confirming it.
+    --resume=<journal>  Journal of an interrupted run, actions already completed in it are skipped.
+    --summary=<file>    Saves the payouts made to this file, as CSV if it ends in .csv and as JSON otherwise.
     --version   Show version.
 """
 import os
@@ -38,19 +54,11 @@ import json
 import logging
 
 from docopt import docopt
-import requests
 
-from axie import (
-    AxiePaymentsManager,
-    AxieClaimsManager,
-    AxieTransferManager,
-    AxieMorphingManager,
-    AxieBreedManager,
-    QRCodeManager,
-    ScatterRonManager
-)
-from axie.utils import load_json
-from axie_utils import Axies
+from axie.journal import RunJournal, new_journal_path
+from axie.lanes import LaneExecutor, account_lane
+from axie.logs import setup_run_logging
+from axie.utils import load_json, ValidationCache
 
 
 # Setup logger
@@ -94,6 +102,7 @@ def generate_transfers_file(csv_file_path, transfer_file_path=None):
 
 
 def load_payments_file(token):
+    import requests
     url = "https://api.axie.management/external/epithslayer/user/scholars"
     r = requests.post(url, json={"accessToken": token})
     if r.status_code == 500:
@@ -228,6 +237,42 @@ def mass_update_secret_file(csv_file_path, secrets_file_path):
         json.dump(merge,  f, ensure_ascii=False, indent=4)
 
 
+def save_payout_plan(plan, plan_file_path):
+    with open(plan_file_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False)
+    log.info(f'Payout plan saved at {plan_file_path}')
+
+
+def save_summary(summary, summary_file_path):
+    if summary_file_path.lower().endswith('.csv'):
+        summary.export_csv(summary_file_path)
+    else:
+        summary.export_json(summary_file_path)
+    logging.info(f'Payouts summary saved at {summary_file_path}')
+
+
+def parse_concurrency(value):
+    try:
+        concurrency = int(value)
+    except ValueError:
+        concurrency = 0
+    if concurrency < 1:
+        logging.critical(f"Concurrency {value} has to be a number bigger than 0!")
+        sys.exit()
+    return concurrency
+
+
+def parse_rate(value):
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = 0
+    if rate <= 0:
+        logging.critical(f"Rate {value} has to be a number bigger than 0!")
+        sys.exit()
+    return rate
+
+
 def check_file(file):
     if not os.path.isfile(file):
         logging.critical('Please provide a correct path to the file. '
@@ -236,258 +281,428 @@ def check_file(file):
     return True
 
 
+def open_journal(journal_path=None):
+    if journal_path:
+        if not check_file(journal_path):
+            logging.critical("Please review your journal path and re-try.")
+            sys.exit()
+        logging.info(f"Resuming run from journal {journal_path}")
+        return RunJournal(journal_path)
+    journal = RunJournal(new_journal_path())
+    logging.info(f"Progress of this run will be saved in journal {journal.path}")
+    return journal
+
+
+# Function running each subcommand. They import the managers they use when they run,
+# so starting the CLI does not load the dependencies of every other subcommand.
+COMMANDS = {}
+
+
+def command(name):
+    def register(run):
+        COMMANDS[name] = run
+        return run
+    return register
+
+
+@command('payout')
+def run_payout(args):
+    from axie import AxiePaymentsManager
+    logging.info("I shall help you pay!")
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(payments_file_path) and check_file(secrets_file_path):
+        logging.info('I shall pay my scholars!')
+        if args['--yes']:
+            logging.info("Automatic acceptance active, it won't ask before each execution")
+        concurrency = parse_concurrency(args['--concurrency'])
+        apm = AxiePaymentsManager(load_json(payments_file_path), load_json(secrets_file_path), auto=args['--yes'],
+                                  concurrency=concurrency, journal=open_journal(args['--resume']),
+                                  validation_cache=ValidationCache())
+        apm.verify_inputs()
+        apm.load_balances()
+        apm.prepare_payout()
+        if args['--summary']:
+            save_summary(apm.summary, args['--summary'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_payout')
+def run_managed_payout(args):
+    from axie import AxiePaymentsManager
+    logging.info("I shall help you pay!")
+    token = args['<token>']
+    payments = load_payments_file(token)
+    secrets_file_path = args['<secrets_file>']
+    if check_file(secrets_file_path):
+        logging.info('I shall pay my scholars!')
+        if args['--yes']:
+            logging.info("Automatic acceptance active, it won't ask before each execution")
+        concurrency = parse_concurrency(args['--concurrency'])
+        apm = AxiePaymentsManager(payments, load_json(secrets_file_path), auto=args['--yes'],
+                                  concurrency=concurrency, journal=open_journal(args['--resume']),
+                                  validation_cache=ValidationCache())
+        apm.verify_inputs()
+        apm.load_balances()
+        apm.prepare_payout()
+        if args['--summary']:
+            save_summary(apm.summary, args['--summary'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('plan_payout')
+def run_plan_payout(args):
+    from axie import AxiePaymentsManager
+    logging.info("I shall help you plan your payout!")
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(payments_file_path) and check_file(secrets_file_path):
+        apm = AxiePaymentsManager(load_json(payments_file_path), load_json(secrets_file_path),
+                                  validation_cache=ValidationCache())
+        apm.verify_inputs()
+        apm.load_balances()
+        plan = apm.plan_payout()
+        save_payout_plan(plan, args['<plan_file>'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('execute_plan')
+def run_execute_plan(args):
+    from axie import AxiePaymentsManager
+    logging.info("I shall help you pay!")
+    plan_file_path = args['<plan_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(plan_file_path) and check_file(secrets_file_path):
+        logging.info('I shall pay my scholars following the plan!')
+        if args['--yes']:
+            logging.info("Automatic acceptance active, it won't ask before each execution")
+        concurrency = parse_concurrency(args['--concurrency'])
+        apm = AxiePaymentsManager({}, load_json(secrets_file_path), auto=args['--yes'], concurrency=concurrency,
+                                  journal=open_journal(args['--resume']))
+        plan = load_json(plan_file_path)
+        apm.verify_plan(plan)
+        apm.execute_plan(plan)
+        if args['--summary']:
+            save_summary(apm.summary, args['--summary'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('scatter_ron')
+def run_scatter_ron(args):
+    from axie import ScatterRonManager
+    logging.info("I shall help you scatter ron!")
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args['<secrets_file>']
+    try:
+        min_ron = float(args['<min_amount>'])
+    except ValueError:
+        logging.warning(f"Min amount {args['min_amount']} has to be a number!")
+        sys.exit()
+    if check_file(payments_file_path) and check_file(secrets_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will provide the RON to scatter: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        logging.info('I shall scatter ron for my scholars!')
+        scm = ScatterRonManager(payment_account, load_json(payments_file_path), load_json(secrets_file_path), min_ron,
+                                journal=open_journal(args['--resume']))
+        scm.verify_inputs()
+        scm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_scatter_ron')
+def run_managed_scatter_ron(args):
+    from axie import ScatterRonManager
+    logging.info("I shall help you scatter ron!")
+    secrets_file_path = args['<secrets_file>']
+    token = args['<token>']
+    payments = load_payments_file(token)
+    try:
+        min_ron = float(args['<min_amount>'])
+    except ValueError:
+        logging.warning(f"Min amount {args['min_amount']} has to be a number!")
+        sys.exit()
+    try:
+        min_ron = float(args['<min_amount>'])
+    except ValueError:
+        logging.warning(f"Min amount {args['min_amount']} has to be a number!")
+        sys.exit()
+    if check_file(secrets_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will provide the RON to scatter: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        logging.info('I shall scatter ron for my scholars!')
+        scm = ScatterRonManager(payment_account, payments, load_json(secrets_file_path), min_ron,
+                                journal=open_journal(args['--resume']))
+        scm.verify_inputs()
+        scm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('claim')
+def run_claim(args):
+    from axie import AxieClaimsManager
+    from axie.tokens import open_token_cache
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args['<secrets_file>']
+    force = args['--force']
+    if check_file(payments_file_path) and check_file(secrets_file_path):
+        # Claim SLP
+        logging.info('I shall claim SLP')
+        acm = AxieClaimsManager(load_json(payments_file_path), load_json(secrets_file_path), force,
+                                journal=open_journal(args['--resume']),
+                                concurrency=parse_concurrency(args['--claim-concurrency']),
+                                rate=parse_rate(args['--claim-rate']), token_cache=open_token_cache())
+        acm.verify_inputs()
+        acm.prepare_claims()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_claim')
+def run_managed_claim(args):
+    from axie import AxieClaimsManager
+    from axie.tokens import open_token_cache
+    token = args['<token>']
+    payments = load_payments_file(token)
+    secrets_file_path = args['<secrets_file>']
+    force = args['--force']
+    if check_file(secrets_file_path):
+        # Claim SLP
+        logging.info('I shall claim SLP')
+        acm = AxieClaimsManager(payments, load_json(secrets_file_path), force, journal=open_journal(args['--resume']),
+                                concurrency=parse_concurrency(args['--claim-concurrency']),
+                                rate=parse_rate(args['--claim-rate']), token_cache=open_token_cache())
+        acm.verify_inputs()
+        acm.prepare_claims()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_secrets')
+def run_generate_secrets(args):
+    # Generate Secrets
+    logging.info('I shall help you generate your secrets file')
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args.get('<secrets_file>')
+    if (secrets_file_path and check_file(secrets_file_path) and check_file(payments_file_path) or
+       not secrets_file_path and check_file(payments_file_path)):
+        logging.info('If you do not know how to get your private keys, check: '
+                     'https://ferranmarin.github.io/axie-scholar-utilities/pages/faq.html')
+        generate_secrets_file(payments_file_path, secrets_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_generate_secrets')
+def run_managed_generate_secrets(args):
+    # Generate Secrets
+    logging.info('I shall help you generate your secrets file')
+    token = args['<token>']
+    payments = load_payments_file(token)
+    secrets_file_path = args['<secrets_file>']
+    if secrets_file_path and check_file(secrets_file_path):
+        logging.info('If you do not know how to get your private keys, check: '
+                     'https://ferranmarin.github.io/axie-scholar-utilities/pages/faq.html')
+        generate_managed_secrets(payments, secrets_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('mass_update_secrets')
+def run_mass_update_secrets(args):
+    # Mass update secrets
+    logging.info('I shall help you mass update your secrets file')
+    csv_file_path = args['<csv_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(csv_file_path) and check_file(secrets_file_path):
+        mass_update_secret_file(csv_file_path, secrets_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_transfer_axies')
+def run_generate_transfer_axies(args):
+    # Generate Axie Transfer Files
+    logging.info('I shall help you create axie transfers file')
+    csv_file_path = args['<csv_file>']
+    transfers_file_path = args.get('<transfers_file>')
+    if (transfers_file_path and check_file(transfers_file_path) and
+       check_file(csv_file_path) or not transfers_file_path and check_file(csv_file_path)):
+        generate_transfers_file(csv_file_path, transfers_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('transfer_axies')
+def run_transfer_axies(args):
+    from axie import AxieTransferManager
+    from axie.bulk_transfers import confirm_approval
+    # Make Axie Transfers
+    logging.info('I shall send axies around')
+    transfers_file_path = args['<transfers_file>']
+    secrets_file_path = args['<secrets_file>']
+    secure = args.get("--safe-mode", None)
+    if check_file(transfers_file_path) and check_file(secrets_file_path):
+        approve = bool(args['--bulk']) and args['--approve-bulk'] and confirm_approval(args['--bulk'])
+        atm = AxieTransferManager(transfers_file_path, secrets_file_path, secure=secure,
+                                  journal=open_journal(args['--resume']), stream=True,
+                                  bulk_contract=args['--bulk'], concurrency=parse_concurrency(args['--concurrency']),
+                                  approve=approve)
+        atm.verify_inputs()
+        atm.prepare_transfers()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_payments')
+def run_generate_payments(args):
+    # Generate Payments File
+    logging.info('I shall help you generate your payments file')
+    csv_file_path = args['<csv_file>']
+    payments_file_path = args.get('<payments_file>')
+    if (payments_file_path and check_file(payments_file_path) and
+       check_file(csv_file_path) or not payments_file_path and check_file(csv_file_path)):
+        generate_payments_file(csv_file_path, payments_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('axie_morphing')
+def run_axie_morphing(args):
+    from axie import AxieMorphingManager
+    from axie_utils import Axies
+    # Morph axies from all accounts given
+    logging.info('I shall morph all axies I can!')
+    accs = args['<list_of_accounts>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(secrets_file_path):
+        accs_list = accs.split(',')
+        concurrency = parse_concurrency(args['--concurrency'])
+        journal = open_journal(args['--resume'])
+
+        def morph_account(acc):
+            axies_to_morph = Axies(acc).find_axies_to_morph()
+            if axies_to_morph:
+                axm = AxieMorphingManager(axies_to_morph, acc, secrets_file_path, journal=journal)
+                axm.verify_inputs()
+                axm.execute()
+            else:
+                logging.critical("No axies to be morphed found")
+
+        LaneExecutor(concurrency).run(accs_list, account_lane, morph_account)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('axie_breeding')
+def run_axie_breeding(args):
+    from axie import AxieBreedManager
+    # Breed axies
+    logging.info('I shall breed your axies')
+    breedings_file_path = args['<breedings_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(breedings_file_path) and check_file(secrets_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will pay the fee for breeding: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        abm = AxieBreedManager(breedings_file_path, secrets_file_path, payment_account,
+                               journal=open_journal(args['--resume']), stream=True,
+                               concurrency=parse_concurrency(args['--concurrency']))
+        abm.verify_inputs()
+        abm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_breedings')
+def run_generate_breedings(args):
+    # Generate breedings file
+    logging.info('I shall help you generate a breedings file')
+    breedings_file_path = args.get('<breedings_file>')
+    csv_file_path = args['<csv_file>']
+    if (breedings_file_path and check_file(breedings_file_path) and
+       check_file(csv_file_path) or not breedings_file_path and check_file(csv_file_path)):
+        generate_breedings_file(csv_file_path, breedings_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_QR')
+def run_generate_qr(args):
+    from axie import QRCodeManager
+    from axie.tokens import open_token_cache
+    # Generate QR codes
+    logging.info('I shall generate QR codes')
+    payments_file_path = args['<payments_file>']
+    secrets_file_path = args['<secrets_file>']
+    if check_file(payments_file_path) and check_file(secrets_file_path):
+        qr = QRCodeManager(load_json(payments_file_path), load_json(secrets_file_path),
+                           os.path.dirname(secrets_file_path), token_cache=open_token_cache())
+        qr.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_generate_QR')
+def run_managed_generate_qr(args):
+    from axie import QRCodeManager
+    from axie.tokens import open_token_cache
+    # Generate QR codes
+    logging.info('I shall generate QR codes')
+    token = args['<token>']
+    payments = load_payments_file(token)
+    secrets_file_path = args['<secrets_file>']
+    if check_file(secrets_file_path):
+        qr = QRCodeManager(payments, load_json(secrets_file_path), os.path.dirname(secrets_file_path),
+                           token_cache=open_token_cache())
+        qr.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
 def run_cli():
     """ Wrapper function for testing purposes"""
     args = docopt(__doc__, version='Axie Scholar Payments CLI v3.2.3')
-    if args['payout']:
-        logging.info("I shall help you pay!")
-        payments_file_path = args['<payments_file>']
-        secrets_file_path = args['<secrets_file>']
-        if check_file(payments_file_path) and check_file(secrets_file_path):
-            logging.info('I shall pay my scholars!')
-            if args['--yes']:
-                logging.info("Automatic acceptance active, it won't ask before each execution")
-            apm = AxiePaymentsManager(load_json(payments_file_path), load_json(secrets_file_path), auto=args['--yes'])
-            apm.verify_inputs()
-            apm.prepare_payout()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    if args['managed_payout']:
-        logging.info("I shall help you pay!")
-        token = args['<token>']
-        payments = load_payments_file(token)
-        secrets_file_path = args['<secrets_file>']
-        if check_file(secrets_file_path):
-            logging.info('I shall pay my scholars!')
-            if args['--yes']:
-                logging.info("Automatic acceptance active, it won't ask before each execution")
-            apm = AxiePaymentsManager(payments, load_json(secrets_file_path), auto=args['--yes'])
-            apm.verify_inputs()
-            apm.prepare_payout()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['scatter_ron']:
-        logging.info("I shall help you scatter ron!")
-        payments_file_path = args['<payments_file>']
-        secrets_file_path = args['<secrets_file>']
-        try:
-            min_ron = float(args['<min_amount>'])
-        except ValueError:
-            logging.warning(f"Min amount {args['min_amount']} has to be a number!")
-            sys.exit()
-        if check_file(payments_file_path) and check_file(secrets_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will provide the RON to scatter: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            logging.info('I shall scatter ron for my scholars!')
-            scm = ScatterRonManager(payment_account, load_json(payments_file_path), load_json(secrets_file_path), min_ron)
-            scm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_scatter_ron']:
-        logging.info("I shall help you scatter ron!")
-        secrets_file_path = args['<secrets_file>']
-        token = args['<token>']
-        payments = load_payments_file(token)
-        try:
-            min_ron = float(args['<min_amount>'])
-        except ValueError:
-            logging.warning(f"Min amount {args['min_amount']} has to be a number!")
-            sys.exit()
-        try:
-            min_ron = float(args['<min_amount>'])
-        except ValueError:
-            logging.warning(f"Min amount {args['min_amount']} has to be a number!")
-            sys.exit()
-        if check_file(secrets_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will provide the RON to scatter: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            logging.info('I shall scatter ron for my scholars!')
-            scm = ScatterRonManager(payment_account, payments, load_json(secrets_file_path), min_ron)
-            scm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['claim']:
-        payments_file_path = args['<payments_file>']
-        secrets_file_path = args['<secrets_file>']
-        force = args['--force']
-        if check_file(payments_file_path) and check_file(secrets_file_path):
-            # Claim SLP
-            logging.info('I shall claim SLP')
-            acm = AxieClaimsManager(load_json(payments_file_path), load_json(secrets_file_path), force)
-            acm.verify_inputs()
-            acm.prepare_claims()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_claim']:
-        token = args['<token>']
-        payments = load_payments_file(token)
-        secrets_file_path = args['<secrets_file>']
-        force = args['--force']
-        if check_file(secrets_file_path):
-            # Claim SLP
-            logging.info('I shall claim SLP')
-            acm = AxieClaimsManager(payments, load_json(secrets_file_path), force)
-            acm.verify_inputs()
-            acm.prepare_claims()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_secrets']:
-        # Generate Secrets
-        logging.info('I shall help you generate your secrets file')
-        payments_file_path = args['<payments_file>']
-        secrets_file_path = args.get('<secrets_file>')
-        if (secrets_file_path and check_file(secrets_file_path) and check_file(payments_file_path) or
-           not secrets_file_path and check_file(payments_file_path)):
-            logging.info('If you do not know how to get your private keys, check: '
-                         'https://ferranmarin.github.io/axie-scholar-utilities/pages/faq.html')
-            generate_secrets_file(payments_file_path, secrets_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_generate_secrets']:
-        # Generate Secrets
-        logging.info('I shall help you generate your secrets file')
-        token = args['<token>']
-        payments = load_payments_file(token)
-        secrets_file_path = args['<secrets_file>']
-        if secrets_file_path and check_file(secrets_file_path):
-            logging.info('If you do not know how to get your private keys, check: '
-                         'https://ferranmarin.github.io/axie-scholar-utilities/pages/faq.html')
-            generate_managed_secrets(payments, secrets_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['mass_update_secrets']:
-        # Mass update secrets
-        logging.info('I shall help you mass update your secrets file')
-        csv_file_path = args['<csv_file>']
-        secrets_file_path = args['<secrets_file>']
-        if check_file(csv_file_path) and check_file(secrets_file_path):
-            mass_update_secret_file(csv_file_path, secrets_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_transfer_axies']:
-        # Generate Axie Transfer Files
-        logging.info('I shall help you create axie transfers file')
-        csv_file_path = args['<csv_file>']
-        transfers_file_path = args.get('<transfers_file>')
-        if (transfers_file_path and check_file(transfers_file_path) and
-           check_file(csv_file_path) or not transfers_file_path and check_file(csv_file_path)):
-            generate_transfers_file(csv_file_path, transfers_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['transfer_axies']:
-        # Make Axie Transfers
-        logging.info('I shall send axies around')
-        transfers_file_path = args['<transfers_file>']
-        secrets_file_path = args['<secrets_file>']
-        secure = args.get("--safe-mode", None)
-        if check_file(transfers_file_path) and check_file(secrets_file_path):
-            atm = AxieTransferManager(transfers_file_path, secrets_file_path, secure=secure)
-            atm.verify_inputs()
-            atm.prepare_transfers()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_payments']:
-        # Generate Payments File
-        logging.info('I shall help you generate your payments file')
-        csv_file_path = args['<csv_file>']
-        payments_file_path = args.get('<payments_file>')
-        if (payments_file_path and check_file(payments_file_path) and
-           check_file(csv_file_path) or not payments_file_path and check_file(csv_file_path)):
-            generate_payments_file(csv_file_path, payments_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['axie_morphing']:
-        # Morph axies from all accounts given
-        logging.info('I shall morph all axies I can!')
-        accs = args['<list_of_accounts>']
-        secrets_file_path = args['<secrets_file>']
-        if check_file(secrets_file_path):
-            accs_list = accs.split(',')
-            for acc in accs_list:
-                axies_to_morph = Axies(acc).find_axies_to_morph()
-                if axies_to_morph:
-                    axm = AxieMorphingManager(axies_to_morph, acc, secrets_file_path)
-                    axm.verify_inputs()
-                    axm.execute()
-                else:
-                    logging.critical("No axies to be morphed found")
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['axie_breeding']:
-        # Breed axies
-        logging.info('I shall breed your axies')
-        breedings_file_path = args['<breedings_file>']
-        secrets_file_path = args['<secrets_file>']
-        if check_file(breedings_file_path) and check_file(secrets_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will pay the fee for breeding: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            abm = AxieBreedManager(breedings_file_path, secrets_file_path, payment_account)
-            abm.verify_inputs()
-            abm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_breedings']:
-        # Generate breedings file
-        logging.info('I shall help you generate a breedings file')
-        breedings_file_path = args.get('<breedings_file>')
-        csv_file_path = args['<csv_file>']
-        if (breedings_file_path and check_file(breedings_file_path) and
-           check_file(csv_file_path) or not breedings_file_path and check_file(csv_file_path)):
-            generate_breedings_file(csv_file_path, breedings_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_QR']:
-        # Generate QR codes
-        logging.info('I shall generate QR codes')
-        payments_file_path = args['<payments_file>']
-        secrets_file_path = args['<secrets_file>']
-        if check_file(payments_file_path) and check_file(secrets_file_path):
-            qr = QRCodeManager(load_json(payments_file_path), load_json(secrets_file_path), os.path.dirname(secrets_file_path))
-            qr.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_generate_QR']:
-        # Generate QR codes
-        logging.info('I shall generate QR codes')
-        token = args['<token>']
-        payments = load_payments_file(token)
-        secrets_file_path = args['<secrets_file>']
-        if check_file(secrets_file_path):
-            qr = QRCodeManager(payments, load_json(secrets_file_path), os.path.dirname(secrets_file_path))
-            qr.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
+    for name, run in COMMANDS.items():
+        if args[name]:
+            run(args)
+            break
 
 
 if __name__ == '__main__':
+    setup_run_logging()
     run_cli()
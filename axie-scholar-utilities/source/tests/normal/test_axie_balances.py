@@ -0,0 +1,96 @@
+import json
+
+import requests_mock
+from requests.exceptions import ConnectionError
+
+from axie.balances import fetch_balances, build_balance_request, top_up_amounts, BALANCE_OF_SELECTOR
+from axie_utils.utils import RONIN_PROVIDER, SLP_CONTRACT, AXS_CONTRACT
+
+
+ACC_1 = 'ronin:' + "a" * 40
+ACC_2 = 'ronin:' + "b" * 40
+ACC_3 = 'ronin:' + "c" * 40
+
+
+def rpc_stand_in(balances):
+    """ Local JSON-RPC stand-in answering batched balance requests """
+    def callback(request, context):
+        responses = []
+        for req in request.json():
+            if req['method'] == 'eth_getBalance':
+                address = req['params'][0]
+            else:
+                address = '0x' + req['params'][0]['data'][-40:]
+            if address in balances:
+                responses.append({"jsonrpc": "2.0", "id": req['id'], "result": hex(balances[address])})
+            else:
+                responses.append({"jsonrpc": "2.0", "id": req['id'], "error": {"code": -32000, "message": "boom"}})
+        return json.dumps(responses)
+    return callback
+
+
+def test_build_balance_request_slp():
+    req = build_balance_request(3, ACC_1)
+    assert req == {
+        "jsonrpc": "2.0",
+        "id": 3,
+        "method": "eth_call",
+        "params": [{"to": SLP_CONTRACT, "data": BALANCE_OF_SELECTOR + "0" * 24 + "a" * 40}, "latest"]
+    }
+
+
+def test_build_balance_request_axs():
+    req = build_balance_request(1, ACC_1, 'axs')
+    assert req["params"][0]["to"] == AXS_CONTRACT
+
+
+def test_build_balance_request_ron():
+    req = build_balance_request(0, ACC_1, 'ron')
+    assert req == {"jsonrpc": "2.0", "id": 0, "method": "eth_getBalance", "params": ["0x" + "a" * 40, "latest"]}
+
+
+def test_fetch_balances_batches():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER,
+                        text=rpc_stand_in({"0x" + "a" * 40: 100, "0x" + "b" * 40: 0, "0x" + "c" * 40: 7}))
+        balances = fetch_balances([ACC_1, ACC_2, ACC_3, ACC_1], batch_size=2)
+        assert req_mocker.call_count == 2
+        assert [len(r.json()) for r in req_mocker.request_history] == [2, 1]
+    assert balances == {ACC_1: 100, ACC_2: 0, ACC_3: 7}
+
+
+def test_fetch_balances_ron():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=rpc_stand_in({"0x" + "a" * 40: 1500000000000000000}))
+        balances = fetch_balances([ACC_1], token='ron')
+    assert balances == {ACC_1: 1.5}
+
+
+def test_fetch_balances_skips_errors(caplog):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=rpc_stand_in({"0x" + "a" * 40: 100}))
+        balances = fetch_balances([ACC_1, ACC_2])
+    assert balances == {ACC_1: 100}
+    assert "Fetched slp balances for 1/2 accounts" in caplog.text
+
+
+def test_fetch_balances_connection_error(caplog):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, exc=ConnectionError("no route"))
+        balances = fetch_balances([ACC_1, ACC_2])
+    assert balances == {}
+    assert "Could not fetch slp balances for 2 accounts. Error: no route" in caplog.text
+
+
+def test_fetch_balances_custom_provider():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post("http://localhost:8545", text=rpc_stand_in({"0x" + "a" * 40: 42}))
+        balances = fetch_balances([ACC_1], provider="http://localhost:8545")
+    assert balances == {ACC_1: 42}
+
+
+def test_top_up_amounts(caplog):
+    balances = {ACC_1: 0.25, ACC_2: 1, ACC_3: 2}
+    assert top_up_amounts([ACC_1, ACC_2, ACC_3, ACC_1], balances, 1) == {ACC_1: 0.75}
+    assert f"Account {ACC_2} already has more than the min ron desired" in caplog.text
+    assert f"Account {ACC_3} already has more than the min ron desired" in caplog.text
@@ -2,9 +2,13 @@ import sys
 import json
 
 from mock import patch, call
+from web3 import Web3
+from axie_utils.utils import AXIE_CONTRACT, SLP_CONTRACT
 
 from axie import AxieBreedManager
-from axie.payments import PaymentsSummary, CREATOR_FEE_ADDRESS
+from axie.breeding import AxieBreed, FeePayment
+from axie.payments import CREATOR_FEE_ADDRESS
+from axie.utils import JsonRecords
 
 
 @patch("axie.breeding.load_json", return_value={"foo": "bar"})
@@ -140,7 +144,8 @@ def test_breed_manager_calculate_fee_cost(tmpdir):
     assert abm.calculate_fee_cost() == (15 * 30) + (15 * 25) + (20 * 20) + ((75 - 50) * 15)
 
 
-def test_breed_manager_calculate_breeding_cost(tmpdir):
+@patch("axie.preflight.fetch_axie_details")
+def test_breed_manager_calculate_breeding_cost(mock_details, tmpdir, caplog):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     private_acc = '0x<accountfoo_private_address>012345' + "".join([str(x) for x in range(10)]*3)
     s_file = tmpdir.join("s.json")
@@ -150,24 +155,41 @@ def test_breed_manager_calculate_breeding_cost(tmpdir):
         "Sire": 1234,
         "Matron": 5678,
         "AccountAddress": acc
+    }, {
+        "Sire": 1234,
+        "Matron": 4321,
+        "AccountAddress": acc
     }]
     b_file.write(json.dumps(data))
+    mock_details.return_value = {
+        1234: {"breed_count": 0, "parents": set(), "stage": 4},
+        5678: {"breed_count": 2, "parents": set(), "stage": 4}
+    }
     abm = AxieBreedManager(b_file, s_file, acc)
-    assert abm.calculate_breeding_cost() == 0
-    abm.breeding_file = list(range(75))
-    assert abm.calculate_breeding_cost() == 0
-
-
-@patch("axie.breeding.check_balance", return_value=1000)
-@patch("axie_utils.Breed.execute")
-@patch("axie_utils.Breed.__init__", return_value=None)
-@patch("axie_utils.Payment.execute")
-@patch("axie_utils.Payment.__init__", return_value=None)
-def test_breed_manager_execute(mock_payments_init,
-                               mock_payments_execute,
-                               mock_breed_init,
-                               mock_bree_execute,
+    # Sire breeds twice, the second time at its next breed count. Matron 4321 is unknown, priced at the highest
+    assert abm.calculate_breeding_cost() == 900 + 2250 + 1350 + 15300
+    assert abm.breeding_costs_by_account == {acc.lower(): 900 + 2250 + 1350 + 15300}
+    assert "Breed count of axie 4321 is unknown, counting it at the highest price" in caplog.text
+    # Breed counts are fetched once per session
+    abm.calculate_breeding_cost()
+    mock_details.assert_called_once()
+
+
+@patch("axie.breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details",
+       side_effect=lambda ids: {i: {"breed_count": 0, "parents": set(), "stage": 4} for i in ids})
+@patch("axie.breeding.check_balance", side_effect=lambda acc, token: 10000 if token == "slp" else 10 ** 18)
+@patch("axie.transactions.get_nonce", return_value=7)
+@patch("axie.breeding.AxieBreed.execute", autospec=True, side_effect=["0xbreed_1", "0xbreed_2"])
+@patch("axie.breeding.FeePayment.execute", autospec=True, return_value="0xfee")
+def test_breed_manager_execute(mock_payments_execute,
+                               mock_breed_execute,
+                               mock_get_nonce,
                                mock_check_balance,
+                               _details,
+                               _owners,
+                               _balances,
                                tmpdir):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     private_acc = '0x<accountfoo_private_address>012345' + "".join([str(x) for x in range(10)]*3)
@@ -185,30 +207,32 @@ def test_breed_manager_execute(mock_payments_init,
     }]
     b_file.write(json.dumps(data))
     abm = AxieBreedManager(b_file, s_file, acc)
+    abm.receipts.wait = lambda: None
     abm.execute()
-    mock_check_balance.assert_called_once()
-    mock_breed_init.assert_has_calls(calls=[
-        call(sire_axie=1234, matron_axie=5678, address=acc, private_key=private_acc),
-        call(sire_axie=123, matron_axie=456, address=acc, private_key=private_acc)
-    ])
-    assert mock_bree_execute.call_count == 2
-    mock_payments_init.assert_called_with(
-        "Breeding Fee",
-        "donation",
-        acc,
-        private_acc,
-        CREATOR_FEE_ADDRESS,
-        60,
-        PaymentsSummary())
-    assert mock_payments_execute.call_count == 1
-
-
-@patch("axie_utils.Payment.execute")
-@patch("axie_utils.Breed.execute")
-@patch("axie_utils.Payment.__init__", return_value=None)
-@patch("axie_utils.Breed.__init__", return_value=None)
+    # Once for the SLP and once for the AXS of the account
+    assert mock_check_balance.call_count == 2
+    acc_0x = acc.replace("ronin:", "0x")
+    assert [(b.sire_axie, b.matron_axie, b.from_acc, b.from_private, nonce)
+            for (b, nonce), _ in mock_breed_execute.call_args_list] == [
+        (1234, 5678, acc_0x, private_acc, 7),
+        (123, 456, acc_0x, private_acc, 8)
+    ]
+    # The nonce is asked once, every transaction of the account is sent with the next one
+    mock_get_nonce.assert_called_once_with(acc_0x)
+    (fee, nonce), _ = mock_payments_execute.call_args
+    assert (fee.from_acc, fee.from_private, fee.to_acc, fee.amount, nonce) == (
+        acc_0x, private_acc, CREATOR_FEE_ADDRESS.replace("ronin:", "0x"), 60, 9)
+
+
+@patch("axie.breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details", return_value={})
+@patch("axie.transactions.get_nonce", return_value=0)
+@patch("axie.breeding.FeePayment.execute")
+@patch("axie.breeding.AxieBreed.execute")
 @patch("axie.breeding.check_balance", return_value=0)
-def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, __, ___, ____, tmpdir, caplog):
+def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, __, ___, _details, _owners, _balances, tmpdir,
+                                              caplog):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     private_acc = '0x<accountfoo_private_address>012345' + "".join([str(x) for x in range(10)]*3)
     s_file = tmpdir.join("s.json")
@@ -228,5 +252,106 @@ def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, __, ___, __
     with patch.object(sys, "exit") as mocked_sys:
         abm.execute()
     mocked_sys.assert_called_once()
-    mock_check_balance.assert_called_once()
-    assert "Not enough SLP funds to pay for breeding and the fee" in caplog.text
+    # Once for the SLP and once for the AXS of the account
+    assert mock_check_balance.call_count == 2
+    assert "Not enough SLP or AXS funds to pay for breeding and the fee" in caplog.text
+
+
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details", return_value={})
+@patch("axie.breeding.AxieBreedManager.check_funds", return_value=True)
+@patch("axie.breeding.AxieBreedManager.pay_fee")
+@patch("axie.transactions.get_nonce", return_value=0)
+@patch("axie.breeding.AxieBreed")
+def test_breed_manager_execute_lanes(mock_breed, _, __, ___, _details, _owners, tmpdir):
+    accs = ['ronin:' + str(i) * 40 for i in range(3)]
+    s_file = tmpdir.join("s.json")
+    s_file.write(json.dumps({acc: '0x' + str(i) * 64 for i, acc in enumerate(accs)}))
+    b_file = tmpdir.join("b.json")
+    data = [{"Sire": s, "Matron": s + 1000, "AccountAddress": acc} for s in range(4) for acc in accs]
+    b_file.write(json.dumps(data))
+    abm = AxieBreedManager(b_file, s_file, accs[0], concurrency=3)
+    abm.receipts.wait = lambda: None
+    abm.execute()
+    assert mock_breed.call_count == 12
+    # Breedings of each account keep the order of the file
+    for acc in accs:
+        assert [c[1]["sire_axie"] for c in mock_breed.call_args_list if c[1]["address"] == acc] == [0, 1, 2, 3]
+
+
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details", return_value={})
+@patch("axie.breeding.check_balance")
+def test_breed_manager_execute_all_rejected(mock_check_balance, _, __, tmpdir, caplog):
+    acc = 'ronin:' + 'a' * 40
+    s_file = tmpdir.join("s.json")
+    s_file.write(json.dumps({acc: "0x" + "1" * 64}))
+    b_file = tmpdir.join("b.json")
+    b_file.write(json.dumps([{"Sire": 1, "Matron": 1, "AccountAddress": acc}]))
+    abm = AxieBreedManager(str(b_file), str(s_file), acc)
+    abm.execute()
+    mock_check_balance.assert_not_called()
+    assert "Important: No valid breedings to execute" in caplog.text
+
+
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details", return_value={})
+@patch("axie.breeding.AxieBreedManager.check_funds", return_value=True)
+@patch("axie.breeding.AxieBreedManager.pay_fee")
+@patch("axie.transactions.get_nonce", return_value=0)
+@patch("axie.breeding.AxieBreed")
+def test_breed_manager_execute_stream(mock_breed, _, __, ___, _details, _owners, tmpdir, caplog):
+    acc = 'ronin:' + 'a' * 40
+    s_file = tmpdir.join("s.json")
+    s_file.write(json.dumps({acc: "0x" + "1" * 64}))
+    b_file = tmpdir.join("b.json")
+    data = [{"Sire": s, "Matron": s + 1000, "AccountAddress": acc} for s in range(5)]
+    data.insert(2, {"Sire": 7, "Matron": 7, "AccountAddress": acc})
+    b_file.write(json.dumps(data))
+    abm = AxieBreedManager(str(b_file), str(s_file), acc, stream=True)
+    abm.receipts.wait = lambda: None
+    abm.execute()
+    # The preflight keeps the file streamed, only the rejected pair is remembered
+    assert isinstance(abm.breeding_file, JsonRecords)
+    assert abm.rejected == {"breed:7:7"}
+    assert [c[1]["sire_axie"] for c in mock_breed.call_args_list] == [0, 1, 2, 3, 4]
+    assert abm.calculate_fee_cost() == 5 * 30
+    assert "Breeding of 7 with 7 rejected: axie 7 cannot breed with itself" in caplog.text
+
+
+@patch("axie.breeding.check_balance", return_value=5000)
+@patch("axie.breeding.fetch_balances")
+def test_breed_manager_check_funds(mock_balances, mock_check_balance, tmpdir, caplog):
+    payer = 'ronin:' + 'a' * 40
+    breeder = 'ronin:' + 'b' * 40
+    unknown = 'ronin:' + 'c' * 40
+    s_file = tmpdir.join("s.json")
+    s_file.write(json.dumps({payer: '0x' + '1' * 64}))
+    b_file = tmpdir.join("b.json")
+    b_file.write(json.dumps([]))
+    abm = AxieBreedManager(b_file, s_file, payer)
+    abm.breeding_file = [1, 2]
+    abm.breeding_costs_by_account = {payer: 1800, breeder: 3000, unknown: 4000}
+    abm.breeding_axs_by_account = {breeder: 1.5}
+    mock_balances.side_effect = lambda accounts, token: ({payer: 1850, breeder: 2999} if token == "slp"
+                                                         else {breeder: 10 ** 18})
+    assert abm.check_funds() is False
+    # One balances request per token for the whole session, the fee is added to the payment account
+    mock_balances.assert_has_calls([call([payer, breeder, unknown], "slp"), call([breeder], "axs")])
+    mock_check_balance.assert_called_once_with(unknown, "slp")
+    assert f"Important: Account {payer} needs 1860 SLP for this session but holds 1850 SLP" in caplog.text
+    assert f"Important: Account {breeder} needs 3000 SLP for this session but holds 2999 SLP" in caplog.text
+    assert f"Important: Account {breeder} needs 1.5 AXS for this session but holds 1.0 AXS" in caplog.text
+    assert unknown not in caplog.text
+
+
+def test_axie_breed_build():
+    b = AxieBreed(1234, 5678, 'ronin:' + 'a' * 40, '0x' + '1' * 64)
+    transaction = b.build(3)
+    assert transaction["to"] == Web3.toChecksumAddress(AXIE_CONTRACT)
+    assert (transaction["nonce"], transaction["gas"]) == (3, 492874)
+    assert str(b) == f"Breeding axie 1234 with 5678 in account ronin:{'a' * 40}"
+    fee = FeePayment('ronin:' + 'a' * 40, '0x' + '1' * 64, CREATOR_FEE_ADDRESS, 60)
+    transaction = fee.build(4)
+    assert transaction["to"] == Web3.toChecksumAddress(SLP_CONTRACT)
+    assert (transaction["nonce"], transaction["gas"]) == (4, 246437)
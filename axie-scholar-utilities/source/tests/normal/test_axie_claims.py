@@ -1,8 +1,13 @@
 import sys
+import asyncio
+from datetime import datetime
 
+import pytest
+import requests_mock
 from mock import patch
 
 from axie import AxieClaimsManager
+from axie.claims import CachedClaim, CLAIM_URL
 
 
 @patch("axie.AxieClaimsManager.load_secrets_and_acc_name", return_value=("foo", "bar"))
@@ -135,8 +140,9 @@ def test_claims_manager_verify_input_wrong_private_short(caplog):
     assert f"Private key for account {scholar_acc} is not valid, please review it!" in caplog.text
 
 
-@patch("axie_utils.Claim.async_execute")
-def test_claims_manager_prepare_claims(mocked_claim_execute):
+@patch("axie.eligibility.fetch_claim_status", return_value={})
+@patch("axie.claims.CachedClaim.async_execute", return_value=None)
+def test_claims_manager_prepare_claims(mocked_claim_execute, _):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*4)
     scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
     p_file = {
@@ -156,3 +162,66 @@ def test_claims_manager_prepare_claims(mocked_claim_execute):
     axc = AxieClaimsManager(p_file, s_file)
     axc.prepare_claims()
     mocked_claim_execute.assert_called_once()
+
+
+@patch("axie.eligibility.fetch_claim_status")
+@patch("axie.claims.CachedClaim.async_execute", return_value=None)
+def test_claims_manager_prepare_claims_skips_not_claimable(mocked_claim_execute, mocked_fetch, caplog):
+    p_file = {"scholars": [
+        {"name": "Scholar 1", "ronin": "ronin:1", "splits": []},
+        {"name": "Scholar 2", "ronin": "ronin:2", "splits": []},
+        {"name": "Scholar 3", "ronin": "ronin:3", "splits": []},
+        {"name": "Scholar 4", "ronin": "ronin:4", "splits": []}]}
+    s_file = {"ronin:1": "0x1", "ronin:2": "0x2", "ronin:3": "0x3", "ronin:4": "0x4"}
+    mocked_fetch.return_value = {
+        "ronin:1": {"last_claimed": datetime(2022, 1, 1), "unclaimed": 100},
+        "ronin:2": {"last_claimed": datetime.utcnow(), "unclaimed": 100},
+        "ronin:3": {"last_claimed": datetime(2022, 1, 1), "unclaimed": 0}}
+    axc = AxieClaimsManager(p_file, s_file)
+    axc.prepare_claims()
+    mocked_fetch.assert_called_once_with(["ronin:1", "ronin:2", "ronin:3", "ronin:4"])
+    # Scholar 4 status is unknown, so its claim checks it by itself
+    assert mocked_claim_execute.call_count == 2
+    assert "Important: Account Scholar 2 (ronin:2) will be claimable again on" in caplog.text
+    assert "Important: Account Scholar 3 (ronin:3) has no claimable SLP" in caplog.text
+    assert "Important: 2 out of 4 accounts can claim" in caplog.text
+
+
+@patch("axie.claims.send_transaction", return_value="0xhash")
+@patch("axie.claims.get_nonce", return_value=3)
+@patch("axie.claims.CachedClaim.claim_signature", return_value={"amount": 10, "timestamp": 1, "signature": "0x5"})
+def test_cached_claim_sends_without_waiting(_, mocked_nonce, mocked_send):
+    claim = CachedClaim(force=False, account="ronin:1", private_key="0x1", acc_name="Scholar 1")
+    with patch.object(CachedClaim, "build", return_value={"nonce": 3}) as mocked_build, \
+            patch("web3.eth.Eth.get_transaction_receipt") as mocked_receipt:
+        assert asyncio.get_event_loop().run_until_complete(claim.async_execute()) == "0xhash"
+    mocked_nonce.assert_called_once_with("0x1")
+    mocked_build.assert_called_once_with({"amount": 10, "timestamp": 1, "signature": "0x5"}, 3)
+    mocked_send.assert_called_once_with(claim.w3, {"nonce": 3}, "0x1", "SLP claim for account ronin:1")
+    # The receipt is tracked by the manager with the rest of the claims
+    mocked_receipt.assert_not_called()
+
+
+@patch("axie.claims.send_transaction")
+@patch("axie.claims.get_nonce")
+@patch("axie.claims.CachedClaim.claim_signature", return_value=None)
+def test_cached_claim_not_sent(_, mocked_nonce, mocked_send):
+    claim = CachedClaim(force=False, account="ronin:1", private_key="0x1", acc_name="Scholar 1")
+    assert asyncio.get_event_loop().run_until_complete(claim.async_execute()) is None
+    mocked_nonce.assert_not_called()
+    mocked_send.assert_not_called()
+
+
+@pytest.mark.parametrize("response, status, expected", [
+    ({"blockchainRelated": {"signature": {"amount": 10, "timestamp": 1, "signature": "0x5"}}}, 200,
+     {"amount": 10, "timestamp": 1, "signature": "0x5"}),
+    ({"blockchainRelated": {"signature": {"amount": 10, "timestamp": 1, "signature": ""}}}, 200, None),
+    ({}, 500, None)
+])
+@patch("axie.claims.CachedClaim.get_jwt", return_value="token")
+@patch("axie.claims.CachedClaim.has_unclaimed_slp", return_value=10)
+def test_cached_claim_signature(_, __, response, status, expected):
+    claim = CachedClaim(force=False, account="ronin:1", private_key="0x1", acc_name="Scholar 1")
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(CLAIM_URL, json=response, status_code=status)
+        assert claim.claim_signature() == expected
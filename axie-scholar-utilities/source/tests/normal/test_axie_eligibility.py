@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import requests_mock
+from freezegun import freeze_time
+from requests.exceptions import ConnectionError
+
+from axie.eligibility import fetch_claim_status, check_eligibility, GAME_API_ITEMS_URL
+
+
+def test_fetch_claim_status():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.get(GAME_API_ITEMS_URL.format("0x1"),
+                       json={"lastClaimedItemAt": 1640995200, "rawTotal": 150, "rawClaimableTotal": 50})
+        req_mocker.get(GAME_API_ITEMS_URL.format("0x2"), status_code=500)
+        req_mocker.get(GAME_API_ITEMS_URL.format("0x3"), exc=ConnectionError("no route"))
+        req_mocker.get(GAME_API_ITEMS_URL.format("0x4"), json={"foo": "bar"})
+        statuses = fetch_claim_status(["ronin:1", "ronin:2", "ronin:3", "ronin:4", "ronin:1"], batch_size=2)
+        assert req_mocker.call_count == 4
+    assert statuses == {"ronin:1": {"last_claimed": datetime(2022, 1, 1), "unclaimed": 100}}
+
+
+@freeze_time("2022-01-20")
+def test_check_eligibility():
+    assert check_eligibility({"last_claimed": datetime(2022, 1, 1), "unclaimed": 100}) is None
+    assert check_eligibility({"last_claimed": datetime(2022, 1, 1), "unclaimed": 0}) == "has no claimable SLP"
+    recent = {"last_claimed": datetime(2022, 1, 10), "unclaimed": 100}
+    assert check_eligibility(recent).startswith("will be claimable again on ")
+    assert check_eligibility(recent, force=True) is None
+    assert check_eligibility({"last_claimed": datetime(2022, 1, 10), "unclaimed": 0}, force=True) == (
+        "has no claimable SLP")
@@ -0,0 +1,67 @@
+import json
+
+import requests_mock
+from mock import patch, MagicMock
+from requests.exceptions import ConnectionError
+from axie_utils.utils import RONIN_PROVIDER
+
+from axie.inventory import AxieInventory, fetch_axie_ids, TOKEN_OF_OWNER_BY_INDEX_SELECTOR
+from axie.balances import BALANCE_OF_SELECTOR
+
+
+def axie_contract_stand_in(inventories):
+    """ Local JSON-RPC stand-in answering balanceOf and tokenOfOwnerByIndex calls """
+    def callback(request, context):
+        responses = []
+        for req in request.json():
+            data = req["params"][0]["data"]
+            owner = "0x" + data[10:74].lstrip("0") if data[10:74].strip("0") else "0x0"
+            axies = inventories.get(owner, [])
+            if data.startswith(BALANCE_OF_SELECTOR):
+                result = hex(len(axies))
+            elif data.startswith(TOKEN_OF_OWNER_BY_INDEX_SELECTOR):
+                result = hex(axies[int(data[74:], 16)])
+            responses.append({"jsonrpc": "2.0", "id": req["id"], "result": result})
+        return json.dumps(responses)
+    return callback
+
+
+def test_fetch_axie_ids_paginates():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=axie_contract_stand_in({"0xabc": list(range(1000, 1250))}))
+        axie_ids = fetch_axie_ids("ronin:abc", batch_size=100)
+        # One balance request and three pages of token indexes
+        assert [len(r.json()) for r in req_mocker.request_history] == [1, 100, 100, 50]
+    assert axie_ids == set(range(1000, 1250))
+
+
+def test_fetch_axie_ids_failure(caplog):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, exc=ConnectionError("no route"))
+        assert fetch_axie_ids("ronin:abc") is None
+    assert "Could not fetch the axies of account ronin:abc. Error: no route" in caplog.text
+
+
+def test_inventory_index():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=axie_contract_stand_in({"0xabc": [1, 2], "0xdef": [3]}))
+        inventory = AxieInventory(["ronin:abc", "0xABC", "ronin:def", "ronin:fed"]).load()
+        # Duplicated accounts are fetched once, empty ones only need their balance
+        assert req_mocker.call_count == 5
+    assert inventory.owns("ronin:abc", 2) is True
+    assert inventory.owns("0xabc", 3) is False
+    assert inventory.owns("ronin:def", 3.0) is True
+    assert inventory.owns("ronin:fed", 3) is False
+    assert inventory.owns("ronin:unknown", 3) is None
+
+
+@patch("axie.inventory.fetch_axie_ids", side_effect=lambda acc, provider: {1} if acc == "ronin:abc" else None)
+def test_inventory_check_owner_falls_back_to_chain(_):
+    inventory = AxieInventory(["ronin:abc", "ronin:def"]).load()
+    known, unknown = MagicMock(acc="0xabc"), MagicMock(acc="0xdef")
+    unknown.check_axie_owner.return_value = True
+    assert inventory.check_owner(known, 1) is True
+    assert inventory.check_owner(known, 2) is False
+    known.check_axie_owner.assert_not_called()
+    assert inventory.check_owner(unknown, 2) is True
+    unknown.check_axie_owner.assert_called_once_with(2)
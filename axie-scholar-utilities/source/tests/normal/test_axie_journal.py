@@ -0,0 +1,111 @@
+import json
+
+from mock import patch
+
+from axie import AxieTransferManager, AxieClaimsManager
+from axie.journal import RunJournal
+
+
+def test_journal_records_and_reloads(tmpdir):
+    path = str(tmpdir.join("journal.jsonl"))
+    journal = RunJournal(path, sync_every=2)
+    journal.plan("payout:ronin:1", name="Scholar 1")
+    journal.complete("payout:ronin:1", tx_hash="0x1")
+    journal.plan("payout:ronin:2", name="Scholar 2")
+    journal.close()
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [(e["event"], e["key"]) for e in entries] == [
+        ("planned", "payout:ronin:1"), ("completed", "payout:ronin:1"), ("planned", "payout:ronin:2")]
+    resumed = RunJournal(path)
+    assert resumed.is_completed("payout:ronin:1")
+    assert not resumed.is_completed("payout:ronin:2")
+    assert resumed.completed["payout:ronin:1"]["tx_hash"] == "0x1"
+
+
+def test_journal_batches_fsync(tmpdir):
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")), sync_every=3)
+    with patch("axie.journal.os.fsync") as mocked_fsync:
+        for i in range(7):
+            journal.complete(f"claim:ronin:{i}")
+        assert mocked_fsync.call_count == 2
+        journal.close()
+        assert mocked_fsync.call_count == 3
+
+
+def test_journal_ignores_truncated_line(tmpdir, caplog):
+    f = tmpdir.join("journal.jsonl")
+    f.write('{"event": "completed", "key": "claim:ronin:1"}\n{"event": "compl')
+    journal = RunJournal(str(f))
+    assert journal.is_completed("claim:ronin:1")
+    assert f"Ignoring corrupted line in journal {f}" in caplog.text
+
+
+def test_journal_is_lazy(tmpdir):
+    path = tmpdir.join("journal.jsonl")
+    RunJournal(str(path)).close()
+    assert not path.exists()
+
+
+def test_journal_pending(tmpdir, caplog):
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    journal.complete("morph:1")
+    assert journal.pending([1, 2, 3], lambda axie: f"morph:{axie}") == [2, 3]
+    assert "Important: Skipping 1 actions already completed" in caplog.text
+
+
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("axie.transfers.Axies.check_axie_owner", return_value=True)
+@patch("axie.transfers.load_json")
+@patch("axie.transactions.get_nonce", return_value=0)
+@patch("axie.transfers.AxieTransfer.execute", return_value="0xhash")
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+def test_transfer_manager_resume(_, mocked_execute, _nonce, mocked_load_json, mock_owner, _inventory, tmpdir):
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    journal.complete(AxieTransferManager.journal_key("ronin:1", 123))
+    atm = AxieTransferManager("transfers.json", "secrets.json", journal=journal)
+    atm.transfers_file = [{"AccountAddress": "ronin:1", "Transfers": [
+        {"AxieId": 123, "ReceiverAddress": "ronin:2"},
+        {"AxieId": 234, "ReceiverAddress": "ronin:3"}
+    ]}]
+    atm.secrets_file = {"ronin:1": "0xsecret1"}
+    atm.prepare_transfers()
+    # Completed transfers are skipped before asking the chain for the axie owner
+    assert mock_owner.call_count == 1
+    assert mocked_execute.call_count == 1
+    assert journal.is_completed(AxieTransferManager.journal_key("ronin:1", 234))
+
+
+@patch("axie.eligibility.fetch_claim_status", return_value={})
+@patch("axie.claims.CachedClaim.async_execute")
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}, "0xreverted": {"status": "0x0"}})
+def test_claims_manager_resume(_, mocked_claim_execute, __, tmpdir):
+    p_file = {"scholars": [
+        {"name": "Scholar 1", "ronin": "ronin:1", "splits": []},
+        {"name": "Scholar 2", "ronin": "ronin:2", "splits": []},
+        {"name": "Scholar 3", "ronin": "ronin:3", "splits": []},
+        {"name": "Scholar 4", "ronin": "ronin:4", "splits": []}]}
+    s_file = {"ronin:1": "0x1", "ronin:2": "0x2", "ronin:3": "0x3", "ronin:4": "0x4"}
+    # Scholar 3 claim fails, it returns no hash. Scholar 4 claim is sent but reverts
+    mocked_claim_execute.side_effect = ["0xhash", None, "0xreverted"]
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    journal.complete("claim:ronin:1")
+    axc = AxieClaimsManager(p_file, s_file, journal=journal, concurrency=1)
+    axc.prepare_claims()
+    assert mocked_claim_execute.call_count == 3
+    assert journal.completed["claim:ronin:2"]["tx_hash"] == "0xhash"
+    assert not journal.is_completed("claim:ronin:3")
+    assert not journal.is_completed("claim:ronin:4")
+
+
+def test_journal_unconfirmed(tmpdir):
+    path = str(tmpdir.join("journal.jsonl"))
+    journal = RunJournal(path)
+    journal.plan("payout:ronin:1", nonce=3)
+    journal.plan("payout:ronin:2", nonce=7)
+    journal.complete("payout:ronin:2", tx_hash="0x2")
+    journal.close()
+    resumed = RunJournal(path)
+    assert resumed.unconfirmed("payout:ronin:1")["nonce"] == 3
+    assert resumed.unconfirmed("payout:ronin:2") is None
+    assert resumed.unconfirmed("payout:ronin:3") is None
@@ -0,0 +1,63 @@
+import time
+import threading
+
+from axie.lanes import LaneExecutor, account_lane
+
+
+class FakeChain:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = 0
+        self.executed = []
+
+    def execute(self, item):
+        account, position = item
+        with self.lock:
+            # Same account items must never overlap, they would race for the nonce
+            assert account not in self.running
+            self.running[account] = position
+            self.max_running = max(self.max_running, len(self.running))
+        time.sleep(0.01)
+        with self.lock:
+            del self.running[account]
+            self.executed.append(item)
+        if position == "boom":
+            raise ValueError("boom")
+        return f"0x{account}{position}"
+
+
+def test_lanes_keep_order_within_account():
+    chain = FakeChain()
+    items = [(acc, i) for i in range(5) for acc in "abcd"]
+    results = LaneExecutor(concurrency=3).run(items, lambda item: item[0], chain.execute)
+    assert results == [f"0x{acc}{i}" for acc, i in items]
+    assert chain.max_running == 3
+    for acc in "abcd":
+        assert [i for a, i in chain.executed if a == acc] == list(range(5))
+
+
+def test_lanes_serial_by_default():
+    chain = FakeChain()
+    items = [("a", 0), ("b", 0), ("a", 1)]
+    results = LaneExecutor().run(items, lambda item: item[0], chain.execute)
+    assert results == ["0xa0", "0xb0", "0xa1"]
+    assert chain.max_running == 1
+    # Without concurrency items keep the order they were given in
+    assert chain.executed == items
+
+
+def test_lanes_failed_item_does_not_stop_lane(caplog):
+    chain = FakeChain()
+    items = [("a", 0), ("a", "boom"), ("a", 2), ("b", 0)]
+    results = LaneExecutor(concurrency=2).run(items, lambda item: item[0], chain.execute)
+    assert results == ["0xa0", None, "0xa2", "0xb0"]
+    assert "Important: Execution in lane a failed with error: boom" in caplog.text
+
+
+def test_lanes_without_items():
+    assert LaneExecutor(concurrency=4).run([], lambda item: item, lambda item: item) == []
+
+
+def test_account_lane():
+    assert account_lane("ronin:ABC") == account_lane("0xabc") == "0xabc"
@@ -0,0 +1,44 @@
+import json
+import logging
+
+from freezegun import freeze_time
+
+from axie.logs import BufferedFileHandler, setup_run_logging, stop_run_logging
+
+
+@freeze_time('2021-01-14 01:10:05')
+def test_setup_run_logging(tmpdir):
+    listener = setup_run_logging(folder=str(tmpdir))
+    try:
+        assert setup_run_logging(folder=str(tmpdir)) is listener
+        logging.info("Important: Payment sent")
+        logging.info("Not so important")
+        logging.warning("Important: Low balance")
+    finally:
+        stop_run_logging()
+    assert len([h for h in logging.getLogger().handlers if isinstance(h, logging.handlers.QueueHandler)]) == 0
+    now = 1610586605
+    assert tmpdir.join(f"results_{now}.log").read() == "Important: Payment sent\nImportant: Low balance\n"
+    records = [json.loads(line) for line in tmpdir.join(f"run_{now}.jsonl").read().splitlines()]
+    assert [(r["level"], r["message"]) for r in records] == [
+        ("INFO", "Important: Payment sent"), ("INFO", "Not so important"), ("WARNING", "Important: Low balance")]
+    assert records[0]["time"] == "2021-01-14T01:10:05"
+    assert records[0]["thread"] == "MainThread"
+
+
+def test_stop_run_logging_without_setup():
+    stop_run_logging()
+
+
+def test_buffered_file_handler_flushes_in_batches(tmpdir):
+    path = tmpdir.join("results.log")
+    handler = BufferedFileHandler(str(path), flush_records=3, flush_interval=60)
+    record = logging.LogRecord("root", logging.INFO, __file__, 1, "Important: foo", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert path.read() == ""
+    handler.handle(record)
+    assert path.read() == "Important: foo\n" * 3
+    handler.handle(record)
+    handler.close()
+    assert path.read() == "Important: foo\n" * 4
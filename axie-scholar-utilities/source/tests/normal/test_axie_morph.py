@@ -1,11 +1,14 @@
 import sys
 
+import pytest
 from mock import patch, call
 import requests_mock
 from hexbytes import HexBytes
 from eth_account.messages import encode_defunct
 
 from axie import AxieMorphingManager
+from axie.journal import RunJournal
+from axie.morphing import CheckedMorph
 from axie_utils import Morph
 
 
@@ -42,8 +45,8 @@ def test_morph_manager_verify_input_fail(tmpdir, caplog):
     assert f"Account '{scholar_acc}' is not present in secret file, please add it." in caplog.text
 
 
-@patch("axie_utils.Morph.execute", return_value=None)
-@patch("axie_utils.Morph.__init__", return_value=None)
+@patch("axie.morphing.CheckedMorph.execute", return_value=True)
+@patch("axie.morphing.CheckedMorph.__init__", return_value=None)
 def test_morph_manager_execute(mock_morph_init, mock_morph_execute, tmpdir):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
     scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
@@ -100,3 +103,39 @@ def test_morph_execute_bad_json_response(mock_get_jwt, mock_sign_msg, caplog):
     mock_sign_msg.assert_called_with(encode_defunct(text=f"axie_id={m.axie}&owner={m.account}"),
                                      private_key=m.private_key)
     assert f"Something went wrong morphing axie {m.axie} in {m.account}\n" in caplog.text
+
+
+@patch("axie.morphing.CheckedMorph.execute", side_effect=[True, False])
+@patch("axie.morphing.CheckedMorph.__init__", return_value=None)
+def test_morph_manager_journals_morphed_axies(_, __, tmpdir):
+    scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
+    s_file = tmpdir.join("s.json")
+    s_file.write('{"'+scholar_acc+'":"0xsecret"}')
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    mm = AxieMorphingManager([1, 2], scholar_acc, s_file, journal=journal)
+    mm.execute()
+    assert journal.is_completed("morph:1")
+    assert not journal.is_completed("morph:2")
+
+
+@pytest.mark.parametrize("response, expected", [
+    ({"data": {"morphAxie": True}}, True),
+    ({"data": {"morphAxie": False}}, False),
+    ({"foo": "bar"}, False)
+])
+@patch("web3.eth.Eth.account.sign_message", return_value={"signature": HexBytes(b"123")})
+@patch("axie_utils.Morph.get_jwt", return_value="token")
+def test_checked_morph_execute(_, __, response, expected):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post('https://graphql-gateway.axieinfinity.com/graphql', json=response)
+        m = CheckedMorph(axie=1, account="ronin:abc1", private_key="0xabc1")
+        assert m.execute() is expected
+
+
+@patch("web3.eth.Eth.account.sign_message", return_value={"signature": HexBytes(b"123")})
+@patch("axie_utils.Morph.get_jwt", return_value="token")
+def test_checked_morph_execute_not_ready(_, __):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post('https://graphql-gateway.axieinfinity.com/graphql', status_code=500)
+        m = CheckedMorph(axie=1, account="ronin:abc1", private_key="0xabc1")
+        assert m.execute() is False
@@ -1,11 +1,28 @@
 import sys
+import json
 import builtins
 import logging
 
-from mock import patch
+from mock import patch, Mock
 
 from axie import AxiePaymentsManager
-from axie.payments import CREATOR_FEE_ADDRESS
+from axie.journal import RunJournal
+from axie.payments import CREATOR_FEE_ADDRESS, PaymentsSummary
+from axie.utils import ValidationCache
+from axie_utils.utils import RONIN_PROVIDER
+
+
+def scatter_chunks(token, account, private, payments):
+    return [Mock(amounts=payments)]
+
+
+def sent_scatter(chunks, receipts, description, before_send=None):
+    return [(chunk, "0xhash") for chunk in chunks]
+
+
+def tracked_scatter(chunks, receipts, description, before_send=None):
+    receipts.track("Scatter", description, "0xhash")
+    return sent_scatter(chunks, receipts, description)
 
 
 def test_payments_manager_init():
@@ -47,7 +64,7 @@ def test_payments_manager_verify_input_success():
                     "percentage": 10,
                     "ronin": "ronin:<trainer_address>"
                 }
-        ]}],
+            ]}],
         "donations": [{
             "name": "Entity 1",
             "ronin": dono_acc,
@@ -63,6 +80,40 @@ def test_payments_manager_verify_input_success():
     assert axp.donations == p_file['donations']
 
 
+def test_payments_manager_verify_input_cached(tmpdir, caplog):
+    scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    p_file = {
+        "scholars": [{
+            "name": "Scholar 1",
+            "ronin": scholar_acc,
+            "splits": [
+                {
+                    "persona": "Manager",
+                    "percentage": 60,
+                    "ronin": 'ronin:<manager_address>000' + "".join([str(x) for x in range(10)]*2)
+                },
+                {
+                    "persona": "Scholar",
+                    "percentage": 40,
+                    "ronin": "ronin:<scholar_1_address>"
+                }
+            ]}]
+    }
+    s_file = {scholar_acc: scholar_private_acc}
+    cache_path = str(tmpdir.join("validation_cache.json"))
+    axp = AxiePaymentsManager(p_file, s_file, validation_cache=ValidationCache(cache_path))
+    axp.verify_inputs()
+    assert axp.type == "new"
+    with patch.object(AxiePaymentsManager, "validate_files") as mocked_validate:
+        axp = AxiePaymentsManager(p_file, s_file, validation_cache=ValidationCache(cache_path))
+        axp.verify_inputs()
+    mocked_validate.assert_not_called()
+    assert axp.type == "new"
+    assert axp.scholar_accounts == p_file['scholars']
+    assert "Files did not change since they were last validated, skipping validation" in caplog.text
+
+
 def test_payments_manager_verify_input_success(caplog):
     manager_acc = 'ronin:<manager_address>000' + "".join([str(x) for x in range(10)]*2)
     dono_acc = 'ronin:<donations_address>0' + "".join([str(x) for x in range(10)]*2)
@@ -93,7 +144,7 @@ def test_payments_manager_verify_input_success(caplog):
                     "percentage": 10,
                     "ronin": "ronin:<trainer_address>"
                 }
-        ]}],
+            ]}],
         "donations": [{
             "name": "Entity 1",
             "ronin": dono_acc,
@@ -234,7 +285,8 @@ def test_payments_manager_verify_input_donations_exceed_max(caplog):
         axp = AxiePaymentsManager(p_file, s_file)
         axp.verify_inputs()
     mocked_sys.assert_called()
-    assert "Error given: 100 is greater than the maximum of 98\nFor attribute in: ['Donations', 0, 'Percent']" in caplog.text
+    assert ("Error given: 100 is greater than the maximum of 98\nFor attribute in: ['Donations', 0, 'Percent']"
+            in caplog.text)
 
 
 def test_payments_manager_verify_input_missing_private_key(caplog):
@@ -299,12 +351,14 @@ def test_payments_manager_verify_input_invalid_private_key(caplog):
     mocked_sys.assert_called()
     assert f"Private key for account {scholar_acc} is not valid, please review it!" in caplog.text
     assert ("There is a problem with your secrets.json, delete it and re-generate the file starting with "
-            "an empty secrets file.Or open it and see what is wrong with the keys of the accounts reported above." in caplog.text)
+            "an empty secrets file.Or open it and see what is wrong with the keys of the accounts reported above."
+            in caplog.text)
 
 
 @patch("axie.AxiePaymentsManager.prepare_new_payout")
 @patch("axie.AxiePaymentsManager.prepare_old_payout")
-def test_payments_manager_prepare_payout_check_correct_calcs_legacy(mocked_prepare_old_payout, mocked_prepare_new_payout):
+def test_payments_manager_prepare_payout_check_correct_calcs_legacy(mocked_prepare_old_payout,
+                                                                    mocked_prepare_new_payout):
     axp = AxiePaymentsManager({}, {})
     axp.type = 'legacy'
     axp.prepare_payout()
@@ -323,8 +377,8 @@ def test_payments_manager_prepare_payout_check_correct_calcs_new(mocked_prepare_
 
 
 @patch("axie.payments.check_balance", return_value=1000)
-@patch("axie_utils.Scatter.execute")
-@patch("axie_utils.Scatter.__init__", return_value=None)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_prepare_payout_check_correct_payments_legacy(mocked_enough_balance,
                                                                        mocked_scatter_init,
@@ -375,8 +429,8 @@ def test_payments_manager_prepare_payout_check_correct_payments_legacy(mocked_en
 
 
 @patch("axie.payments.check_balance", return_value=1000)
-@patch("axie_utils.Scatter.execute")
-@patch("axie_utils.Scatter.__init__", return_value=None)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_prepare_payout_check_correct_payments_new(mocked_enough_balance,
                                                                     mocked_scatter_init,
@@ -411,7 +465,7 @@ def test_payments_manager_prepare_payout_check_correct_payments_new(mocked_enoug
                     "percentage": 10,
                     "ronin": "ronin:<trainer_address>"
                 }
-        ]}],
+            ]}],
         "donations": [{
             "name": "Entity 1",
             "ronin": dono_acc,
@@ -443,7 +497,8 @@ def test_payments_manager_prepare_payout_check_correct_payments_new(mocked_enoug
 
 
 @patch("axie.payments.check_balance", return_value=0)
-@patch("axie_utils.Scatter.execute")
+@patch("axie.payments.chunk_scatter", new=scatter_chunks)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_prepare_payout_check_correct_payments_percent_no_balance(mocked_enough_balance,
                                                                                    mocked_payout,
@@ -480,7 +535,8 @@ def test_payments_manager_prepare_payout_check_correct_payments_percent_no_balan
 
 
 @patch("axie.payments.check_balance", return_value=100)
-@patch("axie_utils.Scatter.execute")
+@patch("axie.payments.chunk_scatter", new=scatter_chunks)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=False)
 def test_payments_manager_prepare_no_payout_not_enough_balance(mocked_check_balance,
                                                                mocked_payout,
@@ -518,7 +574,8 @@ def test_payments_manager_prepare_no_payout_not_enough_balance(mocked_check_bala
 @patch("web3.eth.Eth.contract")
 @patch("web3.Web3.toChecksumAddress")
 @patch("axie.payments.check_balance", return_value=1000)
-@patch("axie_utils.Scatter.execute")
+@patch("axie.payments.chunk_scatter", new=scatter_chunks)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_payout_account_accept(_, mocked_execute, mocked_check_balance, __, ___, caplog):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
@@ -557,7 +614,8 @@ def test_payments_manager_payout_account_accept(_, mocked_execute, mocked_check_
 @patch("web3.eth.Eth.contract")
 @patch("web3.Web3.toChecksumAddress")
 @patch("axie.payments.check_balance", return_value=1000)
-@patch("axie_utils.Scatter.execute")
+@patch("axie.payments.chunk_scatter", new=scatter_chunks)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_payout_auto_yes(_, mocked_execute, mocked_check_balance, __, ___, caplog):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
@@ -594,7 +652,8 @@ def test_payments_manager_payout_auto_yes(_, mocked_execute, mocked_check_balanc
 
 
 @patch("axie.payments.check_balance", return_value=1000)
-@patch("axie_utils.Scatter.execute")
+@patch("axie.payments.chunk_scatter", new=scatter_chunks)
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
 @patch("axie.AxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_payout_account_deny(_, mocked_execute, mocked_check_balance, caplog):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
@@ -627,3 +686,355 @@ def test_payments_manager_payout_account_deny(_, mocked_execute, mocked_check_ba
     mocked_check_balance.assert_called_with(scholar_acc)
     mocked_execute.assert_not_called()
     assert "SLP scatter canceled for account: 'Scholar 1'" in caplog.text
+
+
+@patch("axie.payments.fetch_balances", return_value={'ronin:<account_s1_address>': 1000})
+def test_payments_manager_load_balances_legacy(mocked_fetch):
+    axp = AxiePaymentsManager({}, {})
+    axp.type = "legacy"
+    axp.scholar_accounts = [{"AccountAddress": "ronin:<account_s1_address>"}]
+    axp.load_balances()
+    mocked_fetch.assert_called_with(["ronin:<account_s1_address>"])
+    assert axp.balances == {'ronin:<account_s1_address>': 1000}
+
+
+@patch("axie.payments.fetch_balances", return_value={'ronin:<account_s1_address>': 1000})
+def test_payments_manager_load_balances_new(mocked_fetch):
+    axp = AxiePaymentsManager({}, {})
+    axp.type = "new"
+    axp.scholar_accounts = [{"ronin": "ronin:<account_s1_address>"}, {"ronin": "ronin:<account_s2_address>"}]
+    axp.load_balances()
+    mocked_fetch.assert_called_with(["ronin:<account_s1_address>", "ronin:<account_s2_address>"])
+
+
+@patch("axie.payments.check_balance", return_value=5)
+def test_payments_manager_get_balance_falls_back_once(mocked_check_balance):
+    axp = AxiePaymentsManager({}, {})
+    axp.balances = {"ronin:<account_s1_address>": 1000}
+    assert axp.get_balance("ronin:<account_s1_address>") == 1000
+    mocked_check_balance.assert_not_called()
+    assert axp.get_balance("ronin:<account_s2_address>") == 5
+    assert axp.get_balance("ronin:<account_s2_address>") == 5
+    mocked_check_balance.assert_called_once_with("ronin:<account_s2_address>")
+
+
+@patch("axie.payments.check_balance")
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_payout_uses_balance_snapshot(mocked_scatter_init, mocked_scatter_execute,
+                                                       mocked_check_balance):
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    manager_acc = 'ronin:12345678900987000321' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    p_file = {
+        "scholars": [{
+            "name": "Scholar 1",
+            "ronin": scholar_acc,
+            "splits": [
+                {
+                    "persona": "Manager",
+                    "percentage": 50,
+                    "ronin": manager_acc
+                },
+                {
+                    "persona": "Scholar",
+                    "percentage": 50,
+                    "ronin": "ronin:<scholar_1_address>"
+                }
+            ]}]
+    }
+    s_file = {scholar_acc: scholar_private_acc}
+    axp = AxiePaymentsManager(p_file, s_file, auto=True)
+    axp.verify_inputs()
+    with patch("axie.payments.fetch_balances", return_value={scholar_acc: 1000}):
+        axp.load_balances()
+    axp.prepare_payout()
+    mocked_check_balance.assert_not_called()
+    mocked_scatter_init.assert_called_with(
+        'slp',
+        scholar_acc,
+        scholar_private_acc,
+        {
+            "ronin:<scholar_1_address>": 500,
+            CREATOR_FEE_ADDRESS: 10,
+            manager_acc: 490
+        }
+    )
+    mocked_scatter_execute.assert_called_once()
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("axie.payments.check_balance", return_value=1000)
+@patch("axie.payments.send_scatter_chunks", side_effect=tracked_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_payout_concurrency(mocked_scatter_init, mocked_scatter_execute, _, mocked_fetch_receipts,
+                                             caplog):
+    manager_acc = 'ronin:12345678900987000321' + "".join([str(x) for x in range(10)]*2)
+    scholars = []
+    s_file = {}
+    for i in range(5):
+        scholar_acc = f'ronin:1234567890098765432{i}' + "".join([str(x) for x in range(10)]*2)
+        s_file[scholar_acc] = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+        scholars.append({
+            "name": f"Scholar {i}",
+            "ronin": scholar_acc,
+            "splits": [
+                {"persona": "Manager", "percentage": 50, "ronin": manager_acc},
+                {"persona": "Scholar", "percentage": 50, "ronin": f"ronin:<scholar_{i}_address>"}
+            ]})
+    axp = AxiePaymentsManager({"scholars": scholars}, s_file, auto=True, concurrency=3)
+    axp.verify_inputs()
+    axp.prepare_payout()
+    assert axp.concurrency == 3
+    assert mocked_scatter_init.call_count == 5
+    assert mocked_scatter_execute.call_count == 5
+    assert axp.results == {acc["ronin"]: ["0xhash"] for acc in scholars}
+    for i in range(5):
+        assert f"SLP scatter completed for account: 'Scholar {i}'" in caplog.text
+    assert "Important: 5/5 SLP scatters returned a transaction hash" in caplog.text
+    mocked_fetch_receipts.assert_called_once_with(["0xhash"], RONIN_PROVIDER)
+    assert "Scatter: 5 confirmed, 0 failed, 0 pending." in caplog.text
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_execute_scatters_failure_does_not_stop_others(_, __, caplog):
+    def send_or_fail(chunks, receipts, description, before_send=None):
+        if description == "Scholar 2":
+            raise Exception("boom")
+        return tracked_scatter(chunks, receipts, description)
+
+    axp = AxiePaymentsManager({}, {"ronin:1": "0xkey1", "ronin:2": "0xkey2"})
+    with patch("axie.payments.send_scatter_chunks", side_effect=send_or_fail) as mocked_send:
+        axp.execute_scatters([("Scholar 1", "ronin:1", {"ronin:a": 10}), ("Scholar 2", "ronin:2", {"ronin:b": 10})])
+    assert mocked_send.call_count == 2
+    assert axp.results == {"ronin:1": ["0xhash"], "ronin:2": None}
+    assert "SLP scatter failed for account: 'Scholar 2'. Error given: boom" in caplog.text
+    assert "Important: 1/2 SLP scatters returned a transaction hash" in caplog.text
+    assert axp.receipts.wait() == {"Scatter": {"confirmed": 1, "failed": 1, "pending": 0}}
+
+
+@patch("axie.payments.check_balance")
+def test_payments_manager_plan_payout_new(mocked_check_balance):
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    manager_acc = 'ronin:12345678900987000321' + "".join([str(x) for x in range(10)]*2)
+    dono_acc = 'ronin:<donations_address>0' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    p_file = {
+        "scholars": [{
+            "name": "Scholar 1",
+            "ronin": scholar_acc,
+            "splits": [
+                {
+                    "persona": "Manager",
+                    "percentage": 44,
+                    "ronin": manager_acc
+                },
+                {
+                    "persona": "Scholar",
+                    "percentage": 40,
+                    "ronin": "ronin:<scholar_1_address>"
+                },
+                {
+                    "persona": "Other Person",
+                    "percentage": 6,
+                    "ronin": "ronin:<other_person_address>"
+                },
+                {
+                    "persona": "Investor",
+                    "percentage": 10,
+                    "ronin": "ronin:<trainer_address>"
+                }
+            ]}],
+        "donations": [{
+            "name": "Entity 1",
+            "ronin": dono_acc,
+            "percentage": 1
+        }]
+    }
+    s_file = {scholar_acc: scholar_private_acc}
+    axp = AxiePaymentsManager(p_file, s_file)
+    axp.verify_inputs()
+    axp.balances = {scholar_acc: 1000}
+    plan = axp.plan_payout()
+    mocked_check_balance.assert_not_called()
+    assert plan == {
+        "type": "new",
+        "accounts": [{
+            "name": "Scholar 1",
+            "ronin": scholar_acc,
+            "balance": 1000,
+            "total": 1000,
+            "payments": [
+                {"ronin": manager_acc, "amount": 420, "type": "manager"},
+                {"ronin": "ronin:<scholar_1_address>", "amount": 400, "type": "scholar"},
+                {"ronin": "ronin:<other_person_address>", "amount": 60, "type": "other"},
+                {"ronin": "ronin:<trainer_address>", "amount": 100, "type": "trainer"},
+                {"ronin": dono_acc, "amount": 10, "type": "donation"},
+                {"ronin": CREATOR_FEE_ADDRESS, "amount": 10, "type": "donation"}
+            ]
+        }]
+    }
+
+
+def test_payments_manager_plan_payout_legacy_skips_empty_accounts():
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    scholar_2_acc = 'ronin:12345678900987654322' + "".join([str(x) for x in range(10)]*2)
+    manager_acc = 'ronin:12345678900987000321' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    p_file = {
+        "Manager": manager_acc,
+        "Scholars": [
+            {
+                "Name": "Scholar 1",
+                "AccountAddress": scholar_acc,
+                "ScholarPayoutAddress": "ronin:<scholar_address>",
+                "ScholarPercent": 45,
+                "TrainerPayoutAddress": "ronin:<trainer_address>",
+                "TrainerPercent": 10
+            },
+            {
+                "Name": "Scholar 2",
+                "AccountAddress": scholar_2_acc,
+                "ScholarPayoutAddress": "ronin:<scholar_address>",
+                "ScholarPercent": 45
+            }]
+    }
+    s_file = {scholar_acc: scholar_private_acc, scholar_2_acc: scholar_private_acc}
+    axp = AxiePaymentsManager(p_file, s_file)
+    axp.verify_inputs()
+    axp.balances = {scholar_acc: 1000, scholar_2_acc: 0}
+    plan = axp.plan_payout()
+    assert plan == {
+        "type": "legacy",
+        "accounts": [{
+            "name": "Scholar 1",
+            "ronin": scholar_acc,
+            "balance": 1000,
+            "total": 1000,
+            "payments": [
+                {"ronin": "ronin:<scholar_address>", "amount": 450, "type": "scholar"},
+                {"ronin": "ronin:<trainer_address>", "amount": 100, "type": "trainer"},
+                {"ronin": CREATOR_FEE_ADDRESS, "amount": 10, "type": "donation"},
+                {"ronin": manager_acc, "amount": 440, "type": "manager"}
+            ]
+        }]
+    }
+
+
+def test_payments_manager_verify_plan(caplog):
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    plan = {"type": "new", "accounts": [{
+        "name": "Scholar 1", "ronin": scholar_acc, "balance": 10, "total": 10,
+        "payments": [{"ronin": "ronin:<scholar_address>", "amount": 10, "type": "scholar"}]}]}
+    axp = AxiePaymentsManager({}, {scholar_acc: scholar_private_acc})
+    with patch.object(sys, "exit") as mocked_sys:
+        axp.verify_plan(plan)
+    mocked_sys.assert_not_called()
+    assert "Payout plan correctly validated!" in caplog.text
+
+
+def test_payments_manager_verify_plan_missing_secret(caplog):
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    plan = {"type": "new", "accounts": [{
+        "name": "Scholar 1", "ronin": scholar_acc, "balance": 10, "total": 10,
+        "payments": [{"ronin": "ronin:<scholar_address>", "amount": 10, "type": "scholar"}]}]}
+    axp = AxiePaymentsManager({}, {})
+    with patch.object(sys, "exit") as mocked_sys:
+        axp.verify_plan(plan)
+    mocked_sys.assert_called_once()
+    assert "Account 'Scholar 1' is not present in secret file, please add it." in caplog.text
+
+
+def test_payments_manager_verify_plan_wrong_format(caplog):
+    plan = {"type": "new", "accounts": [{"name": "Scholar 1"}]}
+    axp = AxiePaymentsManager({}, {})
+    with patch.object(sys, "exit", side_effect=SystemExit) as mocked_sys:
+        try:
+            axp.verify_plan(plan)
+        except SystemExit:
+            pass
+    mocked_sys.assert_called_once()
+    assert "Payout plan failed validation. Please review it or generate it again." in caplog.text
+    assert "'ronin' is a required property" in caplog.text
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("axie.payments.check_balance")
+@patch("axie.payments.send_scatter_chunks", side_effect=tracked_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_execute_plan(mocked_scatter_init, mocked_scatter_execute, mocked_check_balance,
+                                       mocked_fetch_receipts, caplog):
+    scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
+    scholar_private_acc = '0x<account_s1_private_address>012345' + "".join([str(x) for x in range(10)]*3)
+    plan = {"type": "new", "accounts": [{
+        "name": "Scholar 1", "ronin": scholar_acc, "balance": 100, "total": 100,
+        "payments": [
+            {"ronin": "ronin:<scholar_address>", "amount": 60, "type": "scholar"},
+            {"ronin": "ronin:<manager_address>", "amount": 40, "type": "manager"}]}]}
+    axp = AxiePaymentsManager({}, {scholar_acc: scholar_private_acc}, auto=True)
+    axp.summary = PaymentsSummary()
+    axp.execute_plan(plan)
+    mocked_check_balance.assert_not_called()
+    mocked_scatter_init.assert_called_with(
+        'slp', scholar_acc, scholar_private_acc, {"ronin:<scholar_address>": 60, "ronin:<manager_address>": 40})
+    mocked_scatter_execute.assert_called_once()
+    assert "Paid 1 managers, 40 SLP.\nPaid 1 scholars, 60 SLP." in caplog.text
+    assert "Scatter: 1 confirmed, 0 failed, 0 pending." in caplog.text
+
+
+@patch("axie.payments.chunk_scatter")
+def test_payments_manager_execute_scatter_partially_sent(mocked_chunk, tmpdir, caplog):
+    chunks = [Mock(amounts={"ronin:a": 10}), Mock(amounts={"ronin:b": 5})]
+    mocked_chunk.return_value = chunks
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    axp = AxiePaymentsManager({}, {"ronin:1": "0xkey1"}, journal=journal)
+    with patch("axie.payments.send_scatter_chunks", return_value=[(chunks[0], "0xhash")]):
+        assert axp.execute_scatter("Scholar 1", "ronin:1", {"ronin:a": 10, "ronin:b": 5}) == ["0xhash"]
+    mocked_chunk.assert_called_once_with('slp', "ronin:1", "0xkey1", {"ronin:a": 10, "ronin:b": 5})
+    assert "SLP scatter for account 'Scholar 1' only partially sent, these payments are missing: ['ronin:b']" \
+        in caplog.text
+    assert not journal.is_completed(axp.journal_key("ronin:1"))
+
+
+def journaled_scatter(chunks, receipts, description, before_send=None):
+    before_send(5)
+    return sent_scatter(chunks, receipts, description)
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("axie.payments.send_scatter_chunks", side_effect=journaled_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_execute_scatter_journals_nonce(_, __, ___, tmpdir):
+    path = str(tmpdir.join("journal.jsonl"))
+    journal = RunJournal(path)
+    axp = AxiePaymentsManager({}, {"ronin:1": "0xkey1"}, journal=journal)
+    assert axp.execute_scatter("Scholar 1", "ronin:1", {"ronin:a": 10}) == ["0xhash"]
+    journal.close()
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [(e["event"], e.get("nonce")) for e in entries] == [("planned", 5), ("completed", None)]
+
+
+@patch("axie.payments.get_nonce", side_effect=lambda account: {"ronin:1": 6, "ronin:2": 5}[account])
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("axie.payments.send_scatter_chunks", side_effect=sent_scatter)
+@patch("axie.payments.chunk_scatter", side_effect=scatter_chunks)
+def test_payments_manager_resume_skips_unconfirmed_sent_payout(_, mocked_send, __, ___, tmpdir, caplog):
+    path = str(tmpdir.join("journal.jsonl"))
+    interrupted = RunJournal(path)
+    interrupted.plan(AxiePaymentsManager.journal_key("ronin:1"), name="Scholar 1", nonce=5)
+    interrupted.plan(AxiePaymentsManager.journal_key("ronin:2"), name="Scholar 2", nonce=5)
+    interrupted.close()
+    plan = {"type": "new", "accounts": [
+        {"name": "Scholar 1", "ronin": "ronin:1", "balance": 10, "total": 10,
+         "payments": [{"ronin": "ronin:a", "amount": 10, "type": "scholar"}]},
+        {"name": "Scholar 2", "ronin": "ronin:2", "balance": 10, "total": 10,
+         "payments": [{"ronin": "ronin:b", "amount": 10, "type": "scholar"}]}]}
+    axp = AxiePaymentsManager({}, {"ronin:1": "0xkey1", "ronin:2": "0xkey2"}, auto=True, journal=RunJournal(path))
+    axp.execute_plan(plan)
+    # Scholar 1 nonce moved since its payout was planned, the payout may be on chain already
+    assert [c[0][2] for c in mocked_send.call_args_list] == ["Scholar 2"]
+    assert ("Important: Skipping payout for account 'Scholar 1', the interrupted run sent it but did not confirm "
+            "it.") in caplog.text
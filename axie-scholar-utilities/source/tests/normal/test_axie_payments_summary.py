@@ -1,56 +1,69 @@
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from mock import patch, Mock
 
 from axie.payments import PaymentsSummary
+from axie.receipts import ReceiptTracker
+
+
+def test_summary_instances_are_independent():
+    s = PaymentsSummary()
+    other = PaymentsSummary()
+    s.increase_payout(1, "ronin:1", "manager")
+    assert s.manager == {"accounts": ["ronin:1"], "slp": 1}
+    assert other.manager == {"accounts": [], "slp": 0}
+    assert str(s) == "Paid 1 managers, 1 SLP.\n"
+    assert str(other) == "No payments made!"
 
 
-def test_summary_is_singleton():
+def test_summary_counts_confirmed_payouts():
+    receipts = ReceiptTracker()
     s = PaymentsSummary()
-    s_copy = PaymentsSummary()
-    s_copy.increase_payout(1, "ronin:1", "manager")
-    assert s == s_copy
-    assert s.manager == s_copy.manager
-    assert s.manager['slp'] == 1
-    assert str(s) == "Paid 1 managers, 1 SLP.\n---------------------- \nThis summary assumes all trasactions went fine, please do NOT trust it!\n"
+    s.expect("0xconfirmed", [(10, "ronin:1", "manager", "ronin:a"), (5, "ronin:2", "scholar", "ronin:a")])
+    s.expect("0xfailed", [(7, "ronin:1", "manager", "ronin:b")])
+    s.expect("0xpending", [(3, "ronin:3", "scholar", "ronin:c")])
+    with patch.object(receipts, "thread", Mock()):
+        for tx_hash in ["0xconfirmed", "0xfailed", "0xpending"]:
+            receipts.track("Scatter", tx_hash, tx_hash)
+    receipts.status.update({"0xconfirmed": "confirmed", "0xfailed": "failed"})
+    s.confirm(receipts)
+    assert s.manager == {"accounts": ["ronin:1"], "slp": 10}
+    assert s.scholar == {"accounts": ["ronin:2"], "slp": 5}
+    assert s.sources == {"ronin:a": {"manager": 10, "scholar": 5, "trainer": 0, "other": 0, "donation": 0}}
+    assert str(s) == ("Paid 1 managers, 10 SLP.\nPaid 1 scholars, 5 SLP.\n---------------------- \n"
+                      "Only counts the 1 confirmed scatters, 1 failed and 1 are still pending.\n")
 
 
 @pytest.mark.parametrize("payouts, expected_output", [
-    ([[10, "ronin:1", "manager"]], "Paid 1 managers, 10 SLP.\n"
-    "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+    ([[10, "ronin:1", "manager"]], "Paid 1 managers, 10 SLP.\n"),
     ([
         [10, "ronin:1", "manager"],
         [10, "ronin:1", "manager"]
-    ], "Paid 1 managers, 20 SLP.\n""---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+    ], "Paid 1 managers, 20 SLP.\n"),
     ([
         [10, "ronin:1", "manager"],
         [10, "ronin:2", "manager"]
-    ], "Paid 2 managers, 20 SLP.\n"
-    "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+    ], "Paid 2 managers, 20 SLP.\n"),
     ([
         [10, "ronin:1", "scholar"],
         [10, "ronin:2", "manager"]
-    ], "Paid 1 managers, 10 SLP.\nPaid 1 scholars, 10 SLP.\n"
-    "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+    ], "Paid 1 managers, 10 SLP.\nPaid 1 scholars, 10 SLP.\n"),
     ([
         [10, "ronin:1", "scholar"],
         [10, "ronin:2", "manager"],
         [10, "ronin:3", "donation"]
     ], "Paid 1 managers, 10 SLP.\nPaid 1 scholars, 10 SLP.\n"
-       "Donated to 1 organisations, 10 SLP.\n"
-       "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+       "Donated to 1 organisations, 10 SLP.\n"),
     ([
         [10, "ronin:1", "scholar"],
         [10, "ronin:2", "manager"],
         [10, "ronin:3", "donation"],
         [10, "ronin:3", "trainer"]
     ], "Paid 1 managers, 10 SLP.\nPaid 1 scholars, 10 SLP.\n"
-       "Paid 1 trainers, 10 SLP.\nDonated to 1 organisations, 10 SLP.\n"
-       "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n"),
+       "Paid 1 trainers, 10 SLP.\nDonated to 1 organisations, 10 SLP.\n"),
     ([
         [10, "ronin:1", "scholar"],
         [10, "ronin:2", "scholar"],
@@ -65,13 +78,65 @@ def test_summary_is_singleton():
         [10, "ronin:3", "trainer"],
         [10, "ronin:2", "trainer"]
     ], "Paid 2 managers, 30 SLP.\nPaid 4 scholars, 40 SLP.\n"
-       "Paid 2 trainers, 20 SLP.\nDonated to 1 organisations, 30 SLP.\n"
-       "---------------------- \n"
-       "This summary assumes all trasactions went fine, please do NOT trust it!\n")
+       "Paid 2 trainers, 20 SLP.\nDonated to 1 organisations, 30 SLP.\n")
 ])
 def test_summary_correct_output(payouts, expected_output):
-    PaymentsSummary().clear()
     s = PaymentsSummary()
     for p in payouts:
         s.increase_payout(p[0], p[1], p[2])
     assert str(s) == expected_output
+
+
+def test_summary_source_breakdown():
+    s = PaymentsSummary()
+    s.increase_payout(10, "ronin:1", "manager", source="ronin:a")
+    s.increase_payout(5, "ronin:2", "scholar", source="ronin:a")
+    s.increase_payout(7, "ronin:1", "manager", source="ronin:b")
+    s.increase_payout(3, "ronin:3", "donation")
+    s.increase_payout(3, "ronin:3", "unknown", source="ronin:b")
+    assert s.manager == {"accounts": ["ronin:1"], "slp": 17}
+    assert s.to_dict() == {
+        "totals": {"manager": 17, "scholar": 5, "trainer": 0, "other": 0, "donation": 3},
+        "receivers": {
+            "manager": {"ronin:1": 17},
+            "scholar": {"ronin:2": 5},
+            "trainer": {},
+            "other": {},
+            "donation": {"ronin:3": 3}
+        },
+        "sources": {
+            "ronin:a": {"manager": 10, "scholar": 5, "trainer": 0, "other": 0, "donation": 0},
+            "ronin:b": {"manager": 7, "scholar": 0, "trainer": 0, "other": 0, "donation": 0}
+        }
+    }
+
+
+def test_summary_export(tmpdir):
+    s = PaymentsSummary()
+    s.increase_payout(10, "ronin:1", "manager", source="ronin:a")
+    s.increase_payout(7, "ronin:1", "manager", source="ronin:a")
+    s.increase_payout(3, "ronin:3", "donation")
+    json_file = tmpdir.join("summary.json")
+    csv_file = tmpdir.join("summary.csv")
+    s.export_json(json_file)
+    s.export_csv(csv_file)
+    assert json.loads(json_file.read())["totals"]["manager"] == 17
+    with open(csv_file, encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [
+            ["type", "address", "source", "slp"],
+            ["manager", "ronin:1", "ronin:a", "17"],
+            ["donation", "ronin:3", "", "3"]]
+
+
+def test_summary_concurrent_payouts():
+    s = PaymentsSummary()
+
+    def pay(worker):
+        for i in range(1000):
+            s.increase_payout(1, f"ronin:{i % 50}", "scholar", source=f"ronin:{worker}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(pay, range(8)))
+    assert s.scholar["slp"] == 8000
+    assert len(s.scholar["accounts"]) == 50
+    assert all(b["scholar"] == 1000 for b in s.sources.values())
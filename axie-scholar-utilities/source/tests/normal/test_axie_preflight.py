@@ -0,0 +1,104 @@
+import requests_mock
+from mock import patch
+from axie_utils.utils import RONIN_PROVIDER
+
+from axie.preflight import (
+    BreedingPreflight,
+    GRAPHQL_URL,
+    breeding_axs_costs,
+    build_axies_query,
+    fetch_axie_details,
+    fetch_owners
+)
+
+
+ACC = "ronin:" + "a" * 40
+OTHER = "ronin:" + "b" * 40
+
+
+def test_build_axies_query():
+    query = build_axies_query([1, 22])
+    assert 'a1: axie(axieId: "1") { id breedCount sireId matronId stage }' in query["query"]
+    assert 'a22: axie(axieId: "22")' in query["query"]
+
+
+def test_fetch_axie_details_batches():
+    responses = [
+        {"json": {"data": {
+            "a1": {"id": "1", "breedCount": 2, "sireId": 10, "matronId": 11, "stage": 4},
+            "a2": None}}},
+        {"json": {"data": {"a3": {"id": "3", "breedCount": 7, "sireId": 0, "matronId": 0, "stage": 4}}}}
+    ]
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(GRAPHQL_URL, responses)
+        details = fetch_axie_details([1, 2, 3, 1], batch_size=2)
+        assert req_mocker.call_count == 2
+        assert "a1: axie" in req_mocker.request_history[0].json()["query"]
+    assert details == {
+        1: {"breed_count": 2, "parents": {10, 11}, "stage": 4},
+        3: {"breed_count": 7, "parents": set(), "stage": 4}
+    }
+
+
+def test_fetch_axie_details_failure(caplog):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(GRAPHQL_URL, text="not json")
+        assert fetch_axie_details([1]) == {}
+    assert "Could not fetch details of 1 axies" in caplog.text
+
+
+def test_fetch_owners():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, json=[
+            {"jsonrpc": "2.0", "id": 0, "result": "0x" + "0" * 24 + "A" * 40},
+            {"jsonrpc": "2.0", "id": 1, "error": {"message": "execution reverted"}}
+        ])
+        owners = fetch_owners([1, 255])
+        payload = req_mocker.request_history[0].json()
+    assert owners == {1: ACC}
+    assert payload[1]["params"][0]["data"] == "0x6352211e" + "0" * 62 + "ff"
+
+
+@patch("axie.preflight.fetch_owners")
+@patch("axie.preflight.fetch_axie_details")
+def test_breeding_preflight(mock_details, mock_owners, caplog):
+    mock_details.return_value = {
+        1: {"breed_count": 0, "parents": {100, 101}, "stage": 4},
+        2: {"breed_count": 3, "parents": {200, 201}, "stage": 4},
+        3: {"breed_count": 7, "parents": set(), "stage": 4},
+        4: {"breed_count": 0, "parents": {1, 300}, "stage": 4},
+        5: {"breed_count": 0, "parents": {100, 500}, "stage": 4},
+        6: {"breed_count": 0, "parents": set(), "stage": 1}
+    }
+    mock_owners.return_value = {1: ACC, 2: ACC, 3: ACC, 4: ACC, 5: ACC, 6: ACC, 7: OTHER}
+    breedings = [
+        {"Sire": 1, "Matron": 2, "AccountAddress": ACC},
+        {"Sire": 1, "Matron": 3, "AccountAddress": ACC},
+        {"Sire": 1, "Matron": 4, "AccountAddress": ACC},
+        {"Sire": 1, "Matron": 5, "AccountAddress": ACC},
+        {"Sire": 6, "Matron": 2, "AccountAddress": ACC},
+        {"Sire": 7, "Matron": 2, "AccountAddress": ACC},
+        {"Sire": 2, "Matron": 2, "AccountAddress": ACC},
+        # Axies without details are only checked for ownership
+        {"Sire": 8, "Matron": 9, "AccountAddress": ACC.replace("ronin:", "0x")}
+    ]
+    valid = BreedingPreflight(breedings).load().valid_breedings()
+    assert valid == [breedings[0], breedings[7]]
+    mock_details.assert_called_once()
+    mock_owners.assert_called_once()
+    assert "Breeding of 1 with 3 rejected: axie 3 reached the max breed count" in caplog.text
+    assert "Breeding of 1 with 4 rejected: one axie is a parent of the other" in caplog.text
+    assert "Breeding of 1 with 5 rejected: axies are siblings" in caplog.text
+    assert "Breeding of 6 with 2 rejected: axie 6 is not an adult" in caplog.text
+    assert f"Breeding of 7 with 2 rejected: axie 7 is not owned by {ACC}" in caplog.text
+    assert "Breeding of 2 with 2 rejected: axie 2 cannot breed with itself" in caplog.text
+    assert "Important: 6 out of 8 breedings rejected before sending them" in caplog.text
+
+
+def test_breeding_axs_costs():
+    breedings = [
+        {"Sire": 1, "Matron": 2, "AccountAddress": ACC},
+        {"Sire": 3, "Matron": 4, "AccountAddress": ACC.replace("ronin:", "0x")},
+        {"Sire": 5, "Matron": 6, "AccountAddress": OTHER}
+    ]
+    assert breeding_axs_costs(breedings) == {ACC: 1.0, OTHER: 0.5}
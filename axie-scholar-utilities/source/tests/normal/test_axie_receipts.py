@@ -0,0 +1,84 @@
+import json
+
+import requests_mock
+from requests.exceptions import ConnectionError
+
+from axie.receipts import ReceiptTracker, fetch_receipts
+from axie_utils.utils import RONIN_PROVIDER
+
+
+def rpc_stand_in(receipts):
+    """ Local JSON-RPC stand-in answering batched receipt requests """
+    def callback(request, context):
+        responses = []
+        for req in request.json():
+            tx_hash = req['params'][0]
+            if tx_hash in receipts:
+                responses.append({"jsonrpc": "2.0", "id": req['id'], "result": receipts[tx_hash]})
+            else:
+                responses.append({"jsonrpc": "2.0", "id": req['id'], "error": {"code": -32000, "message": "boom"}})
+        return json.dumps(responses)
+    return callback
+
+
+def test_fetch_receipts_batches():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=rpc_stand_in({
+            "0x1": {"status": "0x1"}, "0x2": None, "0x3": {"status": "0x0"}}))
+        receipts = fetch_receipts(["0x1", "0x2", "0x3", "0x4"], batch_size=3)
+        assert [len(r.json()) for r in req_mocker.request_history] == [3, 1]
+        assert req_mocker.request_history[0].json()[0]["method"] == "eth_getTransactionReceipt"
+    assert receipts == {"0x1": {"status": "0x1"}, "0x2": None, "0x3": {"status": "0x0"}}
+
+
+def test_fetch_receipts_connection_error(caplog):
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, exc=ConnectionError("no route"))
+        receipts = fetch_receipts(["0x1"])
+    assert receipts == {}
+    assert "Could not fetch receipts for 1 transactions. Error: no route" in caplog.text
+
+
+def test_tracker_summary():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=rpc_stand_in({
+            "0xa": {"status": "0x1"}, "0xb": {"status": "0x0"}, "0xc": None}))
+        tracker = ReceiptTracker(poll_interval=0.01)
+        tracker.track("Scatter", "Scholar 1", "0xa")
+        tracker.track("Transfer", "Axie 1", "0xb")
+        tracker.track("Transfer", "Axie 2", "0xc")
+        tracker.track("Breed", "1 with 2", None)
+        summary = tracker.wait(timeout=0.2)
+    assert summary == {
+        "Scatter": {"confirmed": 1, "failed": 0, "pending": 0},
+        "Transfer": {"confirmed": 0, "failed": 1, "pending": 1},
+        "Breed": {"confirmed": 0, "failed": 1, "pending": 0}
+    }
+    assert tracker.thread is None
+    assert str(tracker) == (
+        "Scatter: 1 confirmed, 0 failed, 0 pending.\n"
+        "Transfer: 0 confirmed, 1 failed, 1 pending.\n"
+        "Breed: 0 confirmed, 1 failed, 0 pending.\n"
+        "Transfer Axie 1 failed (0xb).\n"
+        "Transfer Axie 2 pending (0xc).\n"
+        "Breed 1 with 2 failed.\n")
+
+
+def test_tracker_polls_pending_in_one_batch():
+    with requests_mock.Mocker() as req_mocker:
+        req_mocker.post(RONIN_PROVIDER, text=rpc_stand_in({f"0x{i}": {"status": "0x1"} for i in range(10)}))
+        tracker = ReceiptTracker(poll_interval=60)
+        tracker.stop_event.set()
+        for i in range(10):
+            tracker.track("Payment", f"Payment {i}", f"0x{i}")
+        tracker.poll()
+        assert req_mocker.call_count == 1
+        assert len(req_mocker.request_history[0].json()) == 10
+        assert tracker.pending() == []
+        tracker.wait()
+
+
+def test_tracker_without_transactions():
+    tracker = ReceiptTracker()
+    assert tracker.wait() == {}
+    assert str(tracker) == "No transactions sent!"
@@ -0,0 +1,97 @@
+import asyncio
+
+from mock import patch
+
+from axie.scheduler import ClaimScheduler, TokenBucket
+
+
+class FakeClaim:
+    running = 0
+    max_running = 0
+    built = 0
+
+    def __init__(self, account):
+        self.account = account
+        FakeClaim.built += 1
+
+    async def async_execute(self):
+        FakeClaim.running += 1
+        FakeClaim.max_running = max(FakeClaim.max_running, FakeClaim.running)
+        await asyncio.sleep(0.01)
+        FakeClaim.running -= 1
+        if self.account == "ronin:boom":
+            raise ValueError("boom")
+        if self.account != "ronin:unconfirmed":
+            return f"0xhash_{self.account}"
+
+
+def reset_fake_claims():
+    FakeClaim.running = FakeClaim.max_running = FakeClaim.built = 0
+
+
+def test_scheduler_bounds_concurrency():
+    reset_fake_claims()
+    built_when_started = []
+
+    def accounts():
+        for i in range(20):
+            built_when_started.append(FakeClaim.built)
+            yield f"ronin:{i}"
+
+    completed = []
+    scheduler = ClaimScheduler(concurrency=3, rate=None)
+    results = scheduler.run(accounts(), FakeClaim, lambda account, tx_hash: completed.append(account) or True)
+    assert FakeClaim.max_running == 3
+    # Claims are built lazily, never more than the concurrency ahead of the accounts consumed
+    assert all(built <= i for i, built in enumerate(built_when_started))
+    assert sorted(completed) == sorted(f"ronin:{i}" for i in range(20))
+    assert [r.outcome for r in results] == ["completed"] * 20
+    assert all(r.latency >= 0.01 for r in results)
+
+
+def test_scheduler_failed_claim_does_not_stop_others(caplog):
+    reset_fake_claims()
+    completed = []
+    scheduler = ClaimScheduler(concurrency=2, rate=None)
+    scheduler.run(["ronin:1", "ronin:boom", "ronin:2"], FakeClaim,
+                  lambda account, tx_hash: completed.append(account) or True)
+    assert sorted(completed) == ["ronin:1", "ronin:2"]
+    assert scheduler.summary() == {"completed": 2, "failed": 1}
+    assert "Important: Claim for account ronin:boom failed with error: boom" in caplog.text
+    assert "Claims: 2 completed, 1 failed.\n" in str(scheduler)
+    assert str(scheduler).endswith("Claim for account ronin:boom failed.\n")
+
+
+def test_scheduler_outcome_from_complete_callback():
+    reset_fake_claims()
+    scheduler = ClaimScheduler(concurrency=2, rate=None)
+    results = scheduler.run(["ronin:1", "ronin:2"], FakeClaim, lambda account, tx_hash: account == "ronin:1")
+    assert sorted((r.account, r.outcome) for r in results) == [("ronin:1", "completed"), ("ronin:2", "failed")]
+    # Without a callback, claims that did not return a result are not completed either
+    scheduler = ClaimScheduler(concurrency=2, rate=None)
+    scheduler.run(["ronin:1", "ronin:unconfirmed"], FakeClaim)
+    assert scheduler.summary() == {"completed": 1, "failed": 1}
+    assert str(scheduler).endswith("Claim for account ronin:unconfirmed failed.\n")
+
+
+def test_scheduler_without_claims():
+    scheduler = ClaimScheduler()
+    assert scheduler.run([], FakeClaim) == []
+    assert str(scheduler) == "No claims executed!"
+
+
+def test_token_bucket_limits_rate():
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        bucket.updated -= seconds
+
+    bucket = TokenBucket(rate=2, capacity=2)
+    with patch("axie.scheduler.asyncio.sleep", fake_sleep):
+        loop = asyncio.get_event_loop()
+        for _ in range(4):
+            loop.run_until_complete(bucket.acquire())
+    # The first two requests use the burst, the next ones wait half a second each
+    assert len(sleeps) == 2
+    assert all(abs(s - 0.5) < 0.01 for s in sleeps)
@@ -0,0 +1,103 @@
+import random
+from fractions import Fraction
+from math import floor
+
+import pytest
+
+from axie.splits import SplitsCalculator, persona_type, CREATOR_FEE_ADDRESS
+
+
+PERSONAS = ['Manager', 'scholar', 'Trainer', 'investor/trainer', 'cousin', 'Scholar']
+
+
+def reference_payout(scholars, donations, balances):
+    """ Per scholar loop, as payouts were computed before SplitsCalculator, with exact percentages """
+    def exact(percentage):
+        return Fraction(str(percentage))
+
+    deductable_fees = 1
+    for dono in donations:
+        deductable_fees += exact(dono['percentage'])
+    results = []
+    for acc, acc_balance in zip(scholars, balances):
+        total_payments = 0
+        acc_payments = []
+        for sacc in acc['splits']:
+            if sacc['persona'].lower() == 'manager':
+                amount = floor(acc_balance * ((exact(sacc['percentage']) - deductable_fees)/100))
+            else:
+                amount = floor(acc_balance * (exact(sacc['percentage'])/100))
+            if amount < 1:
+                continue
+            total_payments += amount
+            acc_payments.append({"ronin": sacc['ronin'], "amount": amount, "type": persona_type(sacc['persona'])})
+        for dono in donations:
+            dono_amount = floor(acc_balance * (exact(dono["percentage"])/100))
+            if dono_amount > 0:
+                acc_payments.append({"ronin": dono['ronin'], "amount": dono_amount, "type": "donation"})
+                total_payments += dono_amount
+        fee_amount = floor(acc_balance * Fraction(1, 100))
+        if fee_amount > 0:
+            acc_payments.append({"ronin": CREATOR_FEE_ADDRESS, "amount": fee_amount, "type": "donation"})
+            total_payments += fee_amount
+        results.append((acc_payments, total_payments))
+    return results
+
+
+def random_roster(seed, size=200):
+    rand = random.Random(seed)
+    scholars = []
+    for i in range(size):
+        splits = [{"persona": "Manager", "ronin": f"ronin:{i:040x}", "percentage": rand.choice([40, 44, 50, 55.5])}]
+        for j in range(rand.randint(0, 4)):
+            splits.append({
+                "persona": rand.choice(PERSONAS),
+                "ronin": f"ronin:{(i * 10 + j):040x}",
+                "percentage": rand.choice([0.5, 1, 5, 10.5, 12, 33])})
+        scholars.append({"name": f"Scholar {i}", "ronin": f"ronin:{i + 1000:040x}", "splits": splits})
+    donations = [
+        {"ronin": "ronin:" + "d" * 40, "percentage": 1},
+        {"ronin": "ronin:" + "e" * 40, "percentage": 0.5}]
+    balances = [rand.choice([0, 1, 7, 99, 100, 101, 1234, 56789, rand.randint(0, 10**6)]) for _ in scholars]
+    return scholars, donations, balances
+
+
+def test_persona_type():
+    assert [persona_type(p) for p in PERSONAS] == ['manager', 'scholar', 'trainer', 'trainer', 'other', 'scholar']
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_calculate_matches_reference(seed):
+    scholars, donations, balances = random_roster(seed)
+    result = SplitsCalculator(scholars, donations).calculate(balances)
+    assert result == reference_payout(scholars, donations, balances)
+    assert all(isinstance(p["amount"], int) for payments, _ in result for p in payments)
+
+
+def test_calculate_no_donations_skips_small_payments(caplog):
+    scholars = [{
+        "name": "Scholar 1",
+        "ronin": "ronin:<account_s1_address>" + "".join([str(x) for x in range(10)]),
+        "splits": [
+            {"persona": "Manager", "ronin": "ronin:<manager_address>", "percentage": 90},
+            {"persona": "Scholar", "ronin": "ronin:<scholar_address>", "percentage": 9.5},
+            {"persona": "Other", "ronin": "ronin:<other_address>", "percentage": 0.5}]}]
+    result = SplitsCalculator(scholars).calculate([100])
+    assert result == [([
+        {"ronin": "ronin:<manager_address>", "amount": 89, "type": "manager"},
+        {"ronin": "ronin:<scholar_address>", "amount": 9, "type": "scholar"},
+        {"ronin": CREATOR_FEE_ADDRESS, "amount": 1, "type": "donation"}], 99)]
+    assert "Important: Skipping payment to Other as it would be less than 1SLP" in caplog.text
+
+
+def test_calculate_exact_amounts():
+    # In floats 100 * 0.57 is 56.99999999999999 and 1000 * 0.29 is 289.99999999999994
+    splits = [
+        {"persona": "Manager", "ronin": "ronin:<manager_address>", "percentage": 30},
+        {"persona": "Scholar", "ronin": "ronin:<scholar_address>", "percentage": 57},
+        {"persona": "Trainer", "ronin": "ronin:<trainer_address>", "percentage": 29},
+        {"persona": "Other", "ronin": "ronin:<other_address>", "percentage": 0.7}]
+    scholars = [{"name": f"Scholar {i}", "ronin": f"ronin:{i:040x}", "splits": splits} for i in range(2)]
+    result = SplitsCalculator(scholars).calculate([100, 1000])
+    assert [[p["amount"] for p in payments] for payments, _ in result] == [
+        [29, 57, 29, 1], [290, 570, 290, 7, 10]]
@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import base64
+
+from mock import patch
+
+from axie.tokens import TokenCache, CachedJWTMixin, jwt_expiry, TOKEN_EXPIRY_MARGIN, DEFAULT_TOKEN_TTL, TOKEN_CACHE_FILE
+
+
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class FakeGraphQL:
+    def __init__(self, account):
+        self.account = account
+        self.handshakes = 0
+
+    def get_jwt(self):
+        self.handshakes += 1
+        return make_jwt(int(time.time()) + 3600)
+
+
+class CachedFakeGraphQL(CachedJWTMixin, FakeGraphQL):
+    pass
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(make_jwt(1650000000)) == 1650000000
+    assert jwt_expiry("not a jwt") is None
+    assert jwt_expiry(None) is None
+
+
+def test_token_cache_persists_valid_tokens(tmpdir):
+    path = str(tmpdir.join("logs", "token_cache.json"))
+    valid = make_jwt(int(time.time()) + 3600)
+    cache = TokenCache(path)
+    cache.set("0x1", valid)
+    cache.set("0x2", make_jwt(int(time.time()) + TOKEN_EXPIRY_MARGIN - 1))
+    cache.save()
+    assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+    cache = TokenCache(path)
+    assert cache.get("0x1") == valid
+    # Tokens about to expire are evicted
+    assert cache.get("0x2") is None
+    assert "0x2" not in cache.tokens
+
+
+def test_token_cache_without_expiry_uses_default_ttl(tmpdir):
+    cache = TokenCache(str(tmpdir.join("token_cache.json")))
+    with patch("axie.tokens.time.time", return_value=1000):
+        cache.set("0x1", "opaque")
+    assert cache.tokens["0x1"]["expires"] == 1000 + DEFAULT_TOKEN_TTL
+
+
+def test_token_cache_encrypted(tmpdir, caplog):
+    path = str(tmpdir.join("token_cache.json"))
+    valid = make_jwt(int(time.time()) + 3600)
+    cache = TokenCache(path, passphrase="secret")
+    cache.set("0x1", valid)
+    cache.save()
+    with open(path) as f:
+        assert valid not in f.read()
+    assert TokenCache(path, passphrase="secret").get("0x1") == valid
+    assert TokenCache(path, passphrase="wrong").get("0x1") is None
+    assert f"Could not read token cache {path}, starting a new one" in caplog.text
+    assert TokenCache(path).get("0x1") is None
+    assert f"Token cache {path} is encrypted, set AXIE_TOKEN_CACHE_KEY to use it" in caplog.text
+
+
+def test_token_cache_warns_unencrypted(tmpdir, caplog):
+    path = str(tmpdir.join("cache", "token_cache.json"))
+    cache = TokenCache(path)
+    cache.set("0x1", make_jwt(int(time.time()) + 3600))
+    cache.save()
+    assert f"Saving access tokens unencrypted in {path}, set AXIE_TOKEN_CACHE_KEY to encrypt them" in caplog.text
+    assert oct(os.stat(str(tmpdir.join("cache"))).st_mode & 0o777) == "0o700"
+    caplog.clear()
+    cache = TokenCache(path, passphrase="secret")
+    cache.set("0x1", make_jwt(int(time.time()) + 3600))
+    cache.save()
+    assert "unencrypted" not in caplog.text
+
+
+def test_token_cache_default_path_outside_logs():
+    assert TOKEN_CACHE_FILE.startswith(os.path.expanduser("~"))
+    assert "logs" not in TOKEN_CACHE_FILE.split(os.sep)
+
+
+def test_cached_jwt_mixin_reuses_tokens(tmpdir):
+    cache = TokenCache(str(tmpdir.join("token_cache.json")))
+    first = CachedFakeGraphQL(account="0x1", token_cache=cache)
+    jwt = first.get_jwt()
+    second = CachedFakeGraphQL(account="0x1", token_cache=cache)
+    assert second.get_jwt() == jwt
+    assert (first.handshakes, second.handshakes) == (1, 0)
+    uncached = CachedFakeGraphQL(account="0x1")
+    uncached.get_jwt()
+    assert uncached.handshakes == 1
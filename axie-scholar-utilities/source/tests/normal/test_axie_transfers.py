@@ -1,6 +1,20 @@
-from mock import patch, call
+import os
+import sys
+import json
+
+import pytest
+from mock import patch, call, MagicMock
+from web3 import Web3
 
 from axie import AxieTransferManager
+from axie.bulk_transfers import (BulkTransfer, chunk_transfers, max_axies_per_transfer, bulk_transfer_gas,
+                                 send_bulk_transfers, group_by_account, function_selectors, implements_abi,
+                                 check_batch_contract, confirm_approval, BATCH_TRANSFER_ABI)
+from axie.journal import RunJournal
+from axie.transfers import AxieTransfer, PlannedTransfer, chunk_accounts
+
+# Batch transfer contract given to --bulk
+BATCH_CONTRACT = "0x" + "9" * 40
 
 
 @patch("axie.transfers.load_json")
@@ -16,10 +30,11 @@ def test_transfer_manager_init(mocked_load_json):
     assert atm.secure is True
 
 
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
 @patch("axie.transfers.Axies.check_axie_owner", return_value=True)
 @patch("axie.transfers.load_json")
 @patch("axie.transfers.AxieTransferManager.execute_transfers")
-def test_transfer_manager_prepare_transfers(mocked_execute_transfers, mocked_load_json, mock_axies):
+def test_transfer_manager_prepare_transfers(mocked_execute_transfers, mocked_load_json, mock_axies, _inventory):
     transfers_file = "sample_transfers_file.json"
     secrets_file = "sample_secrets_file.json"
     atm = AxieTransferManager(transfers_file, secrets_file)
@@ -54,10 +69,12 @@ def test_transfer_manager_prepare_transfers(mocked_execute_transfers, mocked_loa
     assert transactions_list[2].axie_id == 234
 
 
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
 @patch("axie.transfers.Axies.check_axie_owner", side_effect=[True, False, False])
 @patch("axie.transfers.load_json")
 @patch("axie.transfers.AxieTransferManager.execute_transfers")
-def test_transfer_manager_prepare_transfers_only_available(mocked_execute_transfers, mocked_load_json, mock_axies):
+def test_transfer_manager_prepare_transfers_only_available(mocked_execute_transfers, mocked_load_json, mock_axies,
+                                                           _inventory):
     transfers_file = "sample_transfers_file.json"
     secrets_file = "sample_secrets_file.json"
     atm = AxieTransferManager(transfers_file, secrets_file)
@@ -82,10 +99,12 @@ def test_transfer_manager_prepare_transfers_only_available(mocked_execute_transf
     assert transactions_list[0].axie_id == 123
 
 
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
 @patch("axie.transfers.Axies.check_axie_owner", return_value=True)
 @patch("axie.transfers.load_json")
 @patch("axie.transfers.AxieTransferManager.execute_transfers")
-def test_transfer_manager_prepare_transfers_secure(mocked_execute_transfers, mocked_load_json, mock_axies):
+def test_transfer_manager_prepare_transfers_secure(mocked_execute_transfers, mocked_load_json, mock_axies,
+                                                   _inventory):
     transfers_file = "sample_transfers_file.json"
     secrets_file = "sample_secrets_file.json"
     atm = AxieTransferManager(transfers_file, secrets_file, True)
@@ -107,3 +126,241 @@ def test_transfer_manager_prepare_transfers_secure(mocked_execute_transfers, moc
     assert transactions_list[0].from_private == "0xsecret1"
     assert transactions_list[0].to_acc == "0x3"
     assert transactions_list[0].axie_id == 234
+
+
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("axie.transfers.Axies.check_axie_owner", return_value=True)
+@patch("axie.transfers.AxieTransferManager.execute_transfers")
+def test_transfer_manager_stream(mocked_execute_transfers, _, _inventory, tmpdir):
+    transfers = [{"AccountAddress": f"ronin:{i}", "Transfers": [{"AxieId": i, "ReceiverAddress": "ronin:2"}]}
+                 for i in range(50)]
+    transfers_file = tmpdir.join("transfers.json")
+    transfers_file.write(json.dumps(transfers))
+    secrets_file = tmpdir.join("secrets.json")
+    secrets_file.write(json.dumps({f"ronin:{i}": "0x" + "a" * 64 for i in range(50)}))
+    atm = AxieTransferManager(str(transfers_file), str(secrets_file), stream=True)
+    atm.verify_inputs()
+    atm.prepare_transfers()
+    transactions_list = mocked_execute_transfers.call_args_list[0][0][0]
+    assert [t.axie_id for t in transactions_list] == list(range(50))
+
+
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("axie.transfers.Axies.check_axie_owner", return_value=True)
+@patch("axie.transfers.AxieTransferManager.execute_transfers")
+def test_transfer_manager_sends_per_chunk(mocked_execute_transfers, _, _inventory, tmpdir):
+    transfers = [{"AccountAddress": f"ronin:{i}", "Transfers": [{"AxieId": i, "ReceiverAddress": "ronin:2"}]}
+                 for i in range(3)]
+    transfers_file = tmpdir.join("transfers.json")
+    transfers_file.write(json.dumps(transfers))
+    secrets_file = tmpdir.join("secrets.json")
+    secrets_file.write(json.dumps({f"ronin:{i}": "0x" + "a" * 64 for i in range(3)}))
+    atm = AxieTransferManager(str(transfers_file), str(secrets_file), stream=True)
+    with patch("axie.transfers.chunk_accounts", side_effect=lambda records: chunk_accounts(records, 2)):
+        atm.prepare_transfers()
+    assert [[t.axie_id for t in c[0][0]] for c in mocked_execute_transfers.call_args_list] == [[0, 1], [2]]
+
+
+def test_chunk_accounts():
+    records = [{"Transfers": [1, 2]}, {"Transfers": [3]}, {"Transfers": [4, 5, 6]}, {"Transfers": [7]}]
+    # Accounts are never split between chunks
+    assert list(chunk_accounts(records, 3)) == [records[:2], records[2:3], records[3:]]
+    assert list(chunk_accounts([], 3)) == []
+
+
+def test_transfer_manager_stream_invalid_record(tmpdir, caplog):
+    transfers_file = tmpdir.join("transfers.json")
+    transfers_file.write(json.dumps([{"AccountAddress": "ronin:1", "Transfers": [{"AxieId": "foo"}]}]))
+    secrets_file = tmpdir.join("secrets.json")
+    secrets_file.write(json.dumps({"ronin:1": "0x" + "a" * 64}))
+    atm = AxieTransferManager(str(transfers_file), str(secrets_file), stream=True)
+    with patch.object(sys, "exit") as mocked_sys:
+        atm.verify_inputs()
+    mocked_sys.assert_called_once()
+    assert ("Transfers file failed validation. Please review it. Error given: 'ReceiverAddress' is a required "
+            "property. For attribute in: [0, 'Transfers', 0]") in caplog.text
+
+
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("axie.transfers.Axies.check_axie_owner", return_value=True)
+@patch("axie.transfers.load_json")
+@patch("axie.transfers.AxieTransferManager.execute_transfers")
+@patch("axie.transfers.AxieTransferManager.execute_bulk_transfers")
+@patch("axie.transfers.check_batch_contract", return_value=True)
+def test_transfer_manager_prepare_transfers_bulk(mocked_check, mocked_execute_bulk, mocked_execute_transfers, _, _owner,
+                                                 _inventory):
+    atm = AxieTransferManager("sample_transfers_file.json", "sample_secrets_file.json", bulk_contract=BATCH_CONTRACT)
+    atm.transfers_file = [{"AccountAddress": "ronin:1", "Transfers": [
+        {"AxieId": 123, "ReceiverAddress": "ronin:2"},
+        {"AxieId": 234, "ReceiverAddress": "ronin:3"}
+    ]}]
+    atm.secrets_file = {"ronin:1": "0xsecret1"}
+    atm.prepare_transfers()
+    mocked_check.assert_called_once_with(BATCH_CONTRACT)
+    mocked_execute_transfers.assert_not_called()
+    transactions_list = mocked_execute_bulk.call_args_list[0][0][0]
+    assert [t.axie_id for t in transactions_list] == [123, 234]
+
+
+@patch("axie.transfers.load_json")
+@patch("axie.transfers.AxieTransferManager.plan_transfers")
+@patch("axie.transfers.check_batch_contract", return_value=False)
+def test_transfer_manager_prepare_transfers_bulk_wrong_contract(_, mocked_plan, __):
+    atm = AxieTransferManager("sample_transfers_file.json", "sample_secrets_file.json", bulk_contract=BATCH_CONTRACT)
+    atm.transfers_file = [{"AccountAddress": "ronin:1", "Transfers": [{"AxieId": 123, "ReceiverAddress": "ronin:2"}]}]
+    atm.prepare_transfers()
+    mocked_plan.assert_not_called()
+
+
+def test_group_by_account_normalizes_addresses():
+    transfers = [MagicMock(from_acc="ronin:ABC"), MagicMock(from_acc="0xabc"), MagicMock(from_acc="0xdef")]
+    # The same account written differently shares its nonce sequence
+    assert group_by_account(transfers) == {"0xabc": transfers[:2], "0xdef": transfers[2:]}
+
+
+@patch("axie.transactions.get_nonce", side_effect=[5, 9])
+@patch("axie.transfers.load_json")
+def test_transfer_manager_execute_transfers(_, mocked_nonce, tmpdir):
+    atm = AxieTransferManager("sample_transfers_file.json", "sample_secrets_file.json",
+                              journal=RunJournal(str(tmpdir.join("journal.jsonl"))))
+    atm.receipts = MagicMock()
+    atm.receipts.outcome.side_effect = lambda tx_hash: "pending" if tx_hash == "0xhash_1_6" else "confirmed"
+    transfers = [PlannedTransfer(from_acc="0x1", from_private="0x" + "a" * 64, to_acc="0x2", axie_id=i)
+                 for i in range(3)]
+    transfers.append(PlannedTransfer(from_acc="0x3", from_private="0x" + "b" * 64, to_acc="0x2", axie_id=100))
+
+    def fake_execute(transfer, nonce):
+        # The second transfer of the first account could not be sent, its nonce is used by the next one
+        if transfer.axie_id == 1:
+            return None
+        return f"0xhash_{transfer.from_acc[2:]}_{nonce}"
+
+    with patch.object(AxieTransfer, "execute", autospec=True, side_effect=fake_execute) as mocked_execute:
+        atm.execute_transfers(transfers)
+    # The nonce of each account is asked once, its transfers are sent without waiting for each other
+    mocked_nonce.assert_has_calls([call("0x1"), call("0x3")])
+    assert [(t.axie_id, nonce) for (t, nonce), _ in mocked_execute.call_args_list] == [(0, 5), (1, 6), (2, 6), (100, 9)]
+    atm.receipts.track.assert_has_calls([
+        call("Transfer", "Axie Transfer of axie (0) from account (ronin:1) to account (ronin:2)", "0xhash_1_5"),
+        call("Transfer", "Axie Transfer of axie (1) from account (ronin:1) to account (ronin:2)", None),
+    ])
+    atm.receipts.wait.assert_called_once()
+    # Only the confirmed transfers are completed in the journal
+    assert atm.journal.is_completed("transfer:ronin:1:0")
+    assert not atm.journal.is_completed("transfer:ronin:1:1")
+    assert not atm.journal.is_completed("transfer:ronin:1:2")
+    assert atm.journal.is_completed("transfer:ronin:3:100")
+
+
+def test_chunk_transfers():
+    assert max_axies_per_transfer() == 36
+    chunks = chunk_transfers(list(range(80)))
+    assert [len(c) for c in chunks] == [36, 36, 8]
+    assert chunk_transfers(list(range(3)), gas_limit=bulk_transfer_gas(2)) == [[0, 1], [2]]
+    # A gas limit too small for a single axie still sends them one by one
+    assert chunk_transfers([1, 2], gas_limit=1) == [[1], [2]]
+
+
+@patch("axie.bulk_transfers.get_nonce", return_value=5)
+@patch("axie.transfers.load_json")
+def test_transfer_manager_execute_bulk_transfers(_, mocked_nonce, tmpdir):
+    atm = AxieTransferManager("sample_transfers_file.json", "sample_secrets_file.json",
+                              journal=RunJournal(str(tmpdir.join("journal.jsonl"))), bulk_contract=BATCH_CONTRACT,
+                              approve=True)
+    atm.receipts = MagicMock()
+    atm.receipts.outcome.side_effect = lambda tx_hash: "failed" if tx_hash == "0xhash_6" else "confirmed"
+    transfers = [PlannedTransfer(from_acc="0x1", from_private="0x" + "a" * 64, to_acc="0x2", axie_id=i)
+                 for i in range(40)]
+    transfers.append(PlannedTransfer(from_acc="0x3", from_private="0x" + "b" * 64, to_acc="0x2", axie_id=100))
+    sent = []
+
+    def fake_send(transaction, description):
+        sent.append((transaction, description))
+        return f"0xhash_{transaction[1]}"
+
+    with patch.object(BulkTransfer, "is_approved", side_effect=[False, True]), \
+            patch.object(BulkTransfer, "build_approval", lambda self, nonce: ("approval", nonce)), \
+            patch.object(BulkTransfer, "build_transfer", lambda self, nonce: (len(self.axie_ids), nonce)), \
+            patch.object(BulkTransfer, "send", side_effect=fake_send):
+        atm.execute_bulk_transfers(transfers)
+    mocked_nonce.assert_has_calls([call("0x1"), call("0x3")])
+    # The first account approves the contract and pipelines its two chunks after it
+    assert [tx for tx, _ in sent] == [("approval", 5), (36, 6), (4, 7), (1, 5)]
+    assert sent[1][1] == "Bulk Transfer of 36 axies from account (ronin:1)"
+    atm.receipts.track.assert_has_calls([
+        call("Approval", "of batch transfers for account (ronin:1)", "0xhash_5"),
+        call("Bulk Transfer", "Bulk Transfer of 36 axies from account (ronin:1)", "0xhash_6"),
+        call("Bulk Transfer", "Bulk Transfer of 4 axies from account (ronin:1)", "0xhash_7"),
+        call("Bulk Transfer", "Bulk Transfer of 1 axies from account (ronin:3)", "0xhash_5")
+    ])
+    atm.receipts.wait.assert_called_once()
+    # Only the axies of confirmed bulk transfers are completed in the journal
+    assert not atm.journal.is_completed("transfer:ronin:1:0")
+    assert atm.journal.is_completed("transfer:ronin:1:36")
+    assert atm.journal.is_completed("transfer:ronin:3:100")
+
+
+@patch("axie.bulk_transfers.get_nonce", return_value=5)
+def test_send_bulk_transfers_requires_approval_opt_in(mocked_nonce, caplog):
+    bulk = BulkTransfer("ronin:" + "1" * 40, "0x" + "a" * 64, [(123, "ronin:" + "2" * 40)], BATCH_CONTRACT)
+    receipts = MagicMock()
+    with patch.object(BulkTransfer, "is_approved", return_value=False), \
+            patch.object(BulkTransfer, "send") as mocked_send:
+        assert send_bulk_transfers([bulk], receipts) == []
+    mocked_send.assert_not_called()
+    mocked_nonce.assert_not_called()
+    assert (f"Important: Account (ronin:{'1' * 40}) has not approved the batch transfer contract "
+            f"({BATCH_CONTRACT}), skipping its bulk transfers. Re-run with --approve-bulk") in caplog.text
+    with patch.object(BulkTransfer, "is_approved", return_value=False), \
+            patch.object(BulkTransfer, "build_approval", lambda self, nonce: ("approval", nonce)), \
+            patch.object(BulkTransfer, "build_transfer", lambda self, nonce: ("transfer", nonce)), \
+            patch.object(BulkTransfer, "send", side_effect=["0xapproval", "0xtransfer"]):
+        assert send_bulk_transfers([bulk], receipts, approve=True) == [(bulk, "0xtransfer")]
+    assert (f"Important: Approving the batch transfer contract ({BATCH_CONTRACT}) to move all the axies "
+            f"of account (ronin:{'1' * 40}). The approval stays after this run.") in caplog.text
+
+
+def test_bulk_transfer_gas():
+    bulk = BulkTransfer("ronin:" + "1" * 40, "0x" + "a" * 64, [(123, "ronin:" + "2" * 40), (234, "ronin:" + "2" * 40)],
+                        BATCH_CONTRACT)
+    with patch.object(BulkTransfer, "transfer_function") as mocked_function:
+        mocked_function.return_value.estimateGas.return_value = 100000
+        assert bulk.transaction_gas() == 125000
+        # The transfer can not be estimated before the approval sent with it is mined
+        mocked_function.return_value.estimateGas.side_effect = ValueError("execution reverted")
+        assert bulk.transaction_gas() == bulk_transfer_gas(2) == 260000
+
+
+def test_implements_abi():
+    # safeBatchTransfer(address,uint256[],address[])
+    assert function_selectors(BATCH_TRANSFER_ABI) == [bytes.fromhex("d56ad454")]
+    dispatcher = bytes.fromhex("6000356001") + b"\x63" + bytes.fromhex("d56ad454") + bytes.fromhex("14")
+    assert implements_abi(dispatcher, BATCH_TRANSFER_ABI)
+    # The selector as plain data is not a dispatched function
+    assert not implements_abi(bytes.fromhex("6000d56ad454"), BATCH_TRANSFER_ABI)
+    # Accounts without code are not contracts
+    assert not implements_abi(b"", BATCH_TRANSFER_ABI)
+
+
+@pytest.mark.parametrize("code, expected", [
+    (b"\x63" + bytes.fromhex("d56ad454"), True),
+    (b"", False)
+])
+def test_check_batch_contract(code, expected, caplog):
+    with patch("web3.eth.Eth.get_code", return_value=code) as mocked_code:
+        assert check_batch_contract(BATCH_CONTRACT) is expected
+    mocked_code.assert_called_once_with(Web3.toChecksumAddress(BATCH_CONTRACT))
+    assert (f"Contract ({BATCH_CONTRACT}) is not a batch transfer contract" in caplog.text) is not expected
+
+
+@pytest.mark.skipif(not os.getenv("BATCH_TRANSFER_CONTRACT"),
+                    reason="Needs the address of the deployed batch transfer contract and access to the ronin RPC")
+def test_batch_transfer_abi_matches_deployed_contract():
+    assert check_batch_contract(os.environ["BATCH_TRANSFER_CONTRACT"])
+
+
+@pytest.mark.parametrize("answers, expected", [(["y"], True), (["maybe", "N"], False)])
+def test_confirm_approval(answers, expected):
+    with patch("builtins.input", side_effect=answers) as mocked_input:
+        assert confirm_approval(BATCH_CONTRACT) is expected
+    assert f"lets the contract ({BATCH_CONTRACT}) move ALL the axies" in mocked_input.call_args[0][0]
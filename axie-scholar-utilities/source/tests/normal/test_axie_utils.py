@@ -1,6 +1,8 @@
+import json
+
 import pytest
 
-from axie.utils import load_json
+from axie.utils import load_json, iter_json_array, JsonRecords, content_hash, ValidationCache
 
 
 def test_load_json_safeguard():
@@ -23,3 +25,67 @@ def test_load_json_not_json(tmpdir):
     with pytest.raises(Exception) as e:
         load_json(f)
     assert str(e.value) == f"File in path {f} is not a correctly encoded JSON."
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_array(tmpdir, chunk_size, indent):
+    records = [{"AccountAddress": f"ronin:{i}", "Transfers": [{"AxieId": i * 1000, "ReceiverAddress": "ronin:]"}]}
+               for i in range(30)] + [12345.5, "foo", [], None]
+    f = tmpdir.join("test.json")
+    f.write(json.dumps(records, indent=indent))
+    assert list(iter_json_array(str(f), chunk_size=chunk_size)) == records
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024])
+def test_iter_json_array_under_key(tmpdir, chunk_size):
+    f = tmpdir.join("test.json")
+    f.write(json.dumps({"Manager": "ronin:manager", "Donations": [{"a": "}"}], "Scholars": [{"Name": "Scholar 1"}]}))
+    assert list(iter_json_array(str(f), "Scholars", chunk_size)) == [{"Name": "Scholar 1"}]
+    with pytest.raises(Exception) as e:
+        list(iter_json_array(str(f), "scholars", chunk_size))
+    assert str(e.value) == f"File in path {f} does not contain the 'scholars' list."
+
+
+@pytest.mark.parametrize("content, expected_error", [
+    ("[1, 2,", "is not a correctly encoded JSON."),
+    ("[1, 2} ", "is not a correctly encoded JSON."),
+    ('{"foo": "bar"}', "does not contain a list of records."),
+])
+def test_iter_json_array_errors(tmpdir, content, expected_error):
+    f = tmpdir.join("test.json")
+    f.write(content)
+    with pytest.raises(Exception) as e:
+        list(iter_json_array(str(f), chunk_size=2))
+    assert str(e.value) == f"File in path {f} {expected_error}"
+
+
+def test_json_records(tmpdir):
+    with pytest.raises(Exception) as e:
+        JsonRecords("non_existent.json", None)
+    assert str(e.value) == ("File path non_existent.json does not exist. "
+                            "Please provide a correct one")
+    f = tmpdir.join("test.json")
+    f.write(json.dumps([{"foo": i} for i in range(5)]))
+    records = JsonRecords(str(f), None)
+    assert len(records) == 5
+    assert list(records) == list(records) == [{"foo": i} for i in range(5)]
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": 2}, {"c": 3}) == content_hash({"b": 2, "a": 1}, {"c": 3})
+    assert content_hash({"a": 1}, {"b": 2}) != content_hash({"a": 1, "b": 2}, {})
+
+
+def test_validation_cache(tmpdir):
+    path = str(tmpdir.join("logs", "cache.json"))
+    cache = ValidationCache(path)
+    assert cache.get("foo") is None
+    cache.set("foo", "new")
+    assert ValidationCache(path).get("foo") == "new"
+
+
+def test_validation_cache_corrupted(tmpdir):
+    f = tmpdir.join("cache.json")
+    f.write("{not json")
+    assert ValidationCache(str(f)).get("foo") is None
@@ -4,21 +4,31 @@ import builtins
 import json
 
 from docopt import docopt, DocoptExit
-from mock import patch, call
+from mock import patch, call, ANY
 import requests_mock
 import pytest
 
 import axie_scholar_cli as cli
 
 
+BATCH_CONTRACT = "0x" + "9" * 40
+
+
 @pytest.mark.parametrize("params, expected_result",
                          [
                             (["payout", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -43,13 +53,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": True}),
                             (["payout", "file1", "file2", "-y"],
                              {"--help": False,
                              "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -74,13 +94,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": True}),
                             (["payout", "file1", "file2", "--yes"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -105,13 +135,146 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": True}),
+                            (["payout", "file1", "file2", "-y", "--concurrency", "4"],
+                             {"--help": False,
+                              "--force": False,
+                              "--version": False,
+                              "--concurrency": "4",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
+                              "--yes": True,
+                              "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              '<list_of_accounts>': None,
+                              '<min_amount>': None,
+                              'managed_scatter_ron': False,
+                              'scatter_ron': False,
+                              'axie_morphing': False,
+                              "<payments_file>": "file1",
+                              "<secrets_file>": "file2",
+                              '<token>': None,
+                              '<transfers_file>': None,
+                              'transfer_axies': False,
+                              '<csv_file>': None,
+                              'mass_update_secrets': False,
+                              '<breedings_file>': None,
+                              'generate_breedings': False,
+                              'axie_breeding': False,
+                              "claim": False,
+                              "generate_QR": False,
+                              'generate_transfer_axies': False,
+                              'managed_claim': False,
+                              'managed_generate_QR': False,
+                              'managed_generate_secrets': False,
+                              'managed_payout': False,
+                              "generate_secrets": False,
+                              'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
+                              "payout": True}),
+                            (["plan_payout", "file1", "file2", "file3"],
+                             {"--help": False,
+                              "--force": False,
+                              "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
+                              "--yes": False,
+                              "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "<list_of_accounts>": None,
+                              "<min_amount>": None,
+                              "managed_scatter_ron": False,
+                              "scatter_ron": False,
+                              "axie_morphing": False,
+                              "<payments_file>": "file1",
+                              "<secrets_file>": "file2",
+                              "<token>": None,
+                              "<transfers_file>": None,
+                              "transfer_axies": False,
+                              "<csv_file>": None,
+                              "mass_update_secrets": False,
+                              "<breedings_file>": None,
+                              "generate_breedings": False,
+                              "axie_breeding": False,
+                              "claim": False,
+                              "generate_QR": False,
+                              "generate_transfer_axies": False,
+                              "managed_claim": False,
+                              "managed_generate_QR": False,
+                              "managed_generate_secrets": False,
+                              "managed_payout": False,
+                              "generate_secrets": False,
+                              "generate_payments": False,
+                              "<plan_file>": "file3",
+                              "plan_payout": True,
+                              "execute_plan": False,
+                              "payout": False}),
+                            (["execute_plan", "file1", "file2", "-y", "--concurrency=5"],
+                             {"--help": False,
+                              "--force": False,
+                              "--version": False,
+                              "--concurrency": "5",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
+                              "--yes": True,
+                              "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "<list_of_accounts>": None,
+                              "<min_amount>": None,
+                              "managed_scatter_ron": False,
+                              "scatter_ron": False,
+                              "axie_morphing": False,
+                              "<payments_file>": None,
+                              "<secrets_file>": "file2",
+                              "<token>": None,
+                              "<transfers_file>": None,
+                              "transfer_axies": False,
+                              "<csv_file>": None,
+                              "mass_update_secrets": False,
+                              "<breedings_file>": None,
+                              "generate_breedings": False,
+                              "axie_breeding": False,
+                              "claim": False,
+                              "generate_QR": False,
+                              "generate_transfer_axies": False,
+                              "managed_claim": False,
+                              "managed_generate_QR": False,
+                              "managed_generate_secrets": False,
+                              "managed_payout": False,
+                              "generate_secrets": False,
+                              "generate_payments": False,
+                              "<plan_file>": "file1",
+                              "plan_payout": False,
+                              "execute_plan": True,
+                              "payout": False}),
                             (["managed_payout", "file1", "secret", "--yes"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -136,13 +299,23 @@ import axie_scholar_cli as cli
                               'managed_payout': True,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_payout", "file1", "secret", "-y"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -167,13 +340,23 @@ import axie_scholar_cli as cli
                               'managed_payout': True,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_payout", "file1", "secret"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -198,13 +381,23 @@ import axie_scholar_cli as cli
                               'managed_payout': True,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["claim", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -229,13 +422,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["claim", "file1", "file2", "--force"],
                              {"--help": False,
                               "--force": True,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -260,13 +463,64 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
+                              "payout": False}),
+                            (["claim", "file1", "file2", "--force", "--claim-concurrency=50", "--claim-rate", "0.5"],
+                             {"--help": False,
+                              "--force": True,
+                              "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "50",
+                              "--claim-rate": "0.5",
+                              "--resume": None,
+                              "--summary": None,
+                              "--yes": False,
+                              "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              '<list_of_accounts>': None,
+                              '<min_amount>': None,
+                              'managed_scatter_ron': False,
+                              'scatter_ron': False,
+                              'axie_morphing': False,
+                              "<payments_file>": "file1",
+                              "<secrets_file>": "file2",
+                              '<token>': None,
+                              '<transfers_file>': None,
+                              'transfer_axies': False,
+                              '<csv_file>': None,
+                              'mass_update_secrets': False,
+                              '<breedings_file>': None,
+                              'axie_breeding': False,
+                              'generate_breedings': False,
+                              "claim": True,
+                              "generate_QR": False,
+                              'generate_transfer_axies': False,
+                              'managed_claim': False,
+                              'managed_generate_QR': False,
+                              'managed_generate_secrets': False,
+                              'managed_payout': False,
+                              "generate_secrets": False,
+                              'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["scatter_ron", "file1", "file2", "1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': '1',
                               'managed_scatter_ron': False,
@@ -291,13 +545,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_scatter_ron", "file1", "TOKEN", "1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': '1',
                               'managed_scatter_ron': True,
@@ -322,13 +586,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_claim", "file1", "secret", "--force"],
                              {"--help": False,
                               "--force": True,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -353,13 +627,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_claim", "file1", "secret"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -384,13 +668,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_secrets", "file1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -415,13 +709,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": True,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_secrets", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -446,13 +750,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": True,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_generate_secrets", "file1", "secret"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -477,13 +791,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["transfer_axies", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -508,13 +832,23 @@ import axie_scholar_cli as cli
                               "generate_QR": False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["transfer_axies", "file1", "file2", "--safe-mode"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": True,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -539,13 +873,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["mass_update_secrets", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -570,13 +914,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_payments", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -601,13 +955,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': True,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_payments", "file1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -632,13 +996,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': True,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["axie_morphing", "file1", "a,b,c"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': "a,b,c",
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -663,13 +1037,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["axie_breeding", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -694,13 +1078,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_QR", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -725,13 +1119,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["managed_generate_QR", "file1", "secret"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -756,13 +1160,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_breedings", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -787,13 +1201,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_breedings", "file1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -818,13 +1242,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_transfer_axies", "file1", "file2"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -849,13 +1283,23 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
                               "payout": False}),
                             (["generate_transfer_axies", "file1"],
                              {"--help": False,
                               "--force": False,
                               "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": None,
+                              "--summary": None,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -880,7 +1324,51 @@ import axie_scholar_cli as cli
                               'managed_payout': False,
                               "generate_secrets": False,
                               'generate_payments': False,
-                              "payout": False})
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
+                              "payout": False}),
+                            (["payout", "file1", "file2", "--resume=journal.jsonl"],
+                             {"--help": False,
+                              "--force": False,
+                              "--version": False,
+                              "--concurrency": "1",
+                              "--claim-concurrency": "10",
+                              "--claim-rate": "2",
+                              "--resume": "journal.jsonl",
+                              "--summary": None,
+                              "--yes": False,
+                              "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              '<list_of_accounts>': None,
+                              '<min_amount>': None,
+                              'managed_scatter_ron': False,
+                              'scatter_ron': False,
+                              'axie_morphing': False,
+                              "<payments_file>": "file1",
+                              "<secrets_file>": "file2",
+                              '<token>': None,
+                              '<transfers_file>': None,
+                              'transfer_axies': False,
+                              '<csv_file>': None,
+                              'mass_update_secrets': False,
+                              '<breedings_file>': None,
+                              'generate_breedings': False,
+                              'axie_breeding': False,
+                              "claim": False,
+                              "generate_QR": False,
+                              'generate_transfer_axies': False,
+                              'managed_claim': False,
+                              'managed_generate_QR': False,
+                              'managed_generate_secrets': False,
+                              'managed_payout': False,
+                              "generate_secrets": False,
+                              'generate_payments': False,
+                              '<plan_file>': None,
+                              'plan_payout': False,
+                              'execute_plan': False,
+                              "payout": True})
                          ])
 def test_parses_params(params, expected_result):
     args = docopt(cli.__doc__, params)
@@ -898,6 +1386,8 @@ def test_parses_params(params, expected_result):
                             (["mass_update_secrets", "file1"]),
                             (["mass_update_secrets", "file1", "file2", "file3"]),
                             (["payout", "file1"]),
+                            (["plan_payout", "file1", "file2"]),
+                            (["execute_plan", "file1"]),
                             (["transfer_axies"]),
                             (["transfer_axies", "file1"]),
                             (["transfer_axies", "file1", "file2", "file3"]),
@@ -1135,29 +1625,38 @@ def test_generate_secrets_partially_there(tmpdir):
                          '    "ronin:<account_s2_address>": "some_input"\n}')
 
 
-@patch("axie_scholar_cli.load_payments_file", return_value={'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]})
+@patch("axie_scholar_cli.load_payments_file",
+       return_value={'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]})
 @patch("axie.AxiePaymentsManager.__init__", return_value=None)
 @patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
 @patch("axie.AxiePaymentsManager.prepare_payout")
-def test_payout_takes_auto_parameter(mock_prepare_payout, mock_verify_input, mocked_paymentsmanager, mocked_load, tmpdir):
+def test_payout_takes_auto_parameter(mock_prepare_payout, mock_load_balances, mock_verify_input, mocked_paymentsmanager,
+                                     mocked_load, tmpdir):
     f1 = tmpdir.join("file2.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     with patch.object(sys, 'argv', ["", "payout", str(f1), "token"]):
         cli.run_cli()
     mock_prepare_payout.assert_called_with()
+    mock_load_balances.assert_called_with()
     mock_verify_input.assert_called_with()
     mocked_load.assert_called_with("token")
     mocked_paymentsmanager.assert_called_with(
         {'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]},
         {'ronin:<account_s1_address>': 'hello'},
-        auto=False
+        auto=False,
+        concurrency=1,
+        journal=ANY,
+        validation_cache=ANY
     )
 
 
 @patch("axie.AxiePaymentsManager.__init__", return_value=None)
 @patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
 @patch("axie.AxiePaymentsManager.prepare_payout")
-def test_payout_takes_auto_parameter(mock_prepare_payout, mock_verify_input, mocked_paymentsmanager, tmpdir):
+def test_payout_takes_auto_parameter(mock_prepare_payout, mock_load_balances, mock_verify_input, mocked_paymentsmanager,
+                                     tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
     f2 = tmpdir.join("file2.json")
@@ -1165,18 +1664,24 @@ def test_payout_takes_auto_parameter(mock_prepare_payout, mock_verify_input, moc
     with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2)]):
         cli.run_cli()
     mock_prepare_payout.assert_called_with()
+    mock_load_balances.assert_called_with()
     mock_verify_input.assert_called_with()
     mocked_paymentsmanager.assert_called_with(
         {'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]},
         {'ronin:<account_s1_address>': 'hello'},
-        auto=False
+        auto=False,
+        concurrency=1,
+        journal=ANY,
+        validation_cache=ANY
     )
 
 
 @patch("axie.AxiePaymentsManager.__init__", return_value=None)
 @patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
 @patch("axie.AxiePaymentsManager.prepare_payout")
-def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_verify_inputs, mocked_paymentsmanager, tmpdir):
+def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_load_balances, mock_verify_inputs,
+                                         mocked_paymentsmanager, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
     f2 = tmpdir.join("file2.json")
@@ -1184,14 +1689,158 @@ def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_verify_inputs
     with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), "-y"]):
         cli.run_cli()
     mock_prepare_payout.assert_called_with()
+    mock_load_balances.assert_called_with()
     mock_verify_inputs.assert_called_with()
     mocked_paymentsmanager.assert_called_with(
         {'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]},
         {'ronin:<account_s1_address>': 'hello'},
-        auto=True
+        auto=True,
+        concurrency=1,
+        journal=ANY,
+        validation_cache=ANY
+    )
+
+
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
+@patch("axie.AxiePaymentsManager.prepare_payout")
+def test_payout_takes_concurrency_parameter(mock_prepare_payout, mock_load_balances, mock_verify_inputs,
+                                            mocked_paymentsmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), "-y", "--concurrency=8"]):
+        cli.run_cli()
+    mock_prepare_payout.assert_called_with()
+    mocked_paymentsmanager.assert_called_with(
+        {'Scholars': [{'Name': 'Acc1', 'AccountAddress': 'ronin:<account_s1_address>'}]},
+        {'ronin:<account_s1_address>': 'hello'},
+        auto=True,
+        concurrency=8,
+        journal=ANY,
+        validation_cache=ANY
     )
 
 
+@pytest.mark.parametrize("summary_file", ["summary.json", "summary.csv"])
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
+@patch("axie.AxiePaymentsManager.prepare_payout")
+def test_payout_saves_summary(mock_prepare_payout, mock_load_balances, mock_verify_inputs, mocked_paymentsmanager,
+                              summary_file, tmpdir):
+    from axie.payments import PaymentsSummary
+    summary = PaymentsSummary()
+    summary.increase_payout(40, "ronin:<manager_address>", "manager", source="ronin:<account_s1_address>")
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    f3 = tmpdir.join(summary_file)
+    with patch("axie.AxiePaymentsManager.summary", summary, create=True):
+        with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), f"--summary={f3}"]):
+            cli.run_cli()
+    mock_prepare_payout.assert_called_with()
+    if summary_file.endswith(".csv"):
+        assert f3.read().splitlines()[1] == "manager,ronin:<manager_address>,ronin:<account_s1_address>,40"
+    else:
+        assert json.loads(f3.read())["totals"]["manager"] == 40
+
+
+@pytest.mark.parametrize("concurrency", ["0", "-1", "foo"])
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.prepare_payout")
+def test_payout_wrong_concurrency(mock_prepare_payout, mocked_paymentsmanager, concurrency, tmpdir, caplog):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), f"--concurrency={concurrency}"]):
+        with pytest.raises(SystemExit):
+            cli.run_cli()
+    mocked_paymentsmanager.assert_not_called()
+    mock_prepare_payout.assert_not_called()
+    assert f"Concurrency {concurrency} has to be a number bigger than 0!" in caplog.text
+
+
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
+@patch("axie.AxiePaymentsManager.prepare_payout")
+def test_payout_resume(mock_prepare_payout, mock_load_balances, mock_verify_inputs, mocked_paymentsmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    f3 = tmpdir.join("journal.jsonl")
+    f3.write('{"event": "completed", "key": "payout:ronin:<account_s1_address>"}\n')
+    with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), f"--resume={f3}"]):
+        cli.run_cli()
+    mock_prepare_payout.assert_called_with()
+    journal = mocked_paymentsmanager.call_args.kwargs["journal"]
+    assert journal.path == str(f3)
+    assert journal.is_completed("payout:ronin:<account_s1_address>")
+
+
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.prepare_payout")
+def test_payout_resume_missing_journal(mock_prepare_payout, mocked_paymentsmanager, tmpdir, caplog):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), "--resume=journal.jsonl"]):
+        with pytest.raises(SystemExit):
+            cli.run_cli()
+    mocked_paymentsmanager.assert_not_called()
+    mock_prepare_payout.assert_not_called()
+    assert "Please review your journal path and re-try." in caplog.text
+
+
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.verify_inputs")
+@patch("axie.AxiePaymentsManager.load_balances")
+@patch("axie.AxiePaymentsManager.plan_payout", return_value={"type": "new", "accounts": []})
+def test_plan_payout(mock_plan_payout, mock_load_balances, mock_verify_inputs, mocked_paymentsmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"scholars": []}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    f3 = tmpdir.join("plan.json")
+    with patch.object(sys, 'argv', ["", "plan_payout", str(f1), str(f2), str(f3)]):
+        cli.run_cli()
+    mocked_paymentsmanager.assert_called_with(
+        {"scholars": []}, {'ronin:<account_s1_address>': 'hello'}, validation_cache=ANY)
+    mock_verify_inputs.assert_called_with()
+    mock_load_balances.assert_called_with()
+    mock_plan_payout.assert_called_with()
+    assert json.loads(f3.read()) == {"type": "new", "accounts": []}
+
+
+@patch("axie.AxiePaymentsManager.__init__", return_value=None)
+@patch("axie.AxiePaymentsManager.verify_plan")
+@patch("axie.AxiePaymentsManager.execute_plan")
+def test_execute_plan(mock_execute_plan, mock_verify_plan, mocked_paymentsmanager, tmpdir):
+    f1 = tmpdir.join("plan.json")
+    f1.write('{"type": "new", "accounts": []}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "execute_plan", str(f1), str(f2), "-y", "--concurrency=3"]):
+        cli.run_cli()
+    mocked_paymentsmanager.assert_called_with(
+        {}, {'ronin:<account_s1_address>': 'hello'}, auto=True, concurrency=3, journal=ANY)
+    mock_verify_plan.assert_called_with({"type": "new", "accounts": []})
+    mock_execute_plan.assert_called_with({"type": "new", "accounts": []})
+
+
+def test_execute_plan_file_check_fail(caplog):
+    with patch.object(sys, 'argv', ["", "execute_plan", "plan.json", "file2.json"]):
+        cli.run_cli()
+    assert "Please provide a correct path to the file. Path provided: plan.json" in caplog.text
+
+
 @patch("axie.AxieClaimsManager.__init__", return_value=None)
 @patch("axie.AxieClaimsManager.prepare_claims")
 @patch("axie.AxieClaimsManager.verify_inputs")
@@ -1207,7 +1856,11 @@ def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpd
     mock_claimsmanager.assert_called_with(
         {'ronin:<account_s1_address>': 'hello'},
         {'ronin:<account_s1_address>': 'hello'},
-        False
+        False,
+        journal=ANY,
+        concurrency=10,
+        rate=2.0,
+        token_cache=ANY
     )
 
 @patch("axie.AxieClaimsManager.__init__", return_value=None)
@@ -1225,10 +1878,52 @@ def test_claim_foced(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager
     mock_claimsmanager.assert_called_with(
         {'ronin:<account_s1_address>': 'hello'},
         {'ronin:<account_s1_address>': 'hello'},
-        True
+        True,
+        journal=ANY,
+        concurrency=10,
+        rate=2.0,
+        token_cache=ANY
+    )
+
+
+@patch("axie.AxieClaimsManager.__init__", return_value=None)
+@patch("axie.AxieClaimsManager.prepare_claims")
+@patch("axie.AxieClaimsManager.verify_inputs")
+def test_claim_scheduling_parameters(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"ronin:<account_s1_address>": "hello"}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "claim", str(f1), str(f2), "--claim-concurrency=50", "--claim-rate=0.5"]):
+        cli.run_cli()
+    mock_prepare_claims.assert_called_with()
+    mock_claimsmanager.assert_called_with(
+        {'ronin:<account_s1_address>': 'hello'},
+        {'ronin:<account_s1_address>': 'hello'},
+        False,
+        journal=ANY,
+        concurrency=50,
+        rate=0.5,
+        token_cache=ANY
     )
 
 
+@pytest.mark.parametrize("rate", ["0", "-1", "foo"])
+@patch("axie.AxieClaimsManager.__init__", return_value=None)
+@patch("axie.AxieClaimsManager.prepare_claims")
+def test_claim_wrong_rate(mock_prepare_claims, mock_claimsmanager, rate, tmpdir, caplog):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"ronin:<account_s1_address>": "hello"}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "claim", str(f1), str(f2), f"--claim-rate={rate}"]):
+        with pytest.raises(SystemExit):
+            cli.run_cli()
+    mock_claimsmanager.assert_not_called()
+    mock_prepare_claims.assert_not_called()
+    assert f"Rate {rate} has to be a number bigger than 0!" in caplog.text
+
+
 @patch("axie_scholar_cli.load_payments_file", return_value={"foo": "bar"})
 @patch("axie.AxieClaimsManager.__init__", return_value=None)
 @patch("axie.AxieClaimsManager.prepare_claims")
@@ -1244,7 +1939,11 @@ def test_managed_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanag
     mock_claimsmanager.assert_called_with(
         {"foo": "bar"},
         {'ronin:<account_s1_address>': 'hello'},
-        False
+        False,
+        journal=ANY,
+        concurrency=10,
+        rate=2.0,
+        token_cache=ANY
     )
 
 
@@ -1263,7 +1962,11 @@ def test_managed_claim_forced(mock_verify_inputs, mock_prepare_claims, mock_clai
     mock_claimsmanager.assert_called_with(
         {"foo": "bar"},
         {'ronin:<account_s1_address>': 'hello'},
-        True
+        True,
+        journal=ANY,
+        concurrency=10,
+        rate=2.0,
+        token_cache=ANY
     )
 
 
@@ -1293,7 +1996,8 @@ def test_transfer(mock_verify_inputs, mock_prepare_transfers, mock_transfersmana
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_transfers.assert_called_with()
-    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False)
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False, journal=ANY, stream=True,
+                                             bulk_contract=None, concurrency=1, approve=False)
 
 
 @patch("axie.AxieTransferManager.__init__", return_value=None)
@@ -1308,7 +2012,44 @@ def test_transfer_secure(mock_verify_inputs, mock_prepare_transfers, mock_transf
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_transfers.assert_called_with()
-    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=True)
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=True, journal=ANY, stream=True,
+                                             bulk_contract=None, concurrency=1, approve=False)
+
+
+@patch("axie.AxieTransferManager.__init__", return_value=None)
+@patch("axie.AxieTransferManager.prepare_transfers")
+@patch("axie.AxieTransferManager.verify_inputs")
+def test_transfer_bulk(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"ronin:<account_s1_address>": "hello"}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    args = ["", "transfer_axies", str(f1), str(f2), "--bulk", BATCH_CONTRACT, "--approve-bulk"]
+    with patch.object(sys, 'argv', args):
+        with patch.object(builtins, 'input', lambda _: 'y'):
+            cli.run_cli()
+    mock_verify_inputs.assert_called_with()
+    mock_prepare_transfers.assert_called_with()
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False, journal=ANY, stream=True,
+                                             bulk_contract=BATCH_CONTRACT, concurrency=1, approve=True)
+
+
+@patch("axie.AxieTransferManager.__init__", return_value=None)
+@patch("axie.AxieTransferManager.prepare_transfers")
+@patch("axie.AxieTransferManager.verify_inputs")
+def test_transfer_bulk_approval_declined(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"ronin:<account_s1_address>": "hello"}')
+    f2 = tmpdir.join("file2.json")
+    f2.write('{"ronin:<account_s1_address>": "hello"}')
+    args = ["", "transfer_axies", str(f1), str(f2), "--bulk", BATCH_CONTRACT, "--approve-bulk"]
+    with patch.object(sys, 'argv', args):
+        with patch.object(builtins, 'input', lambda _: 'n'):
+            cli.run_cli()
+    mock_verify_inputs.assert_called_with()
+    mock_prepare_transfers.assert_called_with()
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False, journal=ANY, stream=True,
+                                             bulk_contract=BATCH_CONTRACT, concurrency=1, approve=False)
 
 
 def test_axie_morphing_file_check_fail(caplog):
@@ -1329,12 +2070,50 @@ def test_axie_morphing(mock_veritfy_inputs, mock_morphing_execute, mock_find_axi
     with patch.object(sys, 'argv', ["", "axie_morphing", str(f), "foo,bar"]):
         cli.run_cli()
     mock_axies_init.assert_has_calls([call('foo'), call('bar')])
-    mock_morphingmanager.assert_has_calls([call([1, 2, 3], "foo", str(f)), call([1, 2, 3], "bar", str(f))])
+    mock_morphingmanager.assert_has_calls([call([1, 2, 3], "foo", str(f), journal=ANY),
+                                           call([1, 2, 3], "bar", str(f), journal=ANY)])
     assert mock_veritfy_inputs.call_count == 2
     assert mock_find_axies.call_count == 2
     assert mock_morphing_execute.call_count == 2
 
 
+@patch("axie.AxieMorphingManager.__init__", return_value=None)
+@patch("axie_utils.Axies.__init__", return_value=None)
+@patch("axie_utils.Axies.find_axies_to_morph", return_value=[1, 2, 3])
+@patch("axie.AxieMorphingManager.execute")
+@patch("axie.AxieMorphingManager.verify_inputs")
+def test_axie_morphing_concurrency(mock_veritfy_inputs, mock_morphing_execute, mock_find_axies, mock_axies_init, mock_morphingmanager, tmpdir): # noqa
+    f = tmpdir.join("file2.json")
+    f.write('{"ronin:<account_s1_address>": "hello"}')
+    with patch.object(sys, 'argv', ["", "axie_morphing", str(f), "foo,bar,baz", "--concurrency=2"]):
+        with patch("axie_scholar_cli.LaneExecutor", wraps=cli.LaneExecutor) as mock_executor:
+            cli.run_cli()
+    mock_executor.assert_called_with(2)
+    mock_axies_init.assert_has_calls([call('foo'), call('bar'), call('baz')], any_order=True)
+    assert mock_morphingmanager.call_count == 3
+    assert mock_morphing_execute.call_count == 3
+
+
+@patch("axie.AxieMorphingManager.__init__", return_value=None)
+@patch("axie_utils.Axies.__init__", return_value=None)
+@patch("axie_utils.Axies.find_axies_to_morph", return_value=[1, 2, 3])
+@patch("axie.AxieMorphingManager.execute")
+@patch("axie.AxieMorphingManager.verify_inputs")
+def test_axie_morphing_account_lanes(mock_veritfy_inputs, mock_morphing_execute, mock_find_axies, mock_axies_init, mock_morphingmanager, tmpdir): # noqa
+    f = tmpdir.join("file2.json")
+    f.write('{"ronin:<account_s1_address>": "hello"}')
+    accs = "ronin:abc1,0xABC1,ronin:abc2"
+    with patch.object(sys, 'argv', ["", "axie_morphing", str(f), accs, "--concurrency=2"]):
+        lanes = []
+        partition = cli.LaneExecutor.partition
+        with patch("axie.lanes.LaneExecutor.partition",
+                   side_effect=lambda items, key: lanes.append(partition(items, key)) or lanes[-1]):
+            cli.run_cli()
+    # The same account written as ronin: and 0x morphs in a single lane
+    assert list(lanes[0]) == ["0xabc1", "0xabc2"]
+    assert mock_morphing_execute.call_count == 3
+
+
 @patch("axie.AxieMorphingManager.__init__", return_value=None)
 @patch("axie_utils.Axies.__init__", return_value=None)
 @patch("axie_utils.Axies.find_axies_to_morph", return_value=[])
@@ -1373,7 +2152,7 @@ def test_breeding(mock_verify_inputs, mock_execute_breeding, mock_breedingmanage
             cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_execute_breeding.assert_called_with()
-    mock_breedingmanager.assert_called_with(str(f1), str(f2), acc)
+    mock_breedingmanager.assert_called_with(str(f1), str(f2), acc, journal=ANY, stream=True, concurrency=1)
 
 
 def test_qrcode_file_check_fail(caplog):
@@ -1393,13 +2172,15 @@ def test_qrcode(mock_execute, mock_qrcodemanager, tmpdir):
     with patch.object(sys, 'argv', ["", "generate_QR", str(f1), str(f2)]):
         cli.run_cli()
     mock_execute.assert_called_with()
-    mock_qrcodemanager.assert_called_with({'ronin:<account_s1_address>': 'hello'}, {'ronin:<account_s1_address>': 'bye'}, os.path.dirname(f2))
+    mock_qrcodemanager.assert_called_with({'ronin:<account_s1_address>': 'hello'},
+                                          {'ronin:<account_s1_address>': 'bye'},
+                                          os.path.dirname(f2), token_cache=ANY)
 
 
 def test_load_payments():
     with requests_mock.Mocker() as req_mocker:
         req_mocker.post("https://api.axie.management/external/epithslayer/user/scholars",
-                       json={"foo": "bar"})
+                        json={"foo": "bar"})
         r = cli.load_payments_file("token")
     assert r == {"foo": "bar"}
 
@@ -0,0 +1,79 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+
+SOURCE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Only the subcommands using them import these, starting the CLI with any of them loaded is a regression
+SUBCOMMAND_MODULES = [
+    "axie_utils",
+    "web3",
+    "trezorlib",
+    "requests",
+    "Crypto",
+    "qrcode",
+    "jsonschema",
+    "axie.payments",
+    "axie.claims",
+    "trezor.trezor_payments",
+    "trezor.trezor_devices"
+]
+
+
+# Runs the CLI as a script with the given arguments and prints the modules it loaded
+RUN_CLI = """
+import sys, runpy
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_module(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+print("\\n".join(sys.modules), file=sys.stderr)
+"""
+
+
+def loaded_modules(cli, cwd, *args):
+    """ Output of the CLI run with the given arguments, and the modules loaded when it ended """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SOURCE, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-c", RUN_CLI, cli, *args], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout, set(result.stderr.splitlines())
+
+
+@pytest.mark.parametrize("cli", ["axie_scholar_cli", "trezor_axie_scholar_cli"])
+def test_cli_help_does_not_import_subcommands(cli, tmpdir):
+    output, modules = loaded_modules(cli, tmpdir, "--help")
+    assert "Usage:" in output
+    assert "docopt" in modules
+    assert [module for module in SUBCOMMAND_MODULES if module in modules] == []
+
+
+def import_times(module, cwd):
+    """ Cumulative import time in µs of every module loaded when importing the given one, from python -X importtime """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SOURCE, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # The header line has no figures
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("cli", ["axie_scholar_cli", "trezor_axie_scholar_cli"])
+def test_cli_import_time_report(cli, tmpdir):
+    times = import_times(cli, tmpdir)
+    # Timings vary between runs and machines, they are reported (pytest -s) but never asserted on
+    print(f"\nImport time of {cli}, cumulative µs:")
+    for module, cumulative in sorted(times.items(), key=lambda t: t[1], reverse=True)[:15]:
+        print(f"{cumulative:>10} {module}")
+    assert cli in times and "docopt" in times
+    assert [module for module in SUBCOMMAND_MODULES if module in times] == []
@@ -130,8 +130,9 @@ def test_qrcode_manager_execute(mocked_qrcode_init, mocked_qrcode_generate_qr):
     qr = QRCodeManager(p_file, s_file, '/')
     qr.execute()
     mocked_qrcode_init.assert_has_calls(calls=[
-        call(account=scholar_acc, private_key=scholar_private_acc, acc_name="Scholar 1", path='/'),
-        call(account=scholar_acc_other, private_key=scholar_private_acc_other, acc_name="Scholar 2", path='/') # noqa
+        call(account=scholar_acc, private_key=scholar_private_acc, acc_name="Scholar 1", path='/',
+             token_cache=None),
+        call(account=scholar_acc_other, private_key=scholar_private_acc_other, acc_name="Scholar 2", path='/', token_cache=None) # noqa
     ])
     assert mocked_qrcode_generate_qr.call_count == 2
 
@@ -1,19 +1,40 @@
-from mock import patch
+import sys
+
+from mock import patch, call, Mock
 
 from axie import ScatterRonManager
+from axie.journal import RunJournal
+from axie.receipts import ReceiptTracker
+from axie.scatter_chunks import (
+    ScatterChunk,
+    chunk_scatter,
+    estimate_scatter_gas,
+    gas_estimates,
+    recipients_per_scatter,
+    scatter_gas,
+    send_scatter_chunks
+)
+
+
+FROM_ACC = "ronin:" + "a" * 40
+
 
 @patch("axie.scatter.ScatterRonManager.load_scatter", return_value='foo')
 def test_init_scatter_ron_manager(mocked_load):
     s = ScatterRonManager('from_acc', {"foo": "bar"}, {"from_acc": "secret"}, 1)
-    mocked_load.assert_called_with({"foo": "bar"})
+    # The scatter plan is only built when first needed
+    mocked_load.assert_not_called()
     assert s.min_ron == 1
     assert s.from_acc == 'from_acc'
     assert s.from_private == 'secret'
     assert s.scatter_accounts_amounts == 'foo'
+    assert s.scatter_accounts_amounts == 'foo'
+    mocked_load.assert_called_once_with({"foo": "bar"})
 
 
+@patch('axie.scatter.fetch_balances', return_value={})
 @patch('axie.scatter.check_balance', return_value=0)
-def test_load_scatter_ron_manager_new(mocked_check):
+def test_load_scatter_ron_manager_new(mocked_check, _balances):
     payments = {
     "scholars": [
         {
@@ -83,8 +104,9 @@ def test_load_scatter_ron_manager_new(mocked_check):
     }
     mocked_check.assert_called()
 
+@patch('axie.scatter.fetch_balances', return_value={})
 @patch('axie.scatter.check_balance', return_value=0)
-def test_load_scatter_ron_manager_old(mocked_check):
+def test_load_scatter_ron_manager_old(mocked_check, _balances):
     payments = {
     "Manager": "ronin:<Manager address here>",
     "Scholars": [
@@ -132,8 +154,9 @@ def test_load_scatter_ron_manager_old(mocked_check):
     }
     mocked_check.assert_called()
 
+@patch('axie.scatter.fetch_balances', return_value={})
 @patch('axie.scatter.check_balance', return_value=0.5)
-def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check):
+def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check, _balances):
     payments = {
     "scholars": [
         {
@@ -202,8 +225,9 @@ def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check):
         "ronin:<account_s2_address>": 0.5}
     mocked_check.assert_called()
 
+@patch('axie.scatter.fetch_balances', return_value={})
 @patch('axie.scatter.check_balance', return_value=0.5)
-def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check):
+def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check, _balances):
     payments = {
     "Manager": "ronin:<Manager address here>",
     "Scholars": [
@@ -251,14 +275,122 @@ def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check):
     }
     mocked_check.assert_called()
 
-@patch("axie_utils.Scatter.execute")
-@patch("axie_utils.Scatter.__init__", return_value=None)
+@patch("axie.scatter.send_scatter_chunks", return_value=[])
+@patch("axie.scatter.chunk_scatter", return_value=["chunk"])
 @patch("axie.scatter.ScatterRonManager.load_scatter", return_value='foo')
-def test_scatter_ron_manager_execute(mocked_load, mocked_scatter_init, mocked_scatter_execute):
+def test_scatter_ron_manager_execute(mocked_load, mocked_chunk, mocked_send):
     s = ScatterRonManager('from_acc', {"foo": "bar"}, {"from_acc": "secret"}, 1)
-    mocked_load.assert_called()
     s.execute()
-    mocked_scatter_init.assert_called_with(
-        'ron', s.from_acc, s.from_private, 'foo'
-    )
-    mocked_scatter_execute.assert_called()
\ No newline at end of file
+    mocked_load.assert_called()
+    mocked_chunk.assert_called_with('ron', s.from_acc, s.from_private, 'foo')
+    mocked_send.assert_called_with(["chunk"], s.receipts, s.from_acc)
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash_1": {"status": "0x1"}, "0xhash_2": {"status": "0x0"}})
+def test_scatter_ron_manager_execute_journal_confirmed_chunks(_, tmpdir):
+    journal = RunJournal(str(tmpdir.join("journal.jsonl")))
+    s = ScatterRonManager('from_acc', {}, {"from_acc": "secret"}, 1, journal=journal)
+    s.scatter_accounts_amounts = {"ronin:1": 0.5, "ronin:2": 0.5, "ronin:3": 0.5}
+    chunks = [Mock(amounts={"ronin:1": 0.5, "ronin:2": 0.5}), Mock(amounts={"ronin:3": 0.5})]
+
+    def fake_send(chunks, receipts, description):
+        sent = []
+        for i, chunk in enumerate(chunks, start=1):
+            receipts.track("Scatter", f"{description} ({i}/{len(chunks)})", f"0xhash_{i}")
+            sent.append((chunk, f"0xhash_{i}"))
+        return sent
+
+    with patch("axie.scatter.chunk_scatter", return_value=chunks), \
+            patch("axie.scatter.send_scatter_chunks", side_effect=fake_send):
+        s.execute()
+    # A chunk tops up all its accounts or none of them
+    assert journal.is_completed("scatter_ron:ronin:1")
+    assert journal.is_completed("scatter_ron:ronin:2")
+    assert not journal.is_completed("scatter_ron:ronin:3")
+
+
+@patch('axie.scatter.fetch_balances', return_value={"ronin:1": 0.2, "ronin:2": 3})
+@patch('axie.scatter.check_balance', return_value=0.5)
+def test_load_scatter_ron_manager_batched_balances(mocked_check, mocked_balances):
+    payments = {"scholars": [{"ronin": "ronin:1"}, {"ronin": "ronin:2"}, {"ronin": "ronin:3"}]}
+    s = ScatterRonManager('from_acc', payments, {"from_acc": "secret"}, 1)
+    assert s.scatter_accounts_amounts == {"ronin:1": 0.8, "ronin:3": 0.5}
+    mocked_balances.assert_called_once_with(["ronin:1", "ronin:2", "ronin:3"], 'ron')
+    # Only accounts missing from the batched balances are asked one by one
+    mocked_check.assert_called_once_with("ronin:3", 'ron')
+
+
+def test_scatter_ron_manager_verify_inputs(caplog):
+    s = ScatterRonManager('from_acc', {}, {"other_acc": "secret"}, 1)
+    with patch.object(sys, "exit") as mocked_sys:
+        s.verify_inputs()
+    mocked_sys.assert_called_once()
+    assert "Account 'from_acc' is not present in secret file, please add it." in caplog.text
+
+
+def recipients(n):
+    return {f"ronin:{i:040x}": 1 for i in range(1, n + 1)}
+
+
+def test_scatter_chunk_size():
+    assert scatter_gas("ron", 2) == 120000
+    assert scatter_gas("slp", 2) == 170000
+    assert recipients_per_scatter(40000) == 18
+    assert recipients_per_scatter(10 ** 7) == 1
+
+
+def test_chunk_scatter_calibrated_from_estimate():
+    gas_estimates.clear()
+    with patch.object(ScatterChunk, "estimate_gas", return_value=450000) as mocked_estimate:
+        chunks = chunk_scatter("ron", FROM_ACC, "0xsecret", recipients(40))
+        # Chunks of the same size reuse the cached estimate
+        assert [chunk.build_scatter(i)["gas"] for i, chunk in enumerate(chunks[:2])] == [562500, 562500]
+    assert [len(chunk.to_list) for chunk in chunks] == [18, 18, 4]
+    assert list(chunks[2].amounts) == list(recipients(40))[36:]
+    assert chunks[0].amounts_list[0] == 10 ** 18
+    assert mocked_estimate.call_count == 2
+    assert gas_estimates == {("ron", 10): 450000, ("ron", 18): 450000}
+    assert chunk_scatter("ron", FROM_ACC, "0xsecret", {}) == []
+
+
+def test_estimate_scatter_gas_fallback(caplog):
+    gas_estimates.clear()
+    chunk = ScatterChunk("slp", FROM_ACC, "0xsecret", recipients(3))
+    with patch.object(ScatterChunk, "estimate_gas", side_effect=ValueError("execution reverted")):
+        assert estimate_scatter_gas(chunk) == 230000
+    assert gas_estimates == {}
+    assert "Could not estimate gas of a slp scatter to 3 recipients" in caplog.text
+
+
+@patch("axie.receipts.fetch_receipts", return_value={})
+@patch("axie.scatter_chunks.check_balance", return_value=100)
+@patch("axie.scatter_chunks.get_nonce", return_value=5)
+def test_send_scatter_chunks_pipelined(mocked_nonce, mocked_balance, _):
+    chunks = [ScatterChunk("slp", FROM_ACC, "0xsecret", recipients(3)),
+              ScatterChunk("slp", FROM_ACC, "0xsecret", {"ronin:" + "f" * 40: 40})]
+    receipts = ReceiptTracker()
+    with patch.object(ScatterChunk, "is_approved", return_value=False) as mocked_approved, \
+            patch.object(ScatterChunk, "build_approval", lambda self, nonce: ("approval", nonce)), \
+            patch.object(ScatterChunk, "build_scatter", lambda self, nonce: ("scatter", nonce)), \
+            patch.object(ScatterChunk, "send", side_effect=lambda tx, description: f"0xhash_{tx[1]}"), \
+            patch.object(receipts, "track") as mocked_track:
+        sent = send_scatter_chunks(chunks, receipts, "Scholar 1")
+    mocked_nonce.assert_called_once_with(FROM_ACC.replace("ronin:", "0x"))
+    mocked_balance.assert_called_once_with(FROM_ACC.replace("ronin:", "0x"), "slp")
+    mocked_approved.assert_called_once_with(43)
+    # Nonces are tracked locally, no chunk waits for the previous receipt
+    assert sent == [(chunks[0], "0xhash_6"), (chunks[1], "0xhash_7")]
+    assert mocked_track.call_args_list == [
+        call("Approval", f"of SLP scatter for account ({FROM_ACC})", "0xhash_5"),
+        call("Scatter", "Scholar 1 (1/2)", "0xhash_6"),
+        call("Scatter", "Scholar 1 (2/2)", "0xhash_7")
+    ]
+
+
+@patch("axie.scatter_chunks.get_nonce")
+@patch("axie.scatter_chunks.check_balance", return_value=1)
+def test_send_scatter_chunks_not_enough_funds(_, mocked_nonce, caplog):
+    chunks = [ScatterChunk("ron", FROM_ACC, "0xsecret", recipients(3))]
+    assert send_scatter_chunks(chunks, ReceiptTracker(), "Scholar 1") == []
+    mocked_nonce.assert_not_called()
+    assert f"Important: Account ({FROM_ACC}) needs 3 RON to scatter but holds 1" in caplog.text
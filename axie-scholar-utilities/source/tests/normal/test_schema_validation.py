@@ -1,8 +1,25 @@
+import json
+
 import pytest
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
-from axie.schemas import legacy_payments_schema, payments_schema, transfers_schema, breeding_schema
+from axie.schemas import (
+    legacy_payments_schema,
+    payments_schema,
+    transfers_schema,
+    breeding_schema,
+    payments_validator,
+    legacy_payments_validator,
+    transfers_validator,
+    breeding_validator,
+    breeding_record_validator,
+    scholar_validator,
+    detect_payments_format,
+    schema_errors,
+    format_errors
+)
+from axie.utils import JsonRecords
 
 
 @pytest.mark.parametrize("json_input, expected_error", [
@@ -319,3 +336,52 @@ def test_json_validator_breeding_schema_error(json_input, expected_error):
     with pytest.raises(ValidationError) as e:
         validate(json_input, breeding_schema)
     assert expected_error in str(e.value)
+
+
+@pytest.mark.parametrize("json_input, expected_format", [
+        ({"scholars": []}, "new"),
+        ({"Manager": "ronin:abc", "Scholars": []}, "legacy"),
+        ({"Scholars": []}, "legacy"),
+        ({}, None),
+        ([], None)
+])
+def test_detect_payments_format(json_input, expected_format):
+    assert detect_payments_format(json_input) == expected_format
+
+
+def test_schema_errors_collects_all_errors():
+    errors = schema_errors(breeding_validator, [
+        {"AccountAddress": "foo", "Sire": 1, "Matron": 2},
+        {"AccountAddress": "ronin:foo", "Sire": "1", "Matron": 2},
+        {"AccountAddress": "ronin:foo", "Sire": 1, "Matron": 2}])
+    assert format_errors(errors) == (
+        "Error given: 'foo' does not match '^ronin:'\nFor attribute in: [0, 'AccountAddress']\n"
+        "Error given: '1' is not of type 'number'\nFor attribute in: [1, 'Sire']\n")
+
+
+def test_compiled_validators_match_schemas():
+    assert payments_validator.schema is payments_schema
+    assert legacy_payments_validator.schema is legacy_payments_schema
+    assert transfers_validator.schema is transfers_schema
+    assert breeding_validator.schema is breeding_schema
+    assert schema_errors(payments_validator, {"scholars": []}) == []
+
+
+def test_schema_errors_streamed_records_match_whole_file(tmpdir):
+    breedings = [
+        {"AccountAddress": "foo", "Sire": 1, "Matron": 2},
+        {"AccountAddress": "ronin:foo", "Sire": "1", "Matron": 2},
+        {"AccountAddress": "ronin:foo", "Sire": 1, "Matron": 2}]
+    f = tmpdir.join("breedings.json")
+    f.write(json.dumps(breedings))
+    records = JsonRecords(str(f), breeding_record_validator, chunk_size=8)
+    assert format_errors(schema_errors(breeding_validator, records)) == format_errors(
+        schema_errors(breeding_validator, breedings))
+
+
+def test_schema_errors_streamed_records_under_key(tmpdir):
+    f = tmpdir.join("payments.json")
+    f.write(json.dumps({"scholars": [{"name": "Scholar 1", "ronin": "foo", "splits": []}], "donations": []}))
+    records = JsonRecords(str(f), scholar_validator, key="scholars")
+    assert format_errors(schema_errors(payments_validator, records)) == (
+        "Error given: 'foo' does not match '^ronin:'\nFor attribute in: ['scholars', 0, 'ronin']\n")
@@ -0,0 +1,62 @@
+from trezorlib.tools import session
+
+
+class FakeDevice:
+    """ Trezor device with a single active session, the one last initialized """
+
+    def __init__(self):
+        self.sessions = 0
+        self.active = None
+        # Sessions asked to resume, None for the new sessions
+        self.initialized = []
+        # Clients that signed with the session the device had active
+        self.signatures = []
+
+    def initialize(self, session_id=None):
+        if session_id is None:
+            self.sessions += 1
+            session_id = f"session_{self.sessions}".encode()
+        self.active = session_id
+        return session_id
+
+
+class FakeClient(str):
+    """ Trezor client that compares equal to its name and opens a new session on its device """
+
+    def __new__(cls, name="client", device=None, path=None):
+        client = super().__new__(cls, name)
+        client.path = path
+        client.device = device or FakeDevice()
+        client.session_counter = 0
+        client.session_id = client.device.initialize()
+        return client
+
+    def open(self):
+        self.session_counter += 1
+
+    def close(self):
+        self.session_counter -= 1
+
+    @session
+    def init_device(self, session_id=None):
+        self.device.initialized.append(session_id)
+        self.session_id = self.device.initialize(session_id)
+        return self.session_id
+
+    @session
+    def end_session(self):
+        self.device.active = None
+        self.session_id = None
+
+
+@session
+def active_session(client):
+    """ Device call returning the session the device runs it with """
+    return client.device.active
+
+
+@session
+def sign_tx(client, n, **kwargs):
+    """ Signature recording the session the device signs it with """
+    client.device.signatures.append((client, client.device.active))
+    return 28, b"\x01", b"\x02"
@@ -2,9 +2,14 @@ import sys
 import json
 
 from mock import patch, call
+from trezorlib.tools import parse_path
+from web3 import Web3
 
 from trezor import TrezorAxieBreedManager
-from axie.payments import CREATOR_FEE_ADDRESS, PaymentsSummary
+from axie.payments import CREATOR_FEE_ADDRESS
+from axie.utils import JsonRecords
+from trezor.trezor_pipeline import sign_transaction
+from tests.trezor.fakes import FakeClient, FakeDevice, sign_tx
 
 
 @patch("trezor.trezor_breeding.load_json", return_value={"foo": "bar"})
@@ -141,7 +146,8 @@ def test_breed_manager_calculate_fee_cost(tmpdir):
     assert abm.calculate_fee_cost() == (15 * 30) + (15 * 25) + (20 * 20) + ((75 - 50) * 15)
 
 
-def test_breed_manager_calculate_breeding_cost(tmpdir):
+@patch("axie.preflight.fetch_axie_details")
+def test_breed_manager_calculate_breeding_cost(mock_details, tmpdir):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     c_file = tmpdir.join("c.json")
     config_data = {acc: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
@@ -153,26 +159,28 @@ def test_breed_manager_calculate_breeding_cost(tmpdir):
         "AccountAddress": acc
     }]
     b_file.write(json.dumps(data))
+    mock_details.return_value = {
+        1234: {"breed_count": 1, "parents": set(), "stage": 4},
+        5678: {"breed_count": 3, "parents": set(), "stage": 4}
+    }
     abm = TrezorAxieBreedManager(b_file, c_file, acc)
-    assert abm.calculate_breeding_cost() == 0
-    abm.breeding_file = list(range(75))
-    assert abm.calculate_breeding_cost() == 0
-
-
-@patch("trezor.trezor_breeding.parse_path", return_value="parsed_path")
-@patch("trezor.trezor_breeding.get_default_client", return_value='client')
-@patch("trezor.trezor_breeding.check_balance", return_value=1000)
-@patch("trezor.trezor_breeding.TrezorBreed.execute")
-@patch("trezor.trezor_breeding.TrezorBreed.__init__", return_value=None)
-@patch("axie_utils.TrezorPayment.execute")
-@patch("axie_utils.TrezorPayment.__init__", return_value=None)
-def test_breed_manager_execute(mock_payments_init,
-                               mock_payments_execute,
-                               mock_breed_init,
-                               mock_bree_execute,
+    assert abm.calculate_breeding_cost() == 1350 + 3600
+    assert abm.breeding_costs_by_account == {acc.lower(): 1350 + 3600}
+
+
+@patch("trezor.trezor_breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details",
+       side_effect=lambda ids: {i: {"breed_count": 0, "parents": set(), "stage": 4} for i in ids})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_breeding.check_balance", side_effect=lambda acc, token: 10000 if token == "slp" else 10 ** 18)
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", autospec=True, return_value=[])
+def test_breed_manager_execute(mock_run,
                                mock_check_balance,
                                mocked_client,
-                               mock_parse,
+                               _details,
+                               _owners,
+                               _balances,
                                tmpdir):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     c_file = tmpdir.join("c.json")
@@ -191,33 +199,88 @@ def test_breed_manager_execute(mock_payments_init,
     b_file.write(json.dumps(data))
     abm = TrezorAxieBreedManager(b_file, c_file, acc)
     abm.execute()
-    mocked_client.assert_called()
-    mock_parse.assert_called()
-    mock_check_balance.assert_called_once()
-    mock_breed_init.assert_has_calls(calls=[
-        call(sire_axie=1234, matron_axie=5678, address=acc, client="client", bip_path="m/44'/60'/0'/0/0"),
-        call(sire_axie=123, matron_axie=456, address=acc, client="client", bip_path="m/44'/60'/0'/0/0")
-    ])
-    assert mock_bree_execute.call_count == 2
-    mock_payments_init.assert_called_with(
-        "Breeding Fee",
-        "donation",
-        "client",
-        "parsed_path",
-        acc,
-        CREATOR_FEE_ADDRESS,
-        60,
-        PaymentsSummary())
-    assert mock_payments_execute.call_count == 1
-
-
-@patch("trezor.trezor_breeding.get_default_client", return_value='client')
-@patch("axie_utils.TrezorPayment.execute")
-@patch("trezor.trezor_breeding.TrezorBreed.execute")
-@patch("axie_utils.TrezorPayment.__init__", return_value=None)
-@patch("trezor.trezor_breeding.TrezorBreed.__init__", return_value=None)
+    mocked_client.assert_called_once()
+    # Once for the SLP and once for the AXS of the account
+    assert mock_check_balance.call_count == 2
+    # Breeds and fee are signed in a single pass of the pipeline
+    mock_run.assert_called_once()
+    transactions = mock_run.call_args[0][0].transactions
+    acc_0x = acc.replace("ronin:", "0x")
+    assert [(t.kind, str(t), t.from_acc, t.client, t.bip_path) for t in transactions] == [
+        ("Breed", f"Breeding axie 1234 with 5678 in account {acc}", acc_0x, "client", parse_path("m/44'/60'/0'/0/0")),
+        ("Breed", f"Breeding axie 123 with 456 in account {acc}", acc_0x, "client", parse_path("m/44'/60'/0'/0/0")),
+        ("Payment", f"Breeding Fee({CREATOR_FEE_ADDRESS}) for the amount of 60 SLP", acc_0x, "client",
+         parse_path("m/44'/60'/0'/0/0"))
+    ]
+    assert [(t.function.fn_name, t.function.args) for t in transactions] == [
+        ("breedAxies", (1234, 5678)),
+        ("breedAxies", (123, 456)),
+        ("transfer", (Web3.toChecksumAddress(CREATOR_FEE_ADDRESS.replace("ronin:", "0x")), 60))
+    ]
+
+
+@patch("trezor.trezor_breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details",
+       side_effect=lambda ids: {i: {"breed_count": 0, "parents": set(), "stage": 4} for i in ids})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_breeding.check_balance", side_effect=lambda acc, token: 10000 if token == "slp" else 10 ** 18)
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", autospec=True, return_value=[])
+def test_breed_manager_execute_stream_skips_rejected(mock_run, _, __, ___, ____, _____, tmpdir):
+    acc = "ronin:" + "1" * 40
+    c_file = tmpdir.join("c.json")
+    c_file.write(json.dumps({acc: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}))
+    b_file = tmpdir.join("b.json")
+    b_file.write(json.dumps([{"Sire": 1234, "Matron": 1234, "AccountAddress": acc},
+                             {"Sire": 123, "Matron": 456, "AccountAddress": acc}]))
+    abm = TrezorAxieBreedManager(str(b_file), c_file, acc, stream=True)
+    abm.execute()
+    # The breedings stay a stream, only the keys of the rejected ones are kept
+    assert isinstance(abm.breeding_file, JsonRecords)
+    assert abm.rejected == {"breed:1234:1234"}
+    assert abm.number_of_breeds() == 1
+    transactions = mock_run.call_args[0][0].transactions
+    assert [(t.function.fn_name, t.function.args[-1]) for t in transactions] == [
+        ("breedAxies", 456),
+        ("transfer", 30)
+    ]
+
+
+@patch("trezor.trezor_breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details",
+       side_effect=lambda ids: {i: {"breed_count": 0, "parents": set(), "stage": 4} for i in ids})
+@patch("trezor.trezor_pipeline.ethereum.sign_tx", side_effect=sign_tx)
+@patch("trezor.trezor_breeding.check_balance", side_effect=lambda acc, token: 10000 if token == "slp" else 10 ** 18)
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", autospec=True,
+       side_effect=lambda pipeline: [sign_transaction(t.client, t.bip_path, t.build(0)) for t in pipeline.transactions])
+def test_breed_manager_execute_fee_resumes_payment_session(_, __, ___, _details, _owners, _balances, tmpdir):
+    acc = "ronin:" + "1" * 40
+    payment_acc = "ronin:" + "2" * 40
+    c_file = tmpdir.join("c.json")
+    c_file.write(json.dumps({acc: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+                             payment_acc: {"passphrase": "fees", "bip_path": "m/44'/60'/0'/0/0"}}))
+    b_file = tmpdir.join("b.json")
+    b_file.write(json.dumps([{"Sire": 1234, "Matron": 5678, "AccountAddress": acc},
+                             {"Sire": 123, "Matron": 456, "AccountAddress": acc}]))
+    device = FakeDevice()
+    with patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(device=device)):
+        abm = TrezorAxieBreedManager(b_file, c_file, payment_acc)
+        abm.execute()
+    breeder, payer = abm.sessions.client(acc), abm.sessions.client(payment_acc)
+    assert breeder.session_id != payer.session_id
+    # The fee is signed with the session of the payment account passphrase, not the one of the breeds before it
+    assert [session for _, session in device.signatures] == [breeder.session_id, breeder.session_id, payer.session_id]
+
+
+@patch("trezor.trezor_breeding.fetch_balances", return_value={})
+@patch("axie.preflight.fetch_owners", return_value={})
+@patch("axie.preflight.fetch_axie_details", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", return_value=[])
 @patch("trezor.trezor_breeding.check_balance", return_value=0)
-def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, __, ___, ____, mocked_client, tmpdir, caplog):
+def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, mocked_client, _details, _owners, _balances,
+                                              tmpdir, caplog):
     acc = 'ronin:<accountfoo_address>' + "".join([str(x) for x in range(10)]*4)
     c_file = tmpdir.join("c.json")
     config_data = {acc: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
@@ -237,6 +300,7 @@ def test_breed_manager_execute_not_enough_slp(mock_check_balance, _, __, ___, __
     with patch.object(sys, "exit") as mocked_sys:
         abm.execute()
     mocked_sys.assert_called_once()
-    mock_check_balance.assert_called_once()
+    # Once for the SLP and once for the AXS of the account
+    assert mock_check_balance.call_count == 2
     mocked_client.assert_called()
-    assert "Not enough SLP funds to pay for breeding and the fee" in caplog.text
+    assert "Not enough SLP or AXS funds to pay for breeding and the fee" in caplog.text
@@ -1,8 +1,11 @@
 import sys
+import asyncio
+from datetime import datetime
 
 from mock import patch
 
 from trezor import TrezorAxieClaimsManager
+from tests.trezor.fakes import FakeClient
 
 
 @patch("trezor.TrezorAxieClaimsManager.load_trezor_config_and_acc_name", return_value=("foo", "bar"))
@@ -86,9 +89,10 @@ def test_claims_manager_verify_inputs_wrong_public_ronin(caplog):
     assert f"Public address {scholar_acc} needs to start with ronin:" in caplog.text
 
 
-@patch("trezor.trezor_claims.get_default_client", return_value="client")
+@patch("axie.eligibility.fetch_claim_status", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_claims.TrezorClaim.async_execute")
-def test_claims_manager_prepare_claims(mocked_claim_execute, mock_client):
+def test_claims_manager_prepare_claims(mocked_claim_execute, mock_client, _):
     scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*4)
     p_file = {
         "Manager": "ronin:<Manager address here>",
@@ -108,3 +112,51 @@ def test_claims_manager_prepare_claims(mocked_claim_execute, mock_client):
     axc.prepare_claims()
     mocked_claim_execute.assert_called_once()
     mock_client.assert_called()
+
+
+@patch("axie.eligibility.fetch_claim_status")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_claims.TrezorClaim.async_execute")
+def test_claims_manager_prepare_claims_skips_not_claimable(mocked_claim_execute, mock_client, mocked_fetch, caplog):
+    p_file = {"scholars": [
+        {"name": "Scholar 1", "ronin": "ronin:1", "splits": []},
+        {"name": "Scholar 2", "ronin": "ronin:2", "splits": []}]}
+    c_file = {
+        "ronin:1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+        "ronin:2": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"}}
+    mocked_fetch.return_value = {"ronin:2": {"last_claimed": datetime(2022, 1, 1), "unclaimed": 0}}
+    axc = TrezorAxieClaimsManager(p_file, c_file)
+    axc.prepare_claims()
+    mocked_claim_execute.assert_called_once()
+    # The device is only asked for the accounts that can claim
+    mock_client.assert_called_once()
+    assert "Important: Account Scholar 2 (ronin:2) has no claimable SLP" in caplog.text
+
+
+@patch("axie.eligibility.fetch_claim_status", return_value={})
+@patch("trezor.trezor_sessions.TrezorSessionPool.device",
+       side_effect=lambda acc: "udp:2" if acc == "ronin:3" else "udp:1")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+def test_claims_manager_prepare_claims_in_order_per_device(_, __, ___):
+    events = []
+
+    async def execute(claim):
+        events.append(("start", claim.account))
+        await asyncio.sleep(0)
+        events.append(("end", claim.account))
+
+    p_file = {"scholars": [
+        {"name": "Scholar 1", "ronin": "ronin:1", "splits": []},
+        {"name": "Scholar 2", "ronin": "ronin:2", "splits": []},
+        {"name": "Scholar 3", "ronin": "ronin:3", "splits": []}]}
+    c_file = {
+        "ronin:1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+        "ronin:2": {"passphrase": "secret", "bip_path": "m/44'/60'/0'/0/0"},
+        "ronin:3": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
+    axc = TrezorAxieClaimsManager(p_file, c_file)
+    with patch("trezor.trezor_claims.TrezorClaim.async_execute", new=execute):
+        axc.prepare_claims()
+    accounts = [(event, acc.replace("0x", "ronin:")) for event, acc in events]
+    # The second device claims alongside the first one, whose passphrases do not interleave
+    assert accounts == [("start", "ronin:1"), ("start", "ronin:3"), ("end", "ronin:1"), ("start", "ronin:2"),
+                        ("end", "ronin:3"), ("end", "ronin:2")]
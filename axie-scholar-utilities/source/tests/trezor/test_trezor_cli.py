@@ -4,12 +4,15 @@ import builtins
 import json
 
 from docopt import docopt, DocoptExit
-from mock import patch, call
+from mock import patch, call, ANY
 import pytest
 
 import trezor_axie_scholar_cli as cli
 
 
+BATCH_CONTRACT = "0x" + "9" * 40
+
+
 @pytest.mark.parametrize("params, expected_result",
                          [
                             (["payout", "file1", "file2"],
@@ -18,6 +21,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -48,6 +54,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -78,6 +87,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -108,6 +120,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": True,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -138,6 +153,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -168,6 +186,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': '1',
                               'managed_scatter_ron': False,
@@ -198,6 +219,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': '1',
                               'managed_scatter_ron': True,
@@ -228,6 +252,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -258,6 +285,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -288,6 +318,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -318,6 +351,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -348,6 +384,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -378,6 +417,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -408,6 +450,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -438,6 +483,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -468,6 +516,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": True,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -498,6 +549,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -528,6 +582,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -558,6 +615,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': "a,b,c",
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -588,6 +648,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -618,6 +681,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -648,6 +714,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -678,6 +747,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -708,6 +780,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -738,6 +813,9 @@ import trezor_axie_scholar_cli as cli
                               "--version": False,
                               "--yes": False,
                               "--safe-mode": False,
+                              "--bulk": None,
+                              "--approve-bulk": False,
+                              "--summary": None,
                               '<list_of_accounts>': None,
                               '<min_amount>': None,
                               'managed_scatter_ron': False,
@@ -845,7 +923,11 @@ def test_config_trezor_no_config_file(mock_account_setup, mock_update_config, tm
              '{"Name": "Acc2", "AccountAddress": "ronin:<account_s2_address>"}]}')
     with patch.object(sys, 'argv', ["", "config_trezor", f1.strpath]):
         cli.run_cli()
-    mock_account_setup.assert_called_with({"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"},{"Name": "Acc2", "AccountAddress": "ronin:<account_s2_address>"}]}, None, None)
+    mock_account_setup.assert_called_with(
+        {"Scholars": [{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"},
+                      {"Name": "Acc2", "AccountAddress": "ronin:<account_s2_address>"}]},
+        None,
+        None)
     mock_update_config.assert_called()
 
 
@@ -860,7 +942,8 @@ def test_config_trezor_config_file(mock_account_setup, mock_update_config, tmpdi
     with patch.object(sys, 'argv', ["", "config_trezor", f1.strpath, f2.strpath]):
         cli.run_cli()
     mock_account_setup.assert_called_with(
-        {"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"},{"Name": "Acc2", "AccountAddress": "ronin:<account_s2_address>"}]},
+        {"Scholars": [{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"},
+                      {"Name": "Acc2", "AccountAddress": "ronin:<account_s2_address>"}]},
         {},
         str(f2))
     mock_update_config.assert_called()
@@ -993,10 +1076,13 @@ def test_generate_transfer_file(tmpdir):
     ]
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxiePaymentsManager.__init__", return_value=None)
 @patch("trezor.TrezorAxiePaymentsManager.verify_inputs")
+@patch("trezor.TrezorAxiePaymentsManager.load_balances")
 @patch("trezor.TrezorAxiePaymentsManager.prepare_payout")
-def test_payout_takes_auto_parameter(mock_prepare_payout, mock_verify_input, mocked_paymentsmanager, tmpdir):
+def test_payout_takes_auto_parameter(mock_prepare_payout, mock_load_balances, mock_verify_input, mocked_paymentsmanager,
+                                     _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
     f2 = tmpdir.join("file2.json")
@@ -1005,14 +1091,20 @@ def test_payout_takes_auto_parameter(mock_prepare_payout, mock_verify_input, moc
     with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2)]):
         cli.run_cli()
     mock_prepare_payout.assert_called_with()
+    mock_load_balances.assert_called_with()
     mock_verify_input.assert_called_with()
-    mocked_paymentsmanager.assert_called_with({"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}, config_data, auto=False)
+    mocked_paymentsmanager.assert_called_with(
+        {"Scholars": [{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]},
+        config_data, auto=False, devices=["udp:1"])
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxiePaymentsManager.__init__", return_value=None)
 @patch("trezor.TrezorAxiePaymentsManager.verify_inputs")
+@patch("trezor.TrezorAxiePaymentsManager.load_balances")
 @patch("trezor.TrezorAxiePaymentsManager.prepare_payout")
-def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_verify_inputs, mocked_paymentsmanager, tmpdir):
+def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_load_balances, mock_verify_inputs,
+                                         mocked_paymentsmanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
     f2 = tmpdir.join("file2.json")
@@ -1021,14 +1113,40 @@ def test_payout_takes_auto_parameter_yes(mock_prepare_payout, mock_verify_inputs
     with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), "-y"]):
         cli.run_cli()
     mock_prepare_payout.assert_called_with()
+    mock_load_balances.assert_called_with()
     mock_verify_inputs.assert_called_with()
-    mocked_paymentsmanager.assert_called_with({"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}, config_data, auto=True)
+    mocked_paymentsmanager.assert_called_with(
+        {"Scholars": [{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]},
+        config_data, auto=True, devices=["udp:1"])
+
+
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
+@patch("trezor.TrezorAxiePaymentsManager.__init__", return_value=None)
+@patch("trezor.TrezorAxiePaymentsManager.verify_inputs")
+@patch("trezor.TrezorAxiePaymentsManager.load_balances")
+@patch("trezor.TrezorAxiePaymentsManager.prepare_payout")
+def test_payout_saves_summary(mock_prepare_payout, mock_load_balances, mock_verify_inputs, mocked_paymentsmanager,
+                              _devices, tmpdir):
+    from axie.payments import PaymentsSummary
+    summary = PaymentsSummary()
+    summary.increase_payout(40, "ronin:<manager_address>", "manager")
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"Scholars":[{"Name": "Acc1", "AccountAddress": "ronin:<account_s1_address>"}]}')
+    f2 = tmpdir.join("file2.json")
+    f2.write(json.dumps({"ronin:<account_s1_address>": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/48"}}))
+    f3 = tmpdir.join("summary.json")
+    with patch("trezor.TrezorAxiePaymentsManager.summary", summary, create=True):
+        with patch.object(sys, 'argv', ["", "payout", str(f1), str(f2), f"--summary={f3}"]):
+            cli.run_cli()
+    mock_prepare_payout.assert_called_with()
+    assert json.loads(f3.read())["receivers"]["manager"] == {"ronin:<manager_address>": 40}
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieClaimsManager.__init__", return_value=None)
 @patch("trezor.TrezorAxieClaimsManager.prepare_claims")
 @patch("trezor.TrezorAxieClaimsManager.verify_inputs")
-def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpdir):
+def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     f2 = tmpdir.join("file2.json")
@@ -1038,13 +1156,15 @@ def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpd
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_claims.assert_called_with()
-    mock_claimsmanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, False)
+    mock_claimsmanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, False, token_cache=ANY,
+                                          devices=["udp:1"])
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieClaimsManager.__init__", return_value=None)
 @patch("trezor.TrezorAxieClaimsManager.prepare_claims")
 @patch("trezor.TrezorAxieClaimsManager.verify_inputs")
-def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpdir):
+def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     f2 = tmpdir.join("file2.json")
@@ -1054,7 +1174,8 @@ def test_claim(mock_verify_inputs, mock_prepare_claims, mock_claimsmanager, tmpd
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_claims.assert_called_with()
-    mock_claimsmanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, True)
+    mock_claimsmanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, True, token_cache=ANY,
+                                          devices=["udp:1"])
 
 
 def test_claim_file_check_fail(caplog):
@@ -1071,10 +1192,11 @@ def test_transfer_file_check_fail(caplog):
     assert "Please review your file paths and re-try." in caplog.text
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieTransferManager.__init__", return_value=None)
 @patch("trezor.TrezorAxieTransferManager.prepare_transfers")
 @patch("trezor.TrezorAxieTransferManager.verify_inputs")
-def test_transfer(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, tmpdir):
+def test_transfer(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     f2 = tmpdir.join("file2.json")
@@ -1084,13 +1206,15 @@ def test_transfer(mock_verify_inputs, mock_prepare_transfers, mock_transfersmana
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_transfers.assert_called_with()
-    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False)
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False, stream=True, bulk_contract=None,
+                                             devices=["udp:1"], approve=False)
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieTransferManager.__init__", return_value=None)
 @patch("trezor.TrezorAxieTransferManager.prepare_transfers")
 @patch("trezor.TrezorAxieTransferManager.verify_inputs")
-def test_transfer_secure(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, tmpdir):
+def test_transfer_secure(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     f2 = tmpdir.join("file2.json")
@@ -1100,7 +1224,28 @@ def test_transfer_secure(mock_verify_inputs, mock_prepare_transfers, mock_transf
         cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_prepare_transfers.assert_called_with()
-    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=True)
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=True, stream=True, bulk_contract=None,
+                                             devices=["udp:1"], approve=False)
+
+
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
+@patch("trezor.TrezorAxieTransferManager.__init__", return_value=None)
+@patch("trezor.TrezorAxieTransferManager.prepare_transfers")
+@patch("trezor.TrezorAxieTransferManager.verify_inputs")
+def test_transfer_bulk(mock_verify_inputs, mock_prepare_transfers, mock_transfersmanager, _devices, tmpdir):
+    f1 = tmpdir.join("file1.json")
+    f1.write('{"ronin:<account_s1_address>": "hello"}')
+    f2 = tmpdir.join("file2.json")
+    config_data = {"ronin:<account_s1_address>": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/48"}}
+    f2.write(json.dumps(config_data))
+    args = ["", "transfer_axies", str(f1), str(f2), "--bulk", BATCH_CONTRACT, "--approve-bulk"]
+    with patch.object(sys, 'argv', args):
+        with patch.object(builtins, 'input', lambda _: 'y'):
+            cli.run_cli()
+    mock_verify_inputs.assert_called_with()
+    mock_prepare_transfers.assert_called_with()
+    mock_transfersmanager.assert_called_with(str(f1), str(f2), secure=False, stream=True, bulk_contract=BATCH_CONTRACT,
+                                             devices=["udp:1"], approve=True)
 
 
 def test_axie_morphing_file_check_fail(caplog):
@@ -1110,19 +1255,21 @@ def test_axie_morphing_file_check_fail(caplog):
     assert "Please review your file paths and re-try." in caplog.text
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieMorphingManager.__init__", return_value=None)
 @patch("axie_utils.Axies.__init__", return_value=None)
 @patch("axie_utils.Axies.find_axies_to_morph", return_value=[1, 2, 3])
 @patch("trezor.TrezorAxieMorphingManager.execute")
 @patch("trezor.TrezorAxieMorphingManager.verify_inputs")
-def test_axie_morphing(mock_veritfy_inputs, mock_morphing_execute, mock_find_axies, mock_axies_init, mock_morphingmanager, tmpdir): # noqa
+def test_axie_morphing(mock_veritfy_inputs, mock_morphing_execute, mock_find_axies, mock_axies_init, mock_morphingmanager, _devices, tmpdir): # noqa
     f = tmpdir.join("file2.json")
     config_data = {"ronin:<account_s1_address>": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/48"}}
     f.write(json.dumps(config_data))
     with patch.object(sys, 'argv', ["", "axie_morphing", str(f), "foo,bar"]):
         cli.run_cli()
     mock_axies_init.assert_has_calls([call('foo'), call('bar')])
-    mock_morphingmanager.assert_has_calls([call([1, 2, 3], "foo", str(f)), call([1, 2, 3], "bar", str(f))])
+    mock_morphingmanager.assert_has_calls([call([1, 2, 3], "foo", str(f), devices=["udp:1"]),
+                                           call([1, 2, 3], "bar", str(f), devices=["udp:1"])])
     assert mock_veritfy_inputs.call_count == 2
     assert mock_find_axies.call_count == 2
     assert mock_morphing_execute.call_count == 2
@@ -1153,10 +1300,11 @@ def test_axiebreeding_file_check_fail(caplog):
     assert "Please review your file paths and re-try." in caplog.text
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorAxieBreedManager.__init__", return_value=None)
 @patch("trezor.TrezorAxieBreedManager.execute")
 @patch("trezor.TrezorAxieBreedManager.verify_inputs")
-def test_breeding(mock_verify_inputs, mock_execute_breeding, mock_breedingmanager, tmpdir):
+def test_breeding(mock_verify_inputs, mock_execute_breeding, mock_breedingmanager, _devices, tmpdir):
     acc = "ronin:45a1bc784c665e123597d3f29375e45786611234"
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
@@ -1168,7 +1316,7 @@ def test_breeding(mock_verify_inputs, mock_execute_breeding, mock_breedingmanage
             cli.run_cli()
     mock_verify_inputs.assert_called_with()
     mock_execute_breeding.assert_called_with()
-    mock_breedingmanager.assert_called_with(str(f1), str(f2), acc)
+    mock_breedingmanager.assert_called_with(str(f1), str(f2), acc, stream=True, devices=["udp:1"])
 
 
 def test_qrcode_file_check_fail(caplog):
@@ -1178,9 +1326,10 @@ def test_qrcode_file_check_fail(caplog):
     assert "Please review your file paths and re-try." in caplog.text
 
 
+@patch("trezor.trezor_devices.connected_devices", return_value=["udp:1"])
 @patch("trezor.TrezorQRCodeManager.__init__", return_value=None)
 @patch("trezor.TrezorQRCodeManager.execute")
-def test_qrcode(mock_execute, mock_qrcodemanager, tmpdir):
+def test_qrcode(mock_execute, mock_qrcodemanager, _devices, tmpdir):
     f1 = tmpdir.join("file1.json")
     f1.write('{"ronin:<account_s1_address>": "hello"}')
     f2 = tmpdir.join("file2.json")
@@ -1189,4 +1338,5 @@ def test_qrcode(mock_execute, mock_qrcodemanager, tmpdir):
     with patch.object(sys, 'argv', ["", "generate_QR", str(f1), str(f2)]):
         cli.run_cli()
     mock_execute.assert_called_with()
-    mock_qrcodemanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, os.path.dirname(f2))
+    mock_qrcodemanager.assert_called_with({"ronin:<account_s1_address>": "hello"}, config_data, os.path.dirname(f2),
+                                          token_cache=ANY, devices=["udp:1"])
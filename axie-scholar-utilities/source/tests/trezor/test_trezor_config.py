@@ -1,9 +1,22 @@
 import builtins
 import json
 
-from mock import patch
+from mock import patch, Mock
+from trezorlib.tools import parse_path
 
 from trezor import TrezorAccountsSetup
+from tests.trezor.fakes import FakeClient
+
+
+# Node m/0'/1/2' of the first BIP32 test vector
+NODE = Mock(public_key=bytes.fromhex("0357bfe1e341d01c69fe5654309956cbea516822fba8a601743a012a7896ee8dc2"),
+            chain_code=bytes.fromhex("04466b9cc8e161e966409ca52986c584f07e9dc81f735db683c3ff6ec7b1503f"))
+NODE_ADDRESSES = [
+    "ronin:c2cfd05ef0a4e1663ab4f93667d536e90b0872c6",
+    "ronin:f913ebb64db80f3dd7f615d9b681339244607b5a",
+    "ronin:1d3462d2319ac0bfc1a52e177a9d372492752130",
+    "ronin:84ec0aa4e1976419ae585a8212cc42d103afec95"
+]
 
 
 def test_trezor_setup_init():
@@ -50,18 +63,23 @@ def test_trezor_setup_update_already_existing(caplog):
     assert 'Trezor_config file saved!' in caplog.text
 
 
-@patch('trezor.trezor_setup.ethereum.get_address', return_value='ronin:<account_s1_address>01234567890123456789')
-@patch('trezor.trezor_setup.get_default_client')
-def test_trezor_setup_update(mock_client, mock_get_address, caplog):
+@patch('trezor.trezor_setup.ethereum.get_public_node', return_value=Mock(node=NODE))
+@patch('trezor.trezor_sessions.get_default_client', side_effect=lambda path, ui: FakeClient())
+def test_trezor_setup_update(mock_client, mock_get_public_node, tmpdir, caplog):
     manager_acc = 'ronin:<manager_address>000' + "".join([str(x) for x in range(10)]*2)
     dono_acc = 'ronin:<donations_address>0' + "".join([str(x) for x in range(10)]*2)
-    scholar_acc = 'ronin:<account_s1_address>' + "".join([str(x) for x in range(10)]*2)
     p_file = {
         "Manager": manager_acc,
         "Scholars": [
             {
                 "Name": "Scholar 1",
-                "AccountAddress": scholar_acc,
+                "AccountAddress": NODE_ADDRESSES[2],
+                "ScholarPayoutAddress": "ronin:<scholar_address>",
+                "ScholarPercent": 55
+            },
+            {
+                "Name": "Scholar 2",
+                "AccountAddress": NODE_ADDRESSES[0].upper().replace("RONIN:", "ronin:"),
                 "ScholarPayoutAddress": "ronin:<scholar_address>",
                 "ScholarPercent": 55
             }
@@ -74,10 +92,31 @@ def test_trezor_setup_update(mock_client, mock_get_address, caplog):
             }
         ]
     }
-    tas = TrezorAccountsSetup(p_file)
-    with patch.object(builtins, 'input', lambda _: 1):
+    config_path = str(tmpdir.join("trezor_config.json"))
+    tas = TrezorAccountsSetup(p_file, path=config_path)
+    with patch.object(builtins, 'input', lambda _: "pass"):
         tas.update_trezor_config()
-        mock_client.assert_called()
-        mock_get_address.assert_called()
+    # The device is only asked once for the public node, addresses are derived locally
+    mock_client.assert_called_once()
+    mock_get_public_node.assert_called_once_with("client", parse_path("m/44'/60'/0'/0"))
+    assert tas.trezor_config == {
+        NODE_ADDRESSES[2]: {"passphrase": "pass", "bip_path": "m/44'/60'/0'/0/2"},
+        NODE_ADDRESSES[0]: {"passphrase": "pass", "bip_path": "m/44'/60'/0'/0/0"}
+    }
+    with open(config_path, encoding='utf-8') as f:
+        assert json.load(f) == tas.trezor_config
+    assert "Scanned 3 addresses of that passphrase, 0 accounts left" in caplog.text
     assert 'Gathered all accounts config, saving trezor_config file' in caplog.text
     assert 'Trezor_config file saved!' in caplog.text
+
+
+@patch('trezor.trezor_setup.ethereum.get_public_node', return_value=Mock(node=NODE))
+@patch('trezor.trezor_sessions.get_default_client', side_effect=lambda path, ui: FakeClient())
+def test_trezor_setup_scan_passphrase_gap_limit(_, __, caplog):
+    tas = TrezorAccountsSetup({}, gap_limit=2)
+    accounts = [NODE_ADDRESSES[1], NODE_ADDRESSES[3], "ronin:" + "f" * 40]
+    tas.scan_passphrase("", accounts)
+    # Index 3 is matched because the gap restarts after index 1, the unknown account stops the scan at 5
+    assert accounts == ["ronin:" + "f" * 40]
+    assert tas.trezor_config[NODE_ADDRESSES[3]] == {"passphrase": "", "bip_path": "m/44'/60'/0'/0/3"}
+    assert "Scanned 6 addresses of that passphrase, 1 accounts left" in caplog.text
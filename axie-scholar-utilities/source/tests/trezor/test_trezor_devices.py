@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from mock import patch, Mock
+from trezorlib import ethereum
+from trezorlib.client import get_default_client
+from trezorlib.tools import parse_path
+
+from axie_utils import CustomUI
+from trezor.trezor_devices import connected_devices, derive_child, public_key_address
+from trezor.trezor_sessions import TrezorSessionPool
+
+
+@patch("trezor.trezor_devices.enumerate_devices")
+def test_connected_devices_detected(mock_enumerate, monkeypatch, caplog):
+    monkeypatch.delenv("TREZOR_DEVICES", raising=False)
+    mock_enumerate.return_value = [Mock(get_path=lambda: "webusb:001:1"), Mock(get_path=lambda: "udp:127.0.0.1:21324")]
+    assert connected_devices() == ["webusb:001:1", "udp:127.0.0.1:21324"]
+    assert "Found 2 trezor devices: webusb:001:1, udp:127.0.0.1:21324" in caplog.text
+
+
+@patch("trezor.trezor_devices.enumerate_devices")
+def test_connected_devices_from_env(mock_enumerate, monkeypatch):
+    monkeypatch.setenv("TREZOR_DEVICES", "udp:127.0.0.1:21324, udp:127.0.0.1:21326,")
+    assert connected_devices() == ["udp:127.0.0.1:21324", "udp:127.0.0.1:21326"]
+    mock_enumerate.assert_not_called()
+
+
+def test_derive_child_bip32_vectors():
+    public_key, chain_code = derive_child(
+        bytes.fromhex("035a784662a4a20a65bf6aab9ae98a6c068a81c52e4b032c0fb5400c706cfccc56"),
+        bytes.fromhex("47fdacbd0f1097043b78c63c20c34ef4ed9a111d980047ad16282c7ae6236141"),
+        1)
+    assert public_key.hex() == "03501e454bf00751f24b1b489aa925215d66af2234e3891c3b21a52bedb3cd711c"
+    assert chain_code.hex() == "2a7857631386ba23dacac34180dd1983734e444fdbf774041578e9b6adb37c19"
+    public_key, chain_code = derive_child(
+        bytes.fromhex("0357bfe1e341d01c69fe5654309956cbea516822fba8a601743a012a7896ee8dc2"),
+        bytes.fromhex("04466b9cc8e161e966409ca52986c584f07e9dc81f735db683c3ff6ec7b1503f"),
+        2)
+    assert public_key.hex() == "02e8445082a72f29b75ca48748a914df60622a609cacfce8ed0e35804560741d29"
+    assert chain_code.hex() == "cfb71883f01676f587d023cc53a35bc7f88f724b1f8c2892ac1275ac822a3edd"
+
+
+def test_public_key_address():
+    generator = bytes.fromhex("0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798")
+    assert public_key_address(generator) == "ronin:7e5f4552091a69125d5dfcb7b8c2659029395bdf"
+
+
+@pytest.mark.skipif(len(os.getenv("TREZOR_DEVICES", "").split(",")) < 2,
+                    reason="Needs TREZOR_DEVICES to list at least two emulators loaded with different seeds")
+def test_locate_accounts_on_emulators():
+    devices = connected_devices()
+    config = {}
+    for device in devices:
+        client = get_default_client(path=device, ui=CustomUI(passphrase=""))
+        address = ethereum.get_address(client, parse_path("m/44'/60'/0'/0/0")).lower().replace("0x", "ronin:")
+        config[address] = {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0", "device": device}
+    assert len(config) == len(devices)
+    sessions = TrezorSessionPool(config, devices)
+    for account, account_config in config.items():
+        assert sessions.device(account) == account_config["device"]
@@ -4,6 +4,7 @@ import json
 from mock import patch, call
 
 from trezor import TrezorAxieMorphingManager
+from tests.trezor.fakes import FakeClient
 
 
 @patch("trezor.trezor_morphing.load_json", return_value={"foo": "bar"})
@@ -40,7 +41,7 @@ def test_morph_manager_verify_input_fail(tmpdir, caplog):
     assert f"Account '{scholar_acc}' is not present in trezor config, please re-run trezor setup." in caplog.text
 
 
-@patch("trezor.trezor_morphing.get_default_client", return_value='client')
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_morphing.TrezorMorph.execute", return_value=None)
 @patch("trezor.trezor_morphing.TrezorMorph.__init__", return_value=None)
 def test_morph_manager_execute(mock_morph_init, mock_morph_execute, mock_client, tmpdir):
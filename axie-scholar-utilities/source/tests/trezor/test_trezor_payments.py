@@ -1,9 +1,10 @@
 import sys
 
-from mock import patch
+from mock import patch, Mock
 
 from trezor import TrezorAxiePaymentsManager
 from trezor.trezor_payments import CREATOR_FEE_ADDRESS
+from tests.trezor.fakes import FakeClient
 
 
 def test_payments_manager_init():
@@ -226,14 +227,14 @@ def test_payments_manager_prepare_payout(mocked_prepare_payout):
     mocked_prepare_payout.assert_called_once()
 
 
-@patch("trezor.trezor_payments.get_default_client", return_value="client")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_payments.check_balance", return_value=1000)
-@patch("axie_utils.TrezorScatter.execute")
-@patch("axie_utils.TrezorScatter.__init__", return_value=None)
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", return_value=[])
+@patch("trezor.TrezorAxiePaymentsManager.add_scatter")
 @patch("trezor.TrezorAxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_prepare_payout_check_correct_payments(mocked_enough_balance,
-                                                                mocked_scatter_init,
-                                                                mocked_scatter_execute,
+                                                                mocked_add_scatter,
+                                                                mocked_run,
                                                                 mocked_check_balance,
                                                                 mocked_client):
     scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
@@ -264,8 +265,8 @@ def test_payments_manager_prepare_payout_check_correct_payments(mocked_enough_ba
     mocked_client.assert_called()
     mocked_check_balance.assert_called()
     mocked_enough_balance.assert_called_with(scholar_acc, 1000)
-    mocked_scatter_init.assert_called_with(
-        'slp',
+    mocked_add_scatter.assert_called_with(
+        "Scholar 1",
         scholar_acc,
         'client',
         config_data[scholar_acc]['bip_path'],
@@ -275,18 +276,25 @@ def test_payments_manager_prepare_payout_check_correct_payments(mocked_enough_ba
            dono_acc: 10,
            CREATOR_FEE_ADDRESS : 10,
            manager_acc: 380 
+        },
+        {
+            "ronin:<scholar_address>": "scholar",
+            "ronin:<trainer_address>": "trainer",
+            dono_acc: "donation",
+            CREATOR_FEE_ADDRESS: "donation",
+            manager_acc: "manager"
         }
     )
-    mocked_scatter_execute.assert_called()
+    mocked_run.assert_called_once()
 
-@patch("trezor.trezor_payments.get_default_client", return_value="client")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_payments.check_balance", return_value=0)
-@patch("axie_utils.TrezorScatter.execute")
-@patch("axie_utils.TrezorScatter.__init__", return_value=None)
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", return_value=[])
+@patch("trezor.TrezorAxiePaymentsManager.add_scatter")
 @patch("trezor.TrezorAxiePaymentsManager.check_acc_has_enough_balance", return_value=True)
 def test_payments_manager_prepare_payout_check_correct_payments_no_balance(mocked_enough_balance,
-                                                                           mocked_scatter_init,
-                                                                           mocked_scatter_execute,
+                                                                           mocked_add_scatter,
+                                                                           mocked_run,
                                                                            mocked_check_balance,
                                                                            mocked_client):
     scholar_acc = 'ronin:12345678900987654321' + "".join([str(x) for x in range(10)]*2)
@@ -317,5 +325,45 @@ def test_payments_manager_prepare_payout_check_correct_payments_no_balance(mocke
     mocked_client.assert_called()
     mocked_check_balance.assert_called()
     mocked_enough_balance.assert_called_with(scholar_acc, 0)
-    mocked_scatter_init.assert_not_called()
-    mocked_scatter_execute.assert_not_called()
\ No newline at end of file
+    mocked_add_scatter.assert_not_called()
+
+@patch("trezor.trezor_payments.fetch_balances", return_value={'ronin:<account_s1_address>': 1000})
+def test_payments_manager_load_balances(mocked_fetch):
+    taxp = TrezorAxiePaymentsManager({}, {})
+    taxp.type = "legacy"
+    taxp.scholar_accounts = [{"AccountAddress": "ronin:<account_s1_address>"}]
+    taxp.load_balances()
+    mocked_fetch.assert_called_with(["ronin:<account_s1_address>"])
+    assert taxp.balances == {'ronin:<account_s1_address>': 1000}
+
+
+@patch("trezor.trezor_payments.check_balance", return_value=5)
+def test_payments_manager_get_balance_reads_snapshot(mocked_check_balance):
+    taxp = TrezorAxiePaymentsManager({}, {})
+    taxp.balances = {"ronin:<account_s1_address>": 1000}
+    assert taxp.get_balance("ronin:<account_s1_address>") == 1000
+    assert taxp.check_acc_has_enough_balance("ronin:<account_s1_address>", 1000) is True
+    mocked_check_balance.assert_not_called()
+
+
+@patch("axie.receipts.fetch_receipts", return_value={"0xhash": {"status": "0x1"}})
+@patch("trezor.trezor_payments.chunk_scatter")
+def test_payments_manager_summary_counts_confirmed_scatters(mocked_chunk, _, caplog):
+    chunk = Mock(amounts={"ronin:a": 10, "ronin:b": 5})
+    chunk.is_approved.return_value = True
+    chunk.transaction_gas.return_value = 100000
+    chunk.total.return_value = 15
+    mocked_chunk.return_value = [chunk]
+    axp = TrezorAxiePaymentsManager({}, {})
+    axp.add_scatter("Scholar 1", "ronin:1", "client", "m/44'/60'/0'/0/0", {"ronin:a": 10, "ronin:b": 5},
+                    {"ronin:a": "scholar", "ronin:b": "manager"})
+
+    def run():
+        for transaction in axp.pipeline.transactions:
+            axp.receipts.track(transaction.kind, str(transaction), "0xhash")
+        return [(transaction, "0xhash") for transaction in axp.pipeline.transactions]
+
+    with patch.object(axp.pipeline, "run", side_effect=run):
+        axp.execute_scatters()
+    assert axp.summary.sources == {"ronin:1": {"manager": 5, "scholar": 10, "trainer": 0, "other": 0, "donation": 0}}
+    assert "Paid 1 managers, 5 SLP.\nPaid 1 scholars, 10 SLP." in caplog.text
@@ -0,0 +1,150 @@
+import threading
+
+from mock import patch, call, MagicMock
+from requests.exceptions import RequestException
+from trezorlib.tools import parse_path
+
+from trezor.trezor_pipeline import TrezorSigningPipeline, TrezorTransaction
+from trezor.trezor_sessions import TrezorSessionPool
+from tests.trezor.fakes import FakeClient, FakeDevice, sign_tx
+
+
+ACC_1 = "ronin:" + "1" * 40
+ACC_2 = "ronin:" + "2" * 40
+
+
+def function(name, fail=False):
+    """ Contract function whose built transaction records its nonce """
+    mocked = MagicMock()
+    if fail:
+        mocked.buildTransaction.side_effect = ValueError("build error")
+    else:
+        mocked.buildTransaction.side_effect = lambda params: {"name": name, "nonce": params["nonce"]}
+    return mocked
+
+
+def transaction(name, acc=ACC_1, fail=False, device=None):
+    return TrezorTransaction("Transfer", name, acc, "client", "m/44'/60'/0'/0/0", function(name, fail), device=device)
+
+
+def raw(name):
+    return f"raw_{name}".encode()
+
+
+def sign(client, bip_path, tx):
+    if tx["name"] == "unsigned":
+        raise Exception("device error")
+    return raw(tx["name"])
+
+
+def test_trezor_transaction_init():
+    t = transaction("foo", acc=ACC_1.upper().replace("RONIN:", "ronin:"))
+    assert t.from_acc == "0x" + "1" * 40
+    assert t.bip_path == parse_path("m/44'/60'/0'/0/0")
+    assert str(t) == "foo"
+
+
+@patch("trezor.trezor_pipeline.sign_transaction", side_effect=sign)
+@patch("trezor.trezor_pipeline.get_nonce", side_effect=lambda acc: 10 if acc.endswith("1") else 20)
+def test_pipeline_run_nonces_per_account(mock_nonce, mock_sign):
+    receipts = MagicMock()
+    pipeline = TrezorSigningPipeline(receipts)
+    for t in [transaction("a"), transaction("b", ACC_2), transaction("broken", fail=True), transaction("c")]:
+        pipeline.add(t)
+    with patch.object(pipeline.w3.eth, "send_raw_transaction") as mock_send:
+        sent = pipeline.run()
+    assert mock_nonce.call_count == 2
+    # The failed build does not use up its nonce
+    assert [call_args[0][2] for call_args in mock_sign.call_args_list] == [
+        {"name": "a", "nonce": 10}, {"name": "b", "nonce": 20}, {"name": "c", "nonce": 11}]
+    assert sorted(call_args[0][0] for call_args in mock_send.call_args_list) == [raw("a"), raw("b"), raw("c")]
+    assert [(str(t), h) for t, h in sent] == [
+        ("a", pipeline.w3.toHex(pipeline.w3.keccak(raw("a")))),
+        ("b", pipeline.w3.toHex(pipeline.w3.keccak(raw("b")))),
+        ("c", pipeline.w3.toHex(pipeline.w3.keccak(raw("c"))))]
+    assert receipts.track.call_count == 4
+    receipts.track.assert_any_call("Transfer", "broken", None)
+    receipts.track.assert_any_call("Transfer", "c", pipeline.w3.toHex(pipeline.w3.keccak(raw("c"))))
+    assert pipeline.transactions == []
+
+
+@patch("trezor.trezor_pipeline.sign_transaction", side_effect=sign)
+@patch("trezor.trezor_pipeline.get_nonce", return_value=0)
+def test_pipeline_run_sign_failure_skips_account(_, mock_sign, caplog):
+    receipts = MagicMock()
+    pipeline = TrezorSigningPipeline(receipts)
+    for t in [transaction("a"), transaction("unsigned"), transaction("b", ACC_2), transaction("c")]:
+        pipeline.add(t)
+    with patch.object(pipeline.w3.eth, "send_raw_transaction") as mock_send:
+        sent = pipeline.run()
+    assert mock_sign.call_count == 3
+    assert sorted(call_args[0][0] for call_args in mock_send.call_args_list) == [raw("a"), raw("b")]
+    assert [(str(t), h is not None) for t, h in sent] == [("a", True), ("unsigned", False), ("b", True), ("c", False)]
+    assert "Important: unsigned could not be signed. Error given: device error" in caplog.text
+    assert "Important: c skipped, an earlier transaction of its account was not signed" in caplog.text
+    receipts.track.assert_any_call("Transfer", "c", None)
+
+
+@patch("trezor.trezor_pipeline.sign_transaction", side_effect=sign)
+@patch("trezor.trezor_pipeline.get_nonce", return_value=0)
+def test_pipeline_run_broadcast_failure_skips_lane(_, __, caplog):
+    receipts = MagicMock()
+    pipeline = TrezorSigningPipeline(receipts, concurrency=1)
+    for t in [transaction("a"), transaction("b"), transaction("c", ACC_2)]:
+        pipeline.add(t)
+
+    def send(raw_transaction):
+        if raw_transaction == raw("a"):
+            raise RequestException("network error")
+
+    with patch.object(pipeline.w3.eth, "send_raw_transaction", side_effect=send) as mock_send:
+        sent = pipeline.run()
+    assert mock_send.call_args_list == [call(raw("a")), call(raw("c"))]
+    assert [(str(t), h is not None) for t, h in sent] == [("a", False), ("b", False), ("c", True)]
+    assert "Important: a could not be sent. Error given: network error" in caplog.text
+    assert "Important: b skipped, an earlier transaction of its account was not sent" in caplog.text
+    receipts.track.assert_any_call("Transfer", "a", None)
+    receipts.track.assert_any_call("Transfer", "b", None)
+
+
+@patch("trezor.trezor_pipeline.get_nonce", return_value=0)
+def test_pipeline_run_signs_on_devices_in_parallel(_):
+    # Each device waits for the other one to be signing, it only passes if they sign at the same time
+    signing = threading.Barrier(2, timeout=5)
+
+    def sign_on_device(client, bip_path, tx):
+        signing.wait()
+        return raw(tx["name"])
+
+    receipts = MagicMock()
+    pipeline = TrezorSigningPipeline(receipts)
+    for t in [transaction("a", device="udp:1"), transaction("b", ACC_2, device="udp:2"),
+              transaction("c", device="udp:1"), transaction("d", ACC_2, device="udp:2")]:
+        pipeline.add(t)
+    with patch("trezor.trezor_pipeline.sign_transaction", side_effect=sign_on_device), \
+            patch.object(pipeline.w3.eth, "send_raw_transaction"):
+        sent = pipeline.run()
+    assert [(str(t), h is not None) for t, h in sent] == [("a", True), ("b", True), ("c", True), ("d", True)]
+
+
+@patch("trezor.trezor_pipeline.ethereum.sign_tx", side_effect=sign_tx)
+@patch("trezor.trezor_pipeline.get_nonce", return_value=0)
+def test_pipeline_run_signs_with_session_of_each_passphrase(_, __):
+    device = FakeDevice()
+    config = {ACC_1: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+              ACC_2: {"passphrase": "secret", "bip_path": "m/44'/60'/0'/0/0"}}
+    with patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(device=device)):
+        sessions = TrezorSessionPool(config)
+        clients = {acc: sessions.client(acc) for acc in [ACC_1, ACC_2]}
+    pipeline = TrezorSigningPipeline(MagicMock())
+    for name, acc in [("a", ACC_1), ("b", ACC_2), ("c", ACC_1), ("d", ACC_1)]:
+        mocked = MagicMock()
+        mocked.buildTransaction.side_effect = lambda params: {
+            "data": "0x", "nonce": params["nonce"], "value": params["value"], "gasPrice": 1, "gas": 1,
+            "to": "0x" + "3" * 40}
+        pipeline.add(TrezorTransaction("Transfer", name, acc, clients[acc], "m/44'/60'/0'/0/0", mocked))
+    with patch.object(pipeline.w3.eth, "send_raw_transaction"):
+        pipeline.run()
+    # Every passphrase switch resumes the session of the signing client
+    assert device.signatures == [(clients[acc], clients[acc].session_id) for acc in [ACC_1, ACC_2, ACC_1, ACC_1]]
+    assert device.initialized == [clients[ACC_1].session_id, clients[ACC_2].session_id, clients[ACC_1].session_id]
@@ -8,6 +8,7 @@ from trezorlib.tools import parse_path
 
 from trezor import TrezorQRCodeManager
 from trezor.trezor_qr_code import TrezorQRCode
+from tests.trezor.fakes import FakeClient
 
 
 @patch("trezor.TrezorQRCodeManager.load_trezor_config_and_acc_name", return_value=("foo", "bar"))
@@ -62,7 +63,7 @@ def test_qrcode_manager_verify_inputs_wrong_public_ronin(caplog):
     assert f"Public address {scholar_acc} needs to start with ronin:" in caplog.text
 
 
-@patch("trezor.trezor_qr_code.get_default_client", return_value="client")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_qr_code.TrezorQRCode.generate_qr")
 @patch("trezor.trezor_qr_code.TrezorQRCode.__init__", return_value=None)
 def test_qrcode_manager_execute(mocked_qrcode_init, mocked_qrcode_generate_qr, mocked_client):
@@ -96,13 +97,15 @@ def test_qrcode_manager_execute(mocked_qrcode_init, mocked_qrcode_generate_qr, m
             bip_path="m/44'/60'/0'/0/0",
             client="client",
             acc_name="Scholar 1",
-            path='/'),
+            path='/',
+            token_cache=None),
         call(
             account=scholar_acc_other,
             bip_path="m/44'/60'/0'/0/1",
             client="client",
             acc_name="Scholar 2",
-            path='/')
+            path='/',
+            token_cache=None)
     ])
     mocked_client.assert_called()
     assert mocked_qrcode_generate_qr.call_count == 2
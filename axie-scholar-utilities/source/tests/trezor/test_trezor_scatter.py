@@ -1,23 +1,31 @@
 from mock import patch
+from trezorlib.tools import parse_path
 
+from axie.scatter_chunks import ScatterChunk, gas_estimates
 from trezor import TrezorScatterRonManager
+from tests.trezor.fakes import FakeClient
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
+
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("trezor.trezor_scatter.TrezorScatterRonManager.load_scatter", return_value='foo')
 def test_init_scatter_ron_manager(mocked_load, mocked_client):
     s = TrezorScatterRonManager('from_acc', {"foo": "bar"}, {"from_acc": {"bip_path": "path", "passphrase": ""}}, 1)
-    mocked_load.assert_called_with({"foo": "bar"})
+    # Nothing is loaded nor connected until it is needed
+    mocked_load.assert_not_called()
+    mocked_client.assert_not_called()
     assert s.min_ron == 1
     assert s.from_acc == 'from_acc'
     assert s.bip_path == 'path'
     assert s.scatter_accounts_amounts == 'foo'
+    mocked_load.assert_called_with({"foo": "bar"})
     assert s.client == 'client'
     mocked_client.assert_called()
 
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
-@patch('trezor.trezor_scatter.check_balance', return_value=0)
-def test_load_scatter_ron_manager_new(mocked_check, mocked_client):
+@patch("axie.scatter.fetch_balances", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("axie.scatter.check_balance", return_value=0)
+def test_load_scatter_ron_manager_new(mocked_check, mocked_client, _balances):
     payments = {
     "scholars": [
         {
@@ -86,12 +94,13 @@ def test_load_scatter_ron_manager_new(mocked_check, mocked_client):
         "ronin:<account_s2_address>": 1
     }
     mocked_check.assert_called()
-    mocked_client.assert_called()
+    mocked_client.assert_not_called()
 
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
-@patch('trezor.trezor_scatter.check_balance', return_value=0)
-def test_load_scatter_ron_manager_old(mocked_check, mocked_client):
+@patch("axie.scatter.fetch_balances", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("axie.scatter.check_balance", return_value=0)
+def test_load_scatter_ron_manager_old(mocked_check, mocked_client, _balances):
     payments = {
     "Manager": "ronin:<Manager address here>",
     "Scholars": [
@@ -138,12 +147,13 @@ def test_load_scatter_ron_manager_old(mocked_check, mocked_client):
         "ronin:<account_s3_address>": 1
     }
     mocked_check.assert_called()
-    mocked_client.assert_called()
+    mocked_client.assert_not_called()
 
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
-@patch('trezor.trezor_scatter.check_balance', return_value=0.5)
-def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check, mocked_client):
+@patch("axie.scatter.fetch_balances", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("axie.scatter.check_balance", return_value=0.5)
+def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check, mocked_client, _balances):
     payments = {
     "scholars": [
         {
@@ -211,12 +221,13 @@ def test_load_scatter_ron_manager_new_only_missing_ron(mocked_check, mocked_clie
         "ronin:<account_s1_address>": 0.5,
         "ronin:<account_s2_address>": 0.5}
     mocked_check.assert_called()
-    mocked_client.assert_called()
+    mocked_client.assert_not_called()
 
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
-@patch('trezor.trezor_scatter.check_balance', return_value=0.5)
-def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check, mocked_client):
+@patch("axie.scatter.fetch_balances", return_value={})
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("axie.scatter.check_balance", return_value=0.5)
+def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check, mocked_client, _balances):
     payments = {
     "Manager": "ronin:<Manager address here>",
     "Scholars": [
@@ -263,19 +274,42 @@ def test_load_scatter_ron_manager_old_only_missing_ron(mocked_check, mocked_clie
         "ronin:<account_s3_address>": 0.5
     }
     mocked_check.assert_called()
-    mocked_client.assert_called()
+    mocked_client.assert_not_called()
 
 
-@patch("trezor.trezor_scatter.get_default_client", return_value='client')
-@patch("axie_utils.TrezorScatter.execute")
-@patch("axie_utils.TrezorScatter.__init__", return_value=None)
-@patch("trezor.trezor_scatter.TrezorScatterRonManager.load_scatter", return_value='foo')
-def test_scatter_ron_manager_execute(mocked_load, mocked_scatter_init, mocked_scatter_execute, mocked_client):
-    s = TrezorScatterRonManager('from_acc', {"foo": "bar"}, {"from_acc": {"bip_path": "path", "passphrase": ""}}, 1)
-    mocked_load.assert_called()
-    mocked_client.assert_called()
-    s.execute()
-    mocked_scatter_init.assert_called_with(
-        'ron',  s.from_acc, s.client, s.bip_path, 'foo'
-    )
-    mocked_scatter_execute.assert_called()
+@patch("axie.receipts.fetch_receipts", return_value={})
+@patch("axie.scatter_chunks.check_balance", return_value=100)
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", autospec=True, return_value=[])
+def test_scatter_ron_manager_execute(mocked_run, mocked_client, mocked_balance, _):
+    from_acc = "ronin:" + "1" * 40
+    amounts = {"ronin:" + str(i) * 40: 1 for i in range(2, 5)}
+    s = TrezorScatterRonManager(from_acc, {}, {from_acc: {"bip_path": "m/44'/60'/0'/0/0", "passphrase": ""}}, 1)
+    s.scatter_accounts_amounts = amounts
+    gas_estimates.clear()
+    with patch.object(ScatterChunk, "estimate_gas", return_value=1000000):
+        s.execute()
+    mocked_balance.assert_called_once_with(from_acc.replace("ronin:", "0x"), "ron")
+    # The scatter is split to fit the gas limit and every chunk is signed in a single pass of the pipeline
+    mocked_run.assert_called_once()
+    transactions = mocked_run.call_args[0][0].transactions
+    assert [(t.kind, str(t), t.client, t.bip_path, t.value) for t in transactions] == [
+        ("Scatter", f"RON Scatter to 2 accounts from account ({from_acc}) (1/2)", "client",
+         parse_path("m/44'/60'/0'/0/0"), 2 * 10 ** 18),
+        ("Scatter", f"RON Scatter to 1 accounts from account ({from_acc}) (2/2)", "client",
+         parse_path("m/44'/60'/0'/0/0"), 10 ** 18)
+    ]
+    assert [t.function.fn_name for t in transactions] == ["disperseEther", "disperseEther"]
+
+
+@patch("trezor.trezor_pipeline.TrezorSigningPipeline.run", autospec=True)
+@patch("axie.scatter_chunks.check_balance", return_value=0)
+def test_scatter_ron_manager_execute_not_enough_ron(_, mocked_run, caplog):
+    from_acc = "ronin:" + "1" * 40
+    s = TrezorScatterRonManager(from_acc, {}, {from_acc: {"bip_path": "m/44'/60'/0'/0/0", "passphrase": ""}}, 1)
+    s.scatter_accounts_amounts = {"ronin:" + "2" * 40: 1}
+    gas_estimates.clear()
+    with patch.object(ScatterChunk, "estimate_gas", return_value=100000):
+        s.execute()
+    mocked_run.assert_not_called()
+    assert f"Account ({from_acc}) needs 1 RON to scatter but holds 0" in caplog.text
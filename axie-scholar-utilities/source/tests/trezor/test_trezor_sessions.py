@@ -0,0 +1,122 @@
+import pytest
+from mock import patch, call, Mock
+from trezorlib.tools import parse_path
+
+from trezor.trezor_sessions import TrezorSessionPool
+from tests.trezor.fakes import FakeClient, FakeDevice, active_session
+
+
+CONFIG = {
+    "ronin:1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+    "ronin:2": {"passphrase": "secret", "bip_path": "m/44'/60'/0'/0/0"},
+    "ronin:3": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"}
+}
+
+
+@patch("trezor.trezor_sessions.CustomUI", side_effect=lambda passphrase: f"ui_{passphrase}")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(f"client_{ui}"))
+def test_session_pool_one_client_per_passphrase(mocked_client, _):
+    sessions = TrezorSessionPool(CONFIG)
+    assert sessions.client("ronin:1") == "client_ui_"
+    assert sessions.client("RONIN:3") == "client_ui_"
+    assert sessions.client("ronin:2") == "client_ui_secret"
+    assert sessions.client("ronin:2") == "client_ui_secret"
+    assert mocked_client.call_args_list == [call(path=None, ui="ui_"), call(path=None, ui="ui_secret")]
+
+
+def test_session_pool_resumes_session_of_client():
+    device = FakeDevice()
+    with patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(device=device)):
+        sessions = TrezorSessionPool(CONFIG)
+        first = sessions.client("ronin:1")
+        second = sessions.client("ronin:2")
+    assert first.session_id != second.session_id
+    # Opening the second passphrase left its session active, the first one is resumed before signing with it
+    assert active_session(first) == first.session_id
+    assert active_session(first) == first.session_id
+    assert device.initialized == [first.session_id]
+    assert active_session(second) == second.session_id
+    assert active_session(first) == first.session_id
+    assert device.initialized == [first.session_id, second.session_id, first.session_id]
+    assert first.session_counter == second.session_counter == 0
+
+
+def test_session_pool_groups_by_passphrase():
+    sessions = TrezorSessionPool(CONFIG)
+    items = [("ronin:2", "a"), ("ronin:1", "b"), ("ronin:2", "c"), ("ronin:3", "d"), ("ronin:1", "e")]
+    assert sessions.group(items, lambda item: item[0]) == [
+        ("ronin:2", "a"), ("ronin:2", "c"), ("ronin:1", "b"), ("ronin:3", "d"), ("ronin:1", "e")]
+    assert sessions.group([], lambda item: item) == []
+
+
+# Nodes of the first BIP32 test vector, standing for the accounts path of two devices
+NODES = {
+    "udp:1": Mock(public_key=bytes.fromhex("0357bfe1e341d01c69fe5654309956cbea516822fba8a601743a012a7896ee8dc2"),
+                  chain_code=bytes.fromhex("04466b9cc8e161e966409ca52986c584f07e9dc81f735db683c3ff6ec7b1503f")),
+    "udp:2": Mock(public_key=bytes.fromhex("035a784662a4a20a65bf6aab9ae98a6c068a81c52e4b032c0fb5400c706cfccc56"),
+                  chain_code=bytes.fromhex("47fdacbd0f1097043b78c63c20c34ef4ed9a111d980047ad16282c7ae6236141"))
+}
+DEVICE_CONFIG = {
+    "ronin:f913ebb64db80f3dd7f615d9b681339244607b5a": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"},
+    "ronin:91860ef4fc12f4dca2564a3f7fccea9325831ac6": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+    "ronin:29379f45f515c494483298225d1b347f73d1babf": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"},
+    "ronin:" + "a" * 40: {"passphrase": "secret", "bip_path": "m/44'/60'/0'/0/0'"}
+}
+
+
+@patch("trezor.trezor_sessions.ethereum.get_public_node")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(path))
+def test_session_pool_single_device(mocked_client, mock_node):
+    sessions = TrezorSessionPool(CONFIG, ["udp:1"])
+    assert sessions.device("ronin:2") == "udp:1"
+    assert sessions.client("ronin:2") == "udp:1"
+    mocked_client.assert_called_once()
+    mock_node.assert_not_called()
+
+
+@patch("trezor.trezor_sessions.ethereum.get_address", side_effect=lambda client, n: "0x" + "A" * 40)
+@patch("trezor.trezor_sessions.ethereum.get_public_node", side_effect=lambda client, n: Mock(node=NODES[client.path]))
+@patch("trezor.trezor_sessions.CustomUI", side_effect=lambda passphrase: passphrase)
+def test_session_pool_locates_accounts(_, mock_node, mock_address, caplog):
+    devices = {"udp:1": FakeDevice(), "udp:2": FakeDevice()}
+    clients = []
+
+    def open_client(path, ui):
+        clients.append(FakeClient(f"{path}_{ui}", device=devices[path], path=path))
+        return clients[-1]
+
+    sessions = TrezorSessionPool(DEVICE_CONFIG, ["udp:1", "udp:2"])
+    with patch("trezor.trezor_sessions.get_default_client", side_effect=open_client):
+        client = sessions.client("ronin:29379f45f515c494483298225d1b347f73d1babf")
+    assert client == "udp:2_"
+    assert sessions.device("RONIN:F913EBB64DB80F3DD7F615D9B681339244607B5A") == "udp:1"
+    assert sessions.device("ronin:91860ef4fc12f4dca2564a3f7fccea9325831ac6") == "udp:2"
+    # The hardened account is found on the first device, it is not looked for on the second one
+    assert sessions.device("ronin:" + "a" * 40) == "udp:1"
+    assert mock_node.call_args_list == [
+        call("udp:1_", parse_path("m/44'/60'/0'/0")),
+        call("udp:1_secret", parse_path("m/44'/60'/0'/0")),
+        call("udp:2_", parse_path("m/44'/60'/0'/0"))]
+    mock_address.assert_called_once_with("udp:1_secret", parse_path("m/44'/60'/0'/0/0'"))
+    # Probing sessions are ended and the account signs with a session of its own
+    assert len(clients) == 4
+    assert [probe.session_id for probe in clients[:3]] == [None, None, None]
+    assert client is clients[3] and client.session_id is not None
+    assert active_session(client) == client.session_id
+    assert devices["udp:2"].initialized == []
+    assert "Trezor device udp:1 holds 2 accounts" in caplog.text
+    assert "Trezor device udp:2 holds 2 accounts" in caplog.text
+    items = [("ronin:91860ef4fc12f4dca2564a3f7fccea9325831ac6", "a"), ("ronin:" + "a" * 40, "b"),
+             ("ronin:f913ebb64db80f3dd7f615d9b681339244607b5a", "c")]
+    assert sessions.group(items, lambda item: item[0]) == [items[0], items[1], items[2]]
+    assert sessions.group(items[1:] + items[:1], lambda item: item[0]) == [items[1], items[2], items[0]]
+
+
+@patch("trezor.trezor_sessions.ethereum.get_public_node", side_effect=lambda client, n: Mock(node=NODES["udp:1"]))
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient(path))
+def test_session_pool_account_not_on_devices(_, __, caplog):
+    config = {"ronin:" + "b" * 40: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
+    sessions = TrezorSessionPool(config, ["udp:1", "udp:2"])
+    with pytest.raises(SystemExit):
+        sessions.client("ronin:" + "b" * 40)
+    assert f"Account ronin:{'b' * 40} is not held by any of the connected trezor devices" in caplog.text
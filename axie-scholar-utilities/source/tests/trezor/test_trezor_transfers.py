@@ -1,6 +1,17 @@
+import json
+
+import rlp
 from mock import patch, call
+from trezorlib.tools import parse_path
+from web3 import Web3
 
 from trezor import TrezorAxieTransferManager
+from axie.transfers import chunk_accounts
+from trezor.trezor_transfers import TrezorBulkTransfer
+from tests.trezor.fakes import FakeClient
+
+
+BATCH_CONTRACT = "0x" + "9" * 40
 
 
 @patch("trezor.trezor_transfers.load_json")
@@ -16,14 +27,16 @@ def test_transfer_manager_init(mocked_load_json):
     assert atm.secure is True
 
 
-@patch("trezor.trezor_transfers.get_default_client", return_value="client")
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("axie_utils.Axies.check_axie_owner", return_value=True)
 @patch("trezor.trezor_transfers.load_json")
 @patch("trezor.trezor_transfers.TrezorAxieTransferManager.execute_transfers")
 def test_transfer_manager_prepare_transfers(mocked_execute_transfers,
                                             mocked_load_json,
                                             mock_axies,
-                                            mock_client):
+                                            mock_client,
+                                            _inventory):
     transfers_file = "sample_transfers_file.json"
     config_file = "sample_config_file.json"
     atm = TrezorAxieTransferManager(transfers_file, config_file)
@@ -38,35 +51,35 @@ def test_transfer_manager_prepare_transfers(mocked_execute_transfers,
     atm.trezor_config = {"ronin:abc1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
     atm.prepare_transfers()
     assert mock_axies.call_count == 3
-    mock_client.assert_called()
+    # Planning opens no trezor session, the clients are only needed to sign
+    mock_client.assert_not_called()
     assert mocked_execute_transfers.call_count == 1
     transactions_list = mocked_execute_transfers.call_args_list[0][0][0]
     assert len(transactions_list) == 3
     # Check transaction 1
     assert transactions_list[0].from_acc == "0xabc1"
-    assert transactions_list[0].client == "client"
     assert transactions_list[0].to_acc == "0xabc2"
     assert transactions_list[0].axie_id == 123
     # Check transaction 2
     assert transactions_list[1].from_acc == "0xabc1"
-    assert transactions_list[1].client == "client"
     assert transactions_list[1].to_acc == "0xabc2"
     assert transactions_list[1].axie_id == 123123
     # Check transaction 3
     assert transactions_list[2].from_acc == "0xabc1"
-    assert transactions_list[2].client == "client"
     assert transactions_list[2].to_acc == "0xabc3"
     assert transactions_list[2].axie_id == 234
 
 
-@patch("trezor.trezor_transfers.get_default_client", return_value="client")
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("axie_utils.Axies.check_axie_owner", side_effect=[True, False, False])
 @patch("trezor.trezor_transfers.load_json")
 @patch("trezor.trezor_transfers.TrezorAxieTransferManager.execute_transfers")
 def test_transfer_manager_prepare_transfers_only_available(mocked_execute_transfers,
                                                            mocked_load_json,
                                                            mock_axies,
-                                                           mock_client):
+                                                           mock_client,
+                                                           _inventory):
     transfers_file = "sample_transfers_file.json"
     config_file = "sample_config_file.json"
     atm = TrezorAxieTransferManager(transfers_file, config_file)
@@ -81,25 +94,27 @@ def test_transfer_manager_prepare_transfers_only_available(mocked_execute_transf
     atm.trezor_config = {"ronin:abc1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"}}
     atm.prepare_transfers()
     assert mock_axies.call_count == 3
-    mock_client.assert_called()
+    # Planning opens no trezor session, the clients are only needed to sign
+    mock_client.assert_not_called()
     assert mocked_execute_transfers.call_count == 1
     transactions_list = mocked_execute_transfers.call_args_list[0][0][0]
     assert len(transactions_list) == 1
     # Check transaction 1
     assert transactions_list[0].from_acc == "0xabc1"
-    assert transactions_list[0].client == "client"
     assert transactions_list[0].to_acc == "0xabc2"
     assert transactions_list[0].axie_id == 123
 
 
-@patch("trezor.trezor_transfers.get_default_client", return_value="client")
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
 @patch("axie_utils.Axies.check_axie_owner", return_value=True)
 @patch("trezor.trezor_transfers.load_json")
 @patch("trezor.trezor_transfers.TrezorAxieTransferManager.execute_transfers")
 def test_transfer_manager_prepare_transfers_secure(mocked_execute_transfers,
                                                    mocked_load_json,
                                                    mock_axies,
-                                                   mock_client):
+                                                   mock_client,
+                                                   _inventory):
     transfers_file = "sample_transfers_file.json"
     config_file = "sample_config_file.json"
     atm = TrezorAxieTransferManager(transfers_file, config_file, True)
@@ -117,11 +132,90 @@ def test_transfer_manager_prepare_transfers_secure(mocked_execute_transfers,
     }
     atm.prepare_transfers()
     assert mock_axies.call_count == 1
-    mock_client.assert_called()
+    # Planning opens no trezor session, the clients are only needed to sign
+    mock_client.assert_not_called()
     assert mocked_execute_transfers.call_count == 1
     transactions_list = mocked_execute_transfers.call_args_list[0][0][0]
     assert len(transactions_list) == 1
     assert transactions_list[0].from_acc == "0xabc1"
-    assert transactions_list[0].client == "client"
     assert transactions_list[0].to_acc == "0xabc3"
     assert transactions_list[0].axie_id == 234
+
+
+@patch("trezor.trezor_transfers.check_batch_contract", return_value=True)
+@patch("axie.inventory.fetch_axie_ids", return_value=None)
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("axie_utils.Axies.check_axie_owner", return_value=True)
+@patch("trezor.trezor_transfers.load_json")
+@patch("trezor.trezor_transfers.TrezorAxieTransferManager.execute_transfers")
+@patch("trezor.trezor_transfers.TrezorAxieTransferManager.execute_bulk_transfers")
+def test_transfer_manager_prepare_transfers_bulk(mocked_execute_bulk, mocked_execute_transfers, _, _owner, _client,
+                                                 _inventory, mocked_check_contract):
+    atm = TrezorAxieTransferManager("sample_transfers_file.json", "sample_config_file.json",
+                                    bulk_contract=BATCH_CONTRACT)
+    atm.transfers_file = [
+        {"AccountAddress": "ronin:abc1", "Transfers": [{"AxieId": 123, "ReceiverAddress": "ronin:abc2"}]},
+        {"AccountAddress": "ronin:abc2", "Transfers": [{"AxieId": 234, "ReceiverAddress": "ronin:abc3"}]}
+    ]
+    atm.trezor_config = {"ronin:abc1": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+                         "ronin:abc2": {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"}}
+    atm.prepare_transfers()
+    mocked_execute_transfers.assert_not_called()
+    # Transfers of all accounts are executed once, together
+    mocked_execute_bulk.assert_called_once()
+    transactions_list = mocked_execute_bulk.call_args_list[0][0][0]
+    assert [t.axie_id for t in transactions_list] == [123, 234]
+    mocked_check_contract.assert_called_once_with(BATCH_CONTRACT)
+
+
+@patch("trezor.trezor_transfers.chunk_accounts", side_effect=lambda records: chunk_accounts(records, 2))
+@patch("trezor.trezor_transfers.AxieInventory")
+@patch("trezor.trezor_sessions.get_default_client", side_effect=lambda path, ui: FakeClient())
+@patch("trezor.trezor_transfers.load_json")
+@patch("trezor.trezor_transfers.TrezorSigningPipeline")
+def test_transfer_manager_prepare_transfers_in_chunks(mocked_pipeline, _, __, mocked_inventory, ___, tmpdir):
+    transfers_file = tmpdir.join("transfers.json")
+    accs = ["ronin:" + str(i) * 40 for i in range(1, 4)]
+    transfers_file.write(json.dumps([
+        {"AccountAddress": accs[0], "Transfers": [{"AxieId": 1, "ReceiverAddress": accs[2]},
+                                                  {"AxieId": 2, "ReceiverAddress": accs[2]}]},
+        {"AccountAddress": accs[1], "Transfers": [{"AxieId": 3, "ReceiverAddress": accs[2]}]}
+    ]))
+    atm = TrezorAxieTransferManager(str(transfers_file), "sample_config_file.json", stream=True)
+    atm.trezor_config = {accs[0]: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/0"},
+                         accs[1]: {"passphrase": "", "bip_path": "m/44'/60'/0'/0/1"}}
+    atm.receipts.wait = lambda: None
+    mocked_inventory.return_value.load.return_value.check_owner.return_value = True
+    atm.prepare_transfers()
+    # The inventory and the signing pipeline only hold one chunk of accounts at a time
+    assert [list(c[0][0]) for c in mocked_inventory.call_args_list] == [[accs[0]], [accs[1]]]
+    transactions = [c[0][0] for c in mocked_pipeline.return_value.add.call_args_list]
+    assert [str(t) for t in transactions] == [
+        f"Axie Transfer of axie (1) from account ({accs[0]}) to account ({accs[2]})",
+        f"Axie Transfer of axie (2) from account ({accs[0]}) to account ({accs[2]})",
+        f"Axie Transfer of axie (3) from account ({accs[1]}) to account ({accs[2]})"
+    ]
+    assert transactions[2].bip_path == parse_path("m/44'/60'/0'/0/1")
+    assert mocked_pipeline.return_value.run.call_count == 2
+
+
+@patch("trezor.trezor_pipeline.ethereum.sign_tx", return_value=(27, b"\x00" + b"r" * 31, b"s" * 32))
+def test_trezor_bulk_transfer_sign(mock_sign_tx):
+    bulk = TrezorBulkTransfer("ronin:" + "1" * 40, "client", "m/44'/60'/0'/0/0",
+                              [(123, "ronin:" + "2" * 40), (234, "ronin:" + "3" * 40)], BATCH_CONTRACT)
+    with patch.object(TrezorBulkTransfer, "transaction_gas", return_value=260000):
+        transaction = bulk.build_transfer(7)
+    raw_transaction = bulk.sign(transaction)
+    mock_sign_tx.assert_called_once()
+    kwargs = mock_sign_tx.call_args[1]
+    assert kwargs["n"] == parse_path("m/44'/60'/0'/0/0")
+    assert kwargs["nonce"] == 7
+    assert kwargs["gas_limit"] == 260000
+    assert kwargs["to"] == transaction["to"] == Web3.toChecksumAddress(BATCH_CONTRACT)
+    nonce, _, gas, to, _, data, v, r, s = rlp.decode(raw_transaction)
+    assert int.from_bytes(nonce, "big") == 7
+    assert int.from_bytes(gas, "big") == 260000
+    assert "0x" + to.hex() == transaction["to"].lower()
+    assert "0x" + data.hex() == transaction["data"]
+    # Leading zeros of the signature are stripped
+    assert r == b"r" * 31
@@ -1,3 +1,5 @@
+import importlib
+
 __version__ = '3.2.3'
 __all__ = [
     'TrezorAccountsSetup',
@@ -10,11 +12,26 @@ __all__ = [
     'TrezorScatterRonManager'
 ]
 
-from trezor.trezor_setup import TrezorAccountsSetup
-from trezor.trezor_payments import TrezorAxiePaymentsManager
-from trezor.trezor_breeding import TrezorAxieBreedManager
-from trezor.trezor_claims import TrezorAxieClaimsManager
-from trezor.trezor_transfers import TrezorAxieTransferManager
-from trezor.trezor_morphing import TrezorAxieMorphingManager
-from trezor.trezor_qr_code import TrezorQRCodeManager
-from trezor.trezor_scatter import TrezorScatterRonManager
\ No newline at end of file
+# Module of each manager, imported the first time the manager is used
+MANAGERS = {
+    'TrezorAccountsSetup': 'trezor.trezor_setup',
+    'TrezorAxiePaymentsManager': 'trezor.trezor_payments',
+    'TrezorAxieBreedManager': 'trezor.trezor_breeding',
+    'TrezorAxieClaimsManager': 'trezor.trezor_claims',
+    'TrezorAxieTransferManager': 'trezor.trezor_transfers',
+    'TrezorAxieMorphingManager': 'trezor.trezor_morphing',
+    'TrezorQRCodeManager': 'trezor.trezor_qr_code',
+    'TrezorScatterRonManager': 'trezor.trezor_scatter'
+}
+
+
+def __getattr__(name):
+    if name not in MANAGERS:
+        raise AttributeError(f"module 'trezor' has no attribute '{name}'")
+    manager = getattr(importlib.import_module(MANAGERS[name]), name)
+    globals()[name] = manager
+    return manager
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
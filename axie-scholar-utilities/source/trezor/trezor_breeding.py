@@ -1,42 +1,43 @@
 import sys
 import logging
-from datetime import datetime
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-from trezorlib.client import get_default_client
-from trezorlib.tools import parse_path
+from web3 import Web3
 
-from axie.schemas import breeding_schema
-from axie.utils import load_json, ImportantLogsFilter
-from axie.payments import PaymentsSummary, CREATOR_FEE_ADDRESS
-from axie_utils import CustomUI, TrezorBreed, TrezorPayment, check_balance
-
-
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+from axie.schemas import breeding_validator, breeding_record_validator, schema_errors
+from axie.receipts import ReceiptTracker
+from axie.preflight import BreedingPreflight, breeding_slp_costs, breeding_axs_costs, WEI_PER_AXS
+from axie.balances import fetch_balances
+from axie.utils import load_json, JsonRecords, FilteredRecords
+from axie.payments import CREATOR_FEE_ADDRESS
+from axie_utils import check_balance
+from axie_utils.abis import AXIE_ABI, SLP_ABI
+from axie_utils.utils import AXIE_CONTRACT, SLP_CONTRACT
+from trezor.trezor_pipeline import TrezorSigningPipeline, TrezorTransaction
+from trezor.trezor_sessions import TrezorSessionPool
 
 
 class TrezorAxieBreedManager:
 
-    def __init__(self, breeding_file, trezor_config, payment_account):
+    def __init__(self, breeding_file, trezor_config, payment_account, stream=False, devices=None):
         self.trezor_config = load_json(trezor_config)
-        self.breeding_file = load_json(breeding_file)
+        if stream:
+            self.breeding_file = JsonRecords(breeding_file, breeding_record_validator)
+        else:
+            self.breeding_file = load_json(breeding_file)
         self.payment_account = payment_account.lower()
         self.breeding_costs = 0
+        self.breeding_costs_by_account = {}
+        self.breeding_axs_by_account = {}
+        self.breed_counts = None
+        self.rejected = set()
+        self.rejected_count = 0
+        self.receipts = ReceiptTracker()
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
 
     def verify_inputs(self):
         validation_error = False
         logging.info("Validating file inputs...")
-        try:
-            validate(self.breeding_file, breeding_schema)
-        except ValidationError as ex:
+        for ex in schema_errors(breeding_validator, self.breeding_file):
             logging.critical(f'Validation of breeding file failed. Error given: {ex.message}\n'
                              f'For attribute in: {list(ex.path)}')
             validation_error = True
@@ -56,11 +57,20 @@ class TrezorAxieBreedManager:
         return self.calculate_fee_cost() + self.breeding_costs
 
     def calculate_breeding_cost(self):
-        # TODO: We need to calculate how much will all breeding cost, pending for the future!
-        return 0
+        """ SLP the breeding accounts will spend, priced from the breed count of every parent.
+        The AXS each of them spends is kept too """
+        if self.breed_counts is None:
+            self.breed_counts = BreedingPreflight(self.pending_breedings()).load().breed_counts()
+        self.breeding_costs_by_account = breeding_slp_costs(self.pending_breedings(), self.breed_counts)
+        self.breeding_axs_by_account = breeding_axs_costs(self.pending_breedings())
+        return sum(self.breeding_costs_by_account.values())
+
+    def number_of_breeds(self):
+        """ Breedings of the file the preflight did not reject """
+        return len(self.breeding_file) - self.rejected_count
 
     def calculate_fee_cost(self):
-        number_of_breeds = len(self.breeding_file)
+        number_of_breeds = self.number_of_breeds()
         if number_of_breeds <= 15:
             cost = number_of_breeds * 30
         if 15 < number_of_breeds <= 30:
@@ -71,32 +81,74 @@ class TrezorAxieBreedManager:
             cost = (15 * 30) + (15 * 25) + (20 * 20) + ((number_of_breeds - 50) * 15)
         return cost
 
+    def pending_breedings(self):
+        """ Breedings the preflight did not reject, read again from the breedings file on every pass """
+        return FilteredRecords(self.breeding_file, lambda bf: self.breeding_key(bf) not in self.rejected)
+
+    def preflight(self):
+        """ Drops the breedings that would revert, before paying any gas or fee for them.
+        Only the keys of the rejected ones are kept, the breedings file is not loaded in memory """
+        index = BreedingPreflight(self.breeding_file).load()
+        rejected = index.rejected_breedings()
+        self.breed_counts = index.breed_counts()
+        self.rejected = {self.breeding_key(bf) for bf in rejected}
+        self.rejected_count = len(rejected)
+
+    @staticmethod
+    def breeding_key(bf):
+        return f"breed:{bf['Sire']}:{bf['Matron']}"
+
+    def check_funds(self):
+        """ Checks at once that every account holds the SLP and AXS it will spend, so the session never stops
+        halfway """
+        required = {"slp": dict(self.breeding_costs_by_account), "axs": dict(self.breeding_axs_by_account)}
+        required["slp"][self.payment_account] = (required["slp"].get(self.payment_account, 0)
+                                                 + self.calculate_fee_cost())
+        enough_funds = True
+        for token, amounts in required.items():
+            if not amounts:
+                continue
+            balances = fetch_balances(list(amounts), token)
+            for acc, amount in amounts.items():
+                balance = balances[acc] if acc in balances else check_balance(acc, token)
+                if token == "axs":
+                    balance = balance / WEI_PER_AXS
+                if balance < amount:
+                    logging.critical(f"Important: Account {acc} needs {amount} {token.upper()} for this session "
+                                     f"but holds {balance} {token.upper()}")
+                    enough_funds = False
+        return enough_funds
+
     def execute(self):
-        if check_balance(self.payment_account) < self.calculate_cost():
-            logging.critical("Not enough SLP funds to pay for breeding and the fee")
+        self.preflight()
+        if not self.number_of_breeds():
+            logging.critical("Important: No valid breedings to execute")
+            return
+        self.breeding_costs = self.calculate_breeding_cost()
+        logging.info(f"Important: Breeding session will cost {self.calculate_cost()} SLP, "
+                     f"{self.breeding_costs} SLP to breed and {self.calculate_fee_cost()} SLP of fee")
+        if not self.check_funds():
+            logging.critical("Not enough SLP or AXS funds to pay for breeding and the fee")
             sys.exit()
 
         logging.info("About to start breeding axies")
-        for bf in self.breeding_file:
-            b = TrezorBreed(
-                sire_axie=bf['Sire'],
-                matron_axie=bf['Matron'],
-                address=bf['AccountAddress'].lower(),
-                client=get_default_client(ui=CustomUI(self.trezor_config[bf['AccountAddress'].lower()]['passphrase'])),
-                bip_path=self.trezor_config[bf['AccountAddress'].lower()]['bip_path']
-            )
-            b.execute()
-        logging.info("Done breeding axies")
+        pipeline = TrezorSigningPipeline(self.receipts)
+        axie_contract = pipeline.contract(AXIE_CONTRACT, AXIE_ABI)
+        for bf in self.sessions.group(self.pending_breedings(), lambda bf: bf['AccountAddress']):
+            account = bf['AccountAddress'].lower()
+            pipeline.add(TrezorTransaction(
+                "Breed", f"Breeding axie {bf['Sire']} with {bf['Matron']} in account {account}",
+                account, self.sessions.client(account), self.trezor_config[account]['bip_path'],
+                axie_contract.functions.breedAxies(bf['Sire'], bf['Matron']), device=self.sessions.device(account)))
         fee = self.calculate_fee_cost()
-        logging.info(f"Time to pay the fee for breeding. For this session it is: {fee} SLP")
-        p = TrezorPayment(
-            "Breeding Fee",
-            "donation",
-            get_default_client(ui=CustomUI(passphrase=self.trezor_config[self.payment_account]['passphrase'])),
-            parse_path(self.trezor_config[self.payment_account]['bip_path']),
-            self.payment_account,
-            CREATOR_FEE_ADDRESS,
-            fee,
-            PaymentsSummary()
-        )
-        p.execute()
+        logging.info(f"The fee for breeding this session is: {fee} SLP, it is signed along with the breeds")
+        slp_contract = pipeline.contract(SLP_CONTRACT, SLP_ABI)
+        pipeline.add(TrezorTransaction(
+            "Payment", f"Breeding Fee({CREATOR_FEE_ADDRESS}) for the amount of {fee} SLP", self.payment_account,
+            self.sessions.client(self.payment_account), self.trezor_config[self.payment_account]['bip_path'],
+            slp_contract.functions.transfer(Web3.toChecksumAddress(CREATOR_FEE_ADDRESS.replace("ronin:", "0x")), fee),
+            device=self.sessions.device(self.payment_account)))
+        pipeline.run()
+        logging.info("Done breeding axies")
+        self.receipts.wait()
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
@@ -1,27 +1,23 @@
 import sys
 import asyncio
 import logging
-from datetime import datetime
-from trezorlib.client import get_default_client
 
-from axie.utils import ImportantLogsFilter
-from axie_utils import CustomUI, TrezorClaim
+from axie.eligibility import claimable_accounts
+from axie.tokens import CachedJWTMixin
+from axie_utils import TrezorClaim
+from trezor.trezor_sessions import TrezorSessionPool
 
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+class CachedTrezorClaim(CachedJWTMixin, TrezorClaim):
+    pass
 
 
 class TrezorAxieClaimsManager:
-    def __init__(self, payments_file, trezor_config, force=False):
+    def __init__(self, payments_file, trezor_config, force=False, token_cache=None, devices=None):
         self.trezor_config, self.acc_names = self.load_trezor_config_and_acc_name(trezor_config, payments_file)
         self.force = force
+        self.token_cache = token_cache
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
 
     def load_trezor_config_and_acc_name(self, trezor_config, payments_file):
         config = trezor_config
@@ -53,15 +49,28 @@ class TrezorAxieClaimsManager:
             sys.exit()
         logging.info("Files correctly validated")
 
+    async def claim_in_order(self, claims):
+        """ Executes the claims of one device one after the other, its sessions are never interleaved """
+        for claim in claims:
+            await claim.async_execute()
+
     def prepare_claims(self):
-        claims_list = [
-            TrezorClaim(
+        accounts = claimable_accounts(self.trezor_config, self.acc_names, self.force)
+        devices = {}
+        for acc in self.sessions.group(accounts, lambda acc: acc):
+            devices.setdefault(self.sessions.device(acc), []).append(CachedTrezorClaim(
                 force=self.force,
                 account=acc,
-                client=get_default_client(ui=CustomUI(passphrase=self.trezor_config[acc]['passphrase'])),
+                client=self.sessions.client(acc),
                 bip_path=self.trezor_config[acc]['bip_path'],
-                acc_name=self.acc_names[acc]) for acc in self.trezor_config]
+                acc_name=self.acc_names[acc],
+                token_cache=self.token_cache))
         logging.info("Claiming starting...")
         loop = asyncio.get_event_loop()
-        loop.run_until_complete(asyncio.gather(*[claim.async_execute() for claim in claims_list]))
+        try:
+            # Devices claim at the same time, each one signing its claims in order
+            loop.run_until_complete(asyncio.gather(*[self.claim_in_order(claims) for claims in devices.values()]))
+        finally:
+            if self.token_cache:
+                self.token_cache.save()
         logging.info("Claiming completed!")
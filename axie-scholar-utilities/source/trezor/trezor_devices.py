@@ -0,0 +1,45 @@
+import os
+import hmac
+import hashlib
+import logging
+
+from eth_keys.backends.native.ecdsa import (
+    compress_public_key,
+    decode_public_key,
+    decompress_public_key,
+    encode_raw_public_key
+)
+from eth_keys.backends.native.jacobian import fast_add, fast_multiply
+from eth_keys.constants import SECPK1_G, SECPK1_N
+from eth_utils import keccak
+from trezorlib.transport import enumerate_devices
+
+
+# Comma separated device paths to use instead of the detected ones, e.g. to sign with several emulators:
+# TREZOR_DEVICES=udp:127.0.0.1:21324,udp:127.0.0.1:21326
+TREZOR_DEVICES_ENV = "TREZOR_DEVICES"
+
+
+def connected_devices():
+    """ Paths of the trezor devices to sign with """
+    paths = os.getenv(TREZOR_DEVICES_ENV)
+    if paths:
+        devices = [path.strip() for path in paths.split(",") if path.strip()]
+    else:
+        devices = [transport.get_path() for transport in enumerate_devices()]
+    logging.info(f"Found {len(devices)} trezor devices: {', '.join(devices)}")
+    return devices
+
+
+def derive_child(public_key, chain_code, index):
+    """ Public key and chain code of the non hardened child of a BIP32 node, derived in software """
+    digest = hmac.new(chain_code, public_key + index.to_bytes(4, "big"), hashlib.sha512).digest()
+    tweak = int.from_bytes(digest[:32], "big")
+    if tweak >= SECPK1_N:
+        raise ValueError(f"Index {index} does not derive a valid key")
+    point = fast_add(fast_multiply(SECPK1_G, tweak), decode_public_key(decompress_public_key(public_key)))
+    return compress_public_key(encode_raw_public_key(point)), digest[32:]
+
+
+def public_key_address(public_key):
+    return "ronin:" + keccak(decompress_public_key(public_key))[-20:].hex()
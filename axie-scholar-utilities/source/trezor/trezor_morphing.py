@@ -1,28 +1,18 @@
 import sys
 import logging
-from datetime import datetime
 
-from trezorlib.client import get_default_client
-
-from axie.utils import load_json, ImportantLogsFilter
-from axie_utils import TrezorMorph, CustomUI
-
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+from axie.utils import load_json
+from axie_utils import TrezorMorph
+from trezor.trezor_sessions import TrezorSessionPool
 
 
 class TrezorAxieMorphingManager:
 
-    def __init__(self, axie_list, account, trezor_config):
+    def __init__(self, axie_list, account, trezor_config, devices=None):
         self.axie_list = axie_list
         self.account = account.lower()
         self.trezor_config = load_json(trezor_config)
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
 
     def verify_inputs(self):
         if self.account not in self.trezor_config:
@@ -35,7 +25,7 @@ class TrezorAxieMorphingManager:
             m = TrezorMorph(
                 axie=axie,
                 account=self.account,
-                client=get_default_client(ui=CustomUI(passphrase=self.trezor_config[self.account]['passphrase'])),
+                client=self.sessions.client(self.account),
                 bip_path=self.trezor_config[self.account]['bip_path'])
             m.execute()
         logging.info(f"Done morphing axies for account {self.account}")
@@ -1,32 +1,25 @@
 import sys
 import logging
-from datetime import datetime
-from math import floor
-
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-from trezorlib.client import get_default_client
 
 from axie.payments import PaymentsSummary
-from axie.schemas import payments_schema, legacy_payments_schema
-from axie.utils import ImportantLogsFilter
-from axie_utils import CustomUI, check_balance, TrezorScatter
-
-
-CREATOR_FEE_ADDRESS = "ronin:9fa1bc784c665e683597d3f29375e45786617550"
-
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+from axie.balances import fetch_balances
+from axie.receipts import ReceiptTracker
+from axie.scatter_chunks import APPROVAL_GAS, chunk_scatter
+from axie.schemas import (
+    payments_validator,
+    legacy_payments_validator,
+    detect_payments_format,
+    schema_errors,
+    format_errors
+)
+from axie.splits import CREATOR_FEE_ADDRESS, SplitsCalculator
+from axie_utils import check_balance
+from trezor.trezor_pipeline import TrezorSigningPipeline, TrezorTransaction
+from trezor.trezor_sessions import TrezorSessionPool
 
 
 class TrezorAxiePaymentsManager:
-    def __init__(self, payments_file, trezor_config, auto=False):
+    def __init__(self, payments_file, trezor_config, auto=False, devices=None):
         self.payments_file = payments_file
         self.trezor_config = trezor_config
         self.manager_acc = None
@@ -34,7 +27,12 @@ class TrezorAxiePaymentsManager:
         self.donations = None
         self.type = None
         self.auto = auto
+        self.balances = {}
         self.summary = PaymentsSummary()
+        self.receipts = ReceiptTracker()
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
+        self.pipeline = TrezorSigningPipeline(self.receipts)
+        self.scatter_payouts = {}
 
     def legacy_verify(self):
         validation_success = True
@@ -102,38 +100,24 @@ class TrezorAxiePaymentsManager:
         logging.info("Validating file inputs...")
         validation_success = True
         # Validate payments file
-        legacy_msg = None
-        new_msg = None
-
-        try:
-            validate(self.payments_file, payments_schema)
-            self.type = "new"
-        except ValidationError as ex:
-            new_msg = ("If you were tyring to pay using the current format:\n"
-                       f"Error given: {ex.message}\n"
-                       f"For attribute in: {list(ex.path)}\n")
-            validation_success = False
-
+        payments_format = detect_payments_format(self.payments_file)
+        msg = "Payments file failed validation. Please review it.\n"
+        for candidate in [payments_format] if payments_format else ["new", "legacy"]:
+            if candidate == "new":
+                errors = schema_errors(payments_validator, self.payments_file)
+                format_name = "current"
+            else:
+                errors = schema_errors(legacy_payments_validator, self.payments_file)
+                format_name = "legacy"
+            if not errors:
+                self.type = candidate
+                break
+            msg += f"If you were tyring to pay using the {format_name} format:\n" + format_errors(errors)
         if not self.type:
-            try:
-                validate(self.payments_file, legacy_payments_schema)
-                self.type = "legacy"
-                validation_success = True
-            except ValidationError as ex:
-                legacy_msg = ("If you were tyring to pay using the legacy format:\n"
-                              f"Error given: {ex.message}\n"
-                              f"For attribute in: {list(ex.path)}\n")
-                validation_success = False
-        
-        if not validation_success:
-            msg = "Payments file failed validation. Please review it.\n"
-            if new_msg:
-                msg += new_msg
-            if legacy_msg:
-                msg += legacy_msg
             logging.critical(msg)
             sys.exit()
-        
+            return
+
         if self.type == 'legacy':
             self.legacy_verify()
         elif self.type == 'new':
@@ -154,8 +138,22 @@ class TrezorAxiePaymentsManager:
             self.scholar_accounts = self.payments_file["scholars"]
         logging.info("Files correctly validated!")
 
+    def load_balances(self):
+        if self.type == "legacy":
+            accounts = [acc['AccountAddress'] for acc in self.scholar_accounts]
+        else:
+            accounts = [acc['ronin'] for acc in self.scholar_accounts]
+        logging.info("Fetching SLP balances for all accounts...")
+        self.balances = fetch_balances(accounts)
+
+    def get_balance(self, account):
+        # Read from the balance snapshot, only accounts missing from it hit the RPC
+        if account not in self.balances:
+            self.balances[account] = check_balance(account)
+        return self.balances[account]
+
     def check_acc_has_enough_balance(self, account, balance):
-        account_balance = check_balance(account)
+        account_balance = self.get_balance(account)
         if account_balance < balance:
             logging.critical(f"Balance in account {account} is "
                              "inssuficient to cover all planned payments!")
@@ -173,79 +171,75 @@ class TrezorAxiePaymentsManager:
         else:
             logging.critical(f"Unexpected error! Unrecognized payments mode")
 
+    def add_scatter(self, name, account, client, bip_path, payments, payout_types):
+        """ Queues the SLP scatter of an account for signing, approving the scatter contract first if needed """
+        chunks = chunk_scatter('slp', account, None, payments)
+        device = self.sessions.device(account)
+        if not chunks[0].is_approved(sum(chunk.total() for chunk in chunks)):
+            self.pipeline.add(TrezorTransaction("Approval", f"SLP scatter approval for account ({account})", account,
+                                                client, bip_path, chunks[0].approval_function(), gas=APPROVAL_GAS,
+                                                device=device))
+        for i, chunk in enumerate(chunks, start=1):
+            description = name if len(chunks) == 1 else f"{name} ({i}/{len(chunks)})"
+            transaction = TrezorTransaction("Scatter", description, account, client, bip_path,
+                                            chunk.scatter_function(), gas=chunk.transaction_gas(), device=device)
+            self.scatter_payouts[transaction] = [(amount, ronin, payout_types.get(ronin, "other"), account)
+                                                 for ronin, amount in chunk.amounts.items()]
+            self.pipeline.add(transaction)
+        logging.info(f"SLP scatter ready to sign for account: '{name}'")
+
+    def execute_scatters(self):
+        sent = self.pipeline.run()
+        if sent:
+            logging.info(f"Important: {len([h for _, h in sent if h])}/{len(sent)} transactions "
+                         "of the payout were sent")
+        for transaction, tx_hash in sent:
+            if tx_hash and transaction in self.scatter_payouts:
+                self.summary.expect(tx_hash, self.scatter_payouts[transaction])
+        self.scatter_payouts = {}
+        self.receipts.wait()
+        self.summary.confirm(self.receipts)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
+        logging.info(f"Important: Transactions Summary:\n {self.summary}")
+
     def prepare_new_payout(self):
-        for acc in self.scholar_accounts:
-            client = get_default_client(
-                ui=CustomUI(passphrase=self.trezor_config[acc['ronin'].lower()]['passphrase']))
+        self.scholar_accounts = self.sessions.group(self.scholar_accounts, lambda acc: acc['ronin'])
+        balances = [self.get_balance(acc['ronin']) for acc in self.scholar_accounts]
+        calculator = SplitsCalculator(self.scholar_accounts, self.donations)
+        for acc, acc_balance, (payments, total_payments) in zip(
+                self.scholar_accounts, balances, calculator.calculate(balances)):
+            client = self.sessions.client(acc['ronin'])
             bip_path = self.trezor_config[acc['ronin'].lower()]['bip_path']
-            acc_balance = check_balance(acc['ronin'])
-            total_payments = 0
             acc_payments = {}
-            deductable_fees = 1
-            if self.donations:
-                for dono in self.donations:
-                    deductable_fees += dono['percentage']
-            # Split payments
-            for sacc in acc['splits']:
-                if sacc['persona'].lower() == 'manager':
-                    amount = floor(acc_balance * ((sacc['percentage'] - deductable_fees)/100))
-                else:
-                    amount = floor(acc_balance * (sacc['percentage']/100))
-                if amount < 1:
-                    logging.info(f'Important: Skipping payment to {sacc["persona"]} as it would be less than 1SLP')
-                    continue
-                total_payments += amount
-                # define type
-                if sacc['persona'].lower() == 'manager':
-                    t = 'manager'
-                elif sacc['persona'].lower() == 'scholar':
-                    t = 'scholar'
-                elif sacc['persona'].lower() in ['trainer', 'investor', 'trainer/investor', 'investor/trainer']:
-                    t = 'trainer'
-                else:
-                    t = 'other'
-                acc_payments[sacc['ronin']] = amount
-                self.summary.increase_payout(amount=amount, address=sacc['ronin'], payout_type=t)
-            # Dono Payments
-            if self.donations:
-                for dono in self.donations:
-                    dono_amount = floor(acc_balance * (dono["percentage"]/100))
-                    if dono_amount > 0:
-                        acc_payments[dono['ronin']] = dono_amount
-                        self.summary.increase_payout(amount=dono_amount, address=dono['ronin'], payout_type='donation')
-                        total_payments += dono_amount
-            # Fee Payments
-            fee_amount = floor(acc_balance * 0.01)
-            if fee_amount > 0:
-                acc_payments[CREATOR_FEE_ADDRESS] = fee_amount
-                self.summary.increase_payout(amount=fee_amount, address=CREATOR_FEE_ADDRESS, payout_type='donation')
-                total_payments += fee_amount
+            payout_types = {}
+            for payment in payments:
+                acc_payments[payment['ronin']] = payment['amount']
+                payout_types[payment['ronin']] = payment['type']
             if self.check_acc_has_enough_balance(acc['ronin'], total_payments) and acc_balance > 0:
                 accept = "y" if self.auto else None
                 while accept not in ["y", "n", "Y", "N"]:
                     accept = input(f"Do you want to proceed with payments for {acc['name']} ({acc_payments})? (y/n): ")
                 if accept.lower() == "y":
-                    s = TrezorScatter('slp', acc['ronin'], client, bip_path, acc_payments)
-                    s.execute()
-                    logging.info(f"SLP scatter completed for account: '{acc['name']}'")
+                    self.add_scatter(acc['name'], acc['ronin'], client, bip_path, acc_payments, payout_types)
                 else:
                     logging.info(f"SLP scatter canceled for account: '{acc['name']}'")
-        logging.info(f"Important: Transactions Summary:\n {self.summary}")
+        self.execute_scatters()
 
     def prepare_old_payout(self):
+        self.scholar_accounts = self.sessions.group(self.scholar_accounts, lambda acc: acc['AccountAddress'])
         for acc in self.scholar_accounts:
-            client = get_default_client(
-                ui=CustomUI(passphrase=self.trezor_config[acc['AccountAddress'].lower()]['passphrase']))
+            client = self.sessions.client(acc['AccountAddress'])
             bip_path = self.trezor_config[acc['AccountAddress'].lower()]['bip_path']
-            acc_balance = check_balance(acc['AccountAddress'].lower())
+            acc_balance = self.get_balance(acc['AccountAddress'])
             total_payments = 0
             acc_payments = {}
+            payout_types = {}
             # Scholar Payment
             scholar_amount = acc_balance * (acc["ScholarPercent"]/100)
             scholar_amount += acc.get("ScholarPayout", 0)
             scholar_amount = round(scholar_amount)
             acc_payments[acc["ScholarPayoutAddress"]] = scholar_amount
-            self.summary.increase_payout(amount=scholar_amount, address=acc["ScholarPayoutAddress"], payout_type='scholar')
+            payout_types[acc["ScholarPayoutAddress"]] = 'scholar'
             total_payments += scholar_amount
             if acc.get("TrainerPayoutAddress"):
                 # Trainer Payment
@@ -254,7 +248,7 @@ class TrezorAxiePaymentsManager:
                 trainer_amount = round(trainer_amount)
                 if trainer_amount > 0:
                     acc_payments[acc["TrainerPayoutAddress"]] = trainer_amount
-                    self.summary.increase_payout(amount=trainer_amount, address=acc["TrainerPayoutAddress"], payout_type='trainer')
+                    payout_types[acc["TrainerPayoutAddress"]] = 'trainer'
                     total_payments += trainer_amount
             manager_payout = acc_balance - total_payments
             if self.donations:
@@ -263,21 +257,20 @@ class TrezorAxiePaymentsManager:
                     dono_amount = round(acc_balance * (dono["Percent"]/100))
                     if dono_amount > 1:
                         acc_payments[dono['AccountAddress']] = dono_amount
-                        self.summary.increase_payout(amount=dono_amount, address=dono['AccountAddress'],
-                                                     payout_type='donation')
+                        payout_types[dono['AccountAddress']] = 'donation'
                         manager_payout -= dono_amount
                         total_payments += dono_amount
             # Fee Payments
             fee_amount = round(acc_balance * 0.01)
             if fee_amount > 0:
                 acc_payments[CREATOR_FEE_ADDRESS] = fee_amount
-                self.summary.increase_payout(amount=fee_amount, address=CREATOR_FEE_ADDRESS, payout_type='donation')
+                payout_types[CREATOR_FEE_ADDRESS] = 'donation'
                 manager_payout -= fee_amount
                 total_payments += fee_amount
             # Manager Payment
             if manager_payout > 0:
                 acc_payments[self.manager_acc] = manager_payout
-                self.summary.increase_payout(amount=manager_payout, address=self.manager_acc, payout_type='manager')
+                payout_types[self.manager_acc] = 'manager'
                 total_payments += manager_payout
             else:
                 logging.info("Important: Skipping manager payout as it resulted in 0 SLP.")
@@ -286,9 +279,8 @@ class TrezorAxiePaymentsManager:
                 while accept not in ["y", "n", "Y", "N"]:
                     accept = input(f"Do you want to proceed with payments for {acc['Name']} ({acc_payments})? (y/n): ")
                 if accept.lower() == "y":
-                    s = TrezorScatter('slp', acc['AccountAddress'], client, bip_path, acc_payments)
-                    s.execute()
-                    logging.info(f"SLP scatter completed for account: '{acc['Name']}'")
+                    self.add_scatter(acc['Name'], acc['AccountAddress'], client, bip_path, acc_payments,
+                                     payout_types)
                 else:
                     logging.info(f"SLP scatter canceled for account: '{acc['Name']}'")
-        logging.info(f"Important: Transactions Summary:\n {self.summary}")
+        self.execute_scatters()
@@ -0,0 +1,163 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import rlp
+from requests.exceptions import RequestException
+from trezorlib import ethereum
+from trezorlib.tools import parse_path
+from web3 import Web3
+from axie_utils.utils import RONIN_PROVIDER, USER_AGENT, get_nonce
+
+
+BROADCAST_CONCURRENCY = 5
+TREZOR_TX_GAS = 250000
+
+
+def sign_transaction(client, bip_path, transaction):
+    """ Signs a built transaction on the trezor device, returns the raw signed transaction """
+    data = Web3.toBytes(hexstr=transaction['data'])
+    sig = ethereum.sign_tx(
+        client,
+        n=bip_path,
+        nonce=transaction['nonce'],
+        gas_price=transaction['gasPrice'],
+        gas_limit=transaction['gas'],
+        to=transaction['to'],
+        value=transaction['value'],
+        data=data,
+        chain_id=2020
+    )
+    l_sig = list(sig)
+    l_sig[1] = l_sig[1].lstrip(b'\x00')
+    l_sig[2] = l_sig[2].lstrip(b'\x00')
+    to = Web3.toBytes(hexstr=transaction['to'])
+    return rlp.encode((transaction['nonce'], transaction['gasPrice'], transaction['gas'], to, transaction['value'],
+                       data) + tuple(l_sig))
+
+
+class TrezorTransaction:
+    """ Contract call to be signed by the trezor device, built once the pipeline gives it a nonce """
+
+    def __init__(self, kind, description, from_acc, client, bip_path, function, gas=TREZOR_TX_GAS, device=None,
+                 value=0):
+        self.kind = kind
+        self.description = description
+        self.from_acc = from_acc.lower().replace("ronin:", "0x")
+        self.client = client
+        self.bip_path = parse_path(bip_path) if isinstance(bip_path, str) else bip_path
+        self.function = function
+        self.gas = gas
+        self.device = device
+        self.value = value
+
+    def build(self, nonce):
+        return self.function.buildTransaction({
+            "chainId": 2020,
+            "gas": self.gas,
+            "from": Web3.toChecksumAddress(self.from_acc),
+            "gasPrice": Web3.toWei("1", "gwei"),
+            "value": self.value,
+            "nonce": nonce
+        })
+
+    def __str__(self):
+        return self.description
+
+
+class TrezorSigningPipeline:
+    """ Signs the transactions of a run on the trezor devices while the signed ones are broadcast.
+
+    Every transaction is built up front, with the nonces of each account counted
+    locally. Each device then signs its transactions one after the other, devices
+    signing at the same time, and each signed transaction is handed to a pool of
+    broadcasters right away, so no device waits on the network. Transactions of an
+    account are broadcast in nonce order.
+
+    Transactions of a device may come from clients of different passphrases, the
+    clients of the session pool resume their own session before each signature. """
+
+    def __init__(self, receipts, concurrency=BROADCAST_CONCURRENCY):
+        self.w3 = Web3(
+            Web3.HTTPProvider(
+                RONIN_PROVIDER,
+                request_kwargs={"headers": {"content-type": "application/json", "user-agent": USER_AGENT}}))
+        self.receipts = receipts
+        self.concurrency = concurrency
+        self.transactions = []
+
+    def contract(self, address, abi):
+        return self.w3.eth.contract(address=Web3.toChecksumAddress(address), abi=abi)
+
+    def add(self, transaction):
+        self.transactions.append(transaction)
+
+    def fail(self, transaction, reason):
+        logging.critical(f"Important: {transaction} {reason}")
+        self.receipts.track(transaction.kind, str(transaction), None)
+
+    def build(self):
+        """ Builds every transaction, a failed build does not use up its nonce """
+        nonces = {}
+        built = []
+        for transaction in self.transactions:
+            if transaction.from_acc not in nonces:
+                nonces[transaction.from_acc] = get_nonce(transaction.from_acc)
+            try:
+                built.append((transaction, transaction.build(nonces[transaction.from_acc])))
+            except (RequestException, ValueError) as e:
+                self.fail(transaction, f"could not be built. Error given: {e}")
+                continue
+            nonces[transaction.from_acc] += 1
+        return built
+
+    def broadcast(self, transaction, raw_transaction, previous=None):
+        # A transaction whose nonce comes after one that was not sent would never be mined
+        if previous is not None and previous.result() is None:
+            self.fail(transaction, "skipped, an earlier transaction of its account was not sent")
+            return None
+        try:
+            self.w3.eth.send_raw_transaction(raw_transaction)
+        except (RequestException, ValueError) as e:
+            self.fail(transaction, f"could not be sent. Error given: {e}")
+            return None
+        _hash = self.w3.toHex(self.w3.keccak(raw_transaction))
+        logging.info(f"Important: {transaction} sent. Hash: {_hash} - "
+                     f"Explorer: https://explorer.roninchain.com/tx/{_hash}")
+        self.receipts.track(transaction.kind, str(transaction), _hash)
+        return _hash
+
+    def sign(self, built, broadcasters):
+        """ Signs the transactions of one device in order, returns them with their broadcast or None """
+        lanes = {}
+        signed = []
+        for transaction, tx in built:
+            previous = lanes.get(transaction.from_acc)
+            if previous is False:
+                self.fail(transaction, "skipped, an earlier transaction of its account was not signed")
+                signed.append((transaction, None))
+                continue
+            try:
+                raw_transaction = sign_transaction(transaction.client, transaction.bip_path, tx)
+            except Exception as e:
+                self.fail(transaction, f"could not be signed. Error given: {e}")
+                lanes[transaction.from_acc] = False
+                signed.append((transaction, None))
+                continue
+            lanes[transaction.from_acc] = broadcasters.submit(self.broadcast, transaction, raw_transaction, previous)
+            signed.append((transaction, lanes[transaction.from_acc]))
+        return signed
+
+    def run(self):
+        """ Signs and broadcasts all the transactions, returns them with their hash or None if not sent """
+        built = self.build()
+        devices = {}
+        for transaction, tx in built:
+            devices.setdefault(transaction.device, []).append((transaction, tx))
+        logging.info(f"Signing {len(built)} transactions on {len(devices)} trezor devices")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as broadcasters, \
+                ThreadPoolExecutor(max_workers=max(1, len(devices))) as signers:
+            workers = [signers.submit(self.sign, transactions, broadcasters) for transactions in devices.values()]
+            broadcasts = dict(signed for worker in workers for signed in worker.result())
+        self.transactions = []
+        return [(transaction, broadcasts[transaction].result() if broadcasts[transaction] else None)
+                for transaction, _ in built]
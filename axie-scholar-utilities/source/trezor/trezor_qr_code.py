@@ -3,13 +3,15 @@ import sys
 import logging
 from datetime import datetime
 
-from trezorlib.client import get_default_client
 import qrcode
 
-from axie_utils import TrezorAxieGraphQL, CustomUI
+from axie_utils import TrezorAxieGraphQL
+from trezor.trezor_sessions import TrezorSessionPool
 
+from axie.tokens import CachedJWTMixin
 
-class TrezorQRCode(TrezorAxieGraphQL):
+
+class TrezorQRCode(CachedJWTMixin, TrezorAxieGraphQL):
 
     def __init__(self, acc_name, path, **kwargs):
         self.acc_name = acc_name
@@ -26,9 +28,11 @@ class TrezorQRCode(TrezorAxieGraphQL):
 
 class TrezorQRCodeManager:
 
-    def __init__(self, payments_file, trezor_config, path):
+    def __init__(self, payments_file, trezor_config, path, token_cache=None, devices=None):
         self.trezor_config, self.acc_names = self.load_trezor_config_and_acc_name(trezor_config, payments_file)
+        self.token_cache = token_cache
         self.path = path
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
 
     def load_trezor_config_and_acc_name(self, trezor_config, payments_file):
         config = trezor_config
@@ -65,10 +69,15 @@ class TrezorQRCodeManager:
             TrezorQRCode(
                 acc_name=self.acc_names[acc],
                 account=acc,
-                client=get_default_client(ui=CustomUI(passphrase=self.trezor_config[acc]['passphrase'])),
+                client=self.sessions.client(acc),
                 bip_path=self.trezor_config[acc]['bip_path'],
-                path=self.path
-            ) for acc in self.trezor_config
+                path=self.path,
+                token_cache=self.token_cache
+            ) for acc in self.sessions.group(self.trezor_config, lambda acc: acc)
         ]
-        for qr in qrcode_list:
-            qr.generate_qr()
+        try:
+            for qr in qrcode_list:
+                qr.generate_qr()
+        finally:
+            if self.token_cache:
+                self.token_cache.save()
@@ -1,36 +1,49 @@
+import sys
 import logging
-from trezorlib.client import get_default_client
 
-from axie_utils import check_balance, TrezorScatter, CustomUI
+from axie.receipts import ReceiptTracker
+from axie.scatter import ScatterPlanMixin
+from axie.scatter_chunks import chunk_scatter, has_funds
+from trezor.trezor_pipeline import TrezorSigningPipeline, TrezorTransaction
+from trezor.trezor_sessions import TrezorSessionPool
 
-class TrezorScatterRonManager:
-    def __init__(self, from_acc, payments, config_file, min_ron):
+
+class TrezorScatterRonManager(ScatterPlanMixin):
+    def __init__(self, from_acc, payments, config_file, min_ron, devices=None):
         self.min_ron = float(min_ron)
         self.from_acc = from_acc
-        self.bip_path = config_file[self.from_acc]['bip_path']
-        self.client = get_default_client(ui=CustomUI(passphrase=config_file[self.from_acc]['passphrase']))
-        self.scatter_accounts_amounts = self.load_scatter(payments)
+        self.config = config_file.get(self.from_acc)
+        self.payments = payments
+        self.sessions = TrezorSessionPool(config_file, devices)
+        self._scatter_accounts_amounts = None
+        self.receipts = ReceiptTracker()
+
+    def verify_inputs(self):
+        if not self.config:
+            logging.critical(f"Account '{self.from_acc}' is not present in trezor config, please re-run setup.")
+            sys.exit()
+
+    @property
+    def bip_path(self):
+        return self.config['bip_path']
+
+    @property
+    def client(self):
+        # Connecting to the device is only needed to sign, not to plan the scatter
+        return self.sessions.client(self.from_acc)
 
-    def load_scatter(self, payments):
-        scatter_dict = {}
-        if 'Manager' in payments:
-            for scholar in payments['Scholars']:
-                # check how much ron to scatter
-                missing_ron = self.min_ron - check_balance(scholar['AccountAddress'], 'ron')
-                if missing_ron > 0:
-                    scatter_dict[scholar['AccountAddress']] = missing_ron
-                else:
-                    logging.info(f'Account {scholar["AccountAddress"]} already has more than the min ron desired')
-        else:
-            for scholar in payments['scholars']:
-                # check how much ron to scatter
-                missing_ron = self.min_ron - check_balance(scholar['ronin'], 'ron')
-                if missing_ron > 0:
-                    scatter_dict[scholar['ronin']] = missing_ron
-                else:
-                    logging.info(f'Account {scholar["ronin"]} already has more than the min ron desired')
-        return scatter_dict
-    
     def execute(self):
-        s = TrezorScatter('ron', self.from_acc, self.client, self.bip_path, self.scatter_accounts_amounts)
-        s.execute()
+        chunks = chunk_scatter('ron', self.from_acc, None, self.scatter_accounts_amounts)
+        if chunks and has_funds(chunks):
+            if len(chunks) > 1:
+                logging.info(f"Scattering RON to {len(self.scatter_accounts_amounts)} accounts "
+                             f"in {len(chunks)} transactions")
+            pipeline = TrezorSigningPipeline(self.receipts)
+            for i, chunk in enumerate(chunks, start=1):
+                pipeline.add(TrezorTransaction(
+                    "Scatter", str(chunk) if len(chunks) == 1 else f"{chunk} ({i}/{len(chunks)})", self.from_acc,
+                    self.client, self.bip_path, chunk.scatter_function(), gas=chunk.transaction_gas(),
+                    device=self.sessions.device(self.from_acc), value=chunk.value()))
+            pipeline.run()
+        self.receipts.wait()
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
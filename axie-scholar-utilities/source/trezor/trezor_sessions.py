@@ -0,0 +1,142 @@
+import sys
+import logging
+import threading
+
+from trezorlib import ethereum
+from trezorlib.client import get_default_client
+from trezorlib.tools import parse_path, HARDENED_FLAG
+
+from axie_utils import CustomUI
+from trezor.trezor_devices import derive_child, public_key_address
+
+
+class TrezorSessionPool:
+    """ Trezor clients of a run, one per device and passphrase in the trezor config.
+
+    Opening a client enumerates the USB devices and opens a passphrase session on
+    the device. Each passphrase gets its client the first time one of its accounts
+    signs, and every later operation of those accounts reuses it.
+
+    A device only has one active session, the one last initialized. Every call a
+    client makes to its device holds the device, and first initializes the device
+    again with the session of the client when another client used it last.
+
+    When several devices are given, every account of the config is first located on
+    the device that holds it, and its clients are opened on that device. """
+
+    def __init__(self, trezor_config, devices=None):
+        self.trezor_config = trezor_config
+        self.devices = devices or []
+        self.accounts = None
+        self.clients = {}
+        self.active = {}
+        self.device_locks = {}
+        self.lock = threading.Lock()
+        self.locating = threading.Lock()
+
+    def passphrase(self, account):
+        return self.trezor_config[account.lower()]['passphrase']
+
+    def device_lock(self, device):
+        with self.lock:
+            return self.device_locks.setdefault(device, threading.RLock())
+
+    def open_client(self, passphrase, device=None):
+        """ Opens a session of the passphrase on the device with a client that resumes it on every call """
+        lock = self.device_lock(device)
+        with lock:
+            client = get_default_client(path=device, ui=CustomUI(passphrase=passphrase))
+            self.active[device] = client
+        open_client, close_client = client.open, client.close
+
+        def open():
+            # Trezorlib opens the client around every call to the device, calls inside it are part of the same call
+            lock.acquire()
+            try:
+                if client.session_counter == 0 and self.active.get(device) is not client:
+                    self.active[device] = client
+                    client.init_device(session_id=client.session_id)
+                open_client()
+            except BaseException:
+                self.active.pop(device, None)
+                lock.release()
+                raise
+
+        def close():
+            try:
+                close_client()
+            finally:
+                lock.release()
+
+        client.open, client.close = open, close
+        return client
+
+    def session(self, passphrase, device=None):
+        with self.device_lock(device):
+            if (device, passphrase) not in self.clients:
+                logging.debug(f"Opening trezor session number {len(self.clients) + 1}")
+                self.clients[(device, passphrase)] = self.open_client(passphrase, device)
+            return self.clients[(device, passphrase)]
+
+    def device(self, account):
+        """ Path of the device that holds the account, None to use the default device """
+        if len(self.devices) < 2:
+            return self.devices[0] if self.devices else None
+        with self.locating:
+            if self.accounts is None:
+                self.accounts = self.locate()
+        if account.lower() not in self.accounts:
+            logging.critical(f"Account {account} is not held by any of the connected trezor devices, "
+                             "please review your trezor config.")
+            sys.exit()
+        return self.accounts[account.lower()]
+
+    def client(self, account):
+        return self.session(self.passphrase(account), self.device(account))
+
+    def locate(self):
+        """ Maps the accounts of the config to the device holding them. Each device is asked the public
+        node of every passphrase and accounts path once, addresses are derived from it locally.
+
+        Probing opens a session of every passphrase on every device, those sessions are ended once
+        probed and are never used to sign, the clients of the accounts open their own session. """
+        nodes = {}
+        for account, config in self.trezor_config.items():
+            path = parse_path(config['bip_path'])
+            nodes.setdefault((config['passphrase'], tuple(path[:-1])), []).append((account.lower(), path))
+        located = {}
+        for device in self.devices:
+            for (passphrase, parent), accounts in nodes.items():
+                pending = [(account, path) for account, path in accounts if account not in located]
+                if not pending:
+                    continue
+                client = self.open_client(passphrase, device)
+                try:
+                    node = ethereum.get_public_node(client, list(parent)).node
+                    for account, path in pending:
+                        if path[-1] & HARDENED_FLAG:
+                            # Hardened addresses can not be derived from the public node
+                            address = ethereum.get_address(client, path).lower().replace("0x", "ronin:")
+                        else:
+                            address = public_key_address(derive_child(node.public_key, node.chain_code, path[-1])[0])
+                        if address == account:
+                            located[account] = device
+                finally:
+                    self.end_probe(client, device)
+            logging.info(f"Trezor device {device} holds {list(located.values()).count(device)} accounts")
+        return located
+
+    def end_probe(self, client, device):
+        """ Ends the session of a probing client, the next client to use the device initializes it again """
+        with self.device_lock(device):
+            client.end_session()
+            self.active.pop(device, None)
+
+    def group(self, items, account_of):
+        """ Puts together the items signed with the same device and passphrase, so each device switches sessions
+        as rarely as possible. Items of a session keep their order, sessions go in order of first use. """
+        groups = {}
+        for item in items:
+            account = account_of(item)
+            groups.setdefault((self.device(account), self.passphrase(account)), []).append(item)
+        return [item for group in groups.values() for item in group]
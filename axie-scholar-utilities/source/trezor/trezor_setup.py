@@ -1,20 +1,43 @@
 import json
 import logging
 
-from trezorlib.client import get_default_client
 from trezorlib.tools import parse_path
 from trezorlib import ethereum
 
-from axie_utils import CustomUI
+from trezor.trezor_devices import derive_child, public_key_address
+from trezor.trezor_sessions import TrezorSessionPool
+
+
+ACCOUNTS_PATH = "m/44'/60'/0'/0"
+# Consecutive addresses without a roster account after which a passphrase is not scanned any further
+ADDRESS_GAP_LIMIT = 20
 
 
 class TrezorAccountsSetup:
 
-    def __init__(self, payments_file, trezor_config_file=None, path=None, type='legacy'):
+    def __init__(self, payments_file, trezor_config_file=None, path=None, type='legacy', gap_limit=ADDRESS_GAP_LIMIT):
         self.trezor_config = trezor_config_file if trezor_config_file else {}
         self.payments = payments_file
         self.path = path
         self.type = type
+        self.gap_limit = gap_limit
+        self.sessions = TrezorSessionPool(self.trezor_config)
+
+    def scan_passphrase(self, passphrase, non_configured_accs):
+        """ Matches the roster accounts to the addresses of a passphrase. Only the public node of the
+        accounts path is asked to the device, every address is derived from it locally. """
+        node = ethereum.get_public_node(self.sessions.session(passphrase), parse_path(ACCOUNTS_PATH)).node
+        index = gap = 0
+        while non_configured_accs and gap < self.gap_limit:
+            address = public_key_address(derive_child(node.public_key, node.chain_code, index)[0])
+            if address in non_configured_accs:
+                self.trezor_config[address] = {"passphrase": passphrase, "bip_path": f"{ACCOUNTS_PATH}/{index}"}
+                non_configured_accs.remove(address)
+                gap = 0
+            else:
+                gap += 1
+            index += 1
+        logging.info(f"Scanned {index} addresses of that passphrase, {len(non_configured_accs)} accounts left")
 
     def update_trezor_config(self):
         account_list = []
@@ -33,21 +56,7 @@ class TrezorAccountsSetup:
 
         while non_configured_accs:
             pf = input("Please input one of your passphrases (can be empty): ")
-            ui = CustomUI(passphrase=pf)
-            num_accs = 0
-            while num_accs == 0:
-                num_inp = input("Please input number of accounts in that passphrase (1-50): ")
-                try:
-                    num_accs = int(num_inp)
-                except ValueError:
-                    pass
-            for i in range(num_accs):
-                client = get_default_client(ui=ui)
-                bip_path = f"m/44'/60'/0'/0/{i}"
-                address = ethereum.get_address(client, parse_path(bip_path), True).lower().replace('0x', 'ronin:')
-                if address in non_configured_accs:
-                    self.trezor_config[address] = {"passphrase": pf, "bip_path": bip_path}
-                    non_configured_accs.remove(address)
+            self.scan_passphrase(pf, non_configured_accs)
 
         logging.info('Gathered all accounts config, saving trezor_config file')
         file_path = self.path if self.path else 'trezor_config.json'
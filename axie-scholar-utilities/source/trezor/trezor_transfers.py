@@ -1,40 +1,55 @@
 import sys
 import logging
-from datetime import datetime
 
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
-from trezorlib.client import get_default_client
+from trezorlib.tools import parse_path
+from web3 import Web3
 
-from axie.schemas import transfers_schema
-from axie.utils import load_json, ImportantLogsFilter
- 
-from axie_utils import CustomUI, TrezorTransfer, Axies
+from axie.schemas import transfers_validator, transfer_validator, schema_errors
+from axie.receipts import ReceiptTracker
+from axie.inventory import AxieInventory
+from axie.bulk_transfers import (BulkTransfer, chunk_transfers, group_by_account, send_bulk_transfers,
+                                 check_batch_contract)
+from axie.transfers import PlannedTransfer, chunk_accounts
+from axie.utils import load_json, JsonRecords
 
+from axie_utils import Axies
+from axie_utils.abis import AXIE_ABI
+from axie_utils.utils import AXIE_CONTRACT
+from trezor.trezor_pipeline import TrezorSigningPipeline, TrezorTransaction, sign_transaction
+from trezor.trezor_sessions import TrezorSessionPool
 
-now = int(datetime.now().timestamp())
-log_file = f'logs/results_{now}.log'
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(log_file, mode='w')
-file_handler.setLevel(logging.INFO)
-file_handler.addFilter(ImportantLogsFilter())
-logger.addHandler(file_handler)
+
+class TrezorBulkTransfer(BulkTransfer):
+    """ Bulk transfer signed by the trezor device """
+
+    def __init__(self, from_acc, client, bip_path, transfers, contract):
+        super().__init__(from_acc, None, transfers, contract)
+        self.client = client
+        self.bip_path = parse_path(bip_path)
+
+    def sign(self, transaction):
+        return sign_transaction(self.client, self.bip_path, transaction)
 
 
 class TrezorAxieTransferManager:
-    def __init__(self, transfers_file, trezor_config, secure=None):
-        self.transfers_file = load_json(transfers_file)
+    def __init__(self, transfers_file, trezor_config, secure=None, stream=False, bulk_contract=None, devices=None,
+                 approve=False):
+        if stream:
+            self.transfers_file = JsonRecords(transfers_file, transfer_validator)
+        else:
+            self.transfers_file = load_json(transfers_file)
         self.trezor_config = load_json(trezor_config)
         self.secure = secure
+        self.receipts = ReceiptTracker()
+        self.bulk_contract = bulk_contract
+        self.approve = approve
+        self.sessions = TrezorSessionPool(self.trezor_config, devices)
 
     def verify_inputs(self):
         logging.info("Validating file inputs...")
         validation_success = True
         # Validate transfers file
-        try:
-            validate(self.transfers_file, transfers_schema)
-        except ValidationError as ex:
+        for ex in schema_errors(transfers_validator, self.transfers_file):
             logging.critical("Transfers file failed validation. Please review it. "
                              f"Error given: {ex.message}. "
                              f"For attribute in: {list(ex.path)}")
@@ -52,33 +67,71 @@ class TrezorAxieTransferManager:
         logging.info("Files correctly validated!")
 
     def prepare_transfers(self):
-        transfers = []
         logging.info("Preparing transfers")
-        for acc in self.transfers_file:
+        if self.bulk_contract and not check_batch_contract(self.bulk_contract):
+            return
+        for records in chunk_accounts(self.transfers_file):
+            transfers = self.plan_transfers(records)
+            if self.bulk_contract:
+                self.execute_bulk_transfers(transfers)
+            else:
+                self.execute_transfers(transfers)
+        logging.info(f"Important: Transactions Receipts:\n {self.receipts}")
+
+    def plan_transfers(self, records):
+        """ Plans the transfers of a chunk of accounts, grouped by the trezor session that signs them.
+        The device signs them, they carry no private key """
+        transfers = []
+        inventory = AxieInventory(acc['AccountAddress'] for acc in records).load()
+        for acc in records:
             a = Axies(acc['AccountAddress'].lower())
             for axie in acc['Transfers']:
                 if not self.secure or (self.secure and axie['ReceiverAddress'].lower() in self.trezor_config):
                     # Check axie in account
-                    if a.check_axie_owner(axie['AxieId']):
-                        t = TrezorTransfer(
-                            to_acc=axie['ReceiverAddress'].lower(),
-                            client=get_default_client(
-                                ui=CustomUI(
-                                    passphrase=self.trezor_config[acc['AccountAddress'].lower()]['passphrase'])),
-                            bip_path=self.trezor_config[acc['AccountAddress'].lower()]['bip_path'],
-                            from_acc=acc['AccountAddress'].lower(),
+                    if inventory.check_owner(a, axie['AxieId']):
+                        t = PlannedTransfer(
+                            from_acc=acc['AccountAddress'].lower().replace("ronin:", "0x"),
+                            from_private=None,
+                            to_acc=axie['ReceiverAddress'].lower().replace("ronin:", "0x"),
                             axie_id=axie['AxieId']
                         )
                         transfers.append(t)
-                        logging.info(f"Added transaction to the list: {t}")
+                        logging.info(f"Added transaction to the list: Axie Transfer of axie ({t.axie_id}) "
+                                     f"from account ({acc['AccountAddress']}) to account ({axie['ReceiverAddress']})")
                     else:
                         logging.info(f"Axie ({axie['AxieId']}) not in account ({acc['AccountAddress']}), skipping.")
                 else:
                     logging.info(f"Receiver address {axie['ReceiverAddress']} not in secrets.json, skipping transfer.")
-            self.execute_transfers(transfers)
+        return self.sessions.group(transfers, lambda t: t.from_acc.replace('0x', 'ronin:'))
 
     def execute_transfers(self, transfers):
         logging.info("Starting to transfer axies")
+        pipeline = TrezorSigningPipeline(self.receipts)
+        axie_contract = pipeline.contract(AXIE_CONTRACT, AXIE_ABI)
         for t in transfers:
-            t.execute()
+            account = t.from_acc.replace('0x', 'ronin:')
+            pipeline.add(TrezorTransaction("Transfer",
+                                           f"Axie Transfer of axie ({t.axie_id}) from account ({account}) "
+                                           f"to account ({t.to_acc.replace('0x', 'ronin:')})",
+                                           t.from_acc, self.sessions.client(account),
+                                           self.trezor_config[account]['bip_path'],
+                                           axie_contract.functions.safeTransferFrom(
+                                               Web3.toChecksumAddress(t.from_acc),
+                                               Web3.toChecksumAddress(t.to_acc),
+                                               t.axie_id),
+                                           device=self.sessions.device(account)))
+        pipeline.run()
+        logging.info("Axie transfers finished")
+        self.receipts.wait()
+
+    def execute_bulk_transfers(self, transfers):
+        logging.info("Starting to transfer axies in bulk")
+        for from_acc, acc_transfers in group_by_account(transfers).items():
+            account = from_acc.replace('0x', 'ronin:')
+            client = self.sessions.client(account)
+            bulks = [TrezorBulkTransfer(from_acc, client, self.trezor_config[account]['bip_path'],
+                                        [(t.axie_id, t.to_acc) for t in chunk], self.bulk_contract)
+                     for chunk in chunk_transfers(acc_transfers)]
+            send_bulk_transfers(bulks, self.receipts, self.approve)
         logging.info("Axie transfers finished")
+        self.receipts.wait()
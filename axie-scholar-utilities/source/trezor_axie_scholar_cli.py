@@ -5,8 +5,8 @@ axie_breeding, generate_breedings, scatter_ron and a few managed ones which mean
 they have an integration with axie.management
 
 Usage:
-    trezor_axie_scholar_cli.py payout <payments_file> <config_file> [-y]
-    trezor_axie_scholar_cli.py managed_payout <config_file> <token> [-y]
+    trezor_axie_scholar_cli.py payout <payments_file> <config_file> [-y] [--summary=<file>]
+    trezor_axie_scholar_cli.py managed_payout <config_file> <token> [-y] [--summary=<file>]
     trezor_axie_scholar_cli.py scatter_ron <payments_file> <config_file> <min_amount>
     trezor_axie_scholar_cli.py managed_scatter_ron <config_file> <token> <min_amount>
     trezor_axie_scholar_cli.py claim <payments_file> <config_file> [--force]
@@ -19,7 +19,8 @@ Usage:
     trezor_axie_scholar_cli.py axie_morphing <config_file> <list_of_accounts>
     trezor_axie_scholar_cli.py axie_breeding <breedings_file> <config_file>
     trezor_axie_scholar_cli.py generate_breedings <csv_file> [<breedings_file>]
-    trezor_axie_scholar_cli.py transfer_axies <transfers_file> <config_file> [--safe-mode]
+    trezor_axie_scholar_cli.py transfer_axies <transfers_file> <config_file> [--safe-mode] [--bulk=<contract>]
+                               [--approve-bulk]
     trezor_axie_scholar_cli.py generate_transfer_axies <csv_file> [<transfers_file>]
     trezor_axie_scholar_cli.py -h | --help
     trezor_axie_scholar_cli.py --version
@@ -28,6 +29,10 @@ Options:
     -h --help   Shows this extra help options
     -y --yes    Automatically say "yes" to all confirmation promts (they will not appear).
     --force     Forces claim even if last claim was less than 14 days ago. (Used to bypass possible issues)
+    --bulk=<contract>  Sends the transfers of each account in as few transactions as possible through the batch
+                           transfer contract at this address.
+    --approve-bulk  Allows the batch transfer contract to move all the axies of the accounts, after confirming it.
+    --summary=<file>    Saves the payouts made to this file, as CSV if it ends in .csv and as JSON otherwise.
     --version   Show version.
 """
 import os
@@ -36,21 +41,10 @@ import csv
 import json
 import logging
 
-import requests
 from docopt import docopt
 
-from axie_utils import Axies
+from axie.logs import setup_run_logging
 from axie.utils import load_json
-from trezor import (
-    TrezorAccountsSetup,
-    TrezorAxiePaymentsManager,
-    TrezorAxieBreedManager,
-    TrezorAxieClaimsManager,
-    TrezorAxieTransferManager,
-    TrezorAxieMorphingManager,
-    TrezorQRCodeManager,
-    TrezorScatterRonManager
-)
 
 # Setup logger
 os.makedirs('logs', exist_ok=True)
@@ -151,6 +145,7 @@ def generate_payments_file(csv_file_path, payments_file_path=None):
 
 
 def load_payments_file(token):
+    import requests
     url = "https://api.axie.management/external/epithslayer/user/scholars"
     r = requests.post(url, json={"accessToken": token})
     if r.status_code == 500:
@@ -165,6 +160,14 @@ def load_payments_file(token):
         return r.json()
 
 
+def save_summary(summary, summary_file_path):
+    if summary_file_path.lower().endswith('.csv'):
+        summary.export_csv(summary_file_path)
+    else:
+        summary.export_json(summary_file_path)
+    logging.info(f'Payouts summary saved at {summary_file_path}')
+
+
 def check_file(file):
     if not os.path.isfile(file):
         logging.critical('Please provide a correct path to the file. '
@@ -173,249 +176,366 @@ def check_file(file):
     return True
 
 
+# Function running each subcommand. They import the managers they use when they run,
+# so starting the CLI does not load the dependencies of every other subcommand.
+COMMANDS = {}
+
+
+def command(name):
+    def register(run):
+        COMMANDS[name] = run
+        return run
+    return register
+
+
+@command('payout')
+def run_payout(args):
+    from trezor import TrezorAxiePaymentsManager
+    from trezor.trezor_devices import connected_devices
+    logging.info("I shall help you pay!")
+    payments_file_path = args['<payments_file>']
+    config_file_path = args['<config_file>']
+    if check_file(payments_file_path) and check_file(config_file_path):
+        logging.info('I shall pay my scholars!')
+        if args['--yes']:
+            logging.info("Automatic acceptance active, it won't ask before each execution")
+        apm = TrezorAxiePaymentsManager(load_json(payments_file_path), load_json(config_file_path), auto=args['--yes'],
+                                        devices=connected_devices())
+        apm.verify_inputs()
+        apm.load_balances()
+        apm.prepare_payout()
+        if args['--summary']:
+            save_summary(apm.summary, args['--summary'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_payout')
+def run_managed_payout(args):
+    from trezor import TrezorAxiePaymentsManager
+    from trezor.trezor_devices import connected_devices
+    logging.info("I shall help you pay!")
+    token = args['<token>']
+    payments = load_payments_file(token)
+    config_file_path = args['<config_file>']
+    if check_file(config_file_path):
+        logging.info('I shall pay my scholars!')
+        if args['--yes']:
+            logging.info("Automatic acceptance active, it won't ask before each execution")
+        apm = TrezorAxiePaymentsManager(payments, load_json(config_file_path), auto=args['--yes'],
+                                        devices=connected_devices())
+        apm.verify_inputs()
+        apm.load_balances()
+        apm.prepare_payout()
+        if args['--summary']:
+            save_summary(apm.summary, args['--summary'])
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('scatter_ron')
+def run_scatter_ron(args):
+    from trezor import TrezorScatterRonManager
+    from trezor.trezor_devices import connected_devices
+    logging.info("I shall help you scatter ron!")
+    payments_file_path = args['<payments_file>']
+    config_file_path = args['<config_file>']
+    try:
+        min_ron = float(args['<min_amount>'])
+    except ValueError:
+        logging.warning(f"Min amount {args['min_amount']} has to be a number!")
+        sys.exit()
+    if check_file(payments_file_path) and check_file(config_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will provide the RON to scatter: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        logging.info('I shall scatter ron for my scholars!')
+        scm = TrezorScatterRonManager(payment_account, load_json(payments_file_path), load_json(config_file_path),
+                                      min_ron, devices=connected_devices())
+        scm.verify_inputs()
+        scm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_scatter_ron')
+def run_managed_scatter_ron(args):
+    from trezor import TrezorScatterRonManager
+    from trezor.trezor_devices import connected_devices
+    logging.info("I shall help you scatter ron!")
+    config_file_path = args['<config_file>']
+    token = args['<token>']
+    payments = load_payments_file(token)
+    try:
+        min_ron = float(args['<min_amount>'])
+    except ValueError:
+        logging.warning(f"Min amount {args['min_amount']} has to be a number!")
+        sys.exit()
+    if check_file(config_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will provide the RON to scatter: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        logging.info('I shall scatter ron for my scholars!')
+        scm = TrezorScatterRonManager(payment_account, payments, load_json(config_file_path), min_ron,
+                                      devices=connected_devices())
+        scm.verify_inputs()
+        scm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('claim')
+def run_claim(args):
+    from trezor import TrezorAxieClaimsManager
+    from trezor.trezor_devices import connected_devices
+    from axie.tokens import open_token_cache
+    payments_file_path = args['<payments_file>']
+    config_file_path = args['<config_file>']
+    force = args['--force']
+    if check_file(payments_file_path) and check_file(config_file_path):
+        # Claim SLP
+        logging.info('I shall claim SLP')
+        acm = TrezorAxieClaimsManager(load_json(payments_file_path), load_json(config_file_path), force,
+                                      token_cache=open_token_cache(), devices=connected_devices())
+        acm.verify_inputs()
+        acm.prepare_claims()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_claim')
+def run_managed_claim(args):
+    from trezor import TrezorAxieClaimsManager
+    from trezor.trezor_devices import connected_devices
+    from axie.tokens import open_token_cache
+    token = args['<token>']
+    payments = load_payments_file(token)
+    config_file_path = args['<config_file>']
+    force = args['--force']
+    if check_file(config_file_path):
+        # Claim SLP
+        logging.info('I shall claim SLP')
+        acm = TrezorAxieClaimsManager(payments, load_json(config_file_path), force, token_cache=open_token_cache(),
+                                      devices=connected_devices())
+        acm.verify_inputs()
+        acm.prepare_claims()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('config_trezor')
+def run_config_trezor(args):
+    from trezor import TrezorAccountsSetup
+    # Configure Trezor
+    logging.info('I shall help you configure your trezor device to use this tool!')
+    payments_file_path = args['<payments_file>']
+    config_file_path = args.get('<config_file>')
+    if (config_file_path and check_file(config_file_path) and check_file(payments_file_path) or
+       not config_file_path and check_file(payments_file_path)):
+        logging.info('You will be asked to introduce passphrases until you '
+                     'have configured the tool for all the accounts present in payments.json')
+        if not config_file_path:
+            tas = TrezorAccountsSetup(load_json(payments_file_path), None, None)
+        else:
+            tas = TrezorAccountsSetup(load_json(payments_file_path), load_json(config_file_path), config_file_path)
+        tas.update_trezor_config()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_config_trezor')
+def run_managed_config_trezor(args):
+    from trezor import TrezorAccountsSetup
+    # Configure Trezor
+    logging.info('I shall help you configure your trezor device to use this tool!')
+    token = args['<token>']
+    payments = load_payments_file(token)
+    config_file_path = args.get('<config_file>')
+    if config_file_path and check_file(config_file_path):
+        logging.info('You will be asked to introduce passphrases until you '
+                     'have configured the tool for all the accounts present in payments.json')
+        tas = TrezorAccountsSetup(payments, load_json(config_file_path), config_file_path, type='new')
+        tas.update_trezor_config()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_transfer_axies')
+def run_generate_transfer_axies(args):
+    # Generate Axie Transfer Files
+    logging.info('I shall help you create axie transfers file')
+    csv_file_path = args['<csv_file>']
+    transfers_file_path = args.get('<transfers_file>')
+    if (transfers_file_path and check_file(transfers_file_path) and
+       check_file(csv_file_path) or not transfers_file_path and check_file(csv_file_path)):
+        generate_transfers_file(csv_file_path, transfers_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('transfer_axies')
+def run_transfer_axies(args):
+    from trezor import TrezorAxieTransferManager
+    from trezor.trezor_devices import connected_devices
+    from axie.bulk_transfers import confirm_approval
+    # Make Axie Transfers
+    logging.info('I shall send axies around')
+    transfers_file_path = args['<transfers_file>']
+    config_file_path = args['<config_file>']
+    secure = args.get("--safe-mode", None)
+    if check_file(transfers_file_path) and check_file(config_file_path):
+        approve = bool(args['--bulk']) and args['--approve-bulk'] and confirm_approval(args['--bulk'])
+        atm = TrezorAxieTransferManager(transfers_file_path, config_file_path, secure=secure, stream=True,
+                                        bulk_contract=args['--bulk'], devices=connected_devices(),
+                                        approve=approve)
+        atm.verify_inputs()
+        atm.prepare_transfers()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_payments')
+def run_generate_payments(args):
+    # Generate Payments File
+    logging.info('I shall help you generate your payments file')
+    csv_file_path = args['<csv_file>']
+    payments_file_path = args.get('<payments_file>')
+    if (payments_file_path and check_file(payments_file_path) and
+       check_file(csv_file_path) or not payments_file_path and check_file(csv_file_path)):
+        generate_payments_file(csv_file_path, payments_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('axie_morphing')
+def run_axie_morphing(args):
+    from axie_utils import Axies
+    from trezor import TrezorAxieMorphingManager
+    from trezor.trezor_devices import connected_devices
+    # Morph axies from all accounts given
+    logging.info('I shall morph all axies I can!')
+    accs = args['<list_of_accounts>']
+    config_file_path = args['<config_file>']
+    if check_file(config_file_path):
+        accs_list = accs.split(',')
+        devices = connected_devices()
+        for acc in accs_list:
+            axies_to_morph = Axies(acc).find_axies_to_morph()
+            if axies_to_morph:
+                axm = TrezorAxieMorphingManager(axies_to_morph, acc, config_file_path, devices=devices)
+                axm.verify_inputs()
+                axm.execute()
+            else:
+                logging.critical("No axies to be morphed found")
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('axie_breeding')
+def run_axie_breeding(args):
+    from trezor import TrezorAxieBreedManager
+    from trezor.trezor_devices import connected_devices
+    # Breed axies
+    logging.info('I shall breed your axies')
+    breedings_file_path = args['<breedings_file>']
+    config_file_path = args['<config_file>']
+    if check_file(breedings_file_path) and check_file(config_file_path):
+        payment_account = ''
+        while payment_account == '':
+            msg = input("Provide ronin account that will pay the fee for breeding: ")
+            if len(msg) == 46 and msg.startswith('ronin:'):
+                # Make sure is a valid Hex
+                try:
+                    int(msg[6:], 16)
+                except ValueError:
+                    continue
+                payment_account = msg
+            else:
+                logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
+        abm = TrezorAxieBreedManager(breedings_file_path, config_file_path, payment_account, stream=True,
+                                     devices=connected_devices())
+        abm.verify_inputs()
+        abm.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_breedings')
+def run_generate_breedings(args):
+    # Generate breedings file
+    logging.info('I shall help you generate a breedings file')
+    breedings_file_path = args.get('<breedings_file>')
+    csv_file_path = args['<csv_file>']
+    if (breedings_file_path and check_file(breedings_file_path) and
+       check_file(csv_file_path) or not breedings_file_path and check_file(csv_file_path)):
+        generate_breedings_file(csv_file_path, breedings_file_path)
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('generate_QR')
+def run_generate_qr(args):
+    from trezor import TrezorQRCodeManager
+    from trezor.trezor_devices import connected_devices
+    from axie.tokens import open_token_cache
+    # Generate QR codes
+    logging.info('I shall generate QR codes')
+    payments_file_path = args['<payments_file>']
+    config_file_path = args['<config_file>']
+    if check_file(payments_file_path) and check_file(config_file_path):
+        qr = TrezorQRCodeManager(load_json(payments_file_path), load_json(config_file_path),
+                                 os.path.dirname(config_file_path), token_cache=open_token_cache(),
+                                 devices=connected_devices())
+        qr.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
+@command('managed_generate_QR')
+def run_managed_generate_qr(args):
+    from trezor import TrezorQRCodeManager
+    from trezor.trezor_devices import connected_devices
+    from axie.tokens import open_token_cache
+    # Generate QR codes
+    logging.info('I shall generate QR codes')
+    token = args['<token>']
+    payments = load_payments_file(token)
+    config_file_path = args['<config_file>']
+    if check_file(config_file_path):
+        qr = TrezorQRCodeManager(payments, load_json(config_file_path), os.path.dirname(config_file_path),
+                                 token_cache=open_token_cache(), devices=connected_devices())
+        qr.execute()
+    else:
+        logging.critical("Please review your file paths and re-try.")
+
+
 def run_cli():
     """ Wrapper function for testing purposes"""
     args = docopt(__doc__, version='Trezor Axie Scholar Payments CLI v3.2.3')
-    if args['payout']:
-        logging.info("I shall help you pay!")
-        payments_file_path = args['<payments_file>']
-        config_file_path = args['<config_file>']
-        if check_file(payments_file_path) and check_file(config_file_path):
-            logging.info('I shall pay my scholars!')
-            if args['--yes']:
-                logging.info("Automatic acceptance active, it won't ask before each execution")
-            apm = TrezorAxiePaymentsManager(load_json(payments_file_path), load_json(config_file_path), auto=args['--yes'])
-            apm.verify_inputs()
-            apm.prepare_payout()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    if args['managed_payout']:
-        logging.info("I shall help you pay!")
-        token = args['<token>']
-        payments = load_payments_file(token)
-        config_file_path = args['<config_file>']
-        if check_file(config_file_path):
-            logging.info('I shall pay my scholars!')
-            if args['--yes']:
-                logging.info("Automatic acceptance active, it won't ask before each execution")
-            apm = TrezorAxiePaymentsManager(payments, load_json(config_file_path), auto=args['--yes'])
-            apm.verify_inputs()
-            apm.prepare_payout()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['scatter_ron']:
-        logging.info("I shall help you scatter ron!")
-        payments_file_path = args['<payments_file>']
-        config_file_path = args['<config_file>']
-        try:
-            min_ron = float(args['<min_amount>'])
-        except ValueError:
-            logging.warning(f"Min amount {args['min_amount']} has to be a number!")
-            sys.exit()
-        if check_file(payments_file_path) and check_file(config_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will provide the RON to scatter: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            logging.info('I shall scatter ron for my scholars!')
-            scm = TrezorScatterRonManager(payment_account, load_json(payments_file_path), load_json(config_file_path), min_ron)
-            scm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_scatter_ron']:
-        logging.info("I shall help you scatter ron!")
-        config_file_path = args['<config_file>']
-        token = args['<token>']
-        payments = load_payments_file(token)
-        try:
-            min_ron = float(args['<min_amount>'])
-        except ValueError:
-            logging.warning(f"Min amount {args['min_amount']} has to be a number!")
-            sys.exit()
-        if check_file(config_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will provide the RON to scatter: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            logging.info('I shall scatter ron for my scholars!')
-            scm = TrezorScatterRonManager(payment_account, payments, load_json(config_file_path), min_ron)
-            scm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['claim']:
-        payments_file_path = args['<payments_file>']
-        config_file_path = args['<config_file>']
-        force = args['--force']
-        if check_file(payments_file_path) and check_file(config_file_path):
-            # Claim SLP
-            logging.info('I shall claim SLP')
-            acm = TrezorAxieClaimsManager(load_json(payments_file_path), load_json(config_file_path), force)
-            acm.verify_inputs()
-            acm.prepare_claims()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_claim']:
-        token = args['<token>']
-        payments = load_payments_file(token)
-        config_file_path = args['<config_file>']
-        force = args['--force']
-        if check_file(config_file_path):
-            # Claim SLP
-            logging.info('I shall claim SLP')
-            acm = TrezorAxieClaimsManager(payments, load_json(config_file_path), force)
-            acm.verify_inputs()
-            acm.prepare_claims()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['config_trezor']:
-        # Configure Trezor
-        logging.info('I shall help you configure your trezor device to use this tool!')
-        payments_file_path = args['<payments_file>']
-        config_file_path = args.get('<config_file>')
-        if (config_file_path and check_file(config_file_path) and check_file(payments_file_path) or
-           not config_file_path and check_file(payments_file_path)):
-            logging.info('You will be asked to introduce passphrases and number of accounts per passphrase until you '
-                         'have configured the tool for all the accounts present in payments.json')
-            if not config_file_path:
-                tas = TrezorAccountsSetup(load_json(payments_file_path), None, None)
-            else:
-                tas = TrezorAccountsSetup(load_json(payments_file_path), load_json(config_file_path), config_file_path)
-            tas.update_trezor_config()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_config_trezor']:
-        # Configure Trezor
-        logging.info('I shall help you configure your trezor device to use this tool!')
-        token = args['<token>']
-        payments = load_payments_file(token)
-        config_file_path = args.get('<config_file>')
-        if config_file_path and check_file(config_file_path):
-            logging.info('You will be asked to introduce passphrases and number of accounts per passphrase until you '
-                         'have configured the tool for all the accounts present in payments.json')
-            tas = TrezorAccountsSetup(payments, load_json(config_file_path), config_file_path, type='new')
-            tas.update_trezor_config()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_transfer_axies']:
-        # Generate Axie Transfer Files
-        logging.info('I shall help you create axie transfers file')
-        csv_file_path = args['<csv_file>']
-        transfers_file_path = args.get('<transfers_file>')
-        if (transfers_file_path and check_file(transfers_file_path) and
-           check_file(csv_file_path) or not transfers_file_path and check_file(csv_file_path)):
-            generate_transfers_file(csv_file_path, transfers_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['transfer_axies']:
-        # Make Axie Transfers
-        logging.info('I shall send axies around')
-        transfers_file_path = args['<transfers_file>']
-        config_file_path = args['<config_file>']
-        secure = args.get("--safe-mode", None)
-        if check_file(transfers_file_path) and check_file(config_file_path):
-            atm = TrezorAxieTransferManager(transfers_file_path, config_file_path, secure=secure)
-            atm.verify_inputs()
-            atm.prepare_transfers()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_payments']:
-        # Generate Payments File
-        logging.info('I shall help you generate your payments file')
-        csv_file_path = args['<csv_file>']
-        payments_file_path = args.get('<payments_file>')
-        if (payments_file_path and check_file(payments_file_path) and
-           check_file(csv_file_path) or not payments_file_path and check_file(csv_file_path)):
-            generate_payments_file(csv_file_path, payments_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['axie_morphing']:
-        # Morph axies from all accounts given
-        logging.info('I shall morph all axies I can!')
-        accs = args['<list_of_accounts>']
-        config_file_path = args['<config_file>']
-        if check_file(config_file_path):
-            accs_list = accs.split(',')
-            for acc in accs_list:
-                axies_to_morph = Axies(acc).find_axies_to_morph()
-                if axies_to_morph:
-                    axm = TrezorAxieMorphingManager(axies_to_morph, acc, config_file_path)
-                    axm.verify_inputs()
-                    axm.execute()
-                else:
-                    logging.critical("No axies to be morphed found")
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['axie_breeding']:
-        # Breed axies
-        logging.info('I shall breed your axies')
-        breedings_file_path = args['<breedings_file>']
-        config_file_path = args['<config_file>']
-        if check_file(breedings_file_path) and check_file(config_file_path):
-            payment_account = ''
-            while payment_account == '':
-                msg = input("Provide ronin account that will pay the fee for breeding: ")
-                if len(msg) == 46 and msg.startswith('ronin:'):
-                    # Make sure is a valid Hex
-                    try:
-                        int(msg[6:], 16)
-                    except ValueError:
-                        continue
-                    payment_account = msg
-                else:
-                    logging.info(f'Ronin provided ({msg}) looks wrong, try again.')
-            abm = TrezorAxieBreedManager(breedings_file_path, config_file_path, payment_account)
-            abm.verify_inputs()
-            abm.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_breedings']:
-        # Generate breedings file
-        logging.info('I shall help you generate a breedings file')
-        breedings_file_path = args.get('<breedings_file>')
-        csv_file_path = args['<csv_file>']
-        if (breedings_file_path and check_file(breedings_file_path) and
-           check_file(csv_file_path) or not breedings_file_path and check_file(csv_file_path)):
-            generate_breedings_file(csv_file_path, breedings_file_path)
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['generate_QR']:
-        # Generate QR codes
-        logging.info('I shall generate QR codes')
-        payments_file_path = args['<payments_file>']
-        config_file_path = args['<config_file>']
-        if check_file(payments_file_path) and check_file(config_file_path):
-            qr = TrezorQRCodeManager(load_json(payments_file_path), load_json(config_file_path), os.path.dirname(config_file_path))
-            qr.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
-    elif args['managed_generate_QR']:
-        # Generate QR codes
-        logging.info('I shall generate QR codes')
-        token = args['<token>']
-        payments = load_payments_file(token)
-        config_file_path = args['<config_file>']
-        if check_file(config_file_path):
-            qr = TrezorQRCodeManager(payments, load_json(config_file_path), os.path.dirname(config_file_path))
-            qr.execute()
-        else:
-            logging.critical("Please review your file paths and re-try.")
+    for name, run in COMMANDS.items():
+        if args[name]:
+            run(args)
+            break
 
 
 if __name__ == '__main__':
+    setup_run_logging()
     run_cli()